@@ -0,0 +1,46 @@
+"""add_web_sessions
+
+Revision ID: a7b8c9d0e1f2
+Revises: f6a7b8c9d0e1
+Create Date: 2025-10-18 00:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a7b8c9d0e1f2"
+down_revision: str | Sequence[str] | None = "f6a7b8c9d0e1"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Постоянный маппинг session_id веб-чата на user_id."""
+    # Веб-пользователи получают отрицательные user_id из общей последовательности
+    op.execute("CREATE SEQUENCE web_user_id_seq")
+
+    # Раньше ID выдавались в памяти процесса (-1, -2, ...): начинаем после уже
+    # использованных, чтобы новые сессии не получили чужую историю
+    op.execute("""
+        SELECT setval('web_user_id_seq', COALESCE(MAX(-user_id), 0) + 1, false)
+        FROM messages
+        WHERE source = 'web' AND user_id < 0
+    """)
+
+    op.execute("""
+        CREATE TABLE web_sessions (
+            session_id TEXT PRIMARY KEY,
+            user_id BIGINT NOT NULL UNIQUE DEFAULT -nextval('web_user_id_seq'),
+            created_at TIMESTAMP NOT NULL DEFAULT NOW()
+        )
+    """)
+    op.execute("ALTER SEQUENCE web_user_id_seq OWNED BY web_sessions.user_id")
+
+
+def downgrade() -> None:
+    """Откат миграции - удаление маппинга сессий."""
+    op.execute("DROP TABLE IF EXISTS web_sessions")
+    op.execute("DROP SEQUENCE IF EXISTS web_user_id_seq")
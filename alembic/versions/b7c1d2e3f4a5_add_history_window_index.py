@@ -0,0 +1,42 @@
+"""add_history_window_index
+
+Revision ID: b7c1d2e3f4a5
+Revises: a1b2c3d4e5f6
+Create Date: 2025-10-18 00:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b7c1d2e3f4a5"
+down_revision: str | Sequence[str] | None = "a1b2c3d4e5f6"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Частичный индекс под окно истории диалога (get_history и clear_history)."""
+    # Порядок ключей совпадает с ORDER BY created_at DESC, id DESC в select_history,
+    # поэтому LIMIT читает только последние N записей индекса без сортировки.
+    # content не включен: TEXT длиннее ~2.7 КБ не помещается в строку btree-индекса.
+    op.execute("""
+        CREATE INDEX idx_messages_history
+        ON messages(user_id, chat_id, created_at DESC, id DESC)
+        INCLUDE (role, message_length)
+        WHERE deleted_at IS NULL
+    """)
+
+    # Новый индекс покрывает все запросы, использовавшие idx_user_chat_deleted
+    op.execute("DROP INDEX IF EXISTS idx_user_chat_deleted")
+
+
+def downgrade() -> None:
+    """Откат миграции - возврат исходного индекса по диалогу."""
+    op.execute("""
+        CREATE INDEX idx_user_chat_deleted
+        ON messages(user_id, chat_id, deleted_at)
+    """)
+    op.execute("DROP INDEX IF EXISTS idx_messages_history")
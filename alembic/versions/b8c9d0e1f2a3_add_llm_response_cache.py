@@ -0,0 +1,35 @@
+"""add_llm_response_cache
+
+Revision ID: b8c9d0e1f2a3
+Revises: a7b8c9d0e1f2
+Create Date: 2025-10-18 00:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b8c9d0e1f2a3"
+down_revision: str | Sequence[str] | None = "a7b8c9d0e1f2"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Постоянный уровень кэша ответов LLM (общий для процессов бота и API)."""
+    # key - SHA-256 нормализованного запроса (модель, параметры, промпт, сообщения)
+    op.execute("""
+        CREATE TABLE llm_response_cache (
+            key CHAR(64) PRIMARY KEY,
+            response TEXT NOT NULL,
+            created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+        )
+    """)
+    op.execute("CREATE INDEX idx_llm_response_cache_created_at ON llm_response_cache (created_at)")
+
+
+def downgrade() -> None:
+    """Откат миграции - удаление кэша ответов LLM."""
+    op.execute("DROP TABLE IF EXISTS llm_response_cache")
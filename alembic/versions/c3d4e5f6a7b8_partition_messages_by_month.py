@@ -0,0 +1,150 @@
+"""partition_messages_by_month
+
+Revision ID: c3d4e5f6a7b8
+Revises: b7c1d2e3f4a5
+Create Date: 2025-10-18 00:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c3d4e5f6a7b8"
+down_revision: str | Sequence[str] | None = "b7c1d2e3f4a5"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# Сколько месяцев вперед создать сразу (дальше партиции создает MessagePartitionManager)
+MONTHS_AHEAD = 3
+
+
+def _create_indexes() -> None:
+    """Индексы таблицы messages (на партиционированной таблице наследуются партициями)."""
+    op.execute("""
+        CREATE INDEX idx_messages_history
+        ON messages(user_id, chat_id, created_at DESC, id DESC)
+        INCLUDE (role, message_length)
+        WHERE deleted_at IS NULL
+    """)
+    op.execute("""
+        CREATE INDEX idx_deleted_at
+        ON messages(deleted_at)
+        WHERE deleted_at IS NULL
+    """)
+    op.execute("""
+        CREATE INDEX idx_messages_source
+        ON messages(source)
+    """)
+
+
+def upgrade() -> None:
+    """Перевод messages в таблицу, партиционированную по месяцам created_at."""
+    # Старая таблица переименовывается и после копирования удаляется
+    op.execute("ALTER TABLE messages RENAME TO messages_legacy")
+    op.execute("ALTER INDEX messages_pkey RENAME TO messages_legacy_pkey")
+    op.execute("DROP INDEX IF EXISTS idx_messages_history")
+    op.execute("DROP INDEX IF EXISTS idx_deleted_at")
+    op.execute("DROP INDEX IF EXISTS idx_messages_source")
+
+    # Первичный ключ партиционированной таблицы обязан включать ключ партиционирования
+    op.execute("""
+        CREATE TABLE messages (
+            id INTEGER NOT NULL DEFAULT nextval('messages_id_seq'),
+            user_id BIGINT NOT NULL,
+            chat_id BIGINT NOT NULL,
+            role VARCHAR(20) NOT NULL,
+            content TEXT NOT NULL,
+            message_length INTEGER NOT NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            deleted_at TIMESTAMP NULL,
+            source VARCHAR(20) NOT NULL DEFAULT 'telegram',
+            PRIMARY KEY (id, created_at)
+        ) PARTITION BY RANGE (created_at)
+    """)
+
+    # Месячные партиции от самого старого сообщения до MONTHS_AHEAD месяцев вперед
+    op.execute(f"""
+        DO $$
+        DECLARE
+            month_start DATE;
+            last_month DATE := date_trunc('month', CURRENT_DATE)::date
+                + INTERVAL '{MONTHS_AHEAD} months';
+        BEGIN
+            SELECT COALESCE(
+                date_trunc('month', MIN(created_at))::date,
+                date_trunc('month', CURRENT_DATE)::date
+            )
+            INTO month_start
+            FROM messages_legacy;
+
+            WHILE month_start <= last_month LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF messages FOR VALUES FROM (%L) TO (%L)',
+                    to_char(month_start, '"messages_y"YYYY"m"MM'),
+                    month_start,
+                    (month_start + INTERVAL '1 month')::date
+                );
+                month_start := (month_start + INTERVAL '1 month')::date;
+            END LOOP;
+        END $$
+    """)
+
+    # Сюда попадают строки вне созданных партиций (если обслуживание не успело)
+    op.execute("CREATE TABLE messages_default PARTITION OF messages DEFAULT")
+
+    op.execute("""
+        INSERT INTO messages
+            (id, user_id, chat_id, role, content, message_length, created_at, deleted_at, source)
+        SELECT id, user_id, chat_id, role, content, message_length, created_at, deleted_at, source
+        FROM messages_legacy
+    """)
+
+    op.execute("ALTER SEQUENCE messages_id_seq OWNED BY messages.id")
+    op.execute("DROP TABLE messages_legacy")
+
+    _create_indexes()
+
+    # Индекс для диапазонных выборок дашборда внутри партиции
+    op.execute("""
+        CREATE INDEX idx_messages_created_at
+        ON messages(created_at)
+        WHERE deleted_at IS NULL
+    """)
+
+
+def downgrade() -> None:
+    """Откат миграции - возврат к обычной таблице messages."""
+    op.execute("ALTER TABLE messages RENAME TO messages_partitioned")
+    op.execute("ALTER INDEX messages_pkey RENAME TO messages_partitioned_pkey")
+    op.execute("DROP INDEX IF EXISTS idx_messages_history")
+    op.execute("DROP INDEX IF EXISTS idx_deleted_at")
+    op.execute("DROP INDEX IF EXISTS idx_messages_source")
+    op.execute("DROP INDEX IF EXISTS idx_messages_created_at")
+
+    op.execute("""
+        CREATE TABLE messages (
+            id INTEGER PRIMARY KEY DEFAULT nextval('messages_id_seq'),
+            user_id BIGINT NOT NULL,
+            chat_id BIGINT NOT NULL,
+            role VARCHAR(20) NOT NULL,
+            content TEXT NOT NULL,
+            message_length INTEGER NOT NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+            deleted_at TIMESTAMP NULL,
+            source VARCHAR(20) NOT NULL DEFAULT 'telegram'
+        )
+    """)
+
+    op.execute("""
+        INSERT INTO messages
+            (id, user_id, chat_id, role, content, message_length, created_at, deleted_at, source)
+        SELECT id, user_id, chat_id, role, content, message_length, created_at, deleted_at, source
+        FROM messages_partitioned
+    """)
+
+    op.execute("ALTER SEQUENCE messages_id_seq OWNED BY messages.id")
+    op.execute("DROP TABLE messages_partitioned CASCADE")
+
+    _create_indexes()
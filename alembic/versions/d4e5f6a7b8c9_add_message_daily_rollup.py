@@ -0,0 +1,63 @@
+"""add_message_daily_rollup
+
+Revision ID: d4e5f6a7b8c9
+Revises: c3d4e5f6a7b8
+Create Date: 2025-10-18 00:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d4e5f6a7b8c9"
+down_revision: str | Sequence[str] | None = "c3d4e5f6a7b8"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Дневные агрегаты сообщений для дашборда."""
+    # Количество не удаленных сообщений по дням и источникам
+    op.execute("""
+        CREATE TABLE message_daily_stats (
+            day DATE NOT NULL,
+            source VARCHAR(20) NOT NULL,
+            message_count BIGINT NOT NULL,
+            PRIMARY KEY (day, source)
+        )
+    """)
+
+    # Множество активных диалогов по дням (для COUNT DISTINCT за период)
+    op.execute("""
+        CREATE TABLE message_daily_conversations (
+            day DATE NOT NULL,
+            user_id BIGINT NOT NULL,
+            chat_id BIGINT NOT NULL,
+            PRIMARY KEY (day, user_id, chat_id)
+        )
+    """)
+
+    # Время последнего пересчета агрегатов (одна строка на агрегат)
+    op.execute("""
+        CREATE TABLE message_rollup_state (
+            name VARCHAR(50) PRIMARY KEY,
+            refreshed_at TIMESTAMP NOT NULL
+        )
+    """)
+
+    # Поиск дней, в которых сообщения были удалены после последнего пересчета
+    op.execute("""
+        CREATE INDEX idx_messages_deleted_at_not_null
+        ON messages(deleted_at)
+        WHERE deleted_at IS NOT NULL
+    """)
+
+
+def downgrade() -> None:
+    """Откат миграции - удаление дневных агрегатов."""
+    op.execute("DROP INDEX IF EXISTS idx_messages_deleted_at_not_null")
+    op.execute("DROP TABLE IF EXISTS message_rollup_state")
+    op.execute("DROP TABLE IF EXISTS message_daily_conversations")
+    op.execute("DROP TABLE IF EXISTS message_daily_stats")
@@ -0,0 +1,33 @@
+"""add_message_daily_hll
+
+Revision ID: e5f6a7b8c9d0
+Revises: d4e5f6a7b8c9
+Create Date: 2025-10-18 00:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e5f6a7b8c9d0"
+down_revision: str | Sequence[str] | None = "d4e5f6a7b8c9"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Дневные HyperLogLog sketches активных диалогов."""
+    # registers - регистры src.hyperloglog.HyperLogLog, объединяемые за любой период
+    op.execute("""
+        CREATE TABLE message_daily_hll (
+            day DATE PRIMARY KEY,
+            registers BYTEA NOT NULL
+        )
+    """)
+
+
+def downgrade() -> None:
+    """Откат миграции - удаление дневных sketches."""
+    op.execute("DROP TABLE IF EXISTS message_daily_hll")
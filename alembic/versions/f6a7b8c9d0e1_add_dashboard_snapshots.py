@@ -0,0 +1,35 @@
+"""add_dashboard_snapshots
+
+Revision ID: f6a7b8c9d0e1
+Revises: e5f6a7b8c9d0
+Create Date: 2025-10-18 00:00:00.000000
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f6a7b8c9d0e1"
+down_revision: str | Sequence[str] | None = "e5f6a7b8c9d0"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Предрасчитанные снимки статистики дашборда по периодам."""
+    # stats - DashboardStats в JSON, общий для всех реплик API
+    op.execute("""
+        CREATE TABLE dashboard_snapshots (
+            period VARCHAR(10) PRIMARY KEY,
+            stats JSONB NOT NULL,
+            computed_at TIMESTAMP NOT NULL,
+            duration_ms DOUBLE PRECISION NOT NULL
+        )
+    """)
+
+
+def downgrade() -> None:
+    """Откат миграции - удаление снимков статистики."""
+    op.execute("DROP TABLE IF EXISTS dashboard_snapshots")
@@ -2,15 +2,35 @@
 
 import asyncio
 import logging
+import os
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
 
 import uvicorn
+from fastapi import FastAPI
 
-from src.api.app import create_app
+from src.api.app import configure_dependencies, create_app
+from src.api.cached_stat_collector import CachedStatCollector
+from src.api.live_stat_collector import LiveStatCollector
+from src.api.protocols import StatCollectorProtocol
 from src.api.real_stat_collector import RealStatCollector
+from src.api.sse_encoder import SSEEncoder
+from src.api.stats_precomputer import PERIODS, StatsPrecomputer
+from src.bot import create_telegram_bot
+from src.caching_llm_client import CachingLLMClient
 from src.config import Config
-from src.database import close_pool, init_db
-from src.database_conversation import DatabaseConversation
+from src.daily_stats_rollup import DailyStatsRollup
+from src.database import init_db, pool_options_from_config, warm_up_pool
+from src.database_conversation import create_database_conversation
+from src.instrumented_pool import InstrumentedPool
+from src.live_stats import LiveStats
 from src.llm_client import LLMClient
+from src.llm_http_client import create_llm_http_client, llm_http_options_from_config
+from src.llm_response_cache import LLMResponseCache
+from src.metrics import MetricsRegistry
+from src.protocols import LLMClientProtocol
+from src.telegram_webhook import TelegramWebhook
+from src.web_session_store import WebSessionStore
 
 # Настройка логирования
 logging.basicConfig(
@@ -22,69 +42,241 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
-async def main() -> None:
-    """Запуск API сервера."""
-    logger.info("Starting Dashboard & Chat API server...")
+@asynccontextmanager
+async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+    """Инициализация и освобождение ресурсов одного worker-процесса.
 
+    Каждый uvicorn worker создает свой connection pool, кэши и фоновые задачи.
+    Общее между workers состояние (сессии веб-чата, агрегаты, снимки статистики)
+    хранится в PostgreSQL, фоновые пересчеты координируются advisory locks.
+    Connection pool, зависимости роутов и метрики принадлежат приложению
+    (app.state) и передаются компонентам явно. До yield pool и статистика
+    прогреваются, при остановке активные потоки дочитываются до закрытия pool.
+    """
     config = Config()
+    metrics: MetricsRegistry = app.state.metrics
+    tasks: list[asyncio.Task[None]] = []
+    telegram_webhook: TelegramWebhook | None = None
+    pool: InstrumentedPool | None = None
+
+    # Общий пул HTTP соединений к LLM API на весь worker
+    llm_http_client = create_llm_http_client(metrics, **llm_http_options_from_config(config))
 
     try:
         # Инициализируем подключение к БД
-        logger.info("Initializing database connection...")
-        await init_db(config.database_url)
+        logger.info(f"Initializing database connection (worker pid={os.getpid()})...")
+        pool = await init_db(config.database_url, **pool_options_from_config(config))
+        app.state.pool = pool
+        metrics.register("database_pool", pool.snapshot)
+        await warm_up_pool(pool)
         logger.info("Database connection initialized successfully")
 
+        # Метрики отдает тот worker, который принял запрос /metrics
+        metrics.register("worker", lambda: {"pid": os.getpid()})
+
         # Инициализируем LLM клиент для веб-чата
-        llm_client = LLMClient(
+        base_llm_client = LLMClient(
             api_key=config.openrouter_api_key,
             model=config.llm_model,
             temperature=config.llm_temperature,
             max_tokens=config.llm_max_tokens,
             timeout=config.llm_timeout,
             system_prompt_path=config.system_prompt_path,
+            connect_timeout=config.llm_connect_timeout,
+            http_client=llm_http_client,
+        )
+
+        # Опционально: кэш ответов на повторяющиеся первые вопросы (при попадании LLM не вызывается)
+        llm_client: LLMClientProtocol = base_llm_client
+        if config.llm_cache_size > 0 or config.llm_cache_persistent:
+            response_cache = LLMResponseCache(
+                config.llm_cache_size,
+                config.llm_cache_ttl,
+                pool if config.llm_cache_persistent else None,
+            )
+            caching_llm_client = CachingLLMClient(
+                base_llm_client, response_cache, config.llm_cache_max_messages
+            )
+            metrics.register("llm_cache", caching_llm_client.stats)
+            llm_client = caching_llm_client
+
+        # Опционально: счетчики статистики в памяти, пополняемые при записи сообщений.
+        # Они видят только записи этого процесса, поэтому включаются, лишь когда
+        # через него идут все сообщения: один worker и webhook Telegram в процессе API
+        live_stats: LiveStats | None = None
+        owns_all_writes = (
+            config.api_workers == 1
+            and config.telegram_mode == "webhook"
+            and config.telegram_webhook_server == "api"
+        )
+        if config.stats_live_counters and not owns_all_writes:
+            logger.warning(
+                "Live stats counters are disabled: messages are also written by other "
+                "processes (API workers or Telegram bot), stats are read from the DB"
+            )
+        elif config.stats_live_counters:
+            live_stats = LiveStats(pool)
+            await live_stats.seed()
+            metrics.register("live_stats", live_stats.stats)
+            if config.stats_live_reseed_interval > 0:
+                tasks.append(
+                    asyncio.create_task(
+                        live_stats.run_periodically(config.stats_live_reseed_interval)
+                    )
+                )
+
+        # Хранилище истории диалогов: запросы веб-чата распределяются между workers,
+        # поэтому при API_WORKERS > 1 кэш истории и write-behind очередь отключены
+        database_conversation = await create_database_conversation(
+            config, pool, metrics, live_stats, workers=config.api_workers
         )
 
-        # Инициализируем хранилище истории диалогов
-        database_conversation = DatabaseConversation(config.max_history_messages)
+        # Опционально: статистика из дневных агрегатов, пересчитываемых в фоне
+        if config.stats_use_rollup:
+            stats_rollup = DailyStatsRollup(pool)
+            metrics.register("stats_rollup", stats_rollup.stats)
+            tasks.append(
+                asyncio.create_task(
+                    stats_rollup.run_periodically(config.stats_rollup_refresh_interval)
+                )
+            )
 
         # Создаем сборщик реальной статистики
-        stat_collector = RealStatCollector()
+        stat_collector: StatCollectorProtocol = RealStatCollector(
+            pool,
+            use_rollup=config.stats_use_rollup,
+            approximate_distinct=config.stats_approximate_distinct,
+        )
+
+        # Счетчики в памяти отвечают без БД: предрасчет и кэш не нужны
+        # Предрасчет статистики в фоне: /api/stats читает готовые снимки
+        # Иначе кэш по периоду: один пересчет на все одновременные запросы
+        if live_stats is not None:
+            stat_collector = LiveStatCollector(live_stats)
+        elif config.stats_precompute_interval > 0:
+            precomputer = StatsPrecomputer(pool, stat_collector)
+            metrics.register("stats_precompute", precomputer.stats)
+            tasks.append(
+                asyncio.create_task(precomputer.run_periodically(config.stats_precompute_interval))
+            )
+            stat_collector = precomputer
+        elif config.stats_cache_ttl > 0:
+            cached_collector = CachedStatCollector(
+                stat_collector, config.stats_cache_ttl, config.stats_cache_stale_ttl
+            )
+            metrics.register("stats_cache", cached_collector.stats)
+            stat_collector = cached_collector
+
+        # Маппинг сессий веб-чата на user_id (таблица web_sessions + LRU-кэш)
+        session_store = WebSessionStore(pool, config.web_session_cache_size)
+        metrics.register("web_sessions", session_store.stats)
+
+        # Токены ответа веб-чата объединяются в кадры SSE по размеру и времени
+        sse_encoder = SSEEncoder(config.sse_flush_bytes, config.sse_flush_interval)
+        metrics.register("sse", sse_encoder.stats)
 
-        # Создаем приложение со всеми зависимостями
-        app = create_app(
+        # Опционально: webhook Telegram в процессе API (бот делит pool и LLM клиент)
+        if config.telegram_mode == "webhook" and config.telegram_webhook_server == "api":
+            bot = create_telegram_bot(config, llm_client, database_conversation, metrics)
+            telegram_webhook = bot.create_webhook(
+                config.telegram_webhook_secret or "",
+                config.telegram_webhook_queue_size,
+                config.telegram_webhook_workers,
+            )
+            metrics.register("telegram_webhook", telegram_webhook.stats)
+            await telegram_webhook.start()
+            await telegram_webhook.register(config.telegram_webhook_url or "")
+
+        # Зависимости роутов этого приложения
+        configure_dependencies(
+            app,
+            pool=pool,
             stat_collector=stat_collector,
             llm_client=llm_client,
             database_conversation=database_conversation,
+            session_store=session_store,
+            sse_encoder=sse_encoder,
+            telegram_webhook=telegram_webhook,
+            export_token=config.api_export_token if config.api_export_enabled else None,
         )
+        metrics.register("streams", app.state.stream_tracker.stats)
 
-        logger.info("Using RealStatCollector for statistics (database-backed)")
-        logger.info("Web chat handler initialized with LLM client")
-        logger.info("API documentation available at: http://localhost:8000/docs")
-        logger.info("ReDoc documentation available at: http://localhost:8000/redoc")
-
-        # Создаем конфигурацию uvicorn
-        config_uvicorn = uvicorn.Config(
-            app=app,
-            host="0.0.0.0",
-            port=8000,
-            log_level="info",
-        )
-        server = uvicorn.Server(config_uvicorn)
+        # Первые запросы /api/stats не должны ждать холодных запросов к БД
+        # (снимки предрасчета заполняет его фоновая задача)
+        if not isinstance(stat_collector, StatsPrecomputer):
+            await warm_up_stats(stat_collector)
 
-        # Запускаем сервер
-        await server.serve()
+        logger.info(f"API worker {os.getpid()} started")
+        yield
 
-    except KeyboardInterrupt:
-        logger.info("Received interrupt signal, shutting down...")
-    except Exception as e:
-        logger.error(f"Fatal error: {e}", exc_info=True)
-        raise
     finally:
-        # Graceful shutdown - закрываем connection pool
-        logger.info("Closing database connection...")
-        await close_pool()
-        logger.info("API server shutdown complete")
+        # Даем клиентам дочитать начатые SSE-ответы и выгрузки до закрытия pool
+        stream_tracker = getattr(app.state, "stream_tracker", None)
+        if stream_tracker is not None:
+            await stream_tracker.drain(config.api_shutdown_drain_timeout)
+
+        if telegram_webhook is not None:
+            await telegram_webhook.stop()
+            await telegram_webhook.bot.session.close()
+
+        # Дожидаемся отмены фоновых задач: запрос отмененной задачи не должен
+        # выполняться во время закрытия pool
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await llm_http_client.aclose()
+
+        # Graceful shutdown - закрываем connection pool этого приложения
+        if pool is not None:
+            logger.info("Closing database connection...")
+            await pool.close()
+            metrics.unregister("database_pool")
+        logger.info(f"API worker {os.getpid()} shutdown complete")
+
+
+async def warm_up_stats(stat_collector: StatCollectorProtocol) -> None:
+    """Заранее посчитать статистику всех периодов (заполняет кэши и планы запросов).
+
+    Ошибка прогрева не мешает старту: статистика посчитается при первом запросе.
+
+    Args:
+        stat_collector: Сборщик статистики, отдаваемый роутами
+    """
+    for period in PERIODS:
+        try:
+            await stat_collector.get_dashboard_stats(period)
+        except Exception as e:
+            logger.warning(f"Failed to warm up dashboard stats for {period}: {e}")
+
+
+def create_api_app() -> FastAPI:
+    """Фабрика приложения для uvicorn (factory=True), вызывается в каждом worker.
+
+    Returns:
+        FastAPI: Приложение, инициализирующее зависимости в lifespan
+    """
+    return create_app(lifespan=lifespan)
+
+
+def main() -> None:
+    """Запуск API сервера в API_WORKERS процессах."""
+    config = Config()
+    logger.info(f"Starting Dashboard & Chat API server with {config.api_workers} worker(s)...")
+    logger.info("API documentation available at: http://localhost:8000/docs")
+    logger.info("ReDoc documentation available at: http://localhost:8000/redoc")
+
+    # Import string + factory: каждый worker-процесс создает приложение заново
+    uvicorn.run(
+        "api_main:create_api_app",
+        factory=True,
+        host="0.0.0.0",
+        port=8000,
+        workers=config.api_workers,
+        log_level="info",
+        # Не ждать бесконечно соединения, открытые клиентами при остановке
+        timeout_graceful_shutdown=int(config.api_shutdown_drain_timeout),
+    )
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    main()
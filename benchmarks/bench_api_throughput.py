@@ -0,0 +1,72 @@
+"""Нагрузочный бенчмарк пропускной способности API сервера.
+
+Запуск (API сервер уже запущен, например с API_WORKERS=1, 2, 4):
+    uv run python -m benchmarks.bench_api_throughput --path "/api/stats?period=30d"
+
+Держит concurrency одновременных запросов в течение duration секунд и печатает
+количество запросов в секунду, p50/p95 латентности и количество ошибок.
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+
+async def _worker(
+    client: httpx.AsyncClient, path: str, deadline: float, latencies: list[float]
+) -> int:
+    """Отправлять запросы до deadline, вернуть количество ошибок."""
+    errors = 0
+    while time.perf_counter() < deadline:
+        started_at = time.perf_counter()
+        try:
+            response = await client.get(path)
+            if response.status_code >= 400:
+                errors += 1
+        except httpx.HTTPError:
+            errors += 1
+            continue
+        latencies.append((time.perf_counter() - started_at) * 1000)
+    return errors
+
+
+async def main() -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser(description="API throughput benchmark")
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--path", default="/api/stats?period=7d")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=20.0)
+    args = parser.parse_args()
+
+    latencies: list[float] = []
+    limits = httpx.Limits(max_connections=args.concurrency)
+
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=30.0) as client:
+        # Прогрев: соединения и кэши сервера
+        await client.get(args.path)
+
+        started_at = time.perf_counter()
+        deadline = started_at + args.duration
+        errors = await asyncio.gather(
+            *(_worker(client, args.path, deadline, latencies) for _ in range(args.concurrency))
+        )
+        elapsed = time.perf_counter() - started_at
+
+    if not latencies:
+        print(f"No successful requests, errors={sum(errors)}")
+        return
+
+    quantiles = statistics.quantiles(latencies, n=20)
+    print(f"{'requests':>10}{'rps':>10}{'p50_ms':>10}{'p95_ms':>10}{'errors':>10}")
+    print(
+        f"{len(latencies):>10}{len(latencies) / elapsed:>10.1f}"
+        f"{statistics.median(latencies):>10.2f}{quantiles[18]:>10.2f}{sum(errors):>10}"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,111 @@
+"""Бенчмарк подсчета активных диалогов: CONCAT, кортежи, дневные агрегаты и HyperLogLog.
+
+Запуск (нужна БД с примененными миграциями):
+    uv run python -m benchmarks.bench_distinct_conversations --database-url postgresql://... \\
+        --days 90 --runs 5 --refresh-rollup
+
+Печатает результат и среднее время каждого способа, а также относительную
+ошибку приближенной оценки относительно точного значения.
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from collections.abc import Awaitable, Callable
+from datetime import datetime, timedelta
+from typing import Any
+
+from src import statements
+from src.daily_stats_rollup import DailyStatsRollup
+from src.database import init_db
+from src.hyperloglog import HyperLogLog
+
+# Исходный запрос RealStatCollector: строка на каждую строку сообщения
+CONCAT_SQL = """
+    SELECT COUNT(DISTINCT CONCAT(user_id::text, '_', chat_id::text))
+    FROM messages
+    WHERE deleted_at IS NULL AND created_at >= $1
+"""
+
+
+async def _concat(connection: Any, since: datetime) -> int:
+    """COUNT(DISTINCT CONCAT(...)) по сырым сообщениям."""
+    count: int = await connection.fetchval(CONCAT_SQL, since)
+    return count
+
+
+async def _tuples(connection: Any, since: datetime) -> int:
+    """COUNT(DISTINCT (user_id, chat_id)) в общем запросе дашборда по сырым сообщениям."""
+    rows = await statements.fetch(connection, "stats_dashboard_scan", since, since)
+    return next(int(row["current_conversations"]) for row in rows if row["is_total"])
+
+
+async def _rollup_exact(connection: Any, since: datetime) -> int:
+    """DISTINCT по message_daily_conversations."""
+    row = await statements.fetchrow(connection, "rollup_totals_since", since.date())
+    return int(row["active_conversations"])
+
+
+async def _rollup_hll(connection: Any, since: datetime) -> int:
+    """Объединение дневных HyperLogLog sketches."""
+    row = await statements.fetchrow(connection, "rollup_sketch_totals_since", since.date())
+    merged = HyperLogLog()
+    for registers in row["sketches"]:
+        merged.merge(HyperLogLog.from_bytes(registers))
+    return merged.count()
+
+
+METHODS: dict[str, Callable[[Any, datetime], Awaitable[int]]] = {
+    "concat": _concat,
+    "tuples": _tuples,
+    "rollup-exact": _rollup_exact,
+    "rollup-hll": _rollup_hll,
+}
+
+
+async def main() -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser(description="Distinct conversations benchmark")
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--days", type=int, default=90)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--refresh-rollup", action="store_true")
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error("--database-url or DATABASE_URL is required")
+
+    pool = await init_db(args.database_url, min_size=1, max_size=2)
+    try:
+        if args.refresh_rollup:
+            await DailyStatsRollup(pool).refresh()
+
+        since = datetime.now() - timedelta(days=args.days)
+        results: dict[str, tuple[int, list[float]]] = {}
+
+        async with pool.acquire() as connection:
+            for name, method in METHODS.items():
+                timings: list[float] = []
+                count = 0
+                for _ in range(args.runs):
+                    started_at = time.perf_counter()
+                    count = await method(connection, since)
+                    timings.append((time.perf_counter() - started_at) * 1000)
+                results[name] = (count, timings)
+
+        exact = results["tuples"][0]
+        print(f"{'method':<15}{'count':>12}{'error_%':>10}{'mean_ms':>12}{'min_ms':>12}")
+        for name, (count, timings) in results.items():
+            error = (count - exact) / exact * 100 if exact else 0.0
+            print(
+                f"{name:<15}{count:>12}{error:>10.2f}"
+                f"{statistics.fmean(timings):>12.2f}{min(timings):>12.2f}"
+            )
+    finally:
+        await pool.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,138 @@
+"""Бенчмарк латентности горячих запросов: без кэша statements asyncpg, с кэшем и через pool.
+
+Запуск (нужна БД с примененными миграциями):
+    uv run python -m benchmarks.bench_statements --database-url postgresql://... --iterations 2000
+
+Для каждого режима выполняет statements из src.statements и печатает среднюю,
+p50 и p95 латентность одного вызова в микросекундах. Режим pool берет соединение
+из pool на каждый вызов, как приложение (acquire/release между запросами).
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from datetime import datetime, timedelta
+from typing import Any
+
+import asyncpg  # type: ignore[import-untyped]
+
+from src import statements
+from src.database import normalize_database_url
+
+# Пользователь и чат, под которыми бенчмарк пишет и читает сообщения
+BENCH_USER_ID = -900_000_001
+BENCH_CHAT_ID = -900_000_001
+
+
+def _hot_calls() -> list[tuple[str, tuple[Any, ...]]]:
+    """Горячие statements и параметры, с которыми они вызываются."""
+    week_ago = datetime.now() - timedelta(days=7)
+    return [
+        ("select_history", (BENCH_USER_ID, BENCH_CHAT_ID, 10)),
+        ("stats_dashboard_scan", (week_ago - timedelta(days=7), week_ago)),
+    ]
+
+
+async def _measure(source: Any, name: str, args: tuple[Any, ...], iterations: int) -> list[float]:
+    """Выполнить statement iterations раз и вернуть латентности (мкс).
+
+    source - соединение или pool (тогда соединение берется на каждый вызов).
+    """
+    samples: list[float] = []
+    for _ in range(iterations):
+        started_at = time.perf_counter()
+        if isinstance(source, asyncpg.Pool):
+            async with source.acquire() as connection:
+                await statements.fetch(connection, name, *args)
+        else:
+            await statements.fetch(source, name, *args)
+        samples.append((time.perf_counter() - started_at) * 1_000_000)
+    return samples
+
+
+async def _run_mode(dsn: str, mode: str, iterations: int) -> dict[str, list[float]]:
+    """Прогнать горячие запросы в одном режиме на отдельном соединении."""
+    # Без кэша asyncpg каждый текстовый вызов заново проходит parse/plan на сервере
+    cache_size = 0 if mode == "text-nocache" else 100
+    source: Any
+    if mode == "pool":
+        source = await asyncpg.create_pool(
+            dsn, min_size=1, max_size=1, statement_cache_size=cache_size
+        )
+    else:
+        source = await asyncpg.connect(dsn, statement_cache_size=cache_size)
+    try:
+        results: dict[str, list[float]] = {}
+        for name, args in _hot_calls():
+            await _measure(source, name, args, min(iterations, 50))  # прогрев
+            results[name] = await _measure(source, name, args, iterations)
+        return results
+    finally:
+        await source.close()
+
+
+async def _seed(dsn: str, messages: int) -> None:
+    """Записать тестовую историю для BENCH_USER_ID."""
+    connection = await asyncpg.connect(dsn)
+    try:
+        await connection.execute(
+            "DELETE FROM messages WHERE user_id = $1 AND chat_id = $2", BENCH_USER_ID, BENCH_CHAT_ID
+        )
+        for i in range(messages):
+            await statements.execute(
+                connection,
+                "insert_message",
+                BENCH_USER_ID,
+                BENCH_CHAT_ID,
+                "user" if i % 2 == 0 else "assistant",
+                f"benchmark message {i}",
+                len(f"benchmark message {i}"),
+                "telegram",
+                datetime.now(),
+            )
+    finally:
+        await connection.close()
+
+
+async def _cleanup(dsn: str) -> None:
+    """Удалить тестовую историю."""
+    connection = await asyncpg.connect(dsn)
+    try:
+        await connection.execute(
+            "DELETE FROM messages WHERE user_id = $1 AND chat_id = $2", BENCH_USER_ID, BENCH_CHAT_ID
+        )
+    finally:
+        await connection.close()
+
+
+async def main() -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"))
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--seed-messages", type=int, default=50)
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error("--database-url or DATABASE_URL is required")
+
+    dsn = normalize_database_url(args.database_url)
+    await _seed(dsn, args.seed_messages)
+    try:
+        print(f"{'statement':<22}{'mode':<15}{'mean_us':>10}{'p50_us':>10}{'p95_us':>10}")
+        for mode in ("text-nocache", "text-cached", "pool"):
+            for name, samples in (await _run_mode(dsn, mode, args.iterations)).items():
+                ordered = sorted(samples)
+                p95 = ordered[int(len(ordered) * 0.95) - 1]
+                print(
+                    f"{name:<22}{mode:<15}{statistics.fmean(samples):>10.1f}"
+                    f"{statistics.median(samples):>10.1f}{p95:>10.1f}"
+                )
+    finally:
+        await _cleanup(dsn)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,87 @@
+"""Фейковый Telegram: отправка обновлений на webhook бота и замер времени подтверждения.
+
+Запуск (бот или API сервер уже запущен с TELEGRAM_MODE=webhook):
+    uv run python -m benchmarks.bench_telegram_webhook \\
+        --url http://localhost:8080/telegram/webhook --secret "$TELEGRAM_WEBHOOK_SECRET"
+
+Отправляет updates текстовых сообщений от chats разных чатов (как Telegram,
+с заголовком X-Telegram-Bot-Api-Secret-Token) и печатает p50/p95 времени
+ответа webhook и количество ответов по статусам. Ответы бота в эти чаты
+уходят в настоящий Bot API и для несуществующих чатов завершатся ошибкой
+в логе бота - замеряется только прием обновлений.
+"""
+
+import argparse
+import asyncio
+import itertools
+import statistics
+import time
+from collections import Counter
+from typing import Any
+
+import httpx
+
+
+def _make_update(update_id: int, chat_id: int) -> dict[str, Any]:
+    """JSON текстового обновления, как его присылает Telegram."""
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private"},
+            "from": {"id": chat_id, "is_bot": False, "first_name": "Bench"},
+            "text": f"Сообщение {update_id}",
+        },
+    }
+
+
+async def main() -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser(description="Fake Telegram webhook sender")
+    parser.add_argument("--url", default="http://localhost:8080/telegram/webhook")
+    parser.add_argument("--secret", required=True)
+    parser.add_argument("--updates", type=int, default=1000)
+    parser.add_argument("--chats", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    update_ids = itertools.count(1)
+    latencies: list[float] = []
+    statuses: Counter[int | str] = Counter()
+    headers = {"X-Telegram-Bot-Api-Secret-Token": args.secret}
+
+    async def sender(client: httpx.AsyncClient, count: int) -> None:
+        for _ in range(count):
+            update_id = next(update_ids)
+            started_at = time.perf_counter()
+            try:
+                response = await client.post(
+                    args.url, json=_make_update(update_id, update_id % args.chats + 1)
+                )
+            except httpx.HTTPError as e:
+                statuses[type(e).__name__] += 1
+                continue
+            latencies.append((time.perf_counter() - started_at) * 1000)
+            statuses[response.status_code] += 1
+
+    per_sender = args.updates // args.concurrency
+    async with httpx.AsyncClient(headers=headers, timeout=30.0) as client:
+        started_at = time.perf_counter()
+        await asyncio.gather(*(sender(client, per_sender) for _ in range(args.concurrency)))
+        elapsed = time.perf_counter() - started_at
+
+    if len(latencies) < 2:
+        print(f"Not enough successful requests: {dict(statuses)}")
+        return
+
+    quantiles = statistics.quantiles(latencies, n=20)
+    print(f"{'updates':>10}{'per_sec':>10}{'p50_ms':>10}{'p95_ms':>10}  statuses")
+    print(
+        f"{len(latencies):>10}{len(latencies) / elapsed:>10.1f}"
+        f"{statistics.median(latencies):>10.2f}{quantiles[18]:>10.2f}  {dict(statuses)}"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
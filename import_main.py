@@ -0,0 +1,75 @@
+"""CLI для загрузки архивов сообщений (CSV/NDJSON) в PostgreSQL.
+
+Запуск (нужна БД с примененными миграциями):
+    uv run python import_main.py archive.ndjson --batch-size 10000
+"""
+
+import argparse
+import asyncio
+import logging
+import os
+from pathlib import Path
+
+from src.daily_stats_rollup import DailyStatsRollup
+from src.database import init_db
+from src.message_importer import MessageImporter, detect_format
+from src.message_partition_manager import MessagePartitionManager
+
+# Настройка логирования
+logging.basicConfig(
+    level=logging.INFO,
+    format="[%(asctime)s] [%(levelname)s] [%(name)s] - %(message)s",
+    datefmt="%Y-%m-%d %H:%M:%S",
+)
+
+logger = logging.getLogger(__name__)
+
+
+async def main() -> None:
+    """Точка входа загрузки архива сообщений."""
+    parser = argparse.ArgumentParser(description="Import messages archive into PostgreSQL")
+    parser.add_argument("path", type=Path, help="CSV or NDJSON file (.csv, .ndjson, .jsonl)")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="Override format detection")
+    parser.add_argument("--batch-size", type=int, default=5000, help="Messages per COPY")
+    parser.add_argument(
+        "--source",
+        choices=["telegram", "web"],
+        default="telegram",
+        help="Source for records without the source column",
+    )
+    parser.add_argument(
+        "--no-partitions",
+        action="store_true",
+        help="Do not create monthly partitions (rows of missing months go to messages_default)",
+    )
+    parser.add_argument("--database-url", default=os.environ.get("DATABASE_URL"))
+    args = parser.parse_args()
+
+    if not args.database_url:
+        parser.error("--database-url or DATABASE_URL is required")
+
+    import_format = args.format or detect_format(args.path)
+
+    pool = await init_db(args.database_url, min_size=1, max_size=2)
+    try:
+        # retention_months=0: загрузка не отсоединяет старые партиции
+        partition_manager = (
+            None
+            if args.no_partitions
+            else MessagePartitionManager(pool, months_ahead=0, retention_months=0)
+        )
+        # Загруженные дни пересчитываются в дневных агрегатах дашборда
+        importer = MessageImporter(
+            pool,
+            batch_size=args.batch_size,
+            default_source=args.source,
+            partition_manager=partition_manager,
+            stats_rollup=DailyStatsRollup(pool),
+        )
+        await importer.import_file(args.path, import_format)
+    finally:
+        await pool.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,13 +1,18 @@
 import asyncio
 import logging
 
-from src.bot import TelegramBot
-from src.command_handler import CommandHandler
+from src.bot import create_telegram_bot
+from src.caching_llm_client import CachingLLMClient
 from src.config import Config
-from src.database import close_pool, init_db
-from src.database_conversation import DatabaseConversation
+from src.database import init_db, pool_options_from_config
+from src.database_conversation import create_database_conversation
+from src.instrumented_pool import InstrumentedPool
 from src.llm_client import LLMClient
-from src.message_handler import MessageHandler
+from src.llm_http_client import create_llm_http_client, llm_http_options_from_config
+from src.llm_response_cache import LLMResponseCache
+from src.message_partition_manager import MessagePartitionManager
+from src.metrics import MetricsRegistry, log_metrics_periodically
+from src.protocols import LLMClientProtocol
 
 # Настройка логирования
 logging.basicConfig(
@@ -21,37 +26,96 @@ logger = logging.getLogger(__name__)
 
 async def main() -> None:
     config = Config()
+    metrics_task: asyncio.Task[None] | None = None
+    partitions_task: asyncio.Task[None] | None = None
+    pool: InstrumentedPool | None = None
+    # Метрики процесса бота (пишутся в лог)
+    metrics = MetricsRegistry()
+    # Общий пул HTTP соединений к LLM API на весь процесс
+    llm_http_client = create_llm_http_client(metrics, **llm_http_options_from_config(config))
 
     try:
         # Инициализируем подключение к БД
         logger.info("Initializing database connection...")
-        await init_db(config.database_url)
+        pool = await init_db(config.database_url, **pool_options_from_config(config))
+        metrics.register("database_pool", pool.snapshot)
         logger.info("Database connection initialized successfully")
 
+        # Создаем партиции messages на ближайшие месяцы и отсоединяем устаревшие
+        partition_manager = MessagePartitionManager(
+            pool,
+            months_ahead=config.message_partition_months_ahead,
+            retention_months=config.message_partition_retention_months,
+        )
+        await partition_manager.run()
+        if config.message_partition_maintenance_interval > 0:
+            partitions_task = asyncio.create_task(
+                partition_manager.run_periodically(config.message_partition_maintenance_interval)
+            )
+
         # Инициализируем LLM клиент
-        llm_client = LLMClient(
+        base_llm_client = LLMClient(
             api_key=config.openrouter_api_key,
             model=config.llm_model,
             temperature=config.llm_temperature,
             max_tokens=config.llm_max_tokens,
             timeout=config.llm_timeout,
             system_prompt_path=config.system_prompt_path,
+            connect_timeout=config.llm_connect_timeout,
+            http_client=llm_http_client,
         )
 
-        # Инициализируем хранилище истории диалогов (PostgreSQL)
-        conversation = DatabaseConversation(config.max_history_messages)
+        # Опционально: кэш ответов на повторяющиеся первые вопросы (при попадании LLM не вызывается)
+        llm_client: LLMClientProtocol = base_llm_client
+        if config.llm_cache_size > 0 or config.llm_cache_persistent:
+            response_cache = LLMResponseCache(
+                config.llm_cache_size,
+                config.llm_cache_ttl,
+                pool if config.llm_cache_persistent else None,
+            )
+            caching_llm_client = CachingLLMClient(
+                base_llm_client, response_cache, config.llm_cache_max_messages
+            )
+            metrics.register("llm_cache", caching_llm_client.stats)
+            llm_client = caching_llm_client
+            # Процесс бота выполняет обслуживание: удаляем устаревшие ответы из БД
+            if config.llm_cache_persistent:
+                await response_cache.prune()
 
-        # Инициализируем обработчик команд
-        command_handler = CommandHandler(conversation)
+        # Инициализируем хранилище истории диалогов (PostgreSQL) с кэшем и очередью:
+        # пользователей Telegram обслуживает только этот процесс
+        conversation = await create_database_conversation(config, pool, metrics)
 
-        # Инициализируем обработчик сообщений
-        message_handler = MessageHandler(llm_client, conversation)
+        # Инициализируем бота с обработчиками команд и сообщений
+        bot = create_telegram_bot(config, llm_client, conversation, metrics)
 
-        # Инициализируем бота
-        bot = TelegramBot(config.telegram_bot_token, command_handler, message_handler)
+        # Периодически пишем снимок метрик в лог (у бота нет HTTP API)
+        if config.metrics_log_interval > 0:
+            metrics_task = asyncio.create_task(
+                log_metrics_periodically(metrics, config.metrics_log_interval)
+            )
 
-        logger.info("Starting Telegram bot...")
-        await bot.start()
+        if config.telegram_mode == "polling":
+            logger.info("Starting Telegram bot...")
+            await bot.start()
+        elif config.telegram_webhook_server == "bot":
+            webhook = bot.create_webhook(
+                config.telegram_webhook_secret or "",
+                config.telegram_webhook_queue_size,
+                config.telegram_webhook_workers,
+            )
+            metrics.register("telegram_webhook", webhook.stats)
+            await bot.start_webhook(
+                webhook,
+                config.telegram_webhook_url or "",
+                config.telegram_webhook_host,
+                config.telegram_webhook_port,
+            )
+        else:
+            # Обновления принимает API сервер, процесс бота выполняет только
+            # обслуживание (партиции messages, метрики)
+            logger.info("Telegram updates are received by the API server")
+            await asyncio.Event().wait()
 
     except KeyboardInterrupt:
         logger.info("Received interrupt signal, shutting down...")
@@ -59,9 +123,17 @@ async def main() -> None:
         logger.error(f"Fatal error: {e}", exc_info=True)
         raise
     finally:
+        if metrics_task is not None:
+            metrics_task.cancel()
+        if partitions_task is not None:
+            partitions_task.cancel()
+
+        await llm_http_client.aclose()
+
         # Graceful shutdown - закрываем connection pool
-        logger.info("Closing database connection...")
-        await close_pool()
+        if pool is not None:
+            logger.info("Closing database connection...")
+            await pool.close()
         logger.info("Application shutdown complete")
 
 
@@ -1,32 +1,57 @@
 """FastAPI приложение для API дашборда и веб-чата."""
 
-from typing import Any
+import hmac
+from collections.abc import Callable
+from contextlib import AbstractAsyncContextManager
+from typing import Annotated, Any
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Header, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 
+from src.api.cached_stat_collector import CachedStatCollector
+from src.api.message_exporter import MessageExporter
 from src.api.protocols import StatCollectorProtocol
 from src.api.real_stat_collector import RealStatCollector
+from src.api.sse_encoder import SSEEncoder
+from src.api.stream_tracker import StreamTracker
 from src.api.web_chat_handler import WebChatHandler
 from src.database_conversation import DatabaseConversation
+from src.instrumented_pool import InstrumentedPool
+from src.metrics import MetricsRegistry
 from src.protocols import LLMClientProtocol
-
-# Глобальные экземпляры (будут инициализированы при запуске)
-_stat_collector: StatCollectorProtocol | None = None
-_web_chat_handler: WebChatHandler | None = None
+from src.telegram_webhook import TelegramWebhook
+from src.web_session_store import WebSessionStore
 
 
 def create_app(
+    pool: InstrumentedPool | None = None,
     stat_collector: StatCollectorProtocol | None = None,
     llm_client: LLMClientProtocol | None = None,
     database_conversation: DatabaseConversation | None = None,
+    session_store: WebSessionStore | None = None,
+    sse_encoder: SSEEncoder | None = None,
+    telegram_webhook: TelegramWebhook | None = None,
+    export_token: str | None = None,
+    lifespan: Callable[[FastAPI], AbstractAsyncContextManager[None]] | None = None,
 ) -> FastAPI:
     """Создать и настроить FastAPI приложение.
 
+    Зависимости хранятся в app.state конкретного приложения: они передаются
+    сразу (тесты) или создаются в lifespan, который вызывает
+    configure_dependencies(). У каждого приложения свой реестр метрик
+    (app.state.metrics), поэтому несколько приложений в одном процессе
+    не разделяют ни зависимости роутов, ни connection pool, ни метрики.
+
     Args:
-        stat_collector: Реализация сборщика статистики (если None, используется Real)
+        pool: Connection pool приложения (если None, создается в lifespan)
+        stat_collector: Реализация сборщика статистики (если None и есть pool, используется Real)
         llm_client: Клиент для работы с LLM (для веб-чата)
         database_conversation: Хранилище диалогов (для веб-чата)
+        session_store: Маппинг сессий веб-чата (если None, создается с кэшем по умолчанию)
+        sse_encoder: Кодировщик SSE ответов чата (если None, с параметрами по умолчанию)
+        telegram_webhook: Прием обновлений Telegram (если None, /telegram/webhook отвечает 404)
+        export_token: Токен администратора выгрузки (если None, /api/export/messages отвечает 404)
+        lifespan: Инициализация и освобождение ресурсов процесса (startup/shutdown)
 
     Returns:
         FastAPI: Настроенное приложение
@@ -38,6 +63,7 @@ def create_app(
         docs_url="/docs",
         redoc_url="/redoc",
         openapi_url="/openapi.json",
+        lifespan=lifespan,
     )
 
     # Настройка CORS для frontend
@@ -53,23 +79,27 @@ def create_app(
         allow_headers=["*"],
     )
 
-    # Устанавливаем глобальные зависимости
-    global _stat_collector, _web_chat_handler
-
-    _stat_collector = stat_collector or RealStatCollector()
-
-    # Инициализируем WebChatHandler если предоставлены зависимости
-    if llm_client and database_conversation:
-        _web_chat_handler = WebChatHandler(
-            database_conversation=database_conversation,
-            llm_client=llm_client,
-            max_history_messages=20,
-        )
+    # Зависимости роутов и метрики живут в состоянии приложения
+    app.state.metrics = MetricsRegistry()
+    app.state.stream_tracker = StreamTracker()
+    configure_dependencies(
+        app,
+        pool=pool,
+        stat_collector=stat_collector,
+        llm_client=llm_client,
+        database_conversation=database_conversation,
+        session_store=session_store,
+        sse_encoder=sse_encoder,
+        telegram_webhook=telegram_webhook,
+        export_token=export_token,
+    )
 
     # Регистрируем роуты
     from src.api.routes import router
+    from src.api.webhook_routes import router as webhook_router
 
     app.include_router(router)
+    app.include_router(webhook_router)
 
     # Health check endpoint
     @app.get("/health", tags=["health"])
@@ -81,32 +111,231 @@ def create_app(
         """
         return {"status": "ok", "service": "dashboard-api", "version": "1.0.0"}
 
+    # Метрики процесса (connection pool, кэши, очереди)
+    @app.get("/metrics", tags=["health"])
+    async def metrics(request: Request) -> dict[str, dict[str, float]]:
+        """Снимок метрик приложения API.
+
+        Returns:
+            dict: Метрики по источникам
+        """
+        registry: MetricsRegistry = request.app.state.metrics
+        return registry.collect()
+
     return app
 
 
-def get_stat_collector() -> StatCollectorProtocol:
+def create_webhook_app(telegram_webhook: TelegramWebhook) -> FastAPI:
+    """Создать отдельное приложение только для webhook Telegram (процесс бота).
+
+    Args:
+        telegram_webhook: Прием обновлений Telegram
+
+    Returns:
+        FastAPI: Приложение с /telegram/webhook и /health
+    """
+    from src.api.webhook_routes import router as webhook_router
+
+    app = FastAPI(title="Systech AIDD Telegram Webhook", docs_url=None, redoc_url=None)
+    app.state.telegram_webhook = telegram_webhook
+    app.include_router(webhook_router)
+
+    @app.get("/health", tags=["health"])
+    async def health_check() -> dict[str, Any]:
+        """Проверка состояния процесса бота.
+
+        Returns:
+            dict: Статус сервиса
+        """
+        return {"status": "ok", "service": "telegram-webhook"}
+
+    return app
+
+
+def configure_dependencies(
+    app: FastAPI,
+    pool: InstrumentedPool | None = None,
+    stat_collector: StatCollectorProtocol | None = None,
+    llm_client: LLMClientProtocol | None = None,
+    database_conversation: DatabaseConversation | None = None,
+    session_store: WebSessionStore | None = None,
+    sse_encoder: SSEEncoder | None = None,
+    telegram_webhook: TelegramWebhook | None = None,
+    export_token: str | None = None,
+) -> None:
+    """Установить зависимости роутов в app.state.
+
+    Args:
+        app: Приложение, которому принадлежат зависимости
+        pool: Connection pool приложения (для сборщика, выгрузки и сессий по умолчанию)
+        stat_collector: Реализация сборщика статистики (если None и есть pool, используется Real)
+        llm_client: Клиент для работы с LLM (для веб-чата)
+        database_conversation: Хранилище диалогов (для веб-чата)
+        session_store: Маппинг сессий веб-чата (если None, создается с кэшем по умолчанию)
+        sse_encoder: Кодировщик SSE ответов чата (если None, с параметрами по умолчанию)
+        telegram_webhook: Прием обновлений Telegram (бот в одном процессе с API)
+        export_token: Токен администратора выгрузки сообщений (None - выгрузка выключена)
+    """
+    collector = stat_collector
+    if collector is None and pool is not None:
+        collector = RealStatCollector(pool)
+    app.state.pool = pool
+    app.state.stat_collector = collector
+    app.state.message_exporter = MessageExporter(pool) if pool is not None else None
+    app.state.sse_encoder = sse_encoder or SSEEncoder()
+    app.state.telegram_webhook = telegram_webhook
+    app.state.export_token = export_token
+
+    # Клиенты могут кэшировать статистику столько же, сколько серверный кэш
+    if isinstance(collector, CachedStatCollector):
+        app.state.stats_cache_control = collector.cache_control
+    else:
+        app.state.stats_cache_control = "no-cache"
+
+    # Инициализируем WebChatHandler если предоставлены зависимости
+    app.state.web_chat_handler = None
+    if session_store is None and pool is not None:
+        session_store = WebSessionStore(pool, cache_size=10000)
+    if llm_client and database_conversation and session_store:
+        app.state.web_chat_handler = WebChatHandler(
+            database_conversation=database_conversation,
+            llm_client=llm_client,
+            max_history_messages=20,
+            session_store=session_store,
+        )
+
+
+def get_stat_collector(request: Request) -> StatCollectorProtocol:
     """Dependency injection для StatCollector.
 
+    Args:
+        request: Текущий запрос (зависимости берутся из его приложения)
+
     Returns:
         StatCollectorProtocol: Текущий экземпляр сборщика статистики
 
     Raises:
         RuntimeError: Если StatCollector не инициализирован
     """
-    if _stat_collector is None:
+    stat_collector: StatCollectorProtocol | None = getattr(
+        request.app.state, "stat_collector", None
+    )
+    if stat_collector is None:
         raise RuntimeError("StatCollector not initialized. Call create_app() first.")
-    return _stat_collector
+    return stat_collector
 
 
-def get_web_chat_handler() -> WebChatHandler:
+def get_stats_cache_control(request: Request) -> str:
+    """Dependency injection для заголовка Cache-Control ответов /api/stats.
+
+    Args:
+        request: Текущий запрос
+
+    Returns:
+        str: Значение заголовка Cache-Control
+    """
+    cache_control: str = getattr(request.app.state, "stats_cache_control", "no-cache")
+    return cache_control
+
+
+def get_message_exporter(request: Request) -> MessageExporter:
+    """Dependency injection для MessageExporter.
+
+    Args:
+        request: Текущий запрос
+
+    Returns:
+        MessageExporter: Текущий экземпляр выгрузки сообщений
+
+    Raises:
+        RuntimeError: Если MessageExporter не инициализирован
+    """
+    message_exporter: MessageExporter | None = getattr(request.app.state, "message_exporter", None)
+    if message_exporter is None:
+        raise RuntimeError("MessageExporter not initialized. Call create_app() first.")
+    return message_exporter
+
+
+def require_export_token(
+    request: Request, authorization: Annotated[str | None, Header()] = None
+) -> None:
+    """Dependency: выгрузка сообщений доступна только с токеном администратора.
+
+    Args:
+        request: Текущий запрос
+        authorization: Заголовок Authorization ('Bearer <token>')
+
+    Raises:
+        HTTPException: 404, если выгрузка не включена; 403 при неверном токене
+    """
+    export_token: str | None = getattr(request.app.state, "export_token", None)
+    if export_token is None:
+        raise HTTPException(status_code=404, detail="Message export is not enabled")
+
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), export_token.encode()):
+        raise HTTPException(status_code=403, detail="Invalid export token")
+
+
+def get_stream_tracker(request: Request) -> StreamTracker:
+    """Dependency injection для StreamTracker.
+
+    Args:
+        request: Текущий запрос
+
+    Returns:
+        StreamTracker: Учет потоковых ответов приложения
+    """
+    stream_tracker: StreamTracker = request.app.state.stream_tracker
+    return stream_tracker
+
+
+def get_sse_encoder(request: Request) -> SSEEncoder:
+    """Dependency injection для SSEEncoder.
+
+    Args:
+        request: Текущий запрос
+
+    Returns:
+        SSEEncoder: Кодировщик SSE ответов чата
+    """
+    sse_encoder: SSEEncoder = request.app.state.sse_encoder
+    return sse_encoder
+
+
+def get_web_chat_handler(request: Request) -> WebChatHandler:
     """Dependency injection для WebChatHandler.
 
+    Args:
+        request: Текущий запрос
+
     Returns:
         WebChatHandler: Текущий экземпляр обработчика веб-чата
 
     Raises:
         RuntimeError: Если WebChatHandler не инициализирован
     """
-    if _web_chat_handler is None:
-        raise RuntimeError("WebChatHandler not initialized. Call create_app() with required dependencies first.")
-    return _web_chat_handler
+    web_chat_handler: WebChatHandler | None = getattr(request.app.state, "web_chat_handler", None)
+    if web_chat_handler is None:
+        raise RuntimeError(
+            "WebChatHandler not initialized. Call create_app() with required dependencies first."
+        )
+    return web_chat_handler
+
+
+def get_telegram_webhook(request: Request) -> TelegramWebhook:
+    """Dependency injection для TelegramWebhook.
+
+    Args:
+        request: Текущий запрос
+
+    Returns:
+        TelegramWebhook: Прием обновлений Telegram
+
+    Raises:
+        HTTPException: 404, если webhook не включен в этом процессе
+    """
+    telegram_webhook: TelegramWebhook | None = getattr(request.app.state, "telegram_webhook", None)
+    if telegram_webhook is None:
+        raise HTTPException(status_code=404, detail="Telegram webhook is not enabled")
+    return telegram_webhook
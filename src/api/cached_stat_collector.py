@@ -0,0 +1,130 @@
+"""Кэширующая обертка над сборщиком статистики дашборда."""
+
+import asyncio
+import logging
+import time
+
+from src.api.models import DashboardStats
+from src.api.protocols import StatCollectorProtocol
+
+logger = logging.getLogger(__name__)
+
+
+class CachedStatCollector:
+    """Реализация StatCollectorProtocol с TTL-кэшем по периоду.
+
+    - Свежие данные (моложе ttl_seconds) отдаются из кэша.
+    - Устаревшие, но моложе ttl_seconds + stale_seconds, отдаются сразу,
+      а пересчет запускается в фоне (stale-while-revalidate).
+    - Одновременные запросы одного периода ждут один общий пересчет (single-flight).
+    """
+
+    def __init__(
+        self, collector: StatCollectorProtocol, ttl_seconds: float, stale_seconds: float
+    ) -> None:
+        """Инициализация кэша.
+
+        Args:
+            collector: Исходный сборщик статистики
+            ttl_seconds: Время, в течение которого данные считаются свежими (сек)
+            stale_seconds: Сколько еще отдавать устаревшие данные во время пересчета (сек)
+        """
+        self.collector = collector
+        self.ttl_seconds = ttl_seconds
+        self.stale_seconds = stale_seconds
+
+        # period -> (время расчета по monotonic, статистика)
+        self._entries: dict[str, tuple[float, DashboardStats]] = {}
+        self._inflight: dict[str, asyncio.Task[DashboardStats]] = {}
+
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.computes = 0
+        self.failures = 0
+
+    @property
+    def cache_control(self) -> str:
+        """Значение заголовка Cache-Control для ответов со статистикой."""
+        return (
+            f"public, max-age={int(self.ttl_seconds)}, "
+            f"stale-while-revalidate={int(self.stale_seconds)}"
+        )
+
+    async def get_dashboard_stats(self, period: str) -> DashboardStats:
+        """Получить статистику из кэша или пересчитать ее.
+
+        Args:
+            period: Период для статистики ('7d', '30d', '3m')
+
+        Returns:
+            DashboardStats: Статистика за период
+
+        Raises:
+            ValueError: Если period имеет невалидное значение
+        """
+        entry = self._entries.get(period)
+        if entry is not None:
+            loaded_at, stats = entry
+            age = time.monotonic() - loaded_at
+            if age < self.ttl_seconds:
+                self.hits += 1
+                return stats
+            if age < self.ttl_seconds + self.stale_seconds:
+                self.stale_hits += 1
+                self._refresh(period)
+                return stats
+
+        self.misses += 1
+        # shield: отмена одного запроса не отменяет общий пересчет для остальных
+        return await asyncio.shield(self._refresh(period))
+
+    def invalidate(self) -> None:
+        """Сбросить все закэшированные периоды."""
+        self._entries.clear()
+
+    def stats(self) -> dict[str, float]:
+        """Получить метрики кэша.
+
+        Returns:
+            dict[str, float]: Попадания, устаревшие попадания, промахи и пересчеты
+        """
+        requests = self.hits + self.stale_hits + self.misses
+        return {
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "hit_ratio": (
+                round((self.hits + self.stale_hits) / requests, 3) if requests > 0 else 0.0
+            ),
+            "computes": self.computes,
+            "failures": self.failures,
+            "inflight": len(self._inflight),
+        }
+
+    def _refresh(self, period: str) -> asyncio.Task[DashboardStats]:
+        """Запустить пересчет периода или вернуть уже идущий."""
+        task = self._inflight.get(period)
+        if task is None:
+            task = asyncio.create_task(self._compute(period), name=f"stats-refresh-{period}")
+            self._inflight[period] = task
+            task.add_done_callback(lambda done: self._on_refresh_done(period, done))
+        return task
+
+    async def _compute(self, period: str) -> DashboardStats:
+        """Пересчитать статистику периода и сохранить в кэш."""
+        stats = await self.collector.get_dashboard_stats(period)
+        self._entries[period] = (time.monotonic(), stats)
+        self.computes += 1
+        return stats
+
+    def _on_refresh_done(self, period: str, task: asyncio.Task[DashboardStats]) -> None:
+        """Снять пересчет с учета и залогировать ошибку фонового пересчета."""
+        self._inflight.pop(period, None)
+        if task.cancelled():
+            return
+
+        error = task.exception()
+        if error is not None and not isinstance(error, ValueError):
+            self.failures += 1
+            logger.error(f"Failed to refresh dashboard stats for {period}: {error}")
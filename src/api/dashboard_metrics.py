@@ -0,0 +1,150 @@
+"""Карточки метрик и временной ряд дашборда по итогам периодов.
+
+Общие для сборщиков статистики из БД (RealStatCollector) и из счетчиков
+в памяти (LiveStatCollector).
+"""
+
+import logging
+from datetime import date, datetime, timedelta
+from typing import Literal
+
+from src.api.models import MetricCard, MetricsData, TimeSeriesPoint
+
+logger = logging.getLogger(__name__)
+
+
+def build_metrics(current_stats: dict[str, int], previous_stats: dict[str, int]) -> MetricsData:
+    """Построить карточки метрик по итогам двух периодов.
+
+    Args:
+        current_stats: total_messages и active_conversations текущего периода
+        previous_stats: total_messages и active_conversations предыдущего периода
+
+    Returns:
+        MetricsData: Метрики для дашборда
+    """
+    # Извлекаем значения
+    current_total = current_stats["total_messages"]
+    previous_total = previous_stats["total_messages"]
+
+    current_conversations = current_stats["active_conversations"]
+    previous_conversations = previous_stats["active_conversations"]
+
+    # Вычисляем средние длины диалогов
+    current_avg_length = (
+        round(current_total / current_conversations, 1) if current_conversations > 0 else 0
+    )
+    previous_avg_length = (
+        round(previous_total / previous_conversations, 1) if previous_conversations > 0 else 0
+    )
+
+    # Создаем карточки метрик с расчетом изменений
+    total_messages_card = create_metric_card(
+        value=current_total,
+        previous_value=previous_total,
+        description_templates={
+            "up": "Trending up this period",
+            "down": "Messages decreased",
+            "stable": "Stable message volume",
+        },
+    )
+
+    active_conversations_card = create_metric_card(
+        value=current_conversations,
+        previous_value=previous_conversations,
+        description_templates={
+            "up": "Strong user engagement",
+            "down": "Fewer active conversations",
+            "stable": "Stable conversation count",
+        },
+    )
+
+    avg_conversation_length_card = create_metric_card(
+        value=current_avg_length,
+        previous_value=previous_avg_length,
+        description_templates={
+            "up": "Longer conversations",
+            "down": "Shorter conversations",
+            "stable": "Consistent conversation length",
+        },
+    )
+
+    return MetricsData(
+        total_messages=total_messages_card,
+        active_conversations=active_conversations_card,
+        avg_conversation_length=avg_conversation_length_card,
+    )
+
+
+def create_metric_card(
+    value: float,
+    previous_value: float,
+    description_templates: dict[str, str],
+) -> MetricCard:
+    """Создать карточку метрики с расчетом тренда.
+
+    Args:
+        value: Текущее значение метрики
+        previous_value: Значение метрики в предыдущем периоде
+        description_templates: Шаблоны описаний для разных трендов
+
+    Returns:
+        MetricCard: Карточка метрики с трендом
+    """
+    # Рассчитываем процентное изменение
+    if previous_value > 0:
+        change_percent = round(((value - previous_value) / previous_value) * 100, 1)
+    elif value > 0:
+        change_percent = 100.0  # Рост с нуля
+    else:
+        change_percent = 0.0  # Оба значения нулевые
+
+    # Определяем тренд
+    trend: Literal["up", "down", "stable"]
+    if change_percent > 2:
+        trend = "up"
+    elif change_percent < -2:
+        trend = "down"
+    else:
+        trend = "stable"
+
+    description = description_templates[trend]
+
+    return MetricCard(
+        value=value,
+        change_percent=change_percent,
+        trend=trend,
+        description=description,
+    )
+
+
+def build_time_series(
+    period_start: datetime, date_to_count: dict[date, int]
+) -> list[TimeSeriesPoint]:
+    """Построить временной ряд для графика.
+
+    Args:
+        period_start: Начало периода
+        date_to_count: Количество сообщений по дням (дни без сообщений отсутствуют)
+
+    Returns:
+        list[TimeSeriesPoint]: Список точек временного ряда
+    """
+    # Генерируем полный временной ряд (включая дни с нулевыми значениями)
+    time_series: list[TimeSeriesPoint] = []
+    current_date = period_start.date()
+    end_date = datetime.now().date()
+
+    while current_date <= end_date:
+        value = date_to_count.get(current_date, 0)
+        time_series.append(
+            TimeSeriesPoint(
+                date=current_date.isoformat(),
+                value=value,
+            )
+        )
+        current_date += timedelta(days=1)
+
+    logger.info(f"Generated time series with {len(time_series)} points")
+
+    return time_series
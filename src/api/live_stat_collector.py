@@ -0,0 +1,54 @@
+"""Сборщик статистики дашборда из in-process счетчиков."""
+
+from datetime import date, datetime, timedelta
+
+from src.api.dashboard_metrics import build_metrics, build_time_series
+from src.api.models import DashboardStats
+from src.live_stats import LiveStats
+
+
+class LiveStatCollector:
+    """Реализация StatCollectorProtocol поверх LiveStats без запросов к БД.
+
+    Метрики и временной ряд строятся теми же функциями, что и в RealStatCollector;
+    как в режиме use_rollup, период округляется до целых дней.
+    """
+
+    def __init__(self, live_stats: LiveStats) -> None:
+        """Инициализация сборщика.
+
+        Args:
+            live_stats: Счетчики, пополняемые DatabaseConversation
+        """
+        self.live_stats = live_stats
+
+    async def get_dashboard_stats(self, period: str) -> DashboardStats:
+        """Получить статистику для дашборда за указанный период.
+
+        Args:
+            period: Период для статистики ('7d', '30d', '3m')
+
+        Returns:
+            DashboardStats: Статистика из счетчиков в памяти
+
+        Raises:
+            ValueError: Если period имеет невалидное значение
+        """
+        if period not in ["7d", "30d", "3m"]:
+            raise ValueError(f"Invalid period: {period}. Must be one of: 7d, 30d, 3m")
+
+        period_days = {"7d": 7, "30d": 30, "3m": 90}[period]
+        today = date.today()
+        current_period_start = today - timedelta(days=period_days)
+        previous_period_start = current_period_start - timedelta(days=period_days)
+
+        current_stats = self.live_stats.totals(current_period_start, today + timedelta(days=1))
+        previous_stats = self.live_stats.totals(previous_period_start, current_period_start)
+        date_to_count = self.live_stats.daily_counts(current_period_start)
+
+        metrics = build_metrics(current_stats, previous_stats)
+        time_series = build_time_series(
+            datetime.combine(current_period_start, datetime.min.time()), date_to_count
+        )
+
+        return DashboardStats(metrics=metrics, time_series=time_series)
@@ -0,0 +1,146 @@
+"""Потоковая выгрузка сообщений через COPY."""
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from datetime import date, timedelta
+from typing import Any, Literal
+
+from src.instrumented_pool import InstrumentedPool
+
+logger = logging.getLogger(__name__)
+
+ExportFormat = Literal["csv", "ndjson"]
+
+# Колонки выгрузки (в порядке CSV)
+EXPORT_COLUMNS = (
+    "id",
+    "user_id",
+    "chat_id",
+    "role",
+    "content",
+    "message_length",
+    "source",
+    "created_at",
+)
+
+
+class MessageExporter:
+    """Выгрузка не удаленных сообщений в CSV или NDJSON через COPY ... TO STDOUT.
+
+    Postgres формирует CSV/JSON сам, asyncpg отдает данные кусками по мере
+    получения, а ограниченная очередь между COPY и клиентом держит в памяти
+    процесса не больше queue_size кусков: медленный клиент притормаживает COPY.
+    """
+
+    def __init__(self, pool: InstrumentedPool, queue_size: int = 16) -> None:
+        """Инициализация выгрузки.
+
+        Args:
+            pool: Connection pool
+            queue_size: Сколько кусков COPY держать в памяти до отправки клиенту
+        """
+        self.pool = pool
+        self.queue_size = queue_size
+
+    def build_query(
+        self,
+        export_format: ExportFormat,
+        date_from: date | None = None,
+        date_to: date | None = None,
+        source: str | None = None,
+        user_id: int | None = None,
+    ) -> tuple[str, list[Any]]:
+        """Собрать запрос выгрузки с фильтрами.
+
+        Args:
+            export_format: Формат выгрузки ('csv' или 'ndjson')
+            date_from: Первый день выгрузки (включительно)
+            date_to: Последний день выгрузки (включительно)
+            source: Источник сообщений ('telegram' или 'web')
+            user_id: ID пользователя
+
+        Returns:
+            tuple[str, list[Any]]: SQL запрос и его параметры
+        """
+        conditions = ["deleted_at IS NULL"]
+        args: list[Any] = []
+
+        # Границы по created_at (а не DATE(created_at)), чтобы работал pruning партиций
+        if date_from is not None:
+            args.append(date_from)
+            conditions.append(f"created_at >= ${len(args)}")
+        if date_to is not None:
+            args.append(date_to + timedelta(days=1))
+            conditions.append(f"created_at < ${len(args)}")
+        if source is not None:
+            args.append(source)
+            conditions.append(f"source = ${len(args)}")
+        if user_id is not None:
+            args.append(user_id)
+            conditions.append(f"user_id = ${len(args)}")
+
+        if export_format == "ndjson":
+            fields = ", ".join(f"'{column}', {column}" for column in EXPORT_COLUMNS)
+            select = f"json_build_object({fields})"
+        else:
+            select = ", ".join(EXPORT_COLUMNS)
+
+        query = (
+            f"SELECT {select} FROM messages WHERE {' AND '.join(conditions)} "
+            "ORDER BY created_at, id"
+        )
+        return query, args
+
+    async def stream(
+        self,
+        export_format: ExportFormat,
+        date_from: date | None = None,
+        date_to: date | None = None,
+        source: str | None = None,
+        user_id: int | None = None,
+    ) -> AsyncIterator[bytes]:
+        """Выгрузить сообщения кусками по мере выполнения COPY.
+
+        Args:
+            export_format: Формат выгрузки ('csv' или 'ndjson')
+            date_from: Первый день выгрузки (включительно)
+            date_to: Последний день выгрузки (включительно)
+            source: Источник сообщений ('telegram' или 'web')
+            user_id: ID пользователя
+
+        Yields:
+            bytes: Очередной кусок CSV или NDJSON
+        """
+        query, args = self.build_query(export_format, date_from, date_to, source, user_id)
+        queue: asyncio.Queue[bytes | None] = asyncio.Queue(maxsize=self.queue_size)
+
+        if export_format == "ndjson":
+            # Одна колонка JSON: CSV без кавычек и разделителей (символы, которые
+            # json_build_object экранирует) выводит ее как есть, по строке на объект
+            options: dict[str, Any] = {"format": "csv", "delimiter": "\x02", "quote": "\x01"}
+        else:
+            options = {"format": "csv", "header": True}
+
+        async def copy() -> None:
+            # None - конец выгрузки; при отмене читать очередь уже некому
+            try:
+                async with self.pool.acquire() as connection:
+                    await connection.copy_from_query(query, *args, output=queue.put, **options)
+            except Exception:
+                await queue.put(None)
+                raise
+            await queue.put(None)
+
+        task = asyncio.create_task(copy(), name="messages-export")
+        try:
+            while (chunk := await queue.get()) is not None:
+                yield chunk
+            await task
+        except Exception as e:
+            logger.error(f"Messages export failed: {e}", exc_info=True)
+            raise
+        finally:
+            # Клиент отключился: прерываем COPY и возвращаем соединение в пул
+            if not task.done():
+                task.cancel()
@@ -1,11 +1,14 @@
 """Реальная реализация сборщика статистики на основе БД."""
 
 import logging
-from datetime import datetime, timedelta
-from typing import Literal
+from datetime import date, datetime, timedelta
+from typing import Any
 
-from src.api.models import DashboardStats, MetricCard, MetricsData, TimeSeriesPoint
-from src.database import get_pool
+from src import statements
+from src.api.dashboard_metrics import build_metrics, build_time_series
+from src.api.models import DashboardStats
+from src.hyperloglog import HyperLogLog
+from src.instrumented_pool import InstrumentedPool
 
 logger = logging.getLogger(__name__)
 
@@ -15,8 +18,40 @@ class RealStatCollector:
 
     Получает статистику из БД PostgreSQL.
     Учитывает сообщения из всех источников (Telegram и Web).
+
+    В режиме use_rollup читает дневные агрегаты (message_daily_stats,
+    message_daily_conversations) вместо сырых сообщений: время ответа не растет
+    вместе с историей, а период округляется до целых дней.
+    С approximate_distinct активные диалоги оцениваются объединением дневных
+    HyperLogLog sketches (ошибка ~1.6%) вместо точного DISTINCT.
     """
 
+    def __init__(
+        self,
+        pool: InstrumentedPool,
+        use_rollup: bool = False,
+        approximate_distinct: bool = False,
+        hll_precision: int = 12,
+    ) -> None:
+        """Инициализация сборщика.
+
+        Args:
+            pool: Connection pool
+            use_rollup: Читать статистику из дневных агрегатов (см. DailyStatsRollup)
+            approximate_distinct: Оценивать активные диалоги по HyperLogLog sketches
+            hll_precision: Precision дневных sketches (как в DailyStatsRollup)
+
+        Raises:
+            ValueError: Если approximate_distinct включен без use_rollup
+        """
+        if approximate_distinct and not use_rollup:
+            raise ValueError("approximate_distinct requires use_rollup (sketches live in rollup)")
+
+        self.pool = pool
+        self.use_rollup = use_rollup
+        self.approximate_distinct = approximate_distinct
+        self.hll_precision = hll_precision
+
     async def get_dashboard_stats(self, period: str) -> DashboardStats:
         """Получить статистику для дашборда за указанный период.
 
@@ -39,209 +74,99 @@ class RealStatCollector:
         current_period_start = datetime.now() - timedelta(days=period_days)
         previous_period_start = current_period_start - timedelta(days=period_days)
 
+        async with self.pool.acquire() as connection:
+            if self.use_rollup:
+                current_stats = await self._fetch_totals(connection, current_period_start, None)
+                previous_stats = await self._fetch_totals(
+                    connection, previous_period_start, current_period_start
+                )
+                rows = await statements.fetch(
+                    connection, "rollup_daily_counts", current_period_start.date()
+                )
+                date_to_count = {row["date"]: row["message_count"] for row in rows}
+            else:
+                # Оба периода и дневной ряд за один проход по messages
+                current_stats, previous_stats, date_to_count = await self._scan_messages(
+                    connection, current_period_start, previous_period_start
+                )
+
         # Получаем метрики
-        metrics = await self._get_metrics(
-            current_period_start, previous_period_start, period_days
-        )
+        metrics = build_metrics(current_stats, previous_stats)
 
         # Получаем временной ряд
-        time_series = await self._get_time_series(current_period_start, period_days)
+        time_series = build_time_series(current_period_start, date_to_count)
 
         return DashboardStats(metrics=metrics, time_series=time_series)
 
-    async def _get_metrics(
-        self,
-        current_period_start: datetime,
-        previous_period_start: datetime,
-        period_days: int,
-    ) -> MetricsData:
-        """Получить метрики из БД.
+    async def _scan_messages(
+        self, connection: Any, current_period_start: datetime, previous_period_start: datetime
+    ) -> tuple[dict[str, int], dict[str, int], dict[date, int]]:
+        """Посчитать итоги обоих периодов и дневной ряд одним запросом.
 
         Args:
+            connection: Соединение с БД
             current_period_start: Начало текущего периода
             previous_period_start: Начало предыдущего периода
-            period_days: Количество дней в периоде
 
         Returns:
-            MetricsData: Метрики для дашборда
+            tuple: Итоги текущего периода, итоги предыдущего периода и
+                количество сообщений текущего периода по дням
         """
-        pool = await get_pool()
-
-        async with pool.acquire() as connection:
-            # Запрос для текущего периода (все источники: telegram и web)
-            current_stats = await connection.fetchrow(
-                """
-                SELECT 
-                    COUNT(*) as total_messages,
-                    COUNT(DISTINCT CONCAT(user_id::text, '_', chat_id::text)) as active_conversations
-                FROM messages
-                WHERE deleted_at IS NULL
-                    AND created_at >= $1
-                """,
-                current_period_start,
-            )
-
-            # Запрос для предыдущего периода (для расчета изменений)
-            previous_stats = await connection.fetchrow(
-                """
-                SELECT 
-                    COUNT(*) as total_messages,
-                    COUNT(DISTINCT CONCAT(user_id::text, '_', chat_id::text)) as active_conversations
-                FROM messages
-                WHERE deleted_at IS NULL
-                    AND created_at >= $1 AND created_at < $2
-                """,
-                previous_period_start,
-                current_period_start,
-            )
-
-        # Извлекаем значения
-        current_total = current_stats["total_messages"] if current_stats else 0
-        previous_total = previous_stats["total_messages"] if previous_stats else 0
-
-        current_conversations = current_stats["active_conversations"] if current_stats else 0
-        previous_conversations = (
-            previous_stats["active_conversations"] if previous_stats else 0
-        )
-
-        # Вычисляем средние длины диалогов
-        current_avg_length = (
-            round(current_total / current_conversations, 1) if current_conversations > 0 else 0
-        )
-        previous_avg_length = (
-            round(previous_total / previous_conversations, 1)
-            if previous_conversations > 0
-            else 0
-        )
-
-        # Создаем карточки метрик с расчетом изменений
-        total_messages_card = self._create_metric_card(
-            value=current_total,
-            previous_value=previous_total,
-            description_templates={
-                "up": "Trending up this period",
-                "down": "Messages decreased",
-                "stable": "Stable message volume",
-            },
+        rows = await statements.fetch(
+            connection, "stats_dashboard_scan", previous_period_start, current_period_start
         )
 
-        active_conversations_card = self._create_metric_card(
-            value=current_conversations,
-            previous_value=previous_conversations,
-            description_templates={
-                "up": "Strong user engagement",
-                "down": "Fewer active conversations",
-                "stable": "Stable conversation count",
-            },
-        )
-
-        avg_conversation_length_card = self._create_metric_card(
-            value=current_avg_length,
-            previous_value=previous_avg_length,
-            description_templates={
-                "up": "Longer conversations",
-                "down": "Shorter conversations",
-                "stable": "Consistent conversation length",
-            },
-        )
-
-        return MetricsData(
-            total_messages=total_messages_card,
-            active_conversations=active_conversations_card,
-            avg_conversation_length=avg_conversation_length_card,
-        )
-
-    def _create_metric_card(
-        self,
-        value: float,
-        previous_value: float,
-        description_templates: dict[str, str],
-    ) -> MetricCard:
-        """Создать карточку метрики с расчетом тренда.
+        current_stats = {"total_messages": 0, "active_conversations": 0}
+        previous_stats = {"total_messages": 0, "active_conversations": 0}
+        date_to_count: dict[date, int] = {}
+
+        for row in rows:
+            if row["is_total"]:
+                current_stats = {
+                    "total_messages": row["current_messages"],
+                    "active_conversations": row["current_conversations"],
+                }
+                previous_stats = {
+                    "total_messages": row["previous_messages"],
+                    "active_conversations": row["previous_conversations"],
+                }
+            elif row["current_messages"] > 0:
+                date_to_count[row["date"]] = row["current_messages"]
+
+        return current_stats, previous_stats, date_to_count
+
+    async def _fetch_totals(
+        self, connection: Any, start: datetime, end: datetime | None
+    ) -> dict[str, int]:
+        """Получить из дневных агрегатов сообщения и активные диалоги за период [start, end).
 
         Args:
-            value: Текущее значение метрики
-            previous_value: Значение метрики в предыдущем периоде
-            description_templates: Шаблоны описаний для разных трендов
+            connection: Соединение с БД
+            start: Начало периода
+            end: Конец периода (None - до текущего момента)
 
         Returns:
-            MetricCard: Карточка метрики с трендом
+            dict[str, int]: total_messages и active_conversations
         """
-        # Рассчитываем процентное изменение
-        if previous_value > 0:
-            change_percent = round(((value - previous_value) / previous_value) * 100, 1)
-        elif value > 0:
-            change_percent = 100.0  # Рост с нуля
-        else:
-            change_percent = 0.0  # Оба значения нулевые
-
-        # Определяем тренд
-        trend: Literal["up", "down", "stable"]
-        if change_percent > 2:
-            trend = "up"
-        elif change_percent < -2:
-            trend = "down"
+        # Агрегаты хранятся по дням: границы периода округляются до дат
+        kind = "rollup_sketch_totals" if self.approximate_distinct else "rollup_totals"
+        args: tuple[Any, ...] = (start.date(),) if end is None else (start.date(), end.date())
+
+        name = f"{kind}_since" if end is None else f"{kind}_between"
+        row = await statements.fetchrow(connection, name, *args)
+        if row is None:
+            return {"total_messages": 0, "active_conversations": 0}
+
+        if self.approximate_distinct:
+            # Объединяем дневные HyperLogLog sketches в sketch за весь период
+            merged = HyperLogLog(self.hll_precision)
+            for registers in row["sketches"]:
+                merged.merge(HyperLogLog.from_bytes(registers))
+            active_conversations = merged.count()
         else:
-            trend = "stable"
-
-        description = description_templates[trend]
-
-        return MetricCard(
-            value=value,
-            change_percent=change_percent,
-            trend=trend,
-            description=description,
-        )
-
-    async def _get_time_series(
-        self, period_start: datetime, period_days: int
-    ) -> list[TimeSeriesPoint]:
-        """Получить временной ряд для графика.
-
-        Args:
-            period_start: Начало периода
-            period_days: Количество дней в периоде
-
-        Returns:
-            list[TimeSeriesPoint]: Список точек временного ряда
-        """
-        pool = await get_pool()
-
-        async with pool.acquire() as connection:
-            # Группируем сообщения по дням (все источники: telegram и web)
-            rows = await connection.fetch(
-                """
-                SELECT 
-                    DATE(created_at) as date,
-                    COUNT(*) as message_count
-                FROM messages
-                WHERE deleted_at IS NULL
-                    AND created_at >= $1
-                GROUP BY DATE(created_at)
-                ORDER BY date ASC
-                """,
-                period_start,
-            )
-
-        # Создаем словарь дата -> количество сообщений
-        date_to_count = {row["date"]: row["message_count"] for row in rows}
-
-        # Генерируем полный временной ряд (включая дни с нулевыми значениями)
-        time_series: list[TimeSeriesPoint] = []
-        current_date = period_start.date()
-        end_date = datetime.now().date()
-
-        while current_date <= end_date:
-            value = date_to_count.get(current_date, 0)
-            time_series.append(
-                TimeSeriesPoint(
-                    date=current_date.isoformat(),
-                    value=value,
-                )
-            )
-            current_date += timedelta(days=1)
-
-        logger.info(f"Generated time series with {len(time_series)} points")
-
-        return time_series
+            active_conversations = row["active_conversations"]
 
+        return {
+            "total_messages": row["total_messages"],
+            "active_conversations": active_conversations,
+        }
@@ -1,14 +1,26 @@
 """API endpoints для дашборда и веб-чата."""
 
-import json
+import hashlib
+from datetime import date
 from typing import Annotated, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Response
 from fastapi.responses import StreamingResponse
 
-from src.api.app import get_stat_collector, get_web_chat_handler
+from src.api.app import (
+    get_message_exporter,
+    get_sse_encoder,
+    get_stat_collector,
+    get_stats_cache_control,
+    get_stream_tracker,
+    get_web_chat_handler,
+    require_export_token,
+)
+from src.api.message_exporter import ExportFormat, MessageExporter
 from src.api.models import ChatMessageResponse, ChatRequest, DashboardStats
 from src.api.protocols import StatCollectorProtocol
+from src.api.sse_encoder import SSEEncoder
+from src.api.stream_tracker import StreamTracker
 from src.api.web_chat_handler import WebChatHandler
 
 router = APIRouter(prefix="/api", tags=["stats"])
@@ -20,23 +32,29 @@ async def get_stats(
         Literal["7d", "30d", "3m"],
         Query(description="Период для статистики: 7d, 30d, 3m"),
     ] = "7d",
+    if_none_match: Annotated[str | None, Header()] = None,
     stat_collector: StatCollectorProtocol = Depends(get_stat_collector),  # noqa: B008
-) -> DashboardStats:
+    cache_control: str = Depends(get_stats_cache_control),
+) -> Response:
     """Получить статистику для дашборда за указанный период.
 
+    Ответ содержит ETag (хэш тела) и Cache-Control. Если клиент прислал
+    If-None-Match с тем же ETag, возвращается 304 без тела.
+
     Args:
         period: Период для статистики (по умолчанию '7d')
+        if_none_match: ETag закэшированного у клиента ответа
         stat_collector: Инжектируемый сборщик статистики
+        cache_control: Значение заголовка Cache-Control
 
     Returns:
-        DashboardStats: Полная статистика включая метрики и временной ряд
+        Response: JSON DashboardStats или 304 Not Modified
 
     Raises:
         HTTPException: При ошибке получения статистики
     """
     try:
         stats = await stat_collector.get_dashboard_stats(period)
-        return stats
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
     except Exception as e:
@@ -45,6 +63,74 @@ async def get_stats(
             detail=f"Failed to fetch dashboard stats: {e!s}",
         ) from e
 
+    body = stats.model_dump_json()
+    etag = f'"{hashlib.sha256(body.encode()).hexdigest()[:32]}"'
+    headers = {"ETag": etag, "Cache-Control": cache_control}
+
+    if if_none_match == etag:
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@router.get(
+    "/export/messages",
+    tags=["export"],
+    dependencies=[Depends(require_export_token)],
+)
+async def export_messages(
+    export_format: Annotated[
+        ExportFormat,
+        Query(alias="format", description="Формат выгрузки: csv или ndjson"),
+    ] = "csv",
+    date_from: Annotated[
+        date | None, Query(description="Первый день выгрузки (YYYY-MM-DD)")
+    ] = None,
+    date_to: Annotated[
+        date | None, Query(description="Последний день выгрузки (YYYY-MM-DD)")
+    ] = None,
+    source: Annotated[
+        Literal["telegram", "web"] | None, Query(description="Источник сообщений")
+    ] = None,
+    user_id: Annotated[int | None, Query(description="ID пользователя")] = None,
+    message_exporter: MessageExporter = Depends(get_message_exporter),  # noqa: B008
+    stream_tracker: StreamTracker = Depends(get_stream_tracker),  # noqa: B008
+) -> StreamingResponse:
+    """Выгрузить не удаленные сообщения потоком в CSV или NDJSON.
+
+    Данные передаются клиенту по мере выполнения COPY в БД, не накапливаясь
+    в памяти процесса API. Доступна, только если включена в конфигурации,
+    и только с токеном администратора (см. require_export_token).
+
+    Args:
+        export_format: Формат выгрузки (по умолчанию 'csv')
+        date_from: Первый день выгрузки (включительно)
+        date_to: Последний день выгрузки (включительно)
+        source: Источник сообщений ('telegram' или 'web')
+        user_id: ID пользователя
+        message_exporter: Инжектируемая выгрузка сообщений
+        stream_tracker: Учет активных потоков для graceful shutdown
+
+    Returns:
+        StreamingResponse: Поток CSV или NDJSON
+
+    Raises:
+        HTTPException: 400, если date_from позже date_to; 404/403 без доступа к выгрузке
+    """
+    if date_from is not None and date_to is not None and date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must not be after date_to")
+
+    media_type = "text/csv" if export_format == "csv" else "application/x-ndjson"
+    return StreamingResponse(
+        stream_tracker.track(
+            message_exporter.stream(export_format, date_from, date_to, source, user_id)
+        ),
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="messages.{export_format}"',
+            "X-Accel-Buffering": "no",
+        },
+    )
+
 
 # ===== Endpoints для веб-чата =====
 
@@ -53,41 +139,27 @@ async def get_stats(
 async def send_message(
     request: ChatRequest,
     web_chat_handler: WebChatHandler = Depends(get_web_chat_handler),  # noqa: B008
+    sse_encoder: SSEEncoder = Depends(get_sse_encoder),  # noqa: B008
+    stream_tracker: StreamTracker = Depends(get_stream_tracker),  # noqa: B008
 ) -> StreamingResponse:
     """Отправить сообщение в чат и получить streaming ответ.
 
+    Токены ответа объединяются в кадры SSE (событие 'token'), поток
+    завершается событием 'done' или 'error'.
+
     Args:
         request: Запрос с session_id и сообщением пользователя
         web_chat_handler: Инжектируемый обработчик веб-чата
+        sse_encoder: Кодировщик событий SSE
+        stream_tracker: Учет активных потоков для graceful shutdown
 
     Returns:
         StreamingResponse: SSE stream с токенами ответа
-
-    Raises:
-        HTTPException: При ошибке обработки сообщения
     """
-
-    async def event_generator():
-        """Генератор SSE events для стриминга ответа."""
-        try:
-            async for chunk in web_chat_handler.handle_message_stream(
-                request.session_id, request.message
-            ):
-                # Экранируем специальные символы для JSON
-                escaped_chunk = chunk.replace('"', '\\"').replace("\n", "\\n")
-                # SSE формат: data: {JSON}\n\n
-                yield f'data: {{"type":"token","content":"{escaped_chunk}"}}\n\n'
-
-            # Сигнал завершения
-            yield f'data: {{"type":"done","content":""}}\n\n'
-
-        except Exception as e:
-            # Отправляем ошибку как SSE event
-            error_msg = str(e).replace('"', '\\"')
-            yield f'data: {{"type":"error","content":"{error_msg}"}}\n\n'
+    chunks = web_chat_handler.handle_message_stream(request.session_id, request.message)
 
     return StreamingResponse(
-        event_generator(),
+        stream_tracker.track(sse_encoder.stream(chunks)),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -0,0 +1,150 @@
+"""Кодирование потока ответа LLM в события SSE."""
+
+import asyncio
+import json
+import logging
+from collections.abc import AsyncIterator, Callable
+
+from src.api.models import StreamEvent
+
+logger = logging.getLogger(__name__)
+
+_dumps: Callable[[dict[str, str]], bytes]
+
+try:
+    import orjson
+
+    _dumps = orjson.dumps
+except ImportError:  # orjson - необязательная зависимость (extra "fast")
+
+    def _dumps(data: dict[str, str]) -> bytes:
+        return json.dumps(data, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class SSEEncoder:
+    """Сериализация StreamEvent в кадры SSE с объединением токенов.
+
+    Токены LLM приходят по несколько символов; вместо кадра на каждый токен
+    они накапливаются и отправляются одним событием 'token', когда набралось
+    flush_bytes байт или с первого ненаписанного токена прошло flush_interval
+    секунд. Это сокращает число кадров и записей в сокет на ответ.
+    """
+
+    def __init__(self, flush_bytes: int = 256, flush_interval: float = 0.03) -> None:
+        """Инициализация кодировщика.
+
+        Args:
+            flush_bytes: Размер накопленного текста, после которого кадр отправляется
+            flush_interval: Максимальная задержка токена до отправки (сек, 0 - без объединения)
+        """
+        self.flush_bytes = flush_bytes
+        self.flush_interval = flush_interval
+
+        self.tokens = 0
+        self.frames = 0
+
+    def encode(self, event: StreamEvent) -> bytes:
+        """Сериализовать событие в кадр SSE.
+
+        Args:
+            event: Событие стрима
+
+        Returns:
+            bytes: Кадр вида 'data: {JSON}\\n\\n'
+        """
+        self.frames += 1
+        return b"data: " + _dumps({"type": event.type, "content": event.content}) + b"\n\n"
+
+    async def stream(self, chunks: AsyncIterator[str]) -> AsyncIterator[bytes]:
+        """Превратить поток текста в кадры SSE: token..., затем done или error.
+
+        Args:
+            chunks: Токены ответа LLM
+
+        Yields:
+            bytes: Кадры SSE
+        """
+        try:
+            async for content in self.coalesce(chunks):
+                yield self.encode(StreamEvent(type="token", content=content))
+        except Exception as e:
+            # Ошибка уходит клиенту событием: HTTP статус уже отправлен
+            logger.error(f"Chat stream failed: {e}")
+            yield self.encode(StreamEvent(type="error", content=str(e)))
+            return
+
+        yield self.encode(StreamEvent(type="done", content=""))
+
+    async def coalesce(self, chunks: AsyncIterator[str]) -> AsyncIterator[str]:
+        """Объединить токены в куски по размеру или времени ожидания.
+
+        Args:
+            chunks: Исходные токены
+
+        Yields:
+            str: Текст одного кадра
+        """
+        if self.flush_interval <= 0:
+            async for chunk in chunks:
+                self.tokens += 1
+                yield chunk
+            return
+
+        loop = asyncio.get_running_loop()
+        iterator = aiter(chunks)
+        buffer: list[str] = []
+        size = 0
+        deadline = 0.0
+        pending: asyncio.Future[str] | None = None
+
+        try:
+            while True:
+                if pending is None:
+                    pending = asyncio.ensure_future(anext(iterator))
+
+                # Ждем следующий токен, но не дольше, чем можно держать буфер
+                timeout = max(deadline - loop.time(), 0.0) if buffer else None
+                done, _ = await asyncio.wait({pending}, timeout=timeout)
+                if not done:
+                    yield "".join(buffer)
+                    buffer, size = [], 0
+                    continue
+
+                future, pending = pending, None
+                try:
+                    chunk = future.result()
+                except StopAsyncIteration:
+                    break
+                except Exception:
+                    # Уже полученный текст отправляем до ошибки
+                    if buffer:
+                        yield "".join(buffer)
+                    raise
+
+                self.tokens += 1
+                if not buffer:
+                    deadline = loop.time() + self.flush_interval
+                buffer.append(chunk)
+                size += len(chunk.encode())
+                if size >= self.flush_bytes:
+                    yield "".join(buffer)
+                    buffer, size = [], 0
+
+            if buffer:
+                yield "".join(buffer)
+        finally:
+            # Клиент отключился: прерываем ожидание следующего токена
+            if pending is not None:
+                pending.cancel()
+
+    def stats(self) -> dict[str, float]:
+        """Получить метрики кодировщика.
+
+        Returns:
+            dict[str, float]: Токены, кадры и среднее число токенов на кадр
+        """
+        return {
+            "tokens": self.tokens,
+            "frames": self.frames,
+            "tokens_per_frame": round(self.tokens / self.frames, 2) if self.frames > 0 else 0.0,
+        }
@@ -0,0 +1,178 @@
+"""Фоновый предрасчет статистики дашборда по расписанию."""
+
+import asyncio
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any
+
+from src.api.models import DashboardStats
+from src.api.protocols import StatCollectorProtocol
+from src.instrumented_pool import InstrumentedPool
+
+logger = logging.getLogger(__name__)
+
+# Ключ advisory lock: снимки в таблицу сохраняет одна реплика API одновременно
+PRECOMPUTE_LOCK_KEY = 727_003
+
+PERIODS = ("7d", "30d", "3m")
+
+
+class StatsPrecomputer:
+    """Реализация StatCollectorProtocol, отдающая готовые снимки статистики.
+
+    Фоновая задача (run_periodically) пересчитывает статистику всех периодов
+    через исходный сборщик и сохраняет снимки в памяти и в таблице
+    dashboard_snapshots. Реплика, чей таймер застал в таблице снимки моложе
+    интервала, загружает их вместо пересчета, поэтому за интервал статистику
+    обычно считает одна реплика; запись снимков идет под advisory lock.
+    """
+
+    def __init__(self, pool: InstrumentedPool, collector: StatCollectorProtocol) -> None:
+        """Инициализация предрасчета.
+
+        Args:
+            pool: Connection pool (таблица dashboard_snapshots и advisory lock)
+            collector: Исходный сборщик статистики (обычно RealStatCollector)
+        """
+        self.pool = pool
+        self.collector = collector
+
+        # period -> (время расчета, длительность расчета в мс, статистика)
+        self._snapshots: dict[str, tuple[datetime, float, DashboardStats]] = {}
+
+        self.computes = 0
+        self.loads = 0
+        self.failures = 0
+
+    async def get_dashboard_stats(self, period: str) -> DashboardStats:
+        """Получить готовый снимок статистики за период.
+
+        Если снимка еще нет (первый запуск), статистика считается сразу.
+
+        Args:
+            period: Период для статистики ('7d', '30d', '3m')
+
+        Returns:
+            DashboardStats: Снимок статистики
+
+        Raises:
+            ValueError: Если period имеет невалидное значение
+        """
+        if period not in PERIODS:
+            raise ValueError(f"Invalid period: {period}. Must be one of: 7d, 30d, 3m")
+
+        snapshot = self._snapshots.get(period)
+        if snapshot is not None:
+            return snapshot[2]
+
+        logger.info(f"No precomputed snapshot for {period} yet, computing inline")
+        return await self.collector.get_dashboard_stats(period)
+
+    async def refresh(self, max_age_seconds: float = 0.0) -> None:
+        """Загрузить свежие снимки из БД или пересчитать устаревшие.
+
+        Снимки, сохраненные другой репликой не раньше max_age_seconds назад,
+        только загружаются. Иначе статистика считается без удержания соединения
+        (сборщик берет свои соединения из того же pool), а сохраняется короткой
+        транзакцией под advisory lock: если его держит другая реплика, которая
+        сейчас сохраняет свои снимки, рассчитанные остаются только в памяти.
+
+        Args:
+            max_age_seconds: Возраст снимков в БД, при котором они еще не пересчитываются
+        """
+        async with self.pool.acquire() as connection:
+            if await self._load_fresh(connection, max_age_seconds):
+                return
+
+        computed: dict[str, tuple[datetime, float, DashboardStats]] = {}
+        for period in PERIODS:
+            started_at = time.perf_counter()
+            stats = await self.collector.get_dashboard_stats(period)
+            duration_ms = (time.perf_counter() - started_at) * 1000
+            computed[period] = (datetime.now(), duration_ms, stats)
+            self.computes += 1
+        self._snapshots.update(computed)
+
+        async with self.pool.acquire() as connection, connection.transaction():
+            locked = await connection.fetchval(
+                "SELECT pg_try_advisory_xact_lock($1)", PRECOMPUTE_LOCK_KEY
+            )
+            if locked:
+                await connection.executemany(
+                    """
+                    INSERT INTO dashboard_snapshots (period, stats, computed_at, duration_ms)
+                    VALUES ($1, $2, $3, $4)
+                    ON CONFLICT (period) DO UPDATE
+                    SET stats = EXCLUDED.stats,
+                        computed_at = EXCLUDED.computed_at,
+                        duration_ms = EXCLUDED.duration_ms
+                    """,
+                    [
+                        (period, stats.model_dump_json(), computed_at, duration_ms)
+                        for period, (computed_at, duration_ms, stats) in computed.items()
+                    ],
+                )
+
+        logger.info(
+            "Dashboard snapshots precomputed: "
+            + ", ".join(f"{period}={computed[period][1]:.0f}ms" for period in PERIODS)
+        )
+
+    def stats(self) -> dict[str, float]:
+        """Получить метрики предрасчета.
+
+        Returns:
+            dict[str, float]: Возраст снимков, длительность последнего расчета и счетчики
+        """
+        metrics: dict[str, float] = {
+            "computes": self.computes,
+            "loads": self.loads,
+            "failures": self.failures,
+        }
+        now = datetime.now()
+        for period, (computed_at, duration_ms, _) in self._snapshots.items():
+            metrics[f"{period}_age_seconds"] = round((now - computed_at).total_seconds(), 1)
+            metrics[f"{period}_duration_ms"] = round(duration_ms, 2)
+        return metrics
+
+    async def _load_fresh(self, connection: Any, max_age_seconds: float) -> bool:
+        """Загрузить снимки из БД, если все периоды рассчитаны не раньше max_age_seconds назад.
+
+        Returns:
+            bool: True, если снимки загружены и пересчет не нужен
+        """
+        if max_age_seconds <= 0:
+            return False
+
+        rows = await connection.fetch(
+            "SELECT period, stats, computed_at, duration_ms FROM dashboard_snapshots"
+        )
+        fresh_since = datetime.now() - timedelta(seconds=max_age_seconds)
+        if not set(PERIODS) <= {row["period"] for row in rows} or any(
+            row["computed_at"] <= fresh_since for row in rows
+        ):
+            return False
+
+        for row in rows:
+            self._snapshots[row["period"]] = (
+                row["computed_at"],
+                row["duration_ms"],
+                DashboardStats.model_validate_json(row["stats"]),
+            )
+        self.loads += 1
+        return True
+
+    async def run_periodically(self, interval_seconds: float) -> None:
+        """Пересчитывать снимки сразу и затем с заданным интервалом.
+
+        Args:
+            interval_seconds: Интервал между пересчетами (сек)
+        """
+        while True:
+            try:
+                await self.refresh(interval_seconds)
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"Dashboard stats precompute failed: {e}", exc_info=True)
+            await asyncio.sleep(interval_seconds)
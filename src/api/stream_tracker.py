@@ -0,0 +1,75 @@
+"""Учет незавершенных потоковых ответов для graceful shutdown."""
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from typing import TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class StreamTracker:
+    """Счетчик активных потоковых ответов (SSE чата, выгрузка) с ожиданием завершения.
+
+    При остановке приложения drain() ждет, пока клиенты дочитают начатые
+    потоки, и только после этого закрывается connection pool.
+    """
+
+    def __init__(self) -> None:
+        """Инициализация счетчика."""
+        self.active = 0
+        self.started = 0
+        self.completed = 0
+        self._idle = asyncio.Event()
+        self._idle.set()
+
+    async def track(self, stream: AsyncIterator[T]) -> AsyncIterator[T]:
+        """Отдать поток без изменений, учитывая его как активный до завершения.
+
+        Args:
+            stream: Исходный поток
+
+        Yields:
+            Элементы исходного потока
+        """
+        self.active += 1
+        self.started += 1
+        self._idle.clear()
+        try:
+            async for item in stream:
+                yield item
+        finally:
+            self.active -= 1
+            self.completed += 1
+            if self.active == 0:
+                self._idle.set()
+
+    async def drain(self, timeout: float) -> bool:
+        """Дождаться завершения активных потоков.
+
+        Args:
+            timeout: Максимальное время ожидания (сек)
+
+        Returns:
+            bool: True, если все потоки завершились за timeout
+        """
+        if self.active == 0:
+            return True
+
+        logger.info(f"Waiting up to {timeout}s for {self.active} active stream(s) to finish")
+        try:
+            await asyncio.wait_for(self._idle.wait(), timeout=timeout)
+        except TimeoutError:
+            logger.warning(f"{self.active} stream(s) still active after {timeout}s, closing")
+            return False
+        return True
+
+    def stats(self) -> dict[str, float]:
+        """Получить метрики потоков.
+
+        Returns:
+            dict[str, float]: Активные, начатые и завершенные потоки
+        """
+        return {"active": self.active, "started": self.started, "completed": self.completed}
@@ -6,6 +6,7 @@ from collections.abc import AsyncGenerator
 from src.database_conversation import DatabaseConversation
 from src.protocols import LLMClientProtocol
 from src.types import ChatMessage
+from src.web_session_store import WebSessionStore
 
 logger = logging.getLogger(__name__)
 
@@ -18,6 +19,7 @@ class WebChatHandler:
         database_conversation: DatabaseConversation,
         llm_client: LLMClientProtocol,
         max_history_messages: int,
+        session_store: WebSessionStore,
     ) -> None:
         """Инициализация обработчика веб-чата.
 
@@ -25,14 +27,14 @@ class WebChatHandler:
             database_conversation: Хранилище диалогов
             llm_client: Клиент для работы с LLM
             max_history_messages: Максимальное количество сообщений в истории
+            session_store: Постоянный маппинг session_id на user_id
         """
         self.db_conversation = database_conversation
         self.llm_client = llm_client
         self.max_history_messages = max_history_messages
-        self.session_to_user_id: dict[str, int] = {}
-        self.next_user_id = -1  # Отрицательные ID для веб-пользователей
+        self.session_store = session_store
 
-    def get_or_create_user_id(self, session_id: str) -> int:
+    async def get_or_create_user_id(self, session_id: str) -> int:
         """Получить или создать user_id для session_id.
 
         Args:
@@ -41,11 +43,7 @@ class WebChatHandler:
         Returns:
             int: user_id (отрицательный для веб-пользователей)
         """
-        if session_id not in self.session_to_user_id:
-            self.session_to_user_id[session_id] = self.next_user_id
-            logger.info(f"Created new web user_id {self.next_user_id} for session {session_id}")
-            self.next_user_id -= 1
-        return self.session_to_user_id[session_id]
+        return await self.session_store.get_or_create_user_id(session_id)
 
     async def handle_message_stream(
         self, session_id: str, message: str
@@ -54,10 +52,9 @@ class WebChatHandler:
 
         Алгоритм:
         1. Получить user_id для session_id
-        2. Сохранить сообщение пользователя в БД (source='web')
-        3. Получить историю диалога
-        4. Стримить ответ от LLM (yield chunks)
-        5. После завершения стрима сохранить полный ответ в БД
+        2. Получить историю диалога и добавить к ней сообщение пользователя
+        3. Стримить ответ от LLM (yield chunks)
+        4. После завершения стрима сохранить сообщение и полный ответ в БД одним запросом
 
         Args:
             session_id: ID сессии пользователя
@@ -69,27 +66,21 @@ class WebChatHandler:
         Raises:
             Exception: При ошибках работы с БД или LLM
         """
-        user_id = self.get_or_create_user_id(session_id)
+        user_id = await self.get_or_create_user_id(session_id)
         chat_id = user_id  # Для веб chat_id = user_id
 
         logger.info(
             f"Handling web chat message from user {user_id} (session {session_id}): {message[:50]}..."
         )
 
-        # Сохранить сообщение пользователя
-        await self.db_conversation.add_message(
-            user_id, chat_id, "user", message, source="web"
-        )
-
         # Получить историю диалога
         history = await self.db_conversation.get_history(user_id, chat_id)
 
         # Добавить текущее сообщение пользователя в контекст
-        # История уже содержит текущее сообщение, т.к. мы его только что сохранили
-        # Но для LLM нужно передать список ChatMessage
         messages: list[ChatMessage] = [
-            {"role": msg["role"], "content": msg["content"]} for msg in history
+            ChatMessage(role=msg["role"], content=msg["content"]) for msg in history
         ]
+        messages.append(ChatMessage(role="user", content=message))
 
         # Стримить ответ от LLM и накапливать полный ответ
         full_response = ""
@@ -98,9 +89,9 @@ class WebChatHandler:
                 full_response += chunk
                 yield chunk
 
-            # Сохранить полный ответ ассистента в БД
-            await self.db_conversation.add_message(
-                user_id, chat_id, "assistant", full_response, source="web"
+            # Сохранить сообщение пользователя и полный ответ ассистента в БД
+            await self.db_conversation.add_turn(
+                user_id, chat_id, message, full_response, source="web"
             )
 
             logger.info(
@@ -121,7 +112,7 @@ class WebChatHandler:
         Returns:
             list[ChatMessage]: Список сообщений из истории
         """
-        user_id = self.get_or_create_user_id(session_id)
+        user_id = await self.get_or_create_user_id(session_id)
         chat_id = user_id
 
         logger.info(f"Retrieving web chat history for user {user_id} (session {session_id})")
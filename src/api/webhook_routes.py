@@ -0,0 +1,50 @@
+"""Endpoint приема обновлений Telegram (webhook)."""
+
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Request
+
+from src.api.app import get_telegram_webhook
+from src.telegram_webhook import TelegramWebhook
+
+router = APIRouter(prefix="/telegram", tags=["telegram"])
+
+
+@router.post("/webhook")
+async def receive_update(
+    request: Request,
+    secret_token: Annotated[str | None, Header(alias="X-Telegram-Bot-Api-Secret-Token")] = None,
+    telegram_webhook: TelegramWebhook = Depends(get_telegram_webhook),  # noqa: B008
+) -> dict[str, bool]:
+    """Принять обновление Telegram и сразу ответить, не дожидаясь обработки.
+
+    Args:
+        request: HTTP запрос с JSON обновления
+        secret_token: Секрет, заданный при регистрации webhook
+        telegram_webhook: Инжектируемый прием обновлений
+
+    Returns:
+        dict: {"ok": True}, если обновление поставлено в очередь
+
+    Raises:
+        HTTPException: 401 при неверном секрете, 400 при невалидном обновлении,
+            503 при заполненной очереди (Telegram повторит доставку)
+    """
+    if not telegram_webhook.verify(secret_token):
+        raise HTTPException(status_code=401, detail="Invalid secret token")
+
+    try:
+        payload = await request.json()
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail="Invalid JSON") from e
+    if not isinstance(payload, dict):
+        raise HTTPException(status_code=400, detail="Update must be a JSON object")
+
+    try:
+        accepted = telegram_webhook.enqueue(payload)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+    if not accepted:
+        raise HTTPException(status_code=503, detail="Update queue is full")
+    return {"ok": True}
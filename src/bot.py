@@ -2,27 +2,50 @@
 
 import logging
 
+import uvicorn
 from aiogram import Bot, Dispatcher
 from aiogram.enums import ChatAction
 from aiogram.filters import Command
 from aiogram.types import Message
 
+from src.api.app import create_webhook_app
+from src.chat_turn_coordinator import ChatTurnCoordinator
 from src.command_handler import CommandHandler
+from src.config import Config
 from src.message_handler import MessageHandler
+from src.metrics import MetricsRegistry
+from src.protocols import ConversationStorageProtocol, LLMClientProtocol
+from src.telegram_stream_writer import TelegramStreamWriter
+from src.telegram_webhook import TelegramWebhook
+from src.turn_limiter import PRIORITY_GROUP, PRIORITY_PRIVATE, OverloadedError, TurnLimiter
 
 logger = logging.getLogger(__name__)
 
+BUSY_REPLY = "Сейчас слишком много запросов. Попробуйте еще раз через минуту."
+
 
 class TelegramBot:
     """Telegram бот - координация bot/dispatcher и регистрация обработчиков."""
 
     def __init__(
-        self, token: str, command_handler: CommandHandler, message_handler: MessageHandler
+        self,
+        token: str,
+        command_handler: CommandHandler,
+        message_handler: MessageHandler,
+        stream_writer: TelegramStreamWriter | None = None,
+        turn_coordinator: ChatTurnCoordinator | None = None,
+        turn_limiter: TurnLimiter | None = None,
     ) -> None:
         self.bot: Bot = Bot(token=token)
         self.dp: Dispatcher = Dispatcher()
         self.command_handler: CommandHandler = command_handler
         self.message_handler: MessageHandler = message_handler
+        # Если задан, ответ показывается по мере генерации (редактированием сообщения)
+        self.stream_writer: TelegramStreamWriter | None = stream_writer
+        # Если задан, сообщения одного чата обрабатываются по очереди и объединяются
+        self.turn_coordinator: ChatTurnCoordinator | None = turn_coordinator
+        # Если задан, ограничивает одновременные запросы к LLM (команды идут в обход)
+        self.turn_limiter: TurnLimiter | None = turn_limiter
         self._register_handlers()
 
     def _register_handlers(self) -> None:
@@ -35,18 +58,50 @@ class TelegramBot:
         self.dp.message()(self._handle_text_message)
 
     async def _handle_text_message(self, message: Message) -> None:
-        """Обработка текстового сообщения с индикатором печати."""
+        """Обработка текстового сообщения (с объединением сообщений чата, если включено)."""
+        # Проверяем наличие обязательных полей
+        if message.from_user is None or message.text is None:
+            return
+
+        user_id = message.from_user.id
+        if self.turn_coordinator is None:
+            await self._respond(message, user_id, message.text)
+            return
+
+        async def process(text: str) -> None:
+            await self._respond(message, user_id, text)
+
+        await self.turn_coordinator.submit(user_id, message.chat.id, message.text, process)
+
+    async def _respond(self, message: Message, user_id: int, text: str) -> None:
+        """Получить ответ LLM, заняв слот лимитера; при перегрузке ответить «занят»."""
+        if self.turn_limiter is None:
+            await self._generate_reply(message, user_id, text)
+            return
+
+        priority = PRIORITY_PRIVATE if message.chat.type == "private" else PRIORITY_GROUP
         try:
-            # Проверяем наличие обязательных полей
-            if message.from_user is None or message.text is None:
-                return
+            async with self.turn_limiter.slot(priority):
+                await self._generate_reply(message, user_id, text)
+        except OverloadedError:
+            await message.answer(BUSY_REPLY)
 
+    async def _generate_reply(self, message: Message, user_id: int, text: str) -> None:
+        """Получить ответ LLM на текст и отправить его в чат с индикатором печати."""
+        try:
             # Показываем индикатор "печатает..."
             await self.bot.send_chat_action(chat_id=message.chat.id, action=ChatAction.TYPING)
 
+            if self.stream_writer is not None:
+                chunks = self.message_handler.handle_message_stream(
+                    user_id=user_id, chat_id=message.chat.id, text=text
+                )
+                await self.stream_writer.write(self.bot, message.chat.id, chunks)
+                return
+
             # Обрабатываем сообщение через MessageHandler
             response = await self.message_handler.handle_message(
-                user_id=message.from_user.id, chat_id=message.chat.id, text=message.text
+                user_id=user_id, chat_id=message.chat.id, text=text
             )
 
             # Отправляем ответ
@@ -60,3 +115,87 @@ class TelegramBot:
         """Запуск бота в режиме polling."""
         logger.info("Bot started successfully")
         await self.dp.start_polling(self.bot)
+
+    def create_webhook(self, secret_token: str, queue_size: int, workers: int) -> TelegramWebhook:
+        """Создать прием обновлений через webhook для этого бота.
+
+        Args:
+            secret_token: Секрет заголовка X-Telegram-Bot-Api-Secret-Token
+            queue_size: Максимальное количество необработанных обновлений
+            workers: Количество одновременно обрабатываемых обновлений
+
+        Returns:
+            TelegramWebhook: Очередь и workers, передающие обновления в Dispatcher
+        """
+        return TelegramWebhook(self.bot, self.dp, secret_token, queue_size, workers)
+
+    async def start_webhook(self, webhook: TelegramWebhook, url: str, host: str, port: int) -> None:
+        """Запуск бота в режиме webhook со своим HTTP сервером.
+
+        Args:
+            webhook: Прием обновлений (см. create_webhook)
+            url: Публичный HTTPS адрес endpoint /telegram/webhook
+            host: Адрес HTTP сервера
+            port: Порт HTTP сервера
+        """
+        await webhook.start()
+        await webhook.register(url)
+
+        server = uvicorn.Server(
+            uvicorn.Config(create_webhook_app(webhook), host=host, port=port, log_level="info")
+        )
+        logger.info(f"Bot started in webhook mode on {host}:{port}")
+        try:
+            await server.serve()
+        finally:
+            await webhook.stop()
+
+
+def create_telegram_bot(
+    config: Config,
+    llm_client: LLMClientProtocol,
+    conversation: ConversationStorageProtocol,
+    metrics: MetricsRegistry,
+) -> TelegramBot:
+    """Собрать бота с обработчиками по конфигурации.
+
+    Используется процессом бота и API сервером, если webhook принимает он.
+
+    Args:
+        config: Конфигурация приложения
+        llm_client: Клиент LLM
+        conversation: Хранилище истории диалогов
+        metrics: Реестр метрик процесса (бота или приложения API)
+
+    Returns:
+        TelegramBot: Бот с зарегистрированными обработчиками
+    """
+    command_handler = CommandHandler(conversation)
+    message_handler = MessageHandler(llm_client, conversation)
+
+    # Опционально: ответ показывается по мере генерации
+    stream_writer: TelegramStreamWriter | None = None
+    if config.telegram_streaming:
+        stream_writer = TelegramStreamWriter(config.telegram_stream_edit_interval)
+        metrics.register("telegram_stream", stream_writer.stats)
+
+    # Сообщения одного чата обрабатываются по очереди, пачка - одним запросом к LLM
+    turn_coordinator = ChatTurnCoordinator(config.chat_debounce_interval)
+    metrics.register("chat_turns", turn_coordinator.stats)
+
+    # Не больше telegram_max_concurrent_turns запросов к LLM, лишние ждут или отклоняются
+    turn_limiter = TurnLimiter(
+        config.telegram_max_concurrent_turns,
+        config.telegram_turn_queue_size,
+        config.telegram_turn_queue_timeout,
+    )
+    metrics.register("turn_limiter", turn_limiter.stats)
+
+    return TelegramBot(
+        config.telegram_bot_token,
+        command_handler,
+        message_handler,
+        stream_writer,
+        turn_coordinator,
+        turn_limiter,
+    )
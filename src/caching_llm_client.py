@@ -0,0 +1,160 @@
+"""Кэширующая обертка над клиентом LLM."""
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncGenerator
+
+from src.llm_client import LLMClient
+from src.llm_response_cache import LLMResponseCache, make_cache_key
+from src.types import ChatMessage
+
+logger = logging.getLogger(__name__)
+
+
+class CachingLLMClient:
+    """Реализация LLMClientProtocol с кэшем ответов на повторяющиеся вопросы.
+
+    Кэшируются только запросы не длиннее max_messages сообщений: первые
+    вопросы диалога («что съесть на завтрак?») повторяются у тысяч
+    пользователей, а запросы с историей почти уникальны и только вытесняли бы
+    полезные ответы. При попадании LLM не вызывается. Одновременные
+    одинаковые запросы ждут один общий вызов LLM (single-flight).
+    """
+
+    def __init__(
+        self, llm_client: LLMClient, cache: LLMResponseCache, max_messages: int = 1
+    ) -> None:
+        """Инициализация обертки.
+
+        Args:
+            llm_client: Исходный клиент LLM (модель, параметры и промпт входят в ключ)
+            cache: Кэш ответов
+            max_messages: Максимальное количество сообщений кэшируемого запроса
+        """
+        self.llm_client = llm_client
+        self.cache = cache
+        self.max_messages = max_messages
+        self._inflight: dict[str, asyncio.Task[str]] = {}
+
+        self.uncacheable = 0
+        self.shared = 0
+        self.llm_calls = 0
+        self.llm_seconds = 0.0
+        self.saved_seconds = 0.0
+
+    async def get_response(self, messages: list[ChatMessage]) -> str:
+        """Получить ответ из кэша или от LLM.
+
+        Args:
+            messages: История сообщений диалога
+
+        Returns:
+            str: Ответ LLM
+
+        Raises:
+            Exception: При ошибках работы с LLM API
+        """
+        key = self._cache_key(messages)
+        if key is None:
+            return await self.llm_client.get_response(messages)
+
+        cached = await self.cache.get(key)
+        if cached is not None:
+            self._record_hit()
+            return cached
+
+        task = self._inflight.get(key)
+        if task is not None:
+            self.shared += 1
+        else:
+            task = asyncio.create_task(self._fetch(key, messages), name="llm-cache-fetch")
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        # shield: отмена одного запроса не отменяет общий вызов LLM для остальных
+        return await asyncio.shield(task)
+
+    async def get_response_stream(self, messages: list[ChatMessage]) -> AsyncGenerator[str, None]:
+        """Получить ответ по частям: из кэша одним chunk или потоком от LLM.
+
+        Ответ LLM сохраняется в кэш, только если поток дочитан до конца.
+
+        Args:
+            messages: История сообщений диалога
+
+        Yields:
+            str: Chunks текста ответа
+
+        Raises:
+            Exception: При ошибках работы с LLM API
+        """
+        key = self._cache_key(messages)
+        if key is None:
+            async for chunk in self.llm_client.get_response_stream(messages):
+                yield chunk
+            return
+
+        cached = await self.cache.get(key)
+        if cached is not None:
+            self._record_hit()
+            yield cached
+            return
+
+        started_at = time.perf_counter()
+        chunks: list[str] = []
+        async for chunk in self.llm_client.get_response_stream(messages):
+            chunks.append(chunk)
+            yield chunk
+
+        self._record_llm_call(time.perf_counter() - started_at)
+        if chunks:
+            await self.cache.set(key, "".join(chunks))
+
+    def stats(self) -> dict[str, float]:
+        """Получить метрики кэша ответов.
+
+        Returns:
+            dict[str, float]: Метрики кэша, вызовы LLM, среднее время ответа LLM
+                и сэкономленное попаданиями время
+        """
+        avg_llm_seconds = self.llm_seconds / self.llm_calls if self.llm_calls > 0 else 0.0
+        return {
+            **self.cache.stats(),
+            "uncacheable": self.uncacheable,
+            "shared": self.shared,
+            "llm_calls": self.llm_calls,
+            "avg_llm_latency_ms": round(avg_llm_seconds * 1000, 2),
+            "saved_latency_s": round(self.saved_seconds, 2),
+        }
+
+    def _cache_key(self, messages: list[ChatMessage]) -> str | None:
+        """Получить ключ кэша или None, если запрос не кэшируется."""
+        if len(messages) > self.max_messages:
+            self.uncacheable += 1
+            return None
+
+        return make_cache_key(
+            self.llm_client.model,
+            self.llm_client.temperature,
+            self.llm_client.max_tokens,
+            self.llm_client.system_prompt,
+            messages,
+        )
+
+    async def _fetch(self, key: str, messages: list[ChatMessage]) -> str:
+        """Получить ответ от LLM, замерить время и сохранить в кэш."""
+        started_at = time.perf_counter()
+        response = await self.llm_client.get_response(messages)
+        self._record_llm_call(time.perf_counter() - started_at)
+        await self.cache.set(key, response)
+        return response
+
+    def _record_llm_call(self, seconds: float) -> None:
+        """Учесть время вызова LLM на промахе."""
+        self.llm_calls += 1
+        self.llm_seconds += seconds
+
+    def _record_hit(self) -> None:
+        """Учесть попадание: сэкономлено среднее время ответа LLM."""
+        if self.llm_calls > 0:
+            self.saved_seconds += self.llm_seconds / self.llm_calls
@@ -0,0 +1,102 @@
+"""Последовательная обработка сообщений одного чата с объединением."""
+
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+# Обработка объединенного текста: запрос к LLM и ответ пользователю
+TurnProcessor = Callable[[str], Awaitable[None]]
+
+
+class ChatTurnCoordinator:
+    """Сериализация ходов диалога по (user_id, chat_id) с debounce.
+
+    Первое сообщение чата становится владельцем хода: ждет debounce секунд,
+    забирает все накопленные сообщения и обрабатывает их одним запросом к LLM.
+    Сообщения, пришедшие во время ожидания или пока ход выполняется,
+    не обрабатываются параллельно, а попадают в следующий ход того же
+    владельца. Так на одну историю диалога приходится один запрос за раз.
+    """
+
+    def __init__(self, debounce_seconds: float = 0.3, separator: str = "\n") -> None:
+        """Инициализация координатора.
+
+        Args:
+            debounce_seconds: Сколько ждать следующих сообщений перед запросом к LLM
+            separator: Разделитель объединяемых сообщений
+        """
+        self.debounce_seconds = debounce_seconds
+        self.separator = separator
+        self._pending: dict[tuple[int, int], list[str]] = {}
+
+        self.messages = 0
+        self.turns = 0
+        self.coalesced = 0
+        self.failures = 0
+
+    async def submit(self, user_id: int, chat_id: int, text: str, process: TurnProcessor) -> bool:
+        """Добавить сообщение в очередь чата и обработать, если ход еще не выполняется.
+
+        Args:
+            user_id: ID пользователя
+            chat_id: ID чата
+            text: Текст сообщения
+            process: Обработка объединенного текста (вызывается владельцем хода)
+
+        Returns:
+            bool: True, если сообщение обработано этим вызовом; False, если оно
+                добавлено к ходу, который уже выполняется
+        """
+        key = (user_id, chat_id)
+        self.messages += 1
+
+        pending = self._pending.get(key)
+        if pending is not None:
+            pending.append(text)
+            return False
+
+        self._pending[key] = [text]
+        try:
+            while True:
+                if self.debounce_seconds > 0:
+                    await asyncio.sleep(self.debounce_seconds)
+
+                texts = self._pending[key]
+                self._pending[key] = []
+
+                self.turns += 1
+                self.coalesced += len(texts) - 1
+                try:
+                    await process(self.separator.join(texts))
+                except Exception as e:
+                    self.failures += 1
+                    logger.error(
+                        f"Turn for user {user_id} in chat {chat_id} failed: {e}", exc_info=True
+                    )
+
+                # Пока шел ход, новых сообщений не было: ход завершен
+                if not self._pending[key]:
+                    break
+        finally:
+            del self._pending[key]
+
+        return True
+
+    def stats(self) -> dict[str, float]:
+        """Получить метрики координатора.
+
+        Returns:
+            dict[str, float]: Сообщения, запросы к LLM, сообщения без отдельного запроса и ошибки
+        """
+        return {
+            "active_chats": len(self._pending),
+            "messages": self.messages,
+            "turns": self.turns,
+            "coalesced": self.coalesced,
+            "coalesced_ratio": round(self.coalesced / self.messages, 3)
+            if self.messages > 0
+            else 0.0,
+            "failures": self.failures,
+        }
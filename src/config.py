@@ -1,6 +1,8 @@
 """Конфигурация приложения с валидацией через Pydantic."""
 
-from pydantic import Field, PositiveFloat, PositiveInt
+from typing import Literal, Self
+
+from pydantic import Field, PositiveFloat, PositiveInt, model_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 
@@ -12,6 +14,40 @@ class Config(BaseSettings):
     openrouter_api_key: str = Field(..., min_length=1, description="OpenRouter API key")
     database_url: str = Field(..., min_length=1, description="PostgreSQL connection string")
 
+    # Параметры connection pool PostgreSQL
+    db_pool_min_size: int = Field(
+        default=2, ge=0, le=1000, description="Minimum number of pooled connections"
+    )
+    db_pool_max_size: PositiveInt = Field(
+        default=10, ge=1, le=1000, description="Maximum number of pooled connections"
+    )
+    db_command_timeout: PositiveFloat = Field(
+        default=30.0, le=3600.0, description="Default query timeout in seconds"
+    )
+    db_statement_cache_size: int = Field(
+        default=100,
+        ge=0,
+        le=100000,
+        description="Per-connection prepared statement cache size, should fit src.statements",
+    )
+    db_max_inactive_connection_lifetime: float = Field(
+        default=300.0,
+        ge=0.0,
+        le=86400.0,
+        description="Seconds after which idle connections are closed (0 keeps them forever)",
+    )
+    db_acquire_timeout: PositiveFloat = Field(
+        default=10.0, le=600.0, description="Maximum wait for a free pooled connection (seconds)"
+    )
+
+    # Метрики
+    metrics_log_interval: int = Field(
+        default=60,
+        ge=0,
+        le=86400,
+        description="Interval for logging metrics snapshots in the bot process (0 disables it)",
+    )
+
     # Опциональные параметры LLM
     llm_model: str = Field(
         default="openai/gpt-oss-20b:free",
@@ -33,6 +69,108 @@ class Config(BaseSettings):
     llm_timeout: PositiveInt = Field(
         default=30, ge=1, le=300, description="LLM API timeout in seconds"
     )
+    llm_connect_timeout: float = Field(
+        default=5.0,
+        gt=0.0,
+        le=60.0,
+        description="Timeout for establishing a connection to the LLM API in seconds",
+    )
+    llm_max_connections: int = Field(
+        default=100,
+        ge=1,
+        le=1000,
+        description="Maximum concurrent HTTP connections to the LLM API per process",
+    )
+    llm_max_keepalive_connections: int = Field(
+        default=20,
+        ge=0,
+        le=1000,
+        description="Idle keepalive connections kept open to the LLM API",
+    )
+    llm_keepalive_expiry: float = Field(
+        default=30.0,
+        ge=0.0,
+        le=600.0,
+        description="Seconds an idle LLM API connection is kept open",
+    )
+    llm_http2: bool = Field(
+        default=False,
+        description="Use HTTP/2 for the LLM API (requires the h2 package)",
+    )
+
+    # Потоковые ответы в Telegram
+    telegram_streaming: bool = Field(
+        default=False,
+        description="Show LLM responses in Telegram as they are generated (message edits)",
+    )
+    telegram_stream_edit_interval: float = Field(
+        default=1.0,
+        ge=0.3,
+        le=10.0,
+        description="Minimum seconds between edits of a streamed Telegram message",
+    )
+    chat_debounce_interval: float = Field(
+        default=0.3,
+        ge=0.0,
+        le=10.0,
+        description="Seconds to wait for more messages in a chat before one LLM request",
+    )
+    telegram_max_concurrent_turns: int = Field(
+        default=16,
+        ge=1,
+        le=1000,
+        description="Max bot turns (LLM request and DB access) running concurrently",
+    )
+    telegram_turn_queue_size: int = Field(
+        default=200,
+        ge=0,
+        le=100000,
+        description="Max bot turns waiting for a slot (overflow gets a busy reply)",
+    )
+    telegram_turn_queue_timeout: float = Field(
+        default=30.0,
+        gt=0.0,
+        le=600.0,
+        description="Max seconds a bot turn waits for a slot before a busy reply",
+    )
+
+    # Режим получения обновлений Telegram
+    telegram_mode: Literal["polling", "webhook"] = Field(
+        default="polling", description="How the bot receives updates: polling or webhook"
+    )
+    telegram_webhook_url: str | None = Field(
+        default=None,
+        description="Public HTTPS URL of the /telegram/webhook endpoint (webhook mode)",
+    )
+    telegram_webhook_secret: str | None = Field(
+        default=None,
+        min_length=1,
+        max_length=256,
+        pattern=r"^[A-Za-z0-9_-]+$",
+        description="Secret token Telegram sends in X-Telegram-Bot-Api-Secret-Token",
+    )
+    telegram_webhook_server: Literal["bot", "api"] = Field(
+        default="bot",
+        description="Process serving the webhook: own server in the bot or the API server",
+    )
+    telegram_webhook_host: str = Field(
+        default="0.0.0.0", description="Bind host of the bot webhook server"
+    )
+    telegram_webhook_port: int = Field(
+        default=8080, ge=1, le=65535, description="Bind port of the bot webhook server"
+    )
+    telegram_webhook_queue_size: int = Field(
+        default=1000,
+        ge=1,
+        le=100000,
+        description="Max webhook updates waiting for processing (full queue answers 503)",
+    )
+    telegram_webhook_workers: int = Field(
+        default=32,
+        ge=1,
+        le=1000,
+        description="Number of webhook updates processed concurrently",
+    )
 
     # Параметры истории диалогов
     max_history_messages: PositiveInt = Field(
@@ -42,6 +180,187 @@ class Config(BaseSettings):
         description="Maximum number of messages in conversation history",
     )
 
+    # Кэш окон истории диалогов
+    history_cache_size: int = Field(
+        default=1000,
+        ge=0,
+        le=1000000,
+        description="Maximum number of cached conversation windows (0 disables the cache)",
+    )
+    history_cache_ttl: PositiveInt = Field(
+        default=300,
+        ge=1,
+        le=86400,
+        description="Conversation window cache TTL in seconds",
+    )
+
+    # Кэш ответов LLM на повторяющиеся вопросы
+    llm_cache_size: int = Field(
+        default=0,
+        ge=0,
+        le=1000000,
+        description="Maximum number of cached LLM responses in memory (0 disables the cache)",
+    )
+    llm_cache_ttl: PositiveInt = Field(
+        default=86400,
+        ge=1,
+        le=2592000,
+        description="LLM response cache TTL in seconds",
+    )
+    llm_cache_persistent: bool = Field(
+        default=False,
+        description="Also keep cached LLM responses in PostgreSQL (llm_response_cache table)",
+    )
+    llm_cache_max_messages: PositiveInt = Field(
+        default=1,
+        ge=1,
+        le=100,
+        description="Only requests with at most this many messages are cached",
+    )
+
+    # Кэш маппинга сессий веб-чата
+    web_session_cache_size: int = Field(
+        default=10000,
+        ge=0,
+        le=1000000,
+        description="Maximum number of cached web chat session to user_id mappings",
+    )
+
+    # Write-behind очередь записи сообщений
+    message_write_behind: bool = Field(
+        default=False,
+        description="Write messages through a background batched queue instead of inline INSERTs",
+    )
+    message_write_queue_size: PositiveInt = Field(
+        default=10000,
+        ge=1,
+        le=1000000,
+        description="Maximum number of messages buffered in the write-behind queue",
+    )
+    message_write_batch_size: PositiveInt = Field(
+        default=500,
+        ge=1,
+        le=100000,
+        description="Number of buffered messages that triggers an immediate flush",
+    )
+    message_write_flush_interval: PositiveFloat = Field(
+        default=0.5,
+        le=60.0,
+        description="Maximum delay before buffered messages are flushed (seconds)",
+    )
+    message_write_max_attempts: PositiveInt = Field(
+        default=5,
+        ge=1,
+        le=1000,
+        description="Consecutive DB rejections of a queued batch before it is dropped",
+    )
+
+    # Обслуживание месячных партиций messages
+    message_partition_months_ahead: PositiveInt = Field(
+        default=3,
+        ge=1,
+        le=24,
+        description="Number of future monthly partitions of messages to keep created",
+    )
+    message_partition_retention_months: int = Field(
+        default=0,
+        ge=0,
+        le=1200,
+        description="Detach monthly partitions older than this many months (0 keeps all)",
+    )
+    message_partition_maintenance_interval: int = Field(
+        default=3600,
+        ge=0,
+        le=604800,
+        description="Interval between partition maintenance runs in seconds (0 runs only on start)",
+    )
+
+    # Дневные агрегаты статистики дашборда
+    stats_use_rollup: bool = Field(
+        default=False,
+        description="Serve dashboard stats from daily rollup tables instead of raw messages",
+    )
+    stats_rollup_refresh_interval: int = Field(
+        default=300,
+        ge=10,
+        le=86400,
+        description="Interval between incremental rollup refreshes in seconds",
+    )
+    stats_approximate_distinct: bool = Field(
+        default=False,
+        description="Estimate active conversations from daily HyperLogLog sketches (needs rollup)",
+    )
+
+    # Кэш ответов /api/stats
+    stats_cache_ttl: int = Field(
+        default=30,
+        ge=0,
+        le=86400,
+        description="Seconds dashboard stats are served from cache (0 disables the cache)",
+    )
+    stats_cache_stale_ttl: int = Field(
+        default=300,
+        ge=0,
+        le=86400,
+        description="Extra seconds stale stats are served while a refresh runs in background",
+    )
+
+    # Фоновый предрасчет статистики дашборда
+    stats_precompute_interval: int = Field(
+        default=0,
+        ge=0,
+        le=86400,
+        description="Interval between dashboard stats precomputations in seconds (0 disables it)",
+    )
+
+    # In-process счетчики статистики дашборда
+    stats_live_counters: bool = Field(
+        default=False,
+        description="Serve dashboard stats from in-process counters fed by message writes",
+    )
+    stats_live_reseed_interval: int = Field(
+        default=600,
+        ge=0,
+        le=86400,
+        description="Interval between reseeding live counters from the DB (0 seeds only on start)",
+    )
+
+    # API сервер
+    api_workers: int = Field(
+        default=1,
+        ge=1,
+        le=64,
+        description="Number of uvicorn worker processes for the API server",
+    )
+    api_shutdown_drain_timeout: float = Field(
+        default=30.0,
+        ge=0.0,
+        le=600.0,
+        description="Seconds to wait for in-flight streaming responses on shutdown",
+    )
+    api_export_enabled: bool = Field(
+        default=False,
+        description="Serve /api/export/messages (requires API_EXPORT_TOKEN)",
+    )
+    api_export_token: str | None = Field(
+        default=None,
+        min_length=16,
+        max_length=256,
+        description="Admin bearer token required by /api/export/messages",
+    )
+    sse_flush_bytes: int = Field(
+        default=256,
+        ge=1,
+        le=65536,
+        description="Send a web chat SSE frame once this many bytes of tokens are buffered",
+    )
+    sse_flush_interval: float = Field(
+        default=0.03,
+        ge=0.0,
+        le=1.0,
+        description="Max seconds a token waits in the SSE buffer (0 - one frame per token)",
+    )
+
     # Системный промпт
     system_prompt_path: str = Field(
         default="prompts/nutritionist.txt",
@@ -55,3 +374,29 @@ class Config(BaseSettings):
         case_sensitive=False,
         extra="ignore",
     )
+
+    @model_validator(mode="after")
+    def check_telegram_webhook(self) -> Self:
+        """Проверить, что для webhook заданы адрес и секрет.
+
+        Raises:
+            ValueError: Если в режиме webhook не задан URL или секрет
+        """
+        if self.telegram_mode == "webhook" and not (
+            self.telegram_webhook_url and self.telegram_webhook_secret
+        ):
+            raise ValueError(
+                "TELEGRAM_WEBHOOK_URL and TELEGRAM_WEBHOOK_SECRET are required in webhook mode"
+            )
+        return self
+
+    @model_validator(mode="after")
+    def check_api_export(self) -> Self:
+        """Проверить, что для выгрузки сообщений задан токен администратора.
+
+        Raises:
+            ValueError: Если выгрузка включена без API_EXPORT_TOKEN
+        """
+        if self.api_export_enabled and not self.api_export_token:
+            raise ValueError("API_EXPORT_TOKEN is required when API_EXPORT_ENABLED is true")
+        return self
@@ -38,6 +38,12 @@ class Conversation:
             f"Total messages: {len(self.conversations[key])}"
         )
 
+    async def add_turn(
+        self, user_id: int, chat_id: int, user_content: str, assistant_content: str
+    ) -> None:
+        await self.add_message(user_id, chat_id, "user", user_content)
+        await self.add_message(user_id, chat_id, "assistant", assistant_content)
+
     async def get_history(self, user_id: int, chat_id: int) -> list[ChatMessage]:
         key = (user_id, chat_id)
         history = self.conversations.get(key, [])
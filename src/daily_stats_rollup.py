@@ -0,0 +1,228 @@
+"""Инкрементальный пересчет дневных агрегатов сообщений для дашборда."""
+
+import asyncio
+import logging
+import struct
+import time
+from datetime import date, datetime, timedelta
+from typing import Any
+
+from src.hyperloglog import HyperLogLog
+from src.instrumented_pool import InstrumentedPool
+
+logger = logging.getLogger(__name__)
+
+# Ключ advisory lock: пересчет выполняет только один процесс одновременно
+ROLLUP_LOCK_KEY = 727_002
+
+# Имя строки в message_rollup_state
+ROLLUP_NAME = "daily"
+
+
+def conversation_key(user_id: int, chat_id: int) -> bytes:
+    """Значение диалога для HyperLogLog sketch.
+
+    Args:
+        user_id: ID пользователя
+        chat_id: ID чата
+
+    Returns:
+        bytes: 16 байт (user_id, chat_id)
+    """
+    return struct.pack(">qq", user_id, chat_id)
+
+
+class DailyStatsRollup:
+    """Поддержка таблиц message_daily_stats и message_daily_conversations.
+
+    Каждый запуск пересчитывает из messages только "грязные" дни: последние
+    lag_days дней до предыдущего пересчета (туда попадают новые сообщения,
+    в том числе отложенные write-behind очередью) и дни сообщений, удаленных
+    после предыдущего пересчета. Первый запуск строит агрегаты целиком.
+    Сообщения, записанные задним числом (загрузка архива), отмечаются
+    через mark_dirty(). Для тех же дней пересобираются HyperLogLog sketches активных диалогов
+    (message_daily_hll).
+    """
+
+    def __init__(self, pool: InstrumentedPool, lag_days: int = 1, hll_precision: int = 12) -> None:
+        """Инициализация пересчета.
+
+        Args:
+            pool: Connection pool
+            lag_days: На сколько дней до предыдущего пересчета захватывать окно
+            hll_precision: Precision дневных HyperLogLog sketches
+        """
+        self.pool = pool
+        self.lag_days = lag_days
+        self.hll_precision = hll_precision
+
+        self.refreshes = 0
+        self.failures = 0
+        self.last_refresh_ms = 0.0
+
+    async def refresh(self) -> None:
+        """Пересчитать грязные дни агрегатов в одной транзакции под advisory lock."""
+        started_at = time.perf_counter()
+        async with self.pool.acquire() as connection, connection.transaction():
+            locked = await connection.fetchval(
+                "SELECT pg_try_advisory_xact_lock($1)", ROLLUP_LOCK_KEY
+            )
+            if not locked:
+                logger.info("Stats rollup is refreshing in another process, skipping")
+                return
+
+            refreshed_at = await connection.fetchval("SELECT LOCALTIMESTAMP")
+            last_refreshed_at = await connection.fetchval(
+                "SELECT refreshed_at FROM message_rollup_state WHERE name = $1", ROLLUP_NAME
+            )
+
+            if last_refreshed_at is None:
+                since = datetime.combine(date.min, datetime.min.time())
+                deleted_days: list[date] = []
+            else:
+                window_start = last_refreshed_at - timedelta(days=self.lag_days)
+                since = datetime.combine(window_start.date(), datetime.min.time())
+                rows = await connection.fetch(
+                    """
+                    SELECT DISTINCT DATE(created_at) AS day
+                    FROM messages
+                    WHERE deleted_at >= $1 AND created_at < $2
+                    """,
+                    window_start,
+                    since,
+                )
+                deleted_days = [row["day"] for row in rows]
+
+            await connection.execute(
+                "DELETE FROM message_daily_stats WHERE day >= $1 OR day = ANY($2::date[])",
+                since.date(),
+                deleted_days,
+            )
+            await connection.execute(
+                """
+                INSERT INTO message_daily_stats (day, source, message_count)
+                SELECT DATE(created_at), source, COUNT(*)
+                FROM messages
+                WHERE deleted_at IS NULL
+                    AND (created_at >= $1 OR DATE(created_at) = ANY($2::date[]))
+                GROUP BY DATE(created_at), source
+                """,
+                since,
+                deleted_days,
+            )
+
+            await connection.execute(
+                "DELETE FROM message_daily_conversations WHERE day >= $1 OR day = ANY($2::date[])",
+                since.date(),
+                deleted_days,
+            )
+            await connection.execute(
+                """
+                INSERT INTO message_daily_conversations (day, user_id, chat_id)
+                SELECT DISTINCT DATE(created_at), user_id, chat_id
+                FROM messages
+                WHERE deleted_at IS NULL
+                    AND (created_at >= $1 OR DATE(created_at) = ANY($2::date[]))
+                """,
+                since,
+                deleted_days,
+            )
+
+            await self._refresh_sketches(connection, since.date(), deleted_days)
+
+            await connection.execute(
+                """
+                INSERT INTO message_rollup_state (name, refreshed_at)
+                VALUES ($1, $2)
+                ON CONFLICT (name) DO UPDATE SET refreshed_at = EXCLUDED.refreshed_at
+                """,
+                ROLLUP_NAME,
+                refreshed_at,
+            )
+
+        self.refreshes += 1
+        self.last_refresh_ms = (time.perf_counter() - started_at) * 1000
+        logger.info(
+            f"Stats rollup refreshed since {since.date()} "
+            f"(+{len(deleted_days)} days with deletions) in {self.last_refresh_ms:.1f}ms"
+        )
+
+    async def mark_dirty(self, since: date) -> None:
+        """Отметить дни начиная с since для пересчета при следующем refresh.
+
+        Окно refresh начинается за lag_days до предыдущего пересчета, поэтому
+        момент предыдущего пересчета сдвигается назад (но не вперед). Берется
+        тот же advisory lock: отметка не перезаписывается одновременным пересчетом.
+        До первого пересчета отмечать нечего - он строит агрегаты целиком.
+
+        Args:
+            since: Первый день, сообщения которого записаны задним числом
+        """
+        refreshed_at = datetime.combine(since, datetime.min.time()) + timedelta(days=self.lag_days)
+        async with self.pool.acquire() as connection, connection.transaction():
+            await connection.execute("SELECT pg_advisory_xact_lock($1)", ROLLUP_LOCK_KEY)
+            await connection.execute(
+                """
+                UPDATE message_rollup_state
+                SET refreshed_at = LEAST(refreshed_at, $2)
+                WHERE name = $1
+                """,
+                ROLLUP_NAME,
+                refreshed_at,
+            )
+        logger.info(f"Stats rollup marked dirty since {since}")
+
+    async def _refresh_sketches(self, connection: Any, since: date, days: list[date]) -> None:
+        """Пересобрать HyperLogLog sketches активных диалогов для грязных дней."""
+        rows = await connection.fetch(
+            """
+            SELECT day, user_id, chat_id
+            FROM message_daily_conversations
+            WHERE day >= $1 OR day = ANY($2::date[])
+            """,
+            since,
+            days,
+        )
+
+        sketches: dict[date, HyperLogLog] = {}
+        for row in rows:
+            sketch = sketches.get(row["day"])
+            if sketch is None:
+                sketch = sketches[row["day"]] = HyperLogLog(self.hll_precision)
+            sketch.add(conversation_key(row["user_id"], row["chat_id"]))
+
+        await connection.execute(
+            "DELETE FROM message_daily_hll WHERE day >= $1 OR day = ANY($2::date[])", since, days
+        )
+        if sketches:
+            await connection.copy_records_to_table(
+                "message_daily_hll",
+                records=[(day, sketch.to_bytes()) for day, sketch in sketches.items()],
+                columns=["day", "registers"],
+            )
+
+    async def run_periodically(self, interval_seconds: float) -> None:
+        """Пересчитывать агрегаты сразу и затем с заданным интервалом.
+
+        Args:
+            interval_seconds: Интервал между пересчетами (сек)
+        """
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"Stats rollup refresh failed: {e}", exc_info=True)
+            await asyncio.sleep(interval_seconds)
+
+    def stats(self) -> dict[str, float]:
+        """Получить метрики пересчета.
+
+        Returns:
+            dict[str, float]: Количество пересчетов, ошибок и длительность последнего
+        """
+        return {
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "last_refresh_ms": round(self.last_refresh_ms, 2),
+        }
@@ -1,14 +1,16 @@
 """Модуль для работы с PostgreSQL через asyncpg."""
 
+import asyncio
 import logging
+from typing import Unpack
 
-import asyncpg  # type: ignore[import-untyped]
+from src.config import Config
+from src.instrumented_pool import InstrumentedPool
+from src.statements import check_statement_cache_size, warm_up_statements
+from src.types import PoolOptions
 
 logger = logging.getLogger(__name__)
 
-# Глобальный connection pool
-_pool: asyncpg.Pool | None = None  # type: ignore[no-any-unimported]
-
 
 def normalize_database_url(database_url: str) -> str:
     """Нормализовать database URL для asyncpg.
@@ -27,61 +29,91 @@ def normalize_database_url(database_url: str) -> str:
     return database_url
 
 
-async def create_pool(database_url: str) -> asyncpg.Pool:  # type: ignore[no-any-unimported]
+def pool_options_from_config(config: Config) -> PoolOptions:
+    """Получить параметры connection pool из конфигурации.
+
+    Args:
+        config: Конфигурация приложения
+
+    Returns:
+        PoolOptions: Параметры для create_pool/init_db
+    """
+    return PoolOptions(
+        min_size=config.db_pool_min_size,
+        max_size=config.db_pool_max_size,
+        command_timeout=config.db_command_timeout,
+        statement_cache_size=config.db_statement_cache_size,
+        max_inactive_connection_lifetime=config.db_max_inactive_connection_lifetime,
+        acquire_timeout=config.db_acquire_timeout,
+    )
+
+
+async def create_pool(database_url: str, **options: Unpack[PoolOptions]) -> InstrumentedPool:
     """Создать connection pool для PostgreSQL.
 
+    Pool не сохраняется в модуле: его владелец (процесс бота, lifespan
+    приложения API, скрипт импорта) передает его компонентам и закрывает.
+
     Args:
         database_url: Connection string для PostgreSQL
+        **options: Параметры pool (размер, таймауты, кэш statements)
 
     Returns:
-        asyncpg.Pool: Connection pool
+        InstrumentedPool: Connection pool с метриками
     """
-    global _pool
-
     # Нормализуем URL для asyncpg
     normalized_url = normalize_database_url(database_url)
 
-    logger.info("Creating database connection pool")
-    _pool = await asyncpg.create_pool(
+    min_size = options.get("min_size", 2)
+    max_size = options.get("max_size", 10)
+    logger.info(f"Creating database connection pool (min_size={min_size}, max_size={max_size})")
+
+    statement_cache_size = options.get("statement_cache_size", 100)
+    check_statement_cache_size(statement_cache_size)
+
+    pool = InstrumentedPool(acquire_timeout=options.get("acquire_timeout", 10.0))
+    await pool.open(
         normalized_url,
-        min_size=2,
-        max_size=10,
-        command_timeout=30,
+        min_size=min_size,
+        max_size=max_size,
+        command_timeout=options.get("command_timeout", 30.0),
+        statement_cache_size=statement_cache_size,
+        max_inactive_connection_lifetime=options.get("max_inactive_connection_lifetime", 300.0),
     )
+
     logger.info("Database connection pool created successfully")
-    return _pool
+    return pool
 
 
-async def get_pool() -> asyncpg.Pool:  # type: ignore[no-any-unimported]
-    """Получить текущий connection pool.
+async def warm_up_pool(pool: InstrumentedPool) -> None:
+    """Прогреть min_size соединений pool и их statements до приема запросов.
 
-    Returns:
-        asyncpg.Pool: Connection pool
+    Соединения берутся одновременно, поэтому каждое из них устанавливается
+    (init hook pool готовит на нем statements) и выполняет читающие statements
+    реестра: первые запросы клиентов не платят ни за соединение, ни за prepare.
 
-    Raises:
-        RuntimeError: Если pool не инициализирован
+    Args:
+        pool: Connection pool
     """
-    if _pool is None:
-        raise RuntimeError("Database pool not initialized. Call create_pool() first.")
-    return _pool
+    size = pool.pool.get_min_size()
 
+    async def ping() -> None:
+        async with pool.acquire() as connection:
+            await warm_up_statements(connection)
 
-async def close_pool() -> None:
-    """Закрыть connection pool."""
-    global _pool
-
-    if _pool is not None:
-        logger.info("Closing database connection pool")
-        await _pool.close()
-        _pool = None
-        logger.info("Database connection pool closed")
+    await asyncio.gather(*(ping() for _ in range(size)))
+    logger.info(f"Database connection pool warmed up ({size} connections)")
 
 
-async def init_db(database_url: str) -> None:
-    """Инициализировать подключение к БД и проверить доступность.
+async def init_db(database_url: str, **options: Unpack[PoolOptions]) -> InstrumentedPool:
+    """Создать connection pool и проверить доступность БД.
 
     Args:
         database_url: Connection string для PostgreSQL
+        **options: Параметры connection pool
+
+    Returns:
+        InstrumentedPool: Открытый connection pool (закрывается владельцем через close())
 
     Raises:
         Exception: Если не удалось подключиться к БД
@@ -89,8 +121,7 @@ async def init_db(database_url: str) -> None:
     logger.info("Initializing database connection")
 
     try:
-        await create_pool(database_url)
-        pool = await get_pool()
+        pool = await create_pool(database_url, **options)
 
         # Проверяем подключение
         async with pool.acquire() as connection:
@@ -100,3 +131,5 @@ async def init_db(database_url: str) -> None:
     except Exception as e:
         logger.error(f"Failed to initialize database: {e}", exc_info=True)
         raise
+
+    return pool
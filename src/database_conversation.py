@@ -3,7 +3,13 @@
 import logging
 from datetime import datetime
 
-from src.database import get_pool
+from src import statements
+from src.config import Config
+from src.history_cache import HistoryCache
+from src.instrumented_pool import InstrumentedPool
+from src.live_stats import LiveStats
+from src.message_write_queue import MessageWriteQueue
+from src.metrics import MetricsRegistry
 from src.types import ChatMessage
 
 logger = logging.getLogger(__name__)
@@ -12,13 +18,28 @@ logger = logging.getLogger(__name__)
 class DatabaseConversation:
     """Управление историей диалогов в PostgreSQL с поддержкой soft delete."""
 
-    def __init__(self, max_history_messages: int) -> None:
+    def __init__(
+        self,
+        pool: InstrumentedPool,
+        max_history_messages: int,
+        history_cache: HistoryCache | None = None,
+        write_queue: MessageWriteQueue | None = None,
+        live_stats: LiveStats | None = None,
+    ) -> None:
         """Инициализация хранилища диалогов.
 
         Args:
+            pool: Connection pool
             max_history_messages: Максимальное количество сообщений в истории
+            history_cache: Опциональный write-through кэш окон истории
+            write_queue: Опциональная write-behind очередь для вставки сообщений
+            live_stats: Опциональные in-process счетчики статистики дашборда
         """
+        self.pool = pool
         self.max_history_messages = max_history_messages
+        self.history_cache = history_cache
+        self.write_queue = write_queue
+        self.live_stats = live_stats
 
     async def add_message(
         self, user_id: int, chat_id: int, role: str, content: str, source: str = "telegram"
@@ -32,28 +53,92 @@ class DatabaseConversation:
             content: Текст сообщения
             source: Источник сообщения ('telegram' или 'web')
         """
-        pool = await get_pool()
         message_length = len(content)
+        # Время записи берется по часам приложения и в очереди, и при INSERT:
+        # порядок сообщений не зависит от того, когда очередь сбросит пачку
+        created_at = datetime.now()
 
-        async with pool.acquire() as connection:
-            await connection.execute(
-                """
-                INSERT INTO messages (user_id, chat_id, role, content, message_length, source)
-                VALUES ($1, $2, $3, $4, $5, $6)
-                """,
-                user_id,
-                chat_id,
-                role,
-                content,
-                message_length,
-                source,
+        if self.write_queue is not None:
+            await self.write_queue.put(
+                [(user_id, chat_id, role, content, message_length, source, created_at)]
             )
+        else:
+            async with self.pool.acquire() as connection:
+                await statements.execute(
+                    connection,
+                    "insert_message",
+                    user_id,
+                    chat_id,
+                    role,
+                    content,
+                    message_length,
+                    source,
+                    created_at,
+                )
+
+        self._cache_message(user_id, chat_id, role, content)
+        if self.live_stats is not None:
+            self.live_stats.record(user_id, chat_id, source)
 
         logger.info(
             f"Message added to database for user {user_id}, chat {chat_id}, "
             f"role={role}, length={message_length}"
         )
 
+    async def add_turn(
+        self,
+        user_id: int,
+        chat_id: int,
+        user_content: str,
+        assistant_content: str,
+        source: str = "telegram",
+    ) -> None:
+        """Добавить в историю реплику пользователя и ответ ассистента за один запрос.
+
+        Обе строки записываются одним multi-row INSERT на одном соединении
+        (или одной пачкой ставятся в write-behind очередь).
+
+        Args:
+            user_id: ID пользователя Telegram
+            chat_id: ID чата Telegram
+            user_content: Текст сообщения пользователя
+            assistant_content: Текст ответа ассистента
+            source: Источник сообщений ('telegram' или 'web')
+        """
+        contents = [user_content, assistant_content]
+        created_at = datetime.now()
+
+        if self.write_queue is not None:
+            await self.write_queue.put(
+                [
+                    (user_id, chat_id, role, content, len(content), source, created_at)
+                    for role, content in zip(["user", "assistant"], contents, strict=True)
+                ]
+            )
+        else:
+            async with self.pool.acquire() as connection:
+                await statements.execute(
+                    connection,
+                    "insert_turn",
+                    user_id,
+                    chat_id,
+                    ["user", "assistant"],
+                    contents,
+                    [len(content) for content in contents],
+                    source,
+                    created_at,
+                )
+
+        self._cache_message(user_id, chat_id, "user", user_content)
+        self._cache_message(user_id, chat_id, "assistant", assistant_content)
+        if self.live_stats is not None:
+            self.live_stats.record(user_id, chat_id, source, count=len(contents))
+
+        logger.info(
+            f"Turn added to database for user {user_id}, chat {chat_id}, "
+            f"lengths={len(user_content)}/{len(assistant_content)}"
+        )
+
     async def get_history(self, user_id: int, chat_id: int) -> list[ChatMessage]:
         """Получить историю диалога для пользователя и чата.
 
@@ -66,17 +151,22 @@ class DatabaseConversation:
         Returns:
             list[ChatMessage]: Список последних N сообщений
         """
-        pool = await get_pool()
-
-        async with pool.acquire() as connection:
-            rows = await connection.fetch(
-                """
-                SELECT role, content, created_at, message_length
-                FROM messages
-                WHERE user_id = $1 AND chat_id = $2 AND deleted_at IS NULL
-                ORDER BY created_at DESC
-                LIMIT $3
-                """,
+        if self.history_cache is not None:
+            cached = self.history_cache.get(user_id, chat_id)
+            if cached is not None:
+                logger.info(
+                    f"Retrieved {len(cached)} cached messages for user {user_id}, chat {chat_id}"
+                )
+                return cached
+
+        # Read-your-writes: сообщения из write-behind очереди должны попасть в выборку
+        if self.write_queue is not None:
+            await self.write_queue.flush()
+
+        async with self.pool.acquire() as connection:
+            rows = await statements.fetch(
+                connection,
+                "select_history",
                 user_id,
                 chat_id,
                 self.max_history_messages,
@@ -94,6 +184,9 @@ class DatabaseConversation:
                 )
             )
 
+        if self.history_cache is not None:
+            self.history_cache.set(user_id, chat_id, messages)
+
         logger.info(f"Retrieved {len(messages)} messages for user {user_id}, chat {chat_id}")
         return messages
 
@@ -106,20 +199,24 @@ class DatabaseConversation:
             user_id: ID пользователя Telegram
             chat_id: ID чата Telegram
         """
-        pool = await get_pool()
-
-        async with pool.acquire() as connection:
-            result = await connection.execute(
-                """
-                UPDATE messages
-                SET deleted_at = $1
-                WHERE user_id = $2 AND chat_id = $3 AND deleted_at IS NULL
-                """,
+        # Отложенные вставки должны быть записаны до soft delete
+        if self.write_queue is not None:
+            await self.write_queue.flush()
+
+        async with self.pool.acquire() as connection:
+            result = await statements.execute(
+                connection,
+                "soft_delete_history",
                 datetime.now(),
                 user_id,
                 chat_id,
             )
 
+        if self.history_cache is not None:
+            self.history_cache.invalidate(user_id, chat_id)
+        if self.live_stats is not None:
+            self.live_stats.forget(user_id, chat_id)
+
         # result имеет формат "UPDATE N" где N - количество обновленных строк
         rows_affected = int(result.split()[-1]) if result else 0
 
@@ -131,3 +228,75 @@ class DatabaseConversation:
         else:
             logger.info(f"No history to clear for user {user_id}, chat {chat_id}")
 
+    def _cache_message(self, user_id: int, chat_id: int, role: str, content: str) -> None:
+        """Дописать сообщение в закэшированное окно истории (write-through)."""
+        if self.history_cache is None:
+            return
+
+        self.history_cache.append(
+            user_id,
+            chat_id,
+            ChatMessage(
+                role=role,
+                content=content,
+                created_at=datetime.now().isoformat(),
+                message_length=len(content),
+            ),
+            self.max_history_messages,
+        )
+
+
+async def create_database_conversation(
+    config: Config,
+    pool: InstrumentedPool,
+    metrics: MetricsRegistry,
+    live_stats: LiveStats | None = None,
+    workers: int = 1,
+) -> DatabaseConversation:
+    """Собрать хранилище диалогов с кэшем истории и write-behind очередью по конфигурации.
+
+    Кэш истории и write-behind очередь живут в памяти процесса. Если диалоги
+    одного пользователя обслуживают несколько процессов (uvicorn workers API
+    распределяют запросы веб-чата произвольно), запись в одном процессе
+    не видна другому: его кэш отдает устаревшее окно, а сообщения из чужой
+    очереди не попадают в выборку. Поэтому при workers > 1 оба отключаются,
+    и история всегда читается из PostgreSQL.
+
+    Args:
+        config: Конфигурация приложения
+        pool: Connection pool
+        metrics: Реестр метрик процесса
+        live_stats: Опциональные in-process счетчики статистики дашборда
+        workers: Сколько процессов обслуживают одних и тех же пользователей
+
+    Returns:
+        DatabaseConversation: Хранилище диалогов (очередь, если включена, уже запущена)
+    """
+    shared = workers > 1
+    if shared and (config.history_cache_size > 0 or config.message_write_behind):
+        logger.warning(
+            f"History cache and write-behind queue are disabled: {workers} workers "
+            "share conversations and would not see each other's writes"
+        )
+
+    history_cache: HistoryCache | None = None
+    if not shared:
+        history_cache = HistoryCache(config.history_cache_size, config.history_cache_ttl)
+        metrics.register("history_cache", history_cache.stats)
+
+    # Write-behind очередь сбрасывается перед закрытием pool
+    write_queue: MessageWriteQueue | None = None
+    if config.message_write_behind and not shared:
+        write_queue = MessageWriteQueue(
+            pool,
+            max_size=config.message_write_queue_size,
+            batch_size=config.message_write_batch_size,
+            flush_interval=config.message_write_flush_interval,
+            max_attempts=config.message_write_max_attempts,
+        )
+        await write_queue.start()
+        metrics.register("message_write_queue", write_queue.stats)
+
+    return DatabaseConversation(
+        pool, config.max_history_messages, history_cache, write_queue, live_stats
+    )
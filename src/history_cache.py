@@ -0,0 +1,121 @@
+"""In-process кэш окон истории диалогов (LRU + TTL)."""
+
+import time
+from collections import OrderedDict
+
+from src.types import ChatMessage
+
+
+class HistoryCache:
+    """Ограниченный LRU/TTL кэш последних N сообщений по ключу (user_id, chat_id).
+
+    Кэш работает в режиме write-through: хранилище дописывает новые сообщения
+    в уже закэшированное окно и инвалидирует его при очистке истории.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float) -> None:
+        """Инициализация кэша.
+
+        Args:
+            max_size: Максимальное количество закэшированных диалогов
+            ttl_seconds: Время жизни окна истории с момента загрузки из БД
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict[tuple[int, int], tuple[float, list[ChatMessage]]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: int, chat_id: int) -> list[ChatMessage] | None:
+        """Получить окно истории из кэша.
+
+        Args:
+            user_id: ID пользователя
+            chat_id: ID чата
+
+        Returns:
+            list[ChatMessage] | None: Копия окна истории или None при промахе
+        """
+        key = (user_id, chat_id)
+        entry = self._entries.get(key)
+
+        if entry is None or self._is_expired(entry[0]):
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return list(entry[1])
+
+    def set(self, user_id: int, chat_id: int, messages: list[ChatMessage]) -> None:
+        """Сохранить окно истории, загруженное из БД.
+
+        Args:
+            user_id: ID пользователя
+            chat_id: ID чата
+            messages: Окно истории (от старых к новым)
+        """
+        if self.max_size <= 0:
+            return
+
+        key = (user_id, chat_id)
+        self._entries[key] = (time.monotonic(), list(messages))
+        self._entries.move_to_end(key)
+
+        # Вытесняем самые давно использованные диалоги
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def append(self, user_id: int, chat_id: int, message: ChatMessage, max_messages: int) -> None:
+        """Дописать сообщение в закэшированное окно истории.
+
+        Если окна нет в кэше, ничего не делает: следующее чтение загрузит его из БД.
+
+        Args:
+            user_id: ID пользователя
+            chat_id: ID чата
+            message: Новое сообщение
+            max_messages: Размер окна истории
+        """
+        key = (user_id, chat_id)
+        entry = self._entries.get(key)
+        if entry is None:
+            return
+
+        if self._is_expired(entry[0]):
+            del self._entries[key]
+            return
+
+        window = entry[1]
+        window.append(message)
+        if len(window) > max_messages:
+            del window[: len(window) - max_messages]
+
+    def invalidate(self, user_id: int, chat_id: int) -> None:
+        """Удалить окно истории из кэша.
+
+        Args:
+            user_id: ID пользователя
+            chat_id: ID чата
+        """
+        self._entries.pop((user_id, chat_id), None)
+
+    def stats(self) -> dict[str, float]:
+        """Получить счетчики кэша.
+
+        Returns:
+            dict[str, float]: hits, misses, hit_ratio и текущий размер кэша
+        """
+        total = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / total, 4) if total > 0 else 0.0,
+            "size": len(self._entries),
+        }
+
+    def _is_expired(self, loaded_at: float) -> bool:
+        """Проверить, истек ли TTL окна истории."""
+        return time.monotonic() - loaded_at > self.ttl_seconds
@@ -0,0 +1,108 @@
+"""HTTP транспорт httpx с метриками пула соединений."""
+
+import logging
+from typing import Any
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class InstrumentedHTTPTransport(httpx.AsyncHTTPTransport):
+    """httpx.AsyncHTTPTransport с учетом запросов и переиспользования соединений.
+
+    Новые соединения (TCP+TLS handshake) считаются по событиям публичного
+    trace extension httpcore, версия протокола - по extensions ответа.
+    Запрос без события установки соединения прошел по теплому
+    keepalive-соединению.
+
+    Состояние пула (открытые и простаивающие соединения) httpx публично
+    не отдает: снимок читает пул httpcore транспорта (совместимые версии
+    httpx и httpcore закреплены в pyproject.toml), а если его устройство
+    изменится, показывает нули вместо ошибки.
+    """
+
+    def __init__(self, **transport_kwargs: Any) -> None:
+        """Инициализация транспорта.
+
+        Args:
+            **transport_kwargs: Параметры httpx.AsyncHTTPTransport (limits, http2, ...)
+        """
+        super().__init__(**transport_kwargs)
+        self.max_connections = transport_kwargs.get("limits", httpx.Limits()).max_connections
+
+        self.requests = 0
+        self.errors = 0
+        self.connections_opened = 0
+        self.http2_requests = 0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        """Выполнить запрос, учитывая ошибки, новые соединения и версию протокола.
+
+        Args:
+            request: Запрос httpx
+
+        Returns:
+            httpx.Response: Ответ (тело читается потоком)
+        """
+        self.requests += 1
+        request.extensions["trace"] = self._tracer(request.extensions.get("trace"))
+        try:
+            response = await super().handle_async_request(request)
+        except Exception:
+            self.errors += 1
+            raise
+
+        if response.extensions.get("http_version") == b"HTTP/2":
+            self.http2_requests += 1
+        return response
+
+    def _tracer(self, inner: Any) -> Any:
+        """Создать callback trace extension, считающий установленные соединения.
+
+        Args:
+            inner: Callback trace, переданный вызывающим кодом (вызывается тоже)
+
+        Returns:
+            Any: Асинхронный callback (event_name, info) для httpcore
+        """
+
+        async def trace(event_name: str, info: dict[str, Any]) -> None:
+            if event_name in (
+                "connection.connect_tcp.complete",
+                "connection.connect_unix_socket.complete",
+            ):
+                self.connections_opened += 1
+            if inner is not None:
+                await inner(event_name, info)
+
+        return trace
+
+    def _pool_connections(self) -> list[Any]:
+        """Соединения пула httpcore (пустой список, если пул недоступен)."""
+        pool = getattr(self, "_pool", None)
+        connections = getattr(pool, "connections", None)
+        return list(connections) if connections is not None else []
+
+    def snapshot(self) -> dict[str, float]:
+        """Получить снимок метрик транспорта.
+
+        Returns:
+            dict[str, float]: Соединения пула, запросы и доля переиспользованных соединений
+        """
+        connections = self._pool_connections()
+        idle = sum(1 for connection in connections if connection.is_idle())
+        http2 = sum(1 for connection in connections if "HTTP/2" in connection.info())
+        reused = max(self.requests - self.connections_opened, 0)
+        return {
+            "connections": len(connections),
+            "idle": idle,
+            "active": len(connections) - idle,
+            "http2_connections": http2,
+            "max_connections": self.max_connections or 0,
+            "requests": self.requests,
+            "http2_requests": self.http2_requests,
+            "errors": self.errors,
+            "connections_opened": self.connections_opened,
+            "reuse_ratio": round(reused / self.requests, 3) if self.requests > 0 else 0.0,
+        }
@@ -0,0 +1,164 @@
+"""Обертка над asyncpg.Pool с метриками ожидания соединений и длительности запросов."""
+
+import logging
+import time
+from collections import deque
+from collections.abc import AsyncIterator, Awaitable, Callable
+from contextlib import asynccontextmanager
+from typing import Any
+
+import asyncpg  # type: ignore[import-untyped]
+
+from src.percentiles import SAMPLES_WINDOW, percentile_ms
+from src.statements import warm_up_statements
+
+logger = logging.getLogger(__name__)
+
+
+class InstrumentedPool:
+    """asyncpg.Pool с таймаутом acquire и метриками использования.
+
+    Собирает время ожидания pool.acquire(), количество выданных соединений
+    и длительность запросов (через query logger, подключаемый в init hook).
+    Init hook также готовит читающие statements реестра на каждом новом
+    соединении, в том числе пересозданном после max_inactive_connection_lifetime.
+    Pool принадлежит процессу бота или приложению API и передается
+    компонентам явно; компоненты, которым нужно дописать данные до закрытия
+    (write-behind очередь), регистрируют before-close callbacks.
+    """
+
+    def __init__(self, acquire_timeout: float) -> None:
+        """Инициализация обертки.
+
+        Args:
+            acquire_timeout: Максимальное время ожидания свободного соединения (сек)
+        """
+        self.acquire_timeout = acquire_timeout
+        self._pool: asyncpg.Pool | None = None  # type: ignore[no-any-unimported]
+        # Готовить statements в init hook (при выключенном кэше asyncpg это бесполезно)
+        self._warm_up_statements = True
+        # Корутины, выполняемые перед закрытием pool (например, сброс write-behind очереди)
+        self._before_close_callbacks: list[Callable[[], Awaitable[None]]] = []
+
+        self.acquires = 0
+        self.acquire_timeouts = 0
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.queries = 0
+        self.query_errors = 0
+        self._acquire_waits: deque[float] = deque(maxlen=SAMPLES_WINDOW)
+        self._query_durations: deque[float] = deque(maxlen=SAMPLES_WINDOW)
+
+    async def open(self, dsn: str, **pool_kwargs: Any) -> None:
+        """Создать исходный pool asyncpg.
+
+        Args:
+            dsn: Connection string в формате asyncpg
+            **pool_kwargs: Параметры asyncpg.create_pool
+        """
+        self._warm_up_statements = pool_kwargs.get("statement_cache_size", 100) > 0
+        self._pool = await asyncpg.create_pool(dsn, init=self._init_connection, **pool_kwargs)
+
+    @property
+    def pool(self) -> asyncpg.Pool:  # type: ignore[no-any-unimported]
+        """Исходный pool asyncpg.
+
+        Raises:
+            RuntimeError: Если pool еще не создан
+        """
+        if self._pool is None:
+            raise RuntimeError("Pool is not opened. Call open() first.")
+        return self._pool
+
+    @asynccontextmanager
+    async def acquire(self) -> AsyncIterator[Any]:
+        """Получить соединение из pool с замером времени ожидания.
+
+        Yields:
+            Соединение asyncpg
+
+        Raises:
+            TimeoutError: Если свободное соединение не получено за acquire_timeout
+        """
+        started_at = time.perf_counter()
+        try:
+            connection = await self.pool.acquire(timeout=self.acquire_timeout)
+        except TimeoutError:
+            self.acquire_timeouts += 1
+            logger.error(
+                f"Timed out waiting {self.acquire_timeout}s for a database connection "
+                f"({self.checked_out} checked out)"
+            )
+            raise
+
+        self._acquire_waits.append(time.perf_counter() - started_at)
+        self.acquires += 1
+        self.checked_out += 1
+        self.max_checked_out = max(self.max_checked_out, self.checked_out)
+
+        try:
+            yield connection
+        finally:
+            self.checked_out -= 1
+            await self.pool.release(connection)
+
+    def add_before_close_callback(self, callback: Callable[[], Awaitable[None]]) -> None:
+        """Зарегистрировать корутину, которая выполнится в close() до закрытия pool.
+
+        Args:
+            callback: Асинхронная функция без аргументов
+        """
+        self._before_close_callbacks.append(callback)
+
+    async def close(self) -> None:
+        """Выполнить before-close callbacks (в порядке регистрации) и закрыть pool."""
+        callbacks = list(self._before_close_callbacks)
+        self._before_close_callbacks.clear()
+        for callback in callbacks:
+            try:
+                await callback()
+            except Exception as e:
+                logger.error(f"Error in before-close callback: {e}", exc_info=True)
+
+        await self.pool.close()
+
+    async def _init_connection(self, connection: Any) -> None:
+        """Init hook asyncpg: подключить query logger и подготовить statements реестра."""
+        connection.add_query_logger(self.record_query)
+        if self._warm_up_statements:
+            await warm_up_statements(connection)
+
+    def record_query(self, query: Any) -> None:
+        """Query logger asyncpg: учесть длительность выполненного запроса.
+
+        Args:
+            query: asyncpg LoggedQuery с полями elapsed и exception
+        """
+        self.queries += 1
+        self._query_durations.append(query.elapsed)
+        if query.exception is not None:
+            self.query_errors += 1
+
+    def snapshot(self) -> dict[str, float]:
+        """Получить снимок метрик pool.
+
+        Returns:
+            dict[str, float]: Размер pool, выданные соединения, ожидание acquire и запросы
+        """
+        return {
+            "size": self.pool.get_size(),
+            "idle": self.pool.get_idle_size(),
+            "max_size": self.pool.get_max_size(),
+            "checked_out": self.checked_out,
+            "max_checked_out": self.max_checked_out,
+            "acquires": self.acquires,
+            "acquire_timeouts": self.acquire_timeouts,
+            "acquire_wait_p50_ms": percentile_ms(self._acquire_waits, 0.5),
+            "acquire_wait_p95_ms": percentile_ms(self._acquire_waits, 0.95),
+            "acquire_wait_max_ms": percentile_ms(self._acquire_waits, 1.0),
+            "queries": self.queries,
+            "query_errors": self.query_errors,
+            "query_p50_ms": percentile_ms(self._query_durations, 0.5),
+            "query_p95_ms": percentile_ms(self._query_durations, 0.95),
+            "query_max_ms": percentile_ms(self._query_durations, 1.0),
+        }
@@ -0,0 +1,205 @@
+"""In-process счетчики сообщений для дашборда, пополняемые при записи."""
+
+import asyncio
+import logging
+import time
+from collections.abc import Callable
+from datetime import date, datetime, timedelta
+
+from src.instrumented_pool import InstrumentedPool
+
+logger = logging.getLogger(__name__)
+
+# Сообщения диалога за день по источникам: source -> количество
+SourceCounts = dict[str, int]
+
+
+class LiveStats:
+    """Дневные счетчики сообщений и активных диалогов в памяти процесса.
+
+    Заполняются один раз из БД (seed), затем DatabaseConversation дописывает
+    в них каждое сообщение и снимает очищенные диалоги. Хранятся только
+    последние retention_days дней (текущий и предыдущий период дашборда).
+
+    Счетчики видят только записи своего процесса, поэтому включаются там,
+    где через процесс проходят все записи (один API worker с webhook Telegram).
+    Записи в обход процесса (загрузка архива) учитываются периодической
+    пересборкой (run_periodically). Изменения, пришедшие во время пересборки,
+    применяются к новому снимку после нее.
+    """
+
+    def __init__(self, pool: InstrumentedPool, retention_days: int = 180) -> None:
+        """Инициализация счетчиков.
+
+        Args:
+            pool: Connection pool
+            retention_days: Сколько последних дней хранить
+        """
+        self.pool = pool
+        self.retention_days = retention_days
+
+        # day -> (user_id, chat_id) -> source -> количество сообщений
+        self._days: dict[date, dict[tuple[int, int], SourceCounts]] = {}
+        # Изменения, пришедшие во время пересборки (None - пересборки нет)
+        self._pending: list[Callable[[], None]] | None = None
+
+        self.seeds = 0
+        self.failures = 0
+        self.last_seed_ms = 0.0
+
+    async def seed(self) -> None:
+        """Пересобрать счетчики из не удаленных сообщений за retention_days дней."""
+        started_at = time.perf_counter()
+        since = datetime.combine(
+            date.today() - timedelta(days=self.retention_days), datetime.min.time()
+        )
+
+        # Изменения, пришедшие во время запроса, повторяются на новом снимке.
+        # Запись, закоммиченная до снимка, но учтенная после начала запроса,
+        # может попасть в счетчики дважды до следующей пересборки
+        self._pending = []
+        try:
+            async with self.pool.acquire() as connection:
+                rows = await connection.fetch(
+                    """
+                    SELECT DATE(created_at) AS day, user_id, chat_id, source,
+                        COUNT(*) AS message_count
+                    FROM messages
+                    WHERE deleted_at IS NULL AND created_at >= $1
+                    GROUP BY DATE(created_at), user_id, chat_id, source
+                    """,
+                    since,
+                )
+
+            days: dict[date, dict[tuple[int, int], SourceCounts]] = {}
+            for row in rows:
+                conversations = days.setdefault(row["day"], {})
+                counts = conversations.setdefault((row["user_id"], row["chat_id"]), {})
+                counts[row["source"]] = row["message_count"]
+
+            self._days = days
+            for apply in self._pending:
+                apply()
+        finally:
+            self._pending = None
+
+        self.seeds += 1
+        self.last_seed_ms = (time.perf_counter() - started_at) * 1000
+        logger.info(
+            f"Live stats seeded with {len(rows)} rows since {since.date()} "
+            f"in {self.last_seed_ms:.1f}ms"
+        )
+
+    def record(
+        self, user_id: int, chat_id: int, source: str, count: int = 1, day: date | None = None
+    ) -> None:
+        """Учесть записанные сообщения.
+
+        Args:
+            user_id: ID пользователя
+            chat_id: ID чата
+            source: Источник сообщений ('telegram' или 'web')
+            count: Количество сообщений
+            day: День сообщений (по умолчанию сегодня)
+        """
+        record_day = day or date.today()
+        self._apply(lambda: self._record(user_id, chat_id, source, count, record_day))
+
+    def forget(self, user_id: int, chat_id: int) -> None:
+        """Снять со счетчиков все сообщения очищенного диалога (soft delete).
+
+        Args:
+            user_id: ID пользователя
+            chat_id: ID чата
+        """
+        self._apply(lambda: self._forget(user_id, chat_id))
+
+    def totals(self, start: date, end: date) -> dict[str, int]:
+        """Сообщения и активные диалоги за дни [start, end).
+
+        Args:
+            start: Первый день периода
+            end: День после последнего дня периода
+
+        Returns:
+            dict[str, int]: total_messages и active_conversations
+        """
+        total_messages = 0
+        active: set[tuple[int, int]] = set()
+
+        for day, conversations in self._days.items():
+            if start <= day < end:
+                active.update(conversations)
+                total_messages += sum(sum(counts.values()) for counts in conversations.values())
+
+        return {"total_messages": total_messages, "active_conversations": len(active)}
+
+    def daily_counts(self, start: date) -> dict[date, int]:
+        """Количество сообщений по дням начиная со start.
+
+        Args:
+            start: Первый день
+
+        Returns:
+            dict[date, int]: Количество сообщений по дням (дни без сообщений отсутствуют)
+        """
+        daily: dict[date, int] = {}
+        for day, conversations in self._days.items():
+            if day >= start:
+                count = sum(sum(counts.values()) for counts in conversations.values())
+                if count > 0:
+                    daily[day] = count
+        return daily
+
+    async def run_periodically(self, interval_seconds: float) -> None:
+        """Пересобирать счетчики из БД с заданным интервалом.
+
+        Args:
+            interval_seconds: Интервал между пересборками (сек)
+        """
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await self.seed()
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"Live stats reseed failed: {e}", exc_info=True)
+
+    def stats(self) -> dict[str, float]:
+        """Получить метрики счетчиков.
+
+        Returns:
+            dict[str, float]: Количество дней, пересборок, ошибок и длительность последней
+        """
+        return {
+            "days": len(self._days),
+            "seeds": self.seeds,
+            "failures": self.failures,
+            "last_seed_ms": round(self.last_seed_ms, 2),
+        }
+
+    def _apply(self, change: Callable[[], None]) -> None:
+        """Применить изменение сейчас и, если идет пересборка, повторить его после нее."""
+        change()
+        if self._pending is not None:
+            self._pending.append(change)
+
+    def _record(self, user_id: int, chat_id: int, source: str, count: int, day: date) -> None:
+        """Прибавить сообщения к счетчику диалога за день."""
+        if day not in self._days:
+            self._days[day] = {}
+            self._prune(day)
+
+        counts = self._days[day].setdefault((user_id, chat_id), {})
+        counts[source] = counts.get(source, 0) + count
+
+    def _forget(self, user_id: int, chat_id: int) -> None:
+        """Удалить счетчики диалога за все дни."""
+        for conversations in self._days.values():
+            conversations.pop((user_id, chat_id), None)
+
+    def _prune(self, today: date) -> None:
+        """Удалить дни старше retention_days."""
+        oldest = today - timedelta(days=self.retention_days)
+        for day in [day for day in self._days if day < oldest]:
+            del self._days[day]
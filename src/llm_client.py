@@ -2,7 +2,15 @@ import logging
 from collections.abc import AsyncGenerator
 from pathlib import Path
 
-from openai import APIError, APITimeoutError, AsyncOpenAI, AuthenticationError, RateLimitError
+import httpx
+from openai import (
+    APIError,
+    APITimeoutError,
+    AsyncOpenAI,
+    AuthenticationError,
+    RateLimitError,
+    Timeout,
+)
 
 from src.types import ChatMessage
 
@@ -18,14 +26,21 @@ class LLMClient:
         max_tokens: int,
         timeout: int,
         system_prompt_path: str | None = None,
+        connect_timeout: float | None = None,
+        http_client: httpx.AsyncClient | None = None,
     ) -> None:
+        # http_client - общий пул соединений процесса (см. create_llm_http_client)
         self.client: AsyncOpenAI = AsyncOpenAI(
-            api_key=api_key, base_url="https://openrouter.ai/api/v1"
+            api_key=api_key, base_url="https://openrouter.ai/api/v1", http_client=http_client
         )
         self.model: str = model
         self.temperature: float = temperature
         self.max_tokens: int = max_tokens
         self.timeout: int = timeout
+        # Установка соединения ограничена отдельно и короче, чем ожидание ответа
+        self.request_timeout: float | Timeout = (
+            Timeout(timeout, connect=connect_timeout) if connect_timeout is not None else timeout
+        )
         self.system_prompt: str | None = None
 
         # Загрузка системного промпта из файла
@@ -67,7 +82,7 @@ class LLMClient:
                 messages=final_messages,  # type: ignore[arg-type]
                 temperature=self.temperature,
                 max_tokens=self.max_tokens,
-                timeout=self.timeout,
+                timeout=self.request_timeout,
             )
 
             answer = response.choices[0].message.content
@@ -125,7 +140,7 @@ class LLMClient:
                 messages=final_messages,  # type: ignore[arg-type]
                 temperature=self.temperature,
                 max_tokens=self.max_tokens,
-                timeout=self.timeout,
+                timeout=self.request_timeout,
                 stream=True,  # Включаем стриминг
             )
 
@@ -0,0 +1,73 @@
+"""Общий HTTP клиент процесса для запросов к LLM API."""
+
+import logging
+from typing import Unpack
+
+import httpx
+
+from src.config import Config
+from src.instrumented_http_transport import InstrumentedHTTPTransport
+from src.metrics import MetricsRegistry
+from src.types import LLMHttpOptions
+
+logger = logging.getLogger(__name__)
+
+
+def llm_http_options_from_config(config: Config) -> LLMHttpOptions:
+    """Получить параметры HTTP клиента LLM из конфигурации.
+
+    Args:
+        config: Конфигурация приложения
+
+    Returns:
+        LLMHttpOptions: Параметры для create_llm_http_client
+    """
+    return LLMHttpOptions(
+        max_connections=config.llm_max_connections,
+        max_keepalive_connections=config.llm_max_keepalive_connections,
+        keepalive_expiry=config.llm_keepalive_expiry,
+        http2=config.llm_http2,
+        connect_timeout=config.llm_connect_timeout,
+        read_timeout=config.llm_timeout,
+    )
+
+
+def create_llm_http_client(
+    metrics: MetricsRegistry, **options: Unpack[LLMHttpOptions]
+) -> httpx.AsyncClient:
+    """Создать HTTP клиент с пулом keepalive-соединений для LLMClient.
+
+    Один клиент на процесс: все запросы к LLM переиспользуют теплые TLS
+    соединения вместо handshake на каждый всплеск нагрузки. Метрики пула
+    регистрируются как источник "llm_http". Клиент закрывается через aclose()
+    при остановке процесса.
+
+    Args:
+        metrics: Реестр метрик процесса (источник "llm_http")
+        **options: Лимиты пула, keepalive, HTTP/2 и таймауты
+
+    Returns:
+        httpx.AsyncClient: Клиент для AsyncOpenAI(http_client=...)
+
+    Raises:
+        ImportError: Если http2=True, а пакет h2 не установлен (extra "fast")
+    """
+    limits = httpx.Limits(
+        max_connections=options.get("max_connections", 100),
+        max_keepalive_connections=options.get("max_keepalive_connections", 20),
+        keepalive_expiry=options.get("keepalive_expiry", 30.0),
+    )
+    read_timeout = options.get("read_timeout", 30.0)
+    # Соединение устанавливается быстро или не устанавливается: ждем его
+    # отдельно и меньше, чем первые токены ответа
+    timeout = httpx.Timeout(read_timeout, connect=options.get("connect_timeout", 5.0))
+    http2 = options.get("http2", False)
+
+    transport = InstrumentedHTTPTransport(limits=limits, http2=http2)
+    metrics.register("llm_http", transport.snapshot)
+
+    logger.info(
+        f"Created LLM HTTP client (max_connections={limits.max_connections}, "
+        f"keepalive={limits.max_keepalive_connections}/{limits.keepalive_expiry}s, http2={http2})"
+    )
+    return httpx.AsyncClient(transport=transport, timeout=timeout)
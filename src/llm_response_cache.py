@@ -0,0 +1,190 @@
+"""Кэш ответов LLM: LRU/TTL в памяти и опциональный постоянный уровень в PostgreSQL."""
+
+import hashlib
+import json
+import logging
+import time
+from collections import OrderedDict
+
+from src import statements
+from src.instrumented_pool import InstrumentedPool
+from src.types import ChatMessage
+
+logger = logging.getLogger(__name__)
+
+
+def make_cache_key(
+    model: str,
+    temperature: float,
+    max_tokens: int,
+    system_prompt: str | None,
+    messages: list[ChatMessage],
+) -> str:
+    """Получить ключ кэша для запроса к LLM.
+
+    Текст сообщений нормализуется (регистр, пробелы по краям и повторные
+    пробелы), поэтому «Что съесть на завтрак?» и «что  съесть на завтрак?»
+    дают один ключ. Системный промпт хэшируется как есть: его правка
+    сбрасывает все ответы, полученные со старым промптом.
+
+    Args:
+        model: Модель LLM
+        temperature: Температура генерации
+        max_tokens: Максимальная длина ответа
+        system_prompt: Системный промпт
+        messages: Сообщения диалога (без системного промпта)
+
+    Returns:
+        str: SHA-256 канонического JSON запроса (hex)
+    """
+    normalized = [
+        [message["role"], " ".join(message["content"].split()).casefold()] for message in messages
+    ]
+    payload = json.dumps(
+        [model, temperature, max_tokens, system_prompt, normalized],
+        ensure_ascii=False,
+        separators=(",", ":"),
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class LLMResponseCache:
+    """Ограниченный LRU/TTL кэш ответов LLM по ключу запроса.
+
+    Первый уровень - словарь в памяти процесса. Если включен постоянный
+    уровень, промахи памяти проверяются в таблице llm_response_cache (общей
+    для процессов бота и API и переживающей перезапуски), а найденные там
+    ответы поднимаются в память. Ошибки БД не ломают запрос: кэш считается
+    промахнувшимся, и ответ получается от LLM.
+    """
+
+    def __init__(
+        self, max_size: int, ttl_seconds: float, pool: InstrumentedPool | None = None
+    ) -> None:
+        """Инициализация кэша.
+
+        Args:
+            max_size: Максимальное количество ответов в памяти
+            ttl_seconds: Время жизни ответа (сек), одинаковое для обоих уровней
+            pool: Connection pool для второго уровня в таблице llm_response_cache
+                (None - только память)
+        """
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self.pool = pool
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+
+        self.memory_hits = 0
+        self.persistent_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.persistent_errors = 0
+
+    async def get(self, key: str) -> str | None:
+        """Получить ответ из кэша.
+
+        Args:
+            key: Ключ запроса (см. make_cache_key)
+
+        Returns:
+            str | None: Закэшированный ответ или None при промахе
+        """
+        entry = self._entries.get(key)
+        if entry is not None:
+            if time.monotonic() - entry[0] <= self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.memory_hits += 1
+                return entry[1]
+            del self._entries[key]
+
+        if self.pool is not None:
+            response = await self._get_persistent(key)
+            if response is not None:
+                self.persistent_hits += 1
+                self._remember(key, response)
+                return response
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, response: str) -> None:
+        """Сохранить ответ LLM в кэш.
+
+        Args:
+            key: Ключ запроса (см. make_cache_key)
+            response: Ответ LLM
+        """
+        self._remember(key, response)
+        self.stores += 1
+
+        if self.pool is not None:
+            try:
+                async with self.pool.acquire() as connection:
+                    await statements.execute(connection, "upsert_llm_response", key, response)
+            except Exception as e:
+                self.persistent_errors += 1
+                logger.warning(f"Failed to store LLM response in database cache: {e}")
+
+    async def prune(self) -> int:
+        """Удалить из таблицы llm_response_cache ответы старше TTL.
+
+        Returns:
+            int: Количество удаленных ответов (0 без постоянного уровня)
+        """
+        if self.pool is None:
+            return 0
+
+        async with self.pool.acquire() as connection:
+            status = await statements.execute(
+                connection, "delete_expired_llm_responses", float(self.ttl_seconds)
+            )
+
+        deleted = int(status.split()[-1])
+        logger.info(f"Pruned {deleted} expired LLM responses from database cache")
+        return deleted
+
+    def stats(self) -> dict[str, float]:
+        """Получить метрики кэша.
+
+        Returns:
+            dict[str, float]: Попадания по уровням, промахи, hit_ratio и размер кэша
+        """
+        hits = self.memory_hits + self.persistent_hits
+        requests = hits + self.misses
+        return {
+            "size": len(self._entries),
+            "hits": hits,
+            "memory_hits": self.memory_hits,
+            "persistent_hits": self.persistent_hits,
+            "misses": self.misses,
+            "hit_ratio": round(hits / requests, 3) if requests > 0 else 0.0,
+            "stores": self.stores,
+            "persistent_errors": self.persistent_errors,
+        }
+
+    async def _get_persistent(self, key: str) -> str | None:
+        """Найти неустаревший ответ в таблице llm_response_cache."""
+        if self.pool is None:
+            return None
+
+        try:
+            async with self.pool.acquire() as connection:
+                row = await statements.fetchrow(
+                    connection, "select_llm_response", key, float(self.ttl_seconds)
+                )
+        except Exception as e:
+            self.persistent_errors += 1
+            logger.warning(f"Failed to read LLM response from database cache: {e}")
+            return None
+
+        return None if row is None else str(row["response"])
+
+    def _remember(self, key: str, response: str) -> None:
+        """Положить ответ в память, вытеснив самые давно использованные."""
+        if self.max_size <= 0:
+            return
+
+        self._entries[key] = (time.monotonic(), response)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
@@ -1,4 +1,5 @@
 import logging
+from collections.abc import AsyncIterator
 
 from src.protocols import ConversationStorageProtocol, LLMClientProtocol
 from src.types import ChatMessage
@@ -26,8 +27,41 @@ class MessageHandler:
         response = await self.llm_client.get_response(messages)
 
         # Сохраняем сообщение пользователя и ответ ассистента в историю
-        await self.conversation.add_message(user_id, chat_id, "user", text)
-        await self.conversation.add_message(user_id, chat_id, "assistant", response)
+        await self.conversation.add_turn(user_id, chat_id, text, response)
 
         logger.info(f"Response sent to user {user_id}")
         return response
+
+    async def handle_message_stream(
+        self, user_id: int, chat_id: int, text: str
+    ) -> AsyncIterator[str]:
+        """Обработать сообщение, отдавая ответ LLM по частям.
+
+        Диалог сохраняется в историю после получения полного ответа.
+
+        Args:
+            user_id: ID пользователя Telegram
+            chat_id: ID чата
+            text: Текст сообщения пользователя
+
+        Yields:
+            str: Chunks текста ответа от LLM
+
+        Raises:
+            Exception: Если LLM вернула пустой ответ или произошла ошибка LLM
+        """
+        logger.info(f"Received message from user {user_id} in chat {chat_id}: {text}")
+
+        history = await self.conversation.get_history(user_id, chat_id)
+        messages = [*history, ChatMessage(role="user", content=text)]
+
+        response = ""
+        async for chunk in self.llm_client.get_response_stream(messages):
+            response += chunk
+            yield chunk
+
+        if not response:
+            raise Exception("LLM returned empty response")
+
+        await self.conversation.add_turn(user_id, chat_id, text, response)
+        logger.info(f"Streamed response sent to user {user_id}")
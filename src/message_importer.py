@@ -0,0 +1,261 @@
+"""Пакетная загрузка архивов сообщений (CSV/NDJSON) в PostgreSQL через COPY."""
+
+import csv
+import json
+import logging
+import time
+from collections.abc import Iterator
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Literal
+
+from src.daily_stats_rollup import DailyStatsRollup
+from src.instrumented_pool import InstrumentedPool
+from src.message_partition_manager import MessagePartitionManager
+from src.message_write_queue import MESSAGE_COLUMNS, MessageRecord
+
+logger = logging.getLogger(__name__)
+
+ImportFormat = Literal["csv", "ndjson"]
+
+SOURCES = ("telegram", "web")
+ROLES = ("user", "assistant")
+
+
+def detect_format(path: Path) -> ImportFormat:
+    """Определить формат архива по расширению файла.
+
+    Args:
+        path: Путь к архиву
+
+    Returns:
+        ImportFormat: 'csv' или 'ndjson'
+
+    Raises:
+        ValueError: Если расширение не поддерживается
+    """
+    suffix = path.suffix.lower()
+    if suffix == ".csv":
+        return "csv"
+    if suffix in (".ndjson", ".jsonl"):
+        return "ndjson"
+    raise ValueError(f"Cannot detect format of {path.name}, use .csv, .ndjson or .jsonl")
+
+
+def _int_field(row: dict[str, Any], name: str) -> int:
+    """Получить целочисленное поле строки архива (число JSON или строка CSV)."""
+    value = row[name]
+    if isinstance(value, bool) or not isinstance(value, int | str):
+        raise ValueError(f"Invalid {name}: {value!r}")
+    try:
+        return int(value)
+    except ValueError as e:
+        raise ValueError(f"Invalid {name}: {value!r}") from e
+
+
+def _str_field(row: dict[str, Any], name: str) -> str:
+    """Получить строковое поле строки архива (null и другие типы JSON отклоняются)."""
+    value = row[name]
+    if not isinstance(value, str):
+        raise ValueError(f"Invalid {name}: {value!r}")
+    return value
+
+
+class MessageImporter:
+    """Загрузка сообщений из CSV или NDJSON пачками через copy_records_to_table.
+
+    Файл читается построчно, в памяти держится одна пачка. Формат совместим
+    с выгрузкой /api/export/messages: id и message_length из файла
+    игнорируются (message_length считается по content), source необязателен.
+    Перед записью пачки создаются партиции messages для ее месяцев.
+    """
+
+    def __init__(
+        self,
+        pool: InstrumentedPool,
+        batch_size: int = 5000,
+        default_source: str = "telegram",
+        partition_manager: MessagePartitionManager | None = None,
+        stats_rollup: DailyStatsRollup | None = None,
+    ) -> None:
+        """Инициализация загрузки.
+
+        Args:
+            pool: Connection pool
+            batch_size: Количество сообщений в одном COPY
+            default_source: Источник для строк без колонки source
+            partition_manager: Менеджер партиций (None - не создавать партиции)
+            stats_rollup: Дневные агрегаты, в которых отмечаются загруженные дни
+                (None - не отмечать)
+
+        Raises:
+            ValueError: Если default_source не поддерживается
+        """
+        if default_source not in SOURCES:
+            raise ValueError(f"Invalid source: {default_source}. Must be one of: telegram, web")
+
+        self.pool = pool
+        self.batch_size = batch_size
+        self.default_source = default_source
+        self.partition_manager = partition_manager
+        self.stats_rollup = stats_rollup
+
+        self.imported = 0
+        self.skipped = 0
+        self.batches = 0
+        self.elapsed_seconds = 0.0
+        self._months: set[tuple[int, int]] = set()
+        # Самый ранний день загруженных сообщений (для пересчета агрегатов)
+        self._earliest_day: date | None = None
+
+    def parse(self, row: dict[str, Any]) -> MessageRecord:
+        """Преобразовать строку архива в запись для COPY.
+
+        Args:
+            row: Поля сообщения (значения CSV - строки, NDJSON - типы JSON)
+
+        Returns:
+            MessageRecord: Запись в порядке MESSAGE_COLUMNS
+
+        Raises:
+            ValueError: Если поле отсутствует, равно null или имеет невалидное значение
+        """
+        try:
+            user_id = _int_field(row, "user_id")
+            chat_id = _int_field(row, "chat_id")
+            role = _str_field(row, "role")
+            content = _str_field(row, "content")
+        except KeyError as e:
+            raise ValueError(f"Missing field {e}") from e
+
+        if role not in ROLES:
+            raise ValueError(f"Invalid role: {role}")
+
+        source = row.get("source") or self.default_source
+        if source not in SOURCES:
+            raise ValueError(f"Invalid source: {source}")
+
+        created_at_value = row.get("created_at")
+        if created_at_value:
+            created_at = datetime.fromisoformat(str(created_at_value))
+            if created_at.tzinfo is not None:
+                # Колонка created_at без часового пояса: переводим в локальное время
+                created_at = created_at.astimezone().replace(tzinfo=None)
+        else:
+            created_at = datetime.now()
+
+        return (user_id, chat_id, role, content, len(content), source, created_at)
+
+    def read(self, path: Path, import_format: ImportFormat) -> Iterator[MessageRecord]:
+        """Построчно прочитать архив, пропуская невалидные строки.
+
+        Args:
+            path: Путь к архиву
+            import_format: Формат архива
+
+        Yields:
+            MessageRecord: Очередная запись для COPY
+        """
+        with path.open(encoding="utf-8", newline="") as file:
+            rows: Iterator[dict[str, Any] | str]
+            if import_format == "csv":
+                rows = csv.DictReader(file)
+            else:
+                rows = (line for line in file if line.strip())
+
+            for line_number, row in enumerate(rows, start=1):
+                try:
+                    fields = json.loads(row) if isinstance(row, str) else row
+                    if not isinstance(fields, dict):
+                        raise ValueError("Record is not an object")
+                    record = self.parse(fields)
+                except ValueError as e:
+                    self.skipped += 1
+                    logger.warning(f"Skipping record {line_number}: {e}")
+                    continue
+                yield record
+
+    async def import_file(self, path: Path, import_format: ImportFormat) -> dict[str, float]:
+        """Загрузить архив в messages.
+
+        Args:
+            path: Путь к архиву
+            import_format: Формат архива
+
+        Дни загруженных сообщений (в том числе при ошибке посреди файла)
+        отмечаются для пересчета дневных агрегатов.
+
+        Returns:
+            dict[str, float]: Итоги загрузки (см. stats)
+        """
+        started_at = time.perf_counter()
+        batch: list[MessageRecord] = []
+
+        try:
+            for record in self.read(path, import_format):
+                batch.append(record)
+                if len(batch) >= self.batch_size:
+                    await self._write(batch)
+                    batch = []
+                    self._report_progress(started_at)
+
+            if batch:
+                await self._write(batch)
+        finally:
+            if self.stats_rollup is not None and self._earliest_day is not None:
+                await self.stats_rollup.mark_dirty(self._earliest_day)
+
+        self.elapsed_seconds = time.perf_counter() - started_at
+        logger.info(
+            f"Import of {path.name} done: {self.imported} messages, {self.skipped} skipped, "
+            f"{self.batches} batches in {self.elapsed_seconds:.1f}s "
+            f"({self._rate(self.elapsed_seconds):.0f} msg/s)"
+        )
+        return self.stats()
+
+    def stats(self) -> dict[str, float]:
+        """Получить итоги загрузки.
+
+        Returns:
+            dict[str, float]: Загружено, пропущено, пачек, время и скорость
+        """
+        return {
+            "imported": self.imported,
+            "skipped": self.skipped,
+            "batches": self.batches,
+            "elapsed_seconds": round(self.elapsed_seconds, 2),
+            "messages_per_second": round(self._rate(self.elapsed_seconds), 1),
+        }
+
+    async def _write(self, batch: list[MessageRecord]) -> None:
+        """Создать недостающие партиции и записать пачку через COPY."""
+        if self.partition_manager is not None:
+            months = {(record[6].year, record[6].month) for record in batch} - self._months
+            if months:
+                await self.partition_manager.ensure_partitions(
+                    date(year, month, 1) for year, month in months
+                )
+                self._months |= months
+
+        async with self.pool.acquire() as connection:
+            await connection.copy_records_to_table(
+                "messages", records=batch, columns=MESSAGE_COLUMNS
+            )
+
+        self.imported += len(batch)
+        self.batches += 1
+        earliest_day = min(record[6] for record in batch).date()
+        if self._earliest_day is None or earliest_day < self._earliest_day:
+            self._earliest_day = earliest_day
+
+    def _report_progress(self, started_at: float) -> None:
+        """Залогировать прогресс и текущую скорость загрузки."""
+        elapsed = time.perf_counter() - started_at
+        logger.info(
+            f"Imported {self.imported} messages ({self.skipped} skipped) "
+            f"in {elapsed:.1f}s, {self._rate(elapsed):.0f} msg/s"
+        )
+
+    def _rate(self, elapsed: float) -> float:
+        """Скорость загрузки (сообщений в секунду)."""
+        return self.imported / elapsed if elapsed > 0 else 0.0
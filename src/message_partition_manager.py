@@ -0,0 +1,226 @@
+"""Обслуживание месячных партиций таблицы messages."""
+
+import asyncio
+import logging
+import re
+from collections.abc import Iterable
+from datetime import date
+from typing import Any
+
+import asyncpg  # type: ignore[import-untyped]
+
+from src.instrumented_pool import InstrumentedPool
+
+logger = logging.getLogger(__name__)
+
+# Ключ advisory lock: обслуживание выполняет только один процесс одновременно
+MAINTENANCE_LOCK_KEY = 727_001
+
+_PARTITION_NAME_RE = re.compile(r"^messages_y(\d{4})m(\d{2})$")
+
+
+def add_months(month: date, months: int) -> date:
+    """Сдвинуть первое число месяца на заданное количество месяцев.
+
+    Args:
+        month: Любая дата месяца
+        months: Сдвиг в месяцах (может быть отрицательным)
+
+    Returns:
+        date: Первое число получившегося месяца
+    """
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    """Имя партиции messages для месяца (messages_yYYYYmMM)."""
+    return f"messages_y{month.year:04d}m{month.month:02d}"
+
+
+def parse_partition_month(name: str) -> date | None:
+    """Получить месяц партиции по ее имени (None для messages_default и чужих таблиц)."""
+    match = _PARTITION_NAME_RE.match(name)
+    if match is None:
+        return None
+    return date(int(match.group(1)), int(match.group(2)), 1)
+
+
+class MessagePartitionManager:
+    """Создание будущих и отсоединение устаревших месячных партиций messages.
+
+    Будущие партиции создаются заранее, чтобы новые сообщения не попадали
+    в messages_default. Если строки месяца уже попали в messages_default,
+    они переносятся в новую партицию в той же транзакции. Партиции старше
+    retention_months отсоединяются (DETACH PARTITION) и остаются отдельными
+    таблицами для архивации.
+    """
+
+    def __init__(self, pool: InstrumentedPool, months_ahead: int, retention_months: int) -> None:
+        """Инициализация менеджера.
+
+        Args:
+            pool: Connection pool
+            months_ahead: Сколько месяцев вперед держать созданными
+            retention_months: Сколько месяцев хранить в messages (0 - не отсоединять)
+        """
+        self.pool = pool
+        self.months_ahead = months_ahead
+        self.retention_months = retention_months
+
+    async def run(self, today: date | None = None) -> None:
+        """Выполнить обслуживание партиций под advisory lock.
+
+        Args:
+            today: Текущая дата (для тестов)
+        """
+        today = today or date.today()
+        async with self.pool.acquire() as connection, connection.transaction():
+            locked = await connection.fetchval(
+                "SELECT pg_try_advisory_xact_lock($1)", MAINTENANCE_LOCK_KEY
+            )
+            if not locked:
+                logger.info("Partition maintenance is running in another process, skipping")
+                return
+
+            existing = await self._list_partitions(connection)
+            created = await self._create_future(connection, existing, today)
+            detached = await self._detach_expired(connection, existing, today)
+
+        logger.info(
+            f"Partition maintenance done: created={created or 'none'}, "
+            f"detached={detached or 'none'}"
+        )
+
+    async def ensure_partitions(self, months: Iterable[date]) -> list[str]:
+        """Создать партиции для месяцев, в которые будут записаны сообщения.
+
+        Нужно перед загрузкой исторических данных: без партиции строки
+        попадают в messages_default. Ждет завершения обслуживания в другом процессе.
+
+        Args:
+            months: Даты внутри нужных месяцев
+
+        Returns:
+            list[str]: Имена созданных партиций
+        """
+        async with self.pool.acquire() as connection, connection.transaction():
+            await connection.execute("SELECT pg_advisory_xact_lock($1)", MAINTENANCE_LOCK_KEY)
+            existing = await self._list_partitions(connection)
+            first_days = sorted({add_months(month, 0) for month in months})
+            created = await self._create_months(connection, existing, first_days)
+
+        if created:
+            logger.info(f"Partitions created: {created}")
+        return created
+
+    async def run_periodically(self, interval_seconds: float) -> None:
+        """Периодически выполнять обслуживание партиций.
+
+        Args:
+            interval_seconds: Интервал между запусками (сек)
+        """
+        while True:
+            await asyncio.sleep(interval_seconds)
+            try:
+                await self.run()
+            except Exception as e:
+                logger.error(f"Partition maintenance failed: {e}", exc_info=True)
+
+    async def _list_partitions(self, connection: Any) -> set[str]:
+        """Получить имена партиций, присоединенных к messages."""
+        rows = await connection.fetch(
+            """
+            SELECT child.relname AS name
+            FROM pg_inherits
+            JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+            JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+            WHERE parent.relname = 'messages'
+            """
+        )
+        return {row["name"] for row in rows}
+
+    async def _create_future(self, connection: Any, existing: set[str], today: date) -> list[str]:
+        """Создать недостающие партиции с текущего месяца до months_ahead вперед."""
+        months = [add_months(today, offset) for offset in range(self.months_ahead + 1)]
+        return await self._create_months(connection, existing, months)
+
+    async def _create_months(
+        self, connection: Any, existing: set[str], months: Iterable[date]
+    ) -> list[str]:
+        """Создать недостающие партиции для месяцев (первых чисел месяцев)."""
+        created: list[str] = []
+        for month in months:
+            name = partition_name(month)
+            if name in existing:
+                continue
+
+            try:
+                # Savepoint: ошибка одной партиции не откатывает остальные
+                async with connection.transaction():
+                    await self._create_partition(connection, name, month)
+            except asyncpg.PostgresError as e:
+                logger.error(f"Failed to create partition {name}: {e}")
+                continue
+
+            existing.add(name)
+            created.append(name)
+        return created
+
+    async def _create_partition(self, connection: Any, name: str, month: date) -> None:
+        """Создать партицию месяца, перенеся в нее строки месяца из messages_default.
+
+        PostgreSQL не создает партицию, если подходящие строки уже лежат
+        в default-партиции. Тогда партиция создается отдельной таблицей,
+        строки переносятся в нее и она присоединяется (ATTACH PARTITION).
+        Default-партиция заблокирована до конца транзакции, поэтому новые
+        строки месяца не попадают в нее между переносом и присоединением.
+        """
+        next_month = add_months(month, 1)
+        bounds = f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month.isoformat()}')"
+        await connection.execute("LOCK TABLE messages_default IN ACCESS EXCLUSIVE MODE")
+        has_rows = await connection.fetchval(
+            """
+            SELECT EXISTS (
+                SELECT 1 FROM messages_default
+                WHERE created_at >= $1::date AND created_at < $2::date
+            )
+            """,
+            month,
+            next_month,
+        )
+        if not has_rows:
+            await connection.execute(f"CREATE TABLE {name} PARTITION OF messages {bounds}")
+            return
+
+        await connection.execute(f"CREATE TABLE {name} (LIKE messages INCLUDING DEFAULTS)")
+        moved = await connection.execute(
+            f"""
+            WITH moved AS (
+                DELETE FROM messages_default
+                WHERE created_at >= $1::date AND created_at < $2::date
+                RETURNING *
+            )
+            INSERT INTO {name} SELECT * FROM moved
+            """,
+            month,
+            next_month,
+        )
+        await connection.execute(f"ALTER TABLE messages ATTACH PARTITION {name} {bounds}")
+        logger.info(f"Moved rows from messages_default to partition {name}: {moved}")
+
+    async def _detach_expired(self, connection: Any, existing: set[str], today: date) -> list[str]:
+        """Отсоединить партиции, целиком вышедшие за retention_months."""
+        if self.retention_months <= 0:
+            return []
+
+        oldest_kept = add_months(today, -self.retention_months)
+        detached: list[str] = []
+        for name in sorted(existing):
+            month = parse_partition_month(name)
+            if month is None or month >= oldest_kept:
+                continue
+
+            await connection.execute(f"ALTER TABLE messages DETACH PARTITION {name}")
+            detached.append(name)
+        return detached
@@ -0,0 +1,219 @@
+"""Асинхронная write-behind очередь для записи сообщений в PostgreSQL."""
+
+import asyncio
+import contextlib
+import logging
+import time
+from datetime import datetime
+
+import asyncpg  # type: ignore[import-untyped]
+
+from src.instrumented_pool import InstrumentedPool
+
+logger = logging.getLogger(__name__)
+
+# Запись для COPY: user_id, chat_id, role, content, message_length, source, created_at
+MessageRecord = tuple[int, int, str, str, int, str, datetime]
+
+MESSAGE_COLUMNS = [
+    "user_id",
+    "chat_id",
+    "role",
+    "content",
+    "message_length",
+    "source",
+    "created_at",
+]
+
+
+def _is_rejected(error: Exception) -> bool:
+    """Пачку отклонила сама БД (данные, схема), а не обрыв соединения или перегрузка."""
+    return isinstance(error, asyncpg.PostgresError) and not isinstance(
+        error,
+        asyncpg.PostgresConnectionError
+        | asyncpg.exceptions.OperatorInterventionError
+        | asyncpg.exceptions.InsufficientResourcesError,
+    )
+
+
+class MessageWriteQueue:
+    """Ограниченная очередь сообщений с фоновой пакетной записью через COPY.
+
+    Сообщения попадают в буфер, фоновый flusher записывает их пачками через
+    copy_records_to_table по достижении batch_size или по истечении flush_interval.
+    Когда в буфере нет места для всех записей вызова, put() ждет его
+    освобождения (backpressure), так что буфер не превышает max_size.
+
+    Пачка, которую БД отклоняет max_attempts раз подряд (невалидные данные,
+    нет партиции), пишется в лог и отбрасывается, чтобы не блокировать очередь.
+    При обрыве соединения пачка повторяется без ограничения.
+    """
+
+    def __init__(
+        self,
+        pool: InstrumentedPool,
+        max_size: int,
+        batch_size: int,
+        flush_interval: float,
+        max_attempts: int = 5,
+    ) -> None:
+        """Инициализация очереди.
+
+        Args:
+            pool: Connection pool, в который пишутся пачки
+            max_size: Максимальное количество сообщений в буфере
+            batch_size: Размер пачки, при котором запись запускается сразу
+            flush_interval: Максимальное время ожидания перед записью (сек)
+            max_attempts: Сколько раз подряд БД может отклонить пачку до ее отбрасывания
+        """
+        self.pool = pool
+        self.max_size = max_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_attempts = max_attempts
+
+        self._buffer: list[MessageRecord] = []
+        self._space = asyncio.Condition()
+        self._wakeup = asyncio.Event()
+        self._write_lock = asyncio.Lock()
+        self._task: asyncio.Task[None] | None = None
+        # Сколько раз подряд БД отклонила пачку из начала буфера
+        self._rejections = 0
+
+        self.enqueued = 0
+        self.written = 0
+        self.flushes = 0
+        self.failures = 0
+        self.dropped = 0
+        self.max_depth = 0
+        self.last_flush_ms = 0.0
+        self._total_flush_ms = 0.0
+
+    async def start(self) -> None:
+        """Запустить фоновый flusher и зарегистрировать сброс буфера при закрытии pool."""
+        if self._task is not None:
+            return
+
+        self._task = asyncio.create_task(self._run(), name="message-write-queue")
+        self.pool.add_before_close_callback(self.stop)
+        logger.info(
+            f"Message write queue started (max_size={self.max_size}, "
+            f"batch_size={self.batch_size}, flush_interval={self.flush_interval}s)"
+        )
+
+    async def stop(self) -> None:
+        """Остановить flusher и записать все оставшиеся сообщения."""
+        if self._task is not None:
+            # Отменяем flusher только между записями, чтобы не потерять взятую пачку
+            async with self._write_lock:
+                self._task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await self._task
+            self._task = None
+
+        await self.flush()
+
+        if self._buffer:
+            logger.error(f"Message write queue stopped with {len(self._buffer)} unwritten messages")
+        else:
+            logger.info("Message write queue stopped, all messages flushed")
+
+    async def put(self, records: list[MessageRecord]) -> None:
+        """Поставить сообщения в очередь на запись.
+
+        Ждет, пока в буфере не появится место для всех записей (backpressure).
+        Вызов с записями больше max_size допускается только в пустой буфер.
+
+        Args:
+            records: Записи сообщений для вставки
+        """
+
+        def has_space() -> bool:
+            return not self._buffer or len(self._buffer) + len(records) <= self.max_size
+
+        async with self._space:
+            if not has_space():
+                # Не ждем таймера flusher: место освобождает только запись в БД
+                self._wakeup.set()
+                await self._space.wait_for(has_space)
+            self._buffer.extend(records)
+
+        self.enqueued += len(records)
+        self.max_depth = max(self.max_depth, len(self._buffer))
+
+        if len(self._buffer) >= self.batch_size:
+            self._wakeup.set()
+
+    async def flush(self) -> None:
+        """Записать в БД все сообщения, поставленные в очередь до вызова."""
+        async with self._write_lock:
+            while self._buffer:
+                batch = self._buffer[: self.batch_size]
+                del self._buffer[: self.batch_size]
+
+                try:
+                    await self._write(batch)
+                    self._rejections = 0
+                except Exception as e:
+                    self.failures += 1
+                    if _is_rejected(e):
+                        self._rejections += 1
+                    if self._rejections >= self.max_attempts:
+                        # БД стабильно отклоняет пачку: отбрасываем ее, очередь идет дальше
+                        self._rejections = 0
+                        self.dropped += len(batch)
+                        logger.error(
+                            f"Dropped {len(batch)} messages rejected "
+                            f"{self.max_attempts} times in a row: {e}",
+                            exc_info=True,
+                        )
+                        continue
+                    # Возвращаем пачку в начало буфера, повторим при следующем сбросе
+                    self._buffer[:0] = batch
+                    logger.error(f"Failed to flush {len(batch)} messages: {e}", exc_info=True)
+                    break
+                finally:
+                    async with self._space:
+                        self._space.notify_all()
+
+    def stats(self) -> dict[str, float]:
+        """Получить метрики очереди.
+
+        Returns:
+            dict[str, float]: Глубина очереди, счетчики и латентность записи
+        """
+        return {
+            "depth": len(self._buffer),
+            "max_depth": self.max_depth,
+            "enqueued": self.enqueued,
+            "written": self.written,
+            "flushes": self.flushes,
+            "failures": self.failures,
+            "dropped": self.dropped,
+            "last_flush_ms": round(self.last_flush_ms, 2),
+            "avg_flush_ms": (
+                round(self._total_flush_ms / self.flushes, 2) if self.flushes > 0 else 0.0
+            ),
+        }
+
+    async def _run(self) -> None:
+        """Фоновый цикл: сброс по размеру пачки или по таймеру."""
+        while True:
+            with contextlib.suppress(TimeoutError):
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            self._wakeup.clear()
+            await self.flush()
+
+    async def _write(self, batch: list[MessageRecord]) -> None:
+        """Записать пачку сообщений через COPY."""
+        started_at = time.perf_counter()
+        async with self.pool.acquire() as connection:
+            await connection.copy_records_to_table(
+                "messages", records=batch, columns=MESSAGE_COLUMNS
+            )
+
+        self.last_flush_ms = (time.perf_counter() - started_at) * 1000
+        self._total_flush_ms += self.last_flush_ms
+        self.flushes += 1
+        self.written += len(batch)
+        logger.info(f"Flushed {len(batch)} messages in {self.last_flush_ms:.1f}ms")
@@ -0,0 +1,64 @@
+"""Реестр источников метрик (процесса бота или приложения API)."""
+
+import asyncio
+import logging
+from collections.abc import Callable
+
+logger = logging.getLogger(__name__)
+
+
+class MetricsRegistry:
+    """Источники метрик одного процесса бота или одного приложения API.
+
+    Реестр создается владельцем компонентов (main, lifespan приложения)
+    и передается туда, где компоненты регистрируются, поэтому несколько
+    приложений в одном процессе не смешивают и не перетирают метрики.
+    """
+
+    def __init__(self) -> None:
+        """Инициализация пустого реестра."""
+        # Имя источника -> функция, возвращающая снимок метрик
+        self._sources: dict[str, Callable[[], dict[str, float]]] = {}
+
+    def register(self, name: str, snapshot: Callable[[], dict[str, float]]) -> None:
+        """Зарегистрировать источник метрик.
+
+        Args:
+            name: Имя источника (например, 'database_pool')
+            snapshot: Функция без аргументов, возвращающая снимок метрик
+        """
+        self._sources[name] = snapshot
+
+    def unregister(self, name: str) -> None:
+        """Удалить источник метрик.
+
+        Args:
+            name: Имя источника
+        """
+        self._sources.pop(name, None)
+
+    def collect(self) -> dict[str, dict[str, float]]:
+        """Собрать снимок метрик всех зарегистрированных источников.
+
+        Returns:
+            dict[str, dict[str, float]]: Метрики по именам источников
+        """
+        result: dict[str, dict[str, float]] = {}
+        for name, snapshot in list(self._sources.items()):
+            try:
+                result[name] = snapshot()
+            except Exception as e:
+                logger.error(f"Failed to collect metrics from {name}: {e}", exc_info=True)
+        return result
+
+
+async def log_metrics_periodically(metrics: MetricsRegistry, interval_seconds: float) -> None:
+    """Периодически писать снимок метрик в лог (для процессов без HTTP API).
+
+    Args:
+        metrics: Реестр метрик процесса
+        interval_seconds: Интервал между снимками (сек)
+    """
+    while True:
+        await asyncio.sleep(interval_seconds)
+        logger.info(f"Metrics snapshot: {metrics.collect()}")
@@ -0,0 +1,23 @@
+"""Перцентили по скользящему окну замеров длительности для метрик."""
+
+from collections.abc import Collection
+
+# Количество последних замеров для расчета перцентилей
+SAMPLES_WINDOW = 1000
+
+
+def percentile_ms(samples: Collection[float], percent: float) -> float:
+    """Получить перцентиль по окну замеров.
+
+    Args:
+        samples: Замеры длительности в секундах (например, deque(maxlen=SAMPLES_WINDOW))
+        percent: Доля от 0 до 1 (1.0 - максимум)
+
+    Returns:
+        float: Перцентиль в миллисекундах (0.0 для пустого окна)
+    """
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(len(ordered) * percent))
+    return round(ordered[index] * 1000, 2)
@@ -1,5 +1,6 @@
 """Protocol интерфейсы для зависимостей."""
 
+from collections.abc import AsyncIterator
 from typing import Protocol
 
 from src.types import ChatMessage
@@ -12,6 +13,12 @@ class ConversationStorageProtocol(Protocol):
         """Добавить сообщение в историю диалога."""
         ...
 
+    async def add_turn(
+        self, user_id: int, chat_id: int, user_content: str, assistant_content: str
+    ) -> None:
+        """Добавить в историю сообщение пользователя и ответ ассистента."""
+        ...
+
     async def get_history(self, user_id: int, chat_id: int) -> list[ChatMessage]:
         """Получить историю диалога для пользователя и чата."""
         ...
@@ -27,3 +34,7 @@ class LLMClientProtocol(Protocol):
     async def get_response(self, messages: list[ChatMessage]) -> str:
         """Получить ответ от LLM на основе истории сообщений."""
         ...
+
+    def get_response_stream(self, messages: list[ChatMessage]) -> AsyncIterator[str]:
+        """Получить ответ от LLM по частям по мере генерации."""
+        ...
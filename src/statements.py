@@ -0,0 +1,231 @@
+"""Реестр именованных SQL-запросов для горячих путей.
+
+Запросы выполняются как текст через соединение asyncpg: его встроенный кэш
+prepared statements (statement_cache_size на соединение) подготавливает каждый
+запрос при первом вызове и дальше переиспользует. Читающие statements
+подготавливаются заранее: init hook pool выполняет их на каждом новом
+соединении с параметрами, которые ничего не находят (warm_up_statements).
+Явные PreparedStatement между acquire не хранятся: asyncpg запрещает их
+использование после возврата соединения в pool. Размер кэша должен вмещать
+весь реестр (см. check_statement_cache_size).
+"""
+
+import logging
+from datetime import date, datetime
+from typing import Any
+
+import asyncpg  # type: ignore[import-untyped]
+
+logger = logging.getLogger(__name__)
+
+STATEMENTS: dict[str, str] = {
+    # DatabaseConversation
+    "insert_message": """
+        INSERT INTO messages (user_id, chat_id, role, content, message_length, source, created_at)
+        VALUES ($1, $2, $3, $4, $5, $6, $7)
+    """,
+    "insert_turn": """
+        INSERT INTO messages (user_id, chat_id, role, content, message_length, source, created_at)
+        SELECT $1, $2, t.role, t.content, t.message_length, $6, $7
+        FROM unnest($3::varchar[], $4::text[], $5::int[])
+            AS t(role, content, message_length)
+    """,
+    "select_history": """
+        SELECT role, content, created_at, message_length
+        FROM messages
+        WHERE user_id = $1 AND chat_id = $2 AND deleted_at IS NULL
+        ORDER BY created_at DESC, id DESC
+        LIMIT $3
+    """,
+    "soft_delete_history": """
+        UPDATE messages
+        SET deleted_at = $1
+        WHERE user_id = $2 AND chat_id = $3 AND deleted_at IS NULL
+    """,
+    # WebSessionStore
+    "select_web_session": """
+        SELECT user_id FROM web_sessions WHERE session_id = $1
+    """,
+    "insert_web_session": """
+        INSERT INTO web_sessions (session_id)
+        VALUES ($1)
+        ON CONFLICT (session_id) DO NOTHING
+        RETURNING user_id
+    """,
+    # LLMResponseCache (постоянный уровень)
+    "select_llm_response": """
+        SELECT response
+        FROM llm_response_cache
+        WHERE key = $1 AND created_at > NOW() - make_interval(secs => $2)
+    """,
+    "upsert_llm_response": """
+        INSERT INTO llm_response_cache (key, response)
+        VALUES ($1, $2)
+        ON CONFLICT (key) DO UPDATE SET response = EXCLUDED.response, created_at = NOW()
+    """,
+    "delete_expired_llm_responses": """
+        DELETE FROM llm_response_cache
+        WHERE created_at <= NOW() - make_interval(secs => $1)
+    """,
+    # RealStatCollector
+    "stats_dashboard_scan": """
+        SELECT
+            GROUPING(DATE(created_at)) = 1 as is_total,
+            DATE(created_at) as date,
+            COUNT(*) FILTER (WHERE created_at >= $2) as current_messages,
+            COUNT(*) FILTER (WHERE created_at < $2) as previous_messages,
+            COUNT(DISTINCT (user_id, chat_id))
+                FILTER (WHERE created_at >= $2) as current_conversations,
+            COUNT(DISTINCT (user_id, chat_id))
+                FILTER (WHERE created_at < $2) as previous_conversations
+        FROM messages
+        WHERE deleted_at IS NULL
+            AND created_at >= $1
+        GROUP BY GROUPING SETS ((DATE(created_at)), ())
+    """,
+    # RealStatCollector в режиме дневных агрегатов
+    "rollup_totals_since": """
+        SELECT
+            (SELECT COALESCE(SUM(message_count), 0)::bigint
+             FROM message_daily_stats
+             WHERE day >= $1) as total_messages,
+            (SELECT COUNT(*)
+             FROM (SELECT DISTINCT user_id, chat_id
+                   FROM message_daily_conversations
+                   WHERE day >= $1) AS conversations) as active_conversations
+    """,
+    "rollup_totals_between": """
+        SELECT
+            (SELECT COALESCE(SUM(message_count), 0)::bigint
+             FROM message_daily_stats
+             WHERE day >= $1 AND day < $2) as total_messages,
+            (SELECT COUNT(*)
+             FROM (SELECT DISTINCT user_id, chat_id
+                   FROM message_daily_conversations
+                   WHERE day >= $1 AND day < $2) AS conversations) as active_conversations
+    """,
+    "rollup_sketch_totals_since": """
+        SELECT
+            (SELECT COALESCE(SUM(message_count), 0)::bigint
+             FROM message_daily_stats
+             WHERE day >= $1) as total_messages,
+            ARRAY(SELECT registers FROM message_daily_hll WHERE day >= $1) as sketches
+    """,
+    "rollup_sketch_totals_between": """
+        SELECT
+            (SELECT COALESCE(SUM(message_count), 0)::bigint
+             FROM message_daily_stats
+             WHERE day >= $1 AND day < $2) as total_messages,
+            ARRAY(
+                SELECT registers FROM message_daily_hll WHERE day >= $1 AND day < $2
+            ) as sketches
+    """,
+    "rollup_daily_counts": """
+        SELECT
+            day as date,
+            SUM(message_count)::bigint as message_count
+        FROM message_daily_stats
+        WHERE day >= $1
+        GROUP BY day
+        ORDER BY date ASC
+    """,
+}
+
+
+# Параметры, с которыми читающие statements выполняются при прогреве соединения:
+# запросы ничего не находят (границы в далеком будущем, LIMIT 0), но попадают
+# в кэш statements asyncpg. Пишущие statements не прогреваются: их нельзя
+# выполнить без изменения данных
+_FAR_FUTURE = datetime(9999, 1, 1)
+WARM_UP_ARGS: dict[str, tuple[Any, ...]] = {
+    "select_history": (0, 0, 0),
+    "select_web_session": ("",),
+    "select_llm_response": ("", 0.0),
+    "stats_dashboard_scan": (_FAR_FUTURE, _FAR_FUTURE),
+    "rollup_totals_since": (_FAR_FUTURE.date(),),
+    "rollup_totals_between": (_FAR_FUTURE.date(), date.max),
+    "rollup_sketch_totals_since": (_FAR_FUTURE.date(),),
+    "rollup_sketch_totals_between": (_FAR_FUTURE.date(), date.max),
+    "rollup_daily_counts": (_FAR_FUTURE.date(),),
+}
+
+
+def check_statement_cache_size(statement_cache_size: int) -> None:
+    """Предупредить, если кэш statements asyncpg не вмещает реестр.
+
+    Args:
+        statement_cache_size: Размер кэша prepared statements на соединение
+    """
+    if statement_cache_size < len(STATEMENTS):
+        logger.warning(
+            f"statement_cache_size={statement_cache_size} is smaller than the statement "
+            f"registry ({len(STATEMENTS)}), hot queries will be re-prepared"
+        )
+
+
+async def warm_up_statements(connection: Any) -> int:
+    """Подготовить читающие statements реестра в кэше соединения.
+
+    Каждый statement из WARM_UP_ARGS выполняется один раз тем же путем,
+    что и в горячих запросах, поэтому первый запрос клиента на этом
+    соединении не платит за prepare. Ошибка statement (например, миграции
+    еще не применены) пишется в лог и не мешает остальным.
+
+    Args:
+        connection: Соединение asyncpg (из pool или прямое)
+
+    Returns:
+        int: Количество подготовленных statements
+    """
+    prepared = 0
+    for name, args in WARM_UP_ARGS.items():
+        try:
+            await connection.fetch(STATEMENTS[name], *args)
+            prepared += 1
+        except asyncpg.PostgresError as e:
+            logger.warning(f"Failed to warm up statement {name}: {e}")
+    return prepared
+
+
+async def fetch(connection: Any, name: str, *args: Any) -> list[Any]:
+    """Выполнить statement реестра и вернуть все строки.
+
+    Args:
+        connection: Соединение asyncpg (из pool или прямое)
+        name: Имя statement в реестре
+        *args: Параметры запроса
+
+    Returns:
+        list: Строки результата
+    """
+    rows: list[Any] = await connection.fetch(STATEMENTS[name], *args)
+    return rows
+
+
+async def fetchrow(connection: Any, name: str, *args: Any) -> Any:
+    """Выполнить statement реестра и вернуть первую строку.
+
+    Args:
+        connection: Соединение asyncpg (из pool или прямое)
+        name: Имя statement в реестре
+        *args: Параметры запроса
+
+    Returns:
+        Record | None: Первая строка результата
+    """
+    return await connection.fetchrow(STATEMENTS[name], *args)
+
+
+async def execute(connection: Any, name: str, *args: Any) -> str:
+    """Выполнить statement реестра без результата.
+
+    Args:
+        connection: Соединение asyncpg (из pool или прямое)
+        name: Имя statement в реестре
+        *args: Параметры запроса
+
+    Returns:
+        str: Статус команды (например, 'UPDATE 3')
+    """
+    status: str = await connection.execute(STATEMENTS[name], *args)
+    return status
@@ -0,0 +1,188 @@
+"""Вывод потокового ответа LLM в Telegram через редактирование сообщения."""
+
+import asyncio
+import logging
+import time
+from collections.abc import AsyncIterator
+
+from aiogram import Bot
+from aiogram.exceptions import TelegramBadRequest, TelegramRetryAfter
+from aiogram.types import Message
+
+logger = logging.getLogger(__name__)
+
+# Максимальная длина текста одного сообщения Telegram (в UTF-16 code units)
+TELEGRAM_MESSAGE_LIMIT = 4096
+
+
+def utf16_length(text: str) -> int:
+    """Длина текста так, как ее считает Telegram (в UTF-16 code units)."""
+    return len(text.encode("utf-16-le")) // 2
+
+
+class TelegramStreamWriter:
+    """Показ ответа LLM по мере генерации: заглушка, затем edit_message_text.
+
+    Токены накапливаются, а сообщение редактируется не чаще раза в
+    edit_interval секунд (лимиты Telegram на редактирование в одном чате).
+    После конца потока выполняется финальное редактирование с полным текстом.
+    Ответ длиннее лимита Telegram продолжается в следующем сообщении.
+    """
+
+    def __init__(
+        self,
+        edit_interval: float = 1.0,
+        placeholder: str = "…",
+        max_length: int = TELEGRAM_MESSAGE_LIMIT,
+    ) -> None:
+        """Инициализация вывода.
+
+        Args:
+            edit_interval: Минимальный интервал между редактированиями сообщения (сек)
+            placeholder: Текст сообщения до первого токена
+            max_length: Максимальная длина одного сообщения (в UTF-16 code units)
+        """
+        self.edit_interval = edit_interval
+        self.placeholder = placeholder
+        self.max_length = max_length
+
+        self.responses = 0
+        self.messages = 0
+        self.edits = 0
+        self.rate_limited = 0
+
+    async def write(self, bot: Bot, chat_id: int, chunks: AsyncIterator[str]) -> str:
+        """Отправить заглушку и обновлять ее по мере получения токенов.
+
+        Args:
+            bot: Telegram бот
+            chat_id: ID чата
+            chunks: Токены ответа LLM
+
+        Returns:
+            str: Полный текст ответа
+
+        Raises:
+            Exception: Ошибка потока; уже полученный текст остается в сообщении
+        """
+        self.responses += 1
+        message: Message | None = await self._send(bot, chat_id)
+        text = ""
+        offset = 0  # Начало текста текущего сообщения
+        shown = ""  # Текст, который сейчас видит пользователь
+        next_edit_at = 0.0  # Первый токен показываем сразу
+
+        try:
+            async for chunk in chunks:
+                text += chunk
+
+                # Текущее сообщение заполнено: фиксируем его, следующее отправится
+                # при первом видимом тексте продолжения
+                while utf16_length(text[offset:]) > self.max_length:
+                    end = self._split_end(text, offset)
+                    if text[offset:end] != shown or not shown:
+                        await self._finish(bot, chat_id, message, text[offset:end])
+                    offset = end
+                    message = None
+                    shown = ""
+
+                # Пустой и пробельный текст Telegram не принимает
+                pending = text[offset:]
+                now = time.monotonic()
+                if now >= next_edit_at and pending.strip() and pending != shown:
+                    if message is None:
+                        message = await self._send(bot, chat_id)
+                    retry_after = await self._edit(bot, message, pending, final=False)
+                    if retry_after is None:
+                        shown = pending
+                        next_edit_at = now + self.edit_interval
+                    else:
+                        next_edit_at = now + retry_after
+
+        except Exception:
+            # Заглушку без текста убираем, полученный текст оставляем
+            try:
+                await self._finish(bot, chat_id, message, text[offset:])
+            except Exception as cleanup_error:
+                logger.warning(f"Failed to finalize streamed message: {cleanup_error}")
+            raise
+
+        # Заглушка, так и не получившая видимого текста, тоже убирается
+        if text[offset:] != shown or not shown:
+            await self._finish(bot, chat_id, message, text[offset:])
+        return text
+
+    def stats(self) -> dict[str, float]:
+        """Получить метрики вывода.
+
+        Returns:
+            dict[str, float]: Ответы, сообщения, редактирования и отказы по лимиту
+        """
+        return {
+            "responses": self.responses,
+            "messages": self.messages,
+            "edits": self.edits,
+            "edits_per_response": round(self.edits / self.responses, 2)
+            if self.responses > 0
+            else 0.0,
+            "rate_limited": self.rate_limited,
+        }
+
+    def _split_end(self, text: str, offset: int) -> int:
+        """Найти конец текста сообщения, начинающегося с offset, в пределах лимита.
+
+        Лимит Telegram считается в UTF-16 code units: эмодзи и другие символы
+        вне BMP занимают по две единицы.
+        """
+        end = offset + self.max_length
+        while (excess := utf16_length(text[offset:end]) - self.max_length) > 0:
+            # Символ занимает не больше двух единиц
+            end -= (excess + 1) // 2
+        return end
+
+    async def _finish(self, bot: Bot, chat_id: int, message: Message | None, text: str) -> None:
+        """Финально заменить текст сообщения; заглушку без видимого текста удалить.
+
+        Продолжение, для которого сообщение еще не отправлено (message is None),
+        отправляется, только если в нем есть видимый текст.
+        """
+        if not text.strip():
+            if message is not None:
+                await bot.delete_message(chat_id=chat_id, message_id=message.message_id)
+            return
+        if message is None:
+            message = await self._send(bot, chat_id)
+        await self._edit(bot, message, text, final=True)
+
+    async def _send(self, bot: Bot, chat_id: int) -> Message:
+        """Отправить сообщение-заглушку."""
+        self.messages += 1
+        return await bot.send_message(chat_id=chat_id, text=self.placeholder)
+
+    async def _edit(self, bot: Bot, message: Message, text: str, final: bool) -> float | None:
+        """Заменить текст сообщения.
+
+        Промежуточное редактирование при превышении лимита пропускается,
+        финальное повторяется после паузы, которую запросил Telegram.
+
+        Returns:
+            float | None: Пауза retry_after, если редактирование пропущено
+        """
+        while True:
+            try:
+                await bot.edit_message_text(
+                    text=text, chat_id=message.chat.id, message_id=message.message_id
+                )
+                self.edits += 1
+                return None
+            except TelegramRetryAfter as e:
+                self.rate_limited += 1
+                if not final:
+                    return float(e.retry_after)
+                logger.warning(f"Telegram edit rate limited, retrying in {e.retry_after}s")
+                await asyncio.sleep(e.retry_after)
+            except TelegramBadRequest as e:
+                # Текст не изменился с прошлого редактирования
+                if "message is not modified" in str(e):
+                    return None
+                raise
@@ -0,0 +1,158 @@
+"""Прием обновлений Telegram через webhook с очередью и быстрым ответом."""
+
+import asyncio
+import hmac
+import logging
+from typing import Any
+
+from aiogram import Bot, Dispatcher
+from aiogram.types import Update
+from pydantic import ValidationError
+
+logger = logging.getLogger(__name__)
+
+
+class TelegramWebhook:
+    """Очередь обновлений webhook и workers, передающие их в Dispatcher.
+
+    HTTP обработчик только проверяет секрет, кладет обновление в очередь
+    и сразу отвечает Telegram 200: долгий ответ LLM не держит запрос
+    Telegram. Обновления обрабатывают workers фоновых задач; при заполненной
+    очереди обновление отклоняется, и Telegram повторит его позже.
+    """
+
+    def __init__(
+        self,
+        bot: Bot,
+        dispatcher: Dispatcher,
+        secret_token: str,
+        queue_size: int = 1000,
+        workers: int = 32,
+    ) -> None:
+        """Инициализация приема обновлений.
+
+        Args:
+            bot: Telegram бот
+            dispatcher: Dispatcher с зарегистрированными обработчиками
+            secret_token: Секрет из заголовка X-Telegram-Bot-Api-Secret-Token
+            queue_size: Максимальное количество необработанных обновлений
+            workers: Количество одновременно обрабатываемых обновлений
+        """
+        self.bot = bot
+        self.dispatcher = dispatcher
+        self.secret_token = secret_token
+        self.workers = workers
+        self._queue: asyncio.Queue[Update] = asyncio.Queue(maxsize=queue_size)
+        self._tasks: list[asyncio.Task[None]] = []
+
+        self.received = 0
+        self.rejected = 0
+        self.invalid = 0
+        self.dropped = 0
+        self.processed = 0
+        self.failures = 0
+
+    def verify(self, secret_token: str | None) -> bool:
+        """Проверить секрет запроса (сравнение за постоянное время).
+
+        Args:
+            secret_token: Значение заголовка X-Telegram-Bot-Api-Secret-Token
+
+        Returns:
+            bool: True, если секрет совпадает
+        """
+        if secret_token is not None and hmac.compare_digest(
+            secret_token.encode(), self.secret_token.encode()
+        ):
+            return True
+        self.rejected += 1
+        return False
+
+    def enqueue(self, payload: dict[str, Any]) -> bool:
+        """Положить обновление в очередь обработки.
+
+        Args:
+            payload: JSON обновления от Telegram
+
+        Returns:
+            bool: False, если очередь заполнена
+
+        Raises:
+            ValueError: Если payload не является обновлением Telegram
+        """
+        try:
+            update = Update.model_validate(payload, context={"bot": self.bot})
+        except ValidationError as e:
+            self.invalid += 1
+            raise ValueError(f"Invalid update: {e}") from e
+
+        try:
+            self._queue.put_nowait(update)
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning(f"Webhook queue is full, rejecting update {update.update_id}")
+            return False
+
+        self.received += 1
+        return True
+
+    async def start(self) -> None:
+        """Запустить workers обработки обновлений."""
+        self._tasks = [
+            asyncio.create_task(self._run_worker(), name=f"telegram-webhook-{index}")
+            for index in range(self.workers)
+        ]
+        logger.info(f"Telegram webhook started with {self.workers} workers")
+
+    async def register(self, url: str) -> None:
+        """Зарегистрировать webhook в Telegram.
+
+        Args:
+            url: Публичный HTTPS адрес endpoint /telegram/webhook
+        """
+        await self.bot.set_webhook(url=url, secret_token=self.secret_token)
+        logger.info(f"Telegram webhook registered at {url}")
+
+    async def stop(self, timeout: float = 10.0) -> None:
+        """Дообработать очередь и остановить workers.
+
+        Args:
+            timeout: Максимальное время ожидания очереди (сек)
+        """
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except TimeoutError:
+            logger.warning(f"{self._queue.qsize()} webhook update(s) left unprocessed")
+
+        for task in self._tasks:
+            task.cancel()
+        self._tasks = []
+
+    def stats(self) -> dict[str, float]:
+        """Получить метрики приема обновлений.
+
+        Returns:
+            dict[str, float]: Размер очереди, принятые, отклоненные и обработанные обновления
+        """
+        return {
+            "queue_size": self._queue.qsize(),
+            "received": self.received,
+            "rejected": self.rejected,
+            "invalid": self.invalid,
+            "dropped": self.dropped,
+            "processed": self.processed,
+            "failures": self.failures,
+        }
+
+    async def _run_worker(self) -> None:
+        """Передавать обновления из очереди в Dispatcher."""
+        while True:
+            update = await self._queue.get()
+            try:
+                await self.dispatcher.feed_update(self.bot, update)
+                self.processed += 1
+            except Exception as e:
+                self.failures += 1
+                logger.error(f"Failed to process update {update.update_id}: {e}", exc_info=True)
+            finally:
+                self._queue.task_done()
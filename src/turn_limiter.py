@@ -0,0 +1,139 @@
+"""Ограничение одновременных запросов к LLM из бота с приоритетной очередью."""
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections import deque
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+
+from src.percentiles import SAMPLES_WINDOW, percentile_ms
+
+logger = logging.getLogger(__name__)
+
+# Приоритеты ходов (меньше - раньше)
+PRIORITY_PRIVATE = 0
+PRIORITY_GROUP = 1
+
+
+class OverloadedError(Exception):
+    """Ход отклонен: очередь заполнена или ожидание слота превысило max_wait."""
+
+
+class TurnLimiter:
+    """Не более max_concurrent ходов (запрос к LLM и БД) одновременно.
+
+    aiogram запускает задачу на каждое обновление без ограничений, и при
+    всплеске сотни одновременных запросов упираются в rate limit LLM и
+    таймауты pool БД. Лимитер пропускает max_concurrent ходов, остальные
+    ждут в очереди по приоритету (затем по времени прихода). Если очередь
+    заполнена или слот не освободился за max_wait, ход отклоняется
+    OverloadedError - бот отвечает пользователю «занят» сразу, а не по таймауту.
+    """
+
+    def __init__(
+        self, max_concurrent: int = 16, max_queue: int = 200, max_wait: float = 30.0
+    ) -> None:
+        """Инициализация лимитера.
+
+        Args:
+            max_concurrent: Максимальное количество одновременных ходов
+            max_queue: Максимальное количество ходов, ожидающих слот
+            max_wait: Максимальное время ожидания слота (сек)
+        """
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.max_wait = max_wait
+        self._active = 0
+        self._waiters: list[tuple[int, int, asyncio.Future[None]]] = []
+        self._sequence = itertools.count()
+
+        self.admitted = 0
+        self.queued = 0
+        self.shed_queue_full = 0
+        self.shed_timeout = 0
+        self._waits: deque[float] = deque(maxlen=SAMPLES_WINDOW)
+
+    @asynccontextmanager
+    async def slot(self, priority: int = PRIORITY_PRIVATE) -> AsyncIterator[None]:
+        """Занять слот на время хода.
+
+        Args:
+            priority: Приоритет хода (меньше - раньше)
+
+        Raises:
+            OverloadedError: Если очередь заполнена или слот не получен за max_wait
+        """
+        started_at = time.perf_counter()
+        await self._acquire(priority)
+        self._waits.append(time.perf_counter() - started_at)
+        self.admitted += 1
+        try:
+            yield
+        finally:
+            self._release()
+
+    async def _acquire(self, priority: int) -> None:
+        """Получить слот сразу или дождаться его в очереди."""
+        if self._active < self.max_concurrent and not self._waiters:
+            self._active += 1
+            return
+
+        if len(self._waiters) >= self.max_queue:
+            self.shed_queue_full += 1
+            logger.warning(f"Turn queue is full ({len(self._waiters)} waiting), shedding turn")
+            raise OverloadedError("Turn queue is full")
+
+        future: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+        self.queued += 1
+        try:
+            await asyncio.wait_for(future, timeout=self.max_wait)
+        except TimeoutError:
+            self.shed_timeout += 1
+            self._remove_cancelled()
+            logger.warning(f"No turn slot within {self.max_wait}s, shedding turn")
+            raise OverloadedError("Timed out waiting for a turn slot") from None
+        except asyncio.CancelledError:
+            # Слот мог быть передан в момент отмены: возвращаем его следующему
+            if future.done() and not future.cancelled():
+                self._release()
+            else:
+                future.cancel()
+                self._remove_cancelled()
+            raise
+
+    def _release(self) -> None:
+        """Передать слот следующему ожидающему или освободить его."""
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                # Слот переходит ожидающему, количество активных не меняется
+                future.set_result(None)
+                return
+        self._active -= 1
+
+    def _remove_cancelled(self) -> None:
+        """Убрать из очереди отмененные ожидания."""
+        self._waiters = [waiter for waiter in self._waiters if not waiter[2].done()]
+        heapq.heapify(self._waiters)
+
+    def stats(self) -> dict[str, float]:
+        """Получить метрики лимитера.
+
+        Returns:
+            dict[str, float]: Активные и ожидающие ходы, время ожидания слота и отклоненные ходы
+        """
+        return {
+            "active": self._active,
+            "queue_depth": len(self._waiters),
+            "max_concurrent": self.max_concurrent,
+            "admitted": self.admitted,
+            "queued": self.queued,
+            "shed_queue_full": self.shed_queue_full,
+            "shed_timeout": self.shed_timeout,
+            "wait_p50_ms": percentile_ms(self._waits, 0.5),
+            "wait_p95_ms": percentile_ms(self._waits, 0.95),
+        }
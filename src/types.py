@@ -14,3 +14,25 @@ class ChatMessage(TypedDict):
     content: str
     created_at: NotRequired[str]  # ISO 8601 формат (YYYY-MM-DDTHH:MM:SS)
     message_length: NotRequired[int]  # Длина сообщения в символах
+
+
+class PoolOptions(TypedDict, total=False):
+    """Параметры connection pool PostgreSQL (asyncpg)."""
+
+    min_size: int
+    max_size: int
+    command_timeout: float
+    statement_cache_size: int
+    max_inactive_connection_lifetime: float
+    acquire_timeout: float
+
+
+class LLMHttpOptions(TypedDict, total=False):
+    """Параметры HTTP клиента LLM API (httpx)."""
+
+    max_connections: int
+    max_keepalive_connections: int
+    keepalive_expiry: float
+    http2: bool
+    connect_timeout: float
+    read_timeout: float
@@ -0,0 +1,92 @@
+"""Постоянный маппинг session_id веб-чата на user_id с LRU-кэшем."""
+
+import logging
+from collections import OrderedDict
+
+from src import statements
+from src.instrumented_pool import InstrumentedPool
+
+logger = logging.getLogger(__name__)
+
+
+class WebSessionStore:
+    """Маппинг session_id на user_id в таблице web_sessions.
+
+    Новые user_id выдает последовательность web_user_id_seq (отрицательные
+    значения), поэтому они не пересекаются между перезапусками и репликами.
+    Перед таблицей стоит ограниченный LRU-кэш: маппинг не меняется,
+    так что закэшированное значение не устаревает.
+    """
+
+    def __init__(self, pool: InstrumentedPool, cache_size: int) -> None:
+        """Инициализация хранилища.
+
+        Args:
+            pool: Connection pool
+            cache_size: Максимальное количество закэшированных сессий (0 - без кэша)
+        """
+        self.pool = pool
+        self.cache_size = cache_size
+        self._cache: OrderedDict[str, int] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+        self.created = 0
+
+    async def get_or_create_user_id(self, session_id: str) -> int:
+        """Получить user_id сессии или выдать новый.
+
+        Args:
+            session_id: ID сессии из localStorage
+
+        Returns:
+            int: user_id (отрицательный для веб-пользователей)
+        """
+        user_id = self._cache.get(session_id)
+        if user_id is not None:
+            self._cache.move_to_end(session_id)
+            self.hits += 1
+            return user_id
+
+        self.misses += 1
+        async with self.pool.acquire() as connection:
+            row = await statements.fetchrow(connection, "select_web_session", session_id)
+            if row is None:
+                row = await statements.fetchrow(connection, "insert_web_session", session_id)
+                if row is not None:
+                    self.created += 1
+                    logger.info(
+                        f"Created new web user_id {row['user_id']} for session {session_id}"
+                    )
+                else:
+                    # Сессию только что создал параллельный запрос
+                    row = await statements.fetchrow(connection, "select_web_session", session_id)
+
+        user_id = int(row["user_id"])
+        self._remember(session_id, user_id)
+        return user_id
+
+    def stats(self) -> dict[str, float]:
+        """Получить метрики хранилища.
+
+        Returns:
+            dict[str, float]: Размер кэша, попадания, промахи и созданные сессии
+        """
+        requests = self.hits + self.misses
+        return {
+            "size": len(self._cache),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / requests, 3) if requests > 0 else 0.0,
+            "created": self.created,
+        }
+
+    def _remember(self, session_id: str, user_id: int) -> None:
+        """Положить маппинг в кэш, вытеснив самую старую сессию при переполнении."""
+        if self.cache_size <= 0:
+            return
+
+        self._cache[session_id] = user_id
+        self._cache.move_to_end(session_id)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
@@ -0,0 +1,75 @@
+"""Интеграционные тесты обслуживания месячных партиций messages.
+
+Требуют PostgreSQL с примененными миграциями:
+    TEST_DATABASE_URL=postgresql://... uv run pytest tests/integration -m integration
+"""
+
+import os
+from collections.abc import AsyncIterator
+from datetime import date
+
+import pytest
+
+from src.database import normalize_database_url
+from src.instrumented_pool import InstrumentedPool
+from src.message_partition_manager import MessagePartitionManager, partition_name
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+pytestmark = [
+    pytest.mark.integration,
+    pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set"),
+]
+
+# Месяц без партиции: его строки попадают в messages_default
+MONTH = date(1990, 1, 1)
+
+
+@pytest.fixture
+async def pool() -> AsyncIterator[InstrumentedPool]:
+    """Pool тестовой БД; созданная партиция и тестовые строки удаляются."""
+    pool = InstrumentedPool(acquire_timeout=5.0)
+    await pool.open(normalize_database_url(TEST_DATABASE_URL or ""), min_size=1, max_size=2)
+    try:
+        yield pool
+    finally:
+        async with pool.acquire() as connection:
+            await connection.execute(f"DROP TABLE IF EXISTS {partition_name(MONTH)}")
+            await connection.execute("DELETE FROM messages WHERE user_id = -2000")
+        await pool.close()
+
+
+class TestCreatePartitionWithDefaultRows:
+    """Создание партиции месяца, строки которого уже лежат в messages_default."""
+
+    async def test_rows_moved_from_default(self, pool: InstrumentedPool) -> None:
+        """Строки месяца переносятся в новую партицию, остальные остаются в default."""
+        async with pool.acquire() as connection:
+            await connection.execute(
+                """
+                INSERT INTO messages (user_id, chat_id, role, content, message_length, created_at)
+                VALUES
+                    (-2000, -2000, 'user', 'a', 1, '1990-01-05 10:00'),
+                    (-2000, -2000, 'assistant', 'b', 1, '1990-01-31 23:59:59'),
+                    (-2000, -2000, 'user', 'c', 1, '1990-02-01 00:00')
+                """
+            )
+
+        manager = MessagePartitionManager(pool, months_ahead=0, retention_months=0)
+        created = await manager.ensure_partitions([MONTH])
+
+        assert created == [partition_name(MONTH)]
+        async with pool.acquire() as connection:
+            moved = await connection.fetch(
+                f"SELECT content FROM {partition_name(MONTH)} ORDER BY created_at"
+            )
+            left = await connection.fetch(
+                "SELECT content FROM messages_default WHERE user_id = -2000"
+            )
+            history = await connection.fetchval(
+                "SELECT COUNT(*) FROM messages WHERE user_id = -2000"
+            )
+
+        assert [row["content"] for row in moved] == ["a", "b"]
+        assert [row["content"] for row in left] == ["c"]
+        assert history == 3
@@ -0,0 +1,109 @@
+"""Интеграционные тесты планов запросов к messages.
+
+Требуют PostgreSQL с примененными миграциями:
+    TEST_DATABASE_URL=postgresql://... uv run pytest tests/integration -m integration
+"""
+
+import json
+import os
+from collections.abc import AsyncIterator
+from datetime import date, datetime
+from typing import Any
+
+import asyncpg  # type: ignore[import-untyped]
+import pytest
+
+from src.database import normalize_database_url
+from src.message_partition_manager import add_months, partition_name
+from src.statements import STATEMENTS
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+pytestmark = [
+    pytest.mark.integration,
+    pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set"),
+]
+
+
+def _plan_nodes(plan: dict[str, Any]) -> list[dict[str, Any]]:
+    """Развернуть дерево плана EXPLAIN в список узлов."""
+    nodes = [plan]
+    for child in plan.get("Plans", []):
+        nodes.extend(_plan_nodes(child))
+    return nodes
+
+
+@pytest.fixture
+async def seeded_connection() -> AsyncIterator[Any]:
+    """Соединение с засеянной таблицей messages (изменения откатываются)."""
+    connection = await asyncpg.connect(normalize_database_url(TEST_DATABASE_URL or ""))
+    transaction = connection.transaction()
+    await transaction.start()
+    try:
+        # 200 диалогов по 100 сообщений, половина первого диалога удалена
+        await connection.execute(
+            """
+            INSERT INTO messages (user_id, chat_id, role, content, message_length, created_at)
+            SELECT -1000 - d, -1000 - d,
+                   CASE WHEN m % 2 = 0 THEN 'user' ELSE 'assistant' END,
+                   repeat('x', 200), 200,
+                   TIMESTAMP '2025-01-01' + m * INTERVAL '1 minute'
+            FROM generate_series(0, 199) AS d, generate_series(0, 99) AS m
+            """
+        )
+        await connection.execute(
+            """
+            UPDATE messages SET deleted_at = now()
+            WHERE user_id = -1000 AND chat_id = -1000 AND created_at < '2025-01-01 00:50'
+            """
+        )
+        await connection.execute("ANALYZE messages")
+        yield connection
+    finally:
+        await transaction.rollback()
+        await connection.close()
+
+
+class TestHistoryWindowPlan:
+    """Регрессия плана select_history."""
+
+    async def test_history_uses_partial_index_without_sort(self, seeded_connection: Any) -> None:
+        """Окно истории читается по индексу (idx_messages_history в партициях) без Sort."""
+        result = await seeded_connection.fetchval(
+            f"EXPLAIN (FORMAT JSON) {STATEMENTS['select_history']}", -1000, -1000, 10
+        )
+        nodes = _plan_nodes(json.loads(result)[0]["Plan"])
+
+        scans = [node for node in nodes if node.get("Relation Name", "").startswith("messages")]
+        assert scans
+        assert all("Index" in node["Node Type"] for node in scans)
+        assert not any(node["Node Type"] == "Sort" for node in nodes)
+
+    async def test_stats_range_prunes_old_partitions(self, seeded_connection: Any) -> None:
+        """Диапазонный запрос дашборда не читает партиции до начала периода."""
+        for month in ("2020-01-01", "2020-02-01"):
+            name = partition_name(date.fromisoformat(month))
+            await seeded_connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF messages "
+                f"FOR VALUES FROM ('{month}') TO ('{add_months(date.fromisoformat(month), 1)}')"
+            )
+
+        result = await seeded_connection.fetchval(
+            f"EXPLAIN (FORMAT JSON) {STATEMENTS['stats_dashboard_scan']}",
+            datetime(2020, 2, 1),
+            datetime(2020, 2, 8),
+        )
+        relations = {
+            node.get("Relation Name") for node in _plan_nodes(json.loads(result)[0]["Plan"])
+        }
+
+        assert "messages_y2020m02" in relations
+        assert "messages_y2020m01" not in relations
+
+    async def test_history_returns_latest_active_messages(self, seeded_connection: Any) -> None:
+        """Запрос возвращает последние не удаленные сообщения в порядке DESC."""
+        rows = await seeded_connection.fetch(STATEMENTS["select_history"], -1000, -1000, 60)
+
+        assert len(rows) == 50
+        created = [row["created_at"] for row in rows]
+        assert created == sorted(created, reverse=True)
@@ -0,0 +1,76 @@
+"""Интеграционные тесты реестра statements на соединениях из pool.
+
+Требуют PostgreSQL с примененными миграциями:
+    TEST_DATABASE_URL=postgresql://... uv run pytest tests/integration -m integration
+"""
+
+import os
+from collections.abc import AsyncIterator
+
+import pytest
+
+from src import statements
+from src.database import normalize_database_url, warm_up_pool
+from src.instrumented_pool import InstrumentedPool
+
+TEST_DATABASE_URL = os.environ.get("TEST_DATABASE_URL")
+
+pytestmark = [
+    pytest.mark.integration,
+    pytest.mark.skipif(not TEST_DATABASE_URL, reason="TEST_DATABASE_URL is not set"),
+]
+
+
+@pytest.fixture
+async def single_connection_pool() -> AsyncIterator[InstrumentedPool]:
+    """Pool из одного соединения: каждый acquire возвращает то же соединение."""
+    pool = InstrumentedPool(acquire_timeout=5.0)
+    await pool.open(normalize_database_url(TEST_DATABASE_URL or ""), min_size=1, max_size=1)
+    try:
+        yield pool
+    finally:
+        await pool.close()
+
+
+class TestStatementsOnPooledConnection:
+    """Statements реестра после возврата соединения в pool."""
+
+    async def test_statement_after_release(self, single_connection_pool: InstrumentedPool) -> None:
+        """Statement выполняется на том же соединении после acquire/release."""
+        raw_connections = []
+        for _ in range(3):
+            async with single_connection_pool.acquire() as connection:
+                raw_connections.append(connection._con)
+                rows = await statements.fetch(connection, "select_history", -1, -1, 10)
+                assert rows == []
+
+        # Все вызовы шли через одно физическое соединение
+        assert len({id(raw) for raw in raw_connections}) == 1
+        assert single_connection_pool.snapshot()["query_errors"] == 0
+
+    async def test_warm_up_pool_fills_statement_cache(
+        self, single_connection_pool: InstrumentedPool
+    ) -> None:
+        """После прогрева читающие statements уже подготовлены на соединении."""
+        await warm_up_pool(single_connection_pool)
+
+        async with single_connection_pool.acquire() as connection:
+            prepared = await connection.fetch("SELECT statement FROM pg_prepared_statements")
+            queries = {row["statement"] for row in prepared}
+            assert {statements.STATEMENTS[name] for name in statements.WARM_UP_ARGS} <= queries
+
+            # Горячий запрос не готовит statement заново
+            count_query = "SELECT count(*) FROM pg_prepared_statements"
+            before = await connection.fetchval(count_query)
+            await statements.fetch(connection, "select_history", -1, -1, 10)
+            assert await connection.fetchval(count_query) == before
+
+    async def test_init_hook_prepares_statements(
+        self, single_connection_pool: InstrumentedPool
+    ) -> None:
+        """Новое соединение pool (и пересозданное после expire) приходит с готовым кэшем."""
+        for _ in range(2):
+            async with single_connection_pool.acquire() as connection:
+                # Кроме statements реестра кэш содержит запросы интроспекции типов asyncpg
+                assert len(connection._con._stmt_cache) >= len(statements.WARM_UP_ARGS)
+            await single_connection_pool.pool.expire_connections()
@@ -1,12 +1,25 @@
 """Unit тесты для API routes."""
 
-from unittest.mock import AsyncMock, MagicMock
+import asyncio
+import json
+from collections.abc import AsyncIterator
+from contextlib import asynccontextmanager
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock, patch
 
 import pytest
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
-from src.api.app import create_app
+from api_main import create_api_app, lifespan
+from src.api.app import configure_dependencies, create_app
+from src.api.cached_stat_collector import CachedStatCollector
+from src.api.message_exporter import MessageExporter
 from src.api.models import DashboardStats, MetricCard, MetricsData, TimeSeriesPoint
+from src.daily_stats_rollup import DailyStatsRollup
+
+EXPORT_TOKEN = "admin-export-token-0123"
+EXPORT_HEADERS = {"Authorization": f"Bearer {EXPORT_TOKEN}"}
 
 
 class TestAPIRoutes:
@@ -53,7 +66,9 @@ class TestAPIRoutes:
     @pytest.fixture
     def client(self, mock_stat_collector: MagicMock) -> TestClient:
         """Фикстура для TestClient с mock StatCollector."""
-        app = create_app(stat_collector=mock_stat_collector)
+        app = create_app(
+            pool=MagicMock(), stat_collector=mock_stat_collector, export_token=EXPORT_TOKEN
+        )
         return TestClient(app)
 
     def test_health_check(self, client: TestClient) -> None:
@@ -167,6 +182,152 @@ class TestAPIRoutes:
         data = response.json()
         assert "detail" in data
 
+    def test_get_stats_etag_and_cache_control(self, client: TestClient) -> None:
+        """Ответ содержит ETag и Cache-Control."""
+        response = client.get("/api/stats?period=7d")
+
+        assert response.status_code == 200
+        assert response.headers["etag"].startswith('"')
+        assert response.headers["cache-control"] == "no-cache"
+
+    def test_get_stats_not_modified(self, client: TestClient) -> None:
+        """Совпадающий If-None-Match возвращает 304 без тела."""
+        etag = client.get("/api/stats?period=7d").headers["etag"]
+
+        response = client.get("/api/stats?period=7d", headers={"If-None-Match": etag})
+
+        assert response.status_code == 304
+        assert response.content == b""
+
+    def test_get_stats_cache_control_from_cached_collector(
+        self, mock_stat_collector: MagicMock
+    ) -> None:
+        """С CachedStatCollector Cache-Control берется из настроек кэша."""
+        cached = CachedStatCollector(mock_stat_collector, ttl_seconds=30, stale_seconds=300)
+        client = TestClient(create_app(stat_collector=cached))
+
+        response = client.get("/api/stats?period=7d")
+
+        assert response.headers["cache-control"] == cached.cache_control
+
+    def test_export_messages_streams_exporter_output(self, client: TestClient) -> None:
+        """Выгрузка отдает поток MessageExporter с заголовками вложения."""
+
+        async def fake_stream(*args: object) -> AsyncIterator[bytes]:
+            yield b'{"id": 1}\n'
+            yield b'{"id": 2}\n'
+
+        with patch.object(MessageExporter, "stream", side_effect=fake_stream) as stream:
+            response = client.get(
+                "/api/export/messages?format=ndjson&date_from=2025-10-01&source=web&user_id=42",
+                headers=EXPORT_HEADERS,
+            )
+
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/x-ndjson"
+        assert 'filename="messages.ndjson"' in response.headers["content-disposition"]
+        assert response.content == b'{"id": 1}\n{"id": 2}\n'
+        assert stream.call_args.args == ("ndjson", date(2025, 10, 1), None, "web", 42)
+
+    def test_export_messages_invalid_date_range(self, client: TestClient) -> None:
+        """date_from позже date_to отклоняется с 400."""
+        response = client.get(
+            "/api/export/messages?date_from=2025-10-02&date_to=2025-10-01",
+            headers=EXPORT_HEADERS,
+        )
+
+        assert response.status_code == 400
+
+    def test_export_messages_disabled_by_default(self, mock_stat_collector: MagicMock) -> None:
+        """Без токена в конфигурации выгрузка выключена и отвечает 404."""
+        client = TestClient(create_app(pool=MagicMock(), stat_collector=mock_stat_collector))
+
+        with patch.object(MessageExporter, "stream") as stream:
+            response = client.get("/api/export/messages", headers=EXPORT_HEADERS)
+
+        assert response.status_code == 404
+        stream.assert_not_called()
+
+    @pytest.mark.parametrize(
+        "headers",
+        [{}, {"Authorization": "Bearer wrong-token"}, {"Authorization": EXPORT_TOKEN}],
+    )
+    def test_export_messages_requires_token(
+        self, client: TestClient, headers: dict[str, str]
+    ) -> None:
+        """Без токена администратора или с неверным токеном выгрузка отвечает 403."""
+        with patch.object(MessageExporter, "stream") as stream:
+            response = client.get("/api/export/messages", headers=headers)
+
+        assert response.status_code == 403
+        stream.assert_not_called()
+
+    def test_send_message_sse_frames(self, client: TestClient) -> None:
+        """Ответ чата приходит JSON-кадрами SSE и завершается событием done."""
+
+        async def chunks(*args: object) -> AsyncIterator[str]:
+            yield 'Цитата "в кавычках"'
+            yield "\\ и перенос\n"
+
+        handler = MagicMock()
+        handler.handle_message_stream = MagicMock(side_effect=chunks)
+        client.app.state.web_chat_handler = handler  # type: ignore[attr-defined]
+
+        response = client.post("/api/chat/message", json={"session_id": "s1", "message": "Hi"})
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = [
+            json.loads(line[len("data: ") :])
+            for line in response.text.split("\n\n")
+            if line.startswith("data: ")
+        ]
+        assert events == [
+            {"type": "token", "content": 'Цитата "в кавычках"\\ и перенос\n'},
+            {"type": "done", "content": ""},
+        ]
+
+    def test_dependencies_configured_in_lifespan(self, mock_stat_collector: MagicMock) -> None:
+        """Зависимости, созданные в lifespan worker-процесса, используются роутами."""
+
+        @asynccontextmanager
+        async def lifespan(app: FastAPI) -> AsyncIterator[None]:
+            configure_dependencies(app, stat_collector=mock_stat_collector)
+            yield
+
+        app = create_app(lifespan=lifespan)
+        mock_stat_collector.get_dashboard_stats.reset_mock()
+
+        with TestClient(app) as client:
+            response = client.get("/api/stats?period=30d")
+
+        assert response.status_code == 200
+        mock_stat_collector.get_dashboard_stats.assert_called_once_with("30d")
+
+    def test_dependencies_isolated_between_apps(self, mock_stat_collector: MagicMock) -> None:
+        """Несколько приложений в одном процессе не разделяют зависимости."""
+        other_collector = MagicMock()
+        other_collector.get_dashboard_stats = AsyncMock(side_effect=ValueError("Invalid period"))
+
+        first = TestClient(create_app(stat_collector=mock_stat_collector))
+        second = TestClient(create_app(stat_collector=other_collector))
+
+        assert first.get("/api/stats?period=7d").status_code == 200
+        assert second.get("/api/stats?period=7d").status_code == 400
+
+    def test_streams_tracked_until_finished(self, client: TestClient) -> None:
+        """Выгрузка учитывается в StreamTracker приложения до конца потока."""
+
+        async def chunks(*args: object) -> AsyncIterator[bytes]:
+            yield b"id\n"
+
+        with patch.object(MessageExporter, "stream", side_effect=chunks):
+            response = client.get("/api/export/messages", headers=EXPORT_HEADERS)
+
+        tracker = client.app.state.stream_tracker  # type: ignore[attr-defined]
+        assert response.status_code == 200
+        assert tracker.stats() == {"active": 0, "started": 1, "completed": 1}
+
     def test_cors_headers(self, client: TestClient) -> None:
         """Тест наличия CORS заголовков."""
         # Проверяем наличие CORS middleware через GET запрос
@@ -204,3 +365,104 @@ class TestAPIRoutes:
         # Проверяем описание API
         assert schema["info"]["title"] == "Systech AIDD Dashboard API"
         assert "version" in schema["info"]
+
+    def test_metrics_endpoint(self, client: TestClient) -> None:
+        """Тест endpoint метрик приложения."""
+        client.app.state.metrics.register(  # type: ignore[attr-defined]
+            "test_source", lambda: {"value": 1.0}
+        )
+
+        response = client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.json()["test_source"] == {"value": 1.0}
+
+    def test_metrics_isolated_between_apps(self, client: TestClient) -> None:
+        """Метрики одного приложения не видны в другом."""
+        client.app.state.metrics.register(  # type: ignore[attr-defined]
+            "test_source", lambda: {"value": 1.0}
+        )
+        other = TestClient(create_app(stat_collector=MagicMock()))
+
+        assert "test_source" not in other.get("/metrics").json()
+
+
+class TestAPILifespan:
+    """Тесты lifespan приложения API (api_main)."""
+
+    @pytest.fixture(autouse=True)
+    def env(self, monkeypatch: pytest.MonkeyPatch) -> None:
+        """Минимальная конфигурация для Config()."""
+        monkeypatch.setenv("TELEGRAM_BOT_TOKEN", "token")
+        monkeypatch.setenv("OPENROUTER_API_KEY", "key")
+        monkeypatch.setenv("DATABASE_URL", "postgresql://localhost:5432/db")
+
+    @staticmethod
+    def raw_pool() -> MagicMock:
+        """Мок исходного asyncpg pool."""
+        pool = MagicMock()
+        pool.acquire = AsyncMock(return_value=AsyncMock())
+        pool.release = AsyncMock()
+        pool.close = AsyncMock()
+        pool.get_min_size.return_value = 1
+        return pool
+
+    async def test_two_apps_in_one_process(self) -> None:
+        """У каждого приложения свой pool и реестр метрик, закрытие одного не трогает другое."""
+        raw_pools = [self.raw_pool(), self.raw_pool()]
+        first = create_api_app()
+        second = create_api_app()
+
+        with patch(
+            "src.instrumented_pool.asyncpg.create_pool",
+            new_callable=AsyncMock,
+            side_effect=raw_pools,
+        ):
+            async with lifespan(first):
+                async with lifespan(second):
+                    assert first.state.pool.pool is raw_pools[0]
+                    assert second.state.pool.pool is raw_pools[1]
+                    assert first.state.metrics is not second.state.metrics
+                    assert "database_pool" in second.state.metrics.collect()
+
+                raw_pools[1].close.assert_awaited_once()
+                raw_pools[0].close.assert_not_awaited()
+                assert "database_pool" not in second.state.metrics.collect()
+                assert "database_pool" in first.state.metrics.collect()
+                async with first.state.pool.acquire() as connection:
+                    await connection.fetchval("SELECT 1")
+
+        raw_pools[0].close.assert_awaited_once()
+
+    async def test_background_tasks_finish_before_pool_close(
+        self, monkeypatch: pytest.MonkeyPatch
+    ) -> None:
+        """Фоновые задачи дожидаются отмены до закрытия pool."""
+        monkeypatch.setenv("STATS_USE_ROLLUP", "true")
+        finished: list[bool] = []
+        closed_after_tasks: list[bool] = []
+
+        async def run_periodically(_: DailyStatsRollup, interval_seconds: float) -> None:
+            try:
+                await asyncio.Event().wait()
+            finally:
+                # Отмененная задача еще работает с БД
+                await asyncio.sleep(0)
+                finished.append(True)
+
+        raw_pool = self.raw_pool()
+        raw_pool.close = AsyncMock(side_effect=lambda: closed_after_tasks.append(bool(finished)))
+        app = create_api_app()
+
+        with (
+            patch(
+                "src.instrumented_pool.asyncpg.create_pool",
+                new_callable=AsyncMock,
+                return_value=raw_pool,
+            ),
+            patch.object(DailyStatsRollup, "run_periodically", run_periodically),
+        ):
+            async with lifespan(app):
+                await asyncio.sleep(0)
+
+        assert closed_after_tasks == [True]
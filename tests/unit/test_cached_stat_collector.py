@@ -0,0 +1,105 @@
+"""Unit-тесты для модуля cached_stat_collector."""
+
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.api.cached_stat_collector import CachedStatCollector
+from src.api.mock_stat_collector import MockStatCollector
+
+
+class TestCachedStatCollector:
+    """Тесты для класса CachedStatCollector."""
+
+    @pytest.fixture
+    def collector(self) -> MagicMock:
+        """Исходный сборщик, возвращающий mock статистику."""
+        inner = MagicMock()
+        inner.get_dashboard_stats = AsyncMock(
+            side_effect=MockStatCollector(seed=1).get_dashboard_stats
+        )
+        return inner
+
+    async def test_fresh_entry_is_served_from_cache(self, collector: MagicMock) -> None:
+        """Повторный запрос в пределах TTL не вызывает пересчет."""
+        cached = CachedStatCollector(collector, ttl_seconds=60, stale_seconds=60)
+
+        first = await cached.get_dashboard_stats("7d")
+        second = await cached.get_dashboard_stats("7d")
+
+        assert first is second
+        assert collector.get_dashboard_stats.await_count == 1
+        assert cached.stats()["hits"] == 1
+
+    async def test_periods_are_cached_separately(self, collector: MagicMock) -> None:
+        """Каждый период кэшируется отдельно."""
+        cached = CachedStatCollector(collector, ttl_seconds=60, stale_seconds=60)
+
+        await cached.get_dashboard_stats("7d")
+        await cached.get_dashboard_stats("30d")
+
+        assert collector.get_dashboard_stats.await_count == 2
+
+    async def test_concurrent_misses_share_one_compute(self, collector: MagicMock) -> None:
+        """Одновременные запросы без кэша ждут один пересчет (single-flight)."""
+        release = asyncio.Event()
+        stats = await MockStatCollector(seed=1).get_dashboard_stats("7d")
+
+        async def slow_compute(period: str) -> object:
+            await release.wait()
+            return stats
+
+        collector.get_dashboard_stats = AsyncMock(side_effect=slow_compute)
+        cached = CachedStatCollector(collector, ttl_seconds=60, stale_seconds=60)
+
+        requests = [asyncio.create_task(cached.get_dashboard_stats("7d")) for _ in range(5)]
+        await asyncio.sleep(0)
+        release.set()
+        results = await asyncio.gather(*requests)
+
+        assert all(result is stats for result in results)
+        assert collector.get_dashboard_stats.await_count == 1
+
+    async def test_stale_entry_served_while_refreshing(self, collector: MagicMock) -> None:
+        """Устаревшие данные отдаются сразу, а пересчет идет в фоне."""
+        cached = CachedStatCollector(collector, ttl_seconds=10, stale_seconds=60)
+        with patch("src.api.cached_stat_collector.time.monotonic", return_value=1000.0):
+            first = await cached.get_dashboard_stats("7d")
+
+        with patch("src.api.cached_stat_collector.time.monotonic", return_value=1020.0):
+            stale = await cached.get_dashboard_stats("7d")
+            await asyncio.sleep(0)
+
+        assert stale is first
+        assert cached.stats()["stale_hits"] == 1
+        assert collector.get_dashboard_stats.await_count == 2
+
+    async def test_expired_entry_is_recomputed(self, collector: MagicMock) -> None:
+        """После TTL + stale данные пересчитываются синхронно."""
+        cached = CachedStatCollector(collector, ttl_seconds=10, stale_seconds=10)
+        with patch("src.api.cached_stat_collector.time.monotonic", return_value=1000.0):
+            await cached.get_dashboard_stats("7d")
+
+        with patch("src.api.cached_stat_collector.time.monotonic", return_value=1100.0):
+            await cached.get_dashboard_stats("7d")
+
+        assert cached.stats()["misses"] == 2
+
+    async def test_errors_are_not_cached(self, collector: MagicMock) -> None:
+        """Ошибка пересчета пробрасывается и не попадает в кэш."""
+        collector.get_dashboard_stats = AsyncMock(side_effect=ValueError("Invalid period: 1y"))
+        cached = CachedStatCollector(collector, ttl_seconds=60, stale_seconds=60)
+
+        with pytest.raises(ValueError, match="Invalid period"):
+            await cached.get_dashboard_stats("1y")
+        with pytest.raises(ValueError, match="Invalid period"):
+            await cached.get_dashboard_stats("1y")
+
+        assert collector.get_dashboard_stats.await_count == 2
+
+    def test_cache_control(self, collector: MagicMock) -> None:
+        """Cache-Control отражает TTL и stale-окно."""
+        cached = CachedStatCollector(collector, ttl_seconds=30, stale_seconds=300)
+
+        assert cached.cache_control == "public, max-age=30, stale-while-revalidate=300"
@@ -0,0 +1,114 @@
+"""Unit-тесты для модуля caching_llm_client."""
+
+import asyncio
+from collections.abc import AsyncGenerator
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.caching_llm_client import CachingLLMClient
+from src.llm_response_cache import LLMResponseCache
+from src.types import ChatMessage
+
+QUESTION: list[ChatMessage] = [{"role": "user", "content": "Что съесть на завтрак?"}]
+
+
+class TestCachingLLMClient:
+    """Тесты для класса CachingLLMClient."""
+
+    @pytest.fixture
+    def llm_client(self) -> MagicMock:
+        """Мок LLMClient с параметрами, входящими в ключ кэша."""
+        client = MagicMock()
+        client.model = "test-model"
+        client.temperature = 0.7
+        client.max_tokens = 1000
+        client.system_prompt = "Ты нутрициолог"
+        client.get_response = AsyncMock(return_value="Овсянка с ягодами")
+        return client
+
+    @pytest.fixture
+    def caching_client(self, llm_client: MagicMock) -> CachingLLMClient:
+        """Кэширующий клиент с кэшем в памяти."""
+        return CachingLLMClient(llm_client, LLMResponseCache(max_size=10, ttl_seconds=60))
+
+    async def test_hit_skips_llm(
+        self, caching_client: CachingLLMClient, llm_client: MagicMock
+    ) -> None:
+        """Повторный вопрос отдается из кэша без вызова LLM."""
+        assert await caching_client.get_response(QUESTION) == "Овсянка с ягодами"
+        assert await caching_client.get_response(QUESTION) == "Овсянка с ягодами"
+
+        llm_client.get_response.assert_awaited_once()
+        stats = caching_client.stats()
+        assert stats["hits"] == 1
+        assert stats["llm_calls"] == 1
+        assert stats["saved_latency_s"] >= 0
+
+    async def test_history_not_cached(
+        self, caching_client: CachingLLMClient, llm_client: MagicMock
+    ) -> None:
+        """Запросы с историей длиннее max_messages идут в LLM без кэша."""
+        messages: list[ChatMessage] = [
+            *QUESTION,
+            {"role": "assistant", "content": "Овсянка"},
+            {"role": "user", "content": "А еще?"},
+        ]
+
+        await caching_client.get_response(messages)
+        await caching_client.get_response(messages)
+
+        assert llm_client.get_response.await_count == 2
+        assert caching_client.stats()["uncacheable"] == 2
+        assert caching_client.stats()["size"] == 0
+
+    async def test_concurrent_requests_share_llm_call(
+        self, caching_client: CachingLLMClient, llm_client: MagicMock
+    ) -> None:
+        """Одновременные одинаковые вопросы ждут один вызов LLM."""
+        release = asyncio.Event()
+
+        async def slow_response(messages: list[ChatMessage]) -> str:
+            await release.wait()
+            return "Овсянка с ягодами"
+
+        llm_client.get_response = AsyncMock(side_effect=slow_response)
+        requests = [asyncio.create_task(caching_client.get_response(QUESTION)) for _ in range(3)]
+        await asyncio.sleep(0)
+        release.set()
+
+        assert await asyncio.gather(*requests) == ["Овсянка с ягодами"] * 3
+        llm_client.get_response.assert_awaited_once()
+        assert caching_client.stats()["shared"] == 2
+
+    async def test_error_not_cached(
+        self, caching_client: CachingLLMClient, llm_client: MagicMock
+    ) -> None:
+        """Ошибка LLM пробрасывается и не попадает в кэш."""
+        llm_client.get_response = AsyncMock(side_effect=[Exception("Rate limit"), "Овсянка"])
+
+        with pytest.raises(Exception, match="Rate limit"):
+            await caching_client.get_response(QUESTION)
+
+        assert await caching_client.get_response(QUESTION) == "Овсянка"
+
+    async def test_stream_cached_after_completion(
+        self, caching_client: CachingLLMClient, llm_client: MagicMock
+    ) -> None:
+        """Дочитанный поток сохраняется, повторный вопрос отдается одним chunk."""
+        calls = 0
+
+        async def stream(messages: list[ChatMessage]) -> AsyncGenerator[str, None]:
+            nonlocal calls
+            calls += 1
+            for chunk in ["Овсянка", " с ягодами"]:
+                yield chunk
+
+        llm_client.get_response_stream = stream
+
+        first = [chunk async for chunk in caching_client.get_response_stream(QUESTION)]
+        second = [chunk async for chunk in caching_client.get_response_stream(QUESTION)]
+
+        assert first == ["Овсянка", " с ягодами"]
+        assert second == ["Овсянка с ягодами"]
+        assert calls == 1
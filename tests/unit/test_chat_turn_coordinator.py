@@ -0,0 +1,95 @@
+"""Unit-тесты для модуля chat_turn_coordinator."""
+
+import asyncio
+
+from src.chat_turn_coordinator import ChatTurnCoordinator
+
+
+class TestChatTurnCoordinator:
+    """Тесты для класса ChatTurnCoordinator."""
+
+    async def test_single_message(self) -> None:
+        """Одиночное сообщение обрабатывается своим вызовом."""
+        coordinator = ChatTurnCoordinator(debounce_seconds=0)
+        processed: list[str] = []
+
+        async def process(text: str) -> None:
+            processed.append(text)
+
+        assert await coordinator.submit(1, 2, "Привет", process) is True
+        assert processed == ["Привет"]
+        assert coordinator.stats()["active_chats"] == 0
+
+    async def test_messages_within_debounce_merged(self) -> None:
+        """Сообщения, пришедшие за время debounce, уходят одним запросом."""
+        coordinator = ChatTurnCoordinator(debounce_seconds=0.05)
+        processed: list[str] = []
+
+        async def process(text: str) -> None:
+            processed.append(text)
+
+        results = await asyncio.gather(
+            coordinator.submit(1, 2, "Привет", process),
+            coordinator.submit(1, 2, "У меня вопрос", process),
+            coordinator.submit(1, 2, "про завтрак", process),
+        )
+
+        assert results == [True, False, False]
+        assert processed == ["Привет\nУ меня вопрос\nпро завтрак"]
+        assert coordinator.stats()["turns"] == 1
+        assert coordinator.stats()["coalesced"] == 2
+
+    async def test_messages_during_turn_processed_next(self) -> None:
+        """Сообщения, пришедшие во время хода, объединяются в следующий ход."""
+        coordinator = ChatTurnCoordinator(debounce_seconds=0)
+        started = asyncio.Event()
+        release = asyncio.Event()
+        processed: list[str] = []
+
+        async def process(text: str) -> None:
+            processed.append(text)
+            if len(processed) == 1:
+                started.set()
+                await release.wait()
+
+        owner = asyncio.create_task(coordinator.submit(1, 2, "первое", process))
+        await started.wait()
+        assert await coordinator.submit(1, 2, "второе", process) is False
+        assert await coordinator.submit(1, 2, "третье", process) is False
+        release.set()
+
+        assert await owner is True
+        assert processed == ["первое", "второе\nтретье"]
+        assert coordinator.stats()["turns"] == 2
+
+    async def test_different_chats_independent(self) -> None:
+        """Сообщения разных чатов не объединяются."""
+        coordinator = ChatTurnCoordinator(debounce_seconds=0.01)
+        processed: list[str] = []
+
+        async def process(text: str) -> None:
+            processed.append(text)
+
+        results = await asyncio.gather(
+            coordinator.submit(1, 1, "a", process),
+            coordinator.submit(2, 2, "b", process),
+        )
+
+        assert results == [True, True]
+        assert sorted(processed) == ["a", "b"]
+
+    async def test_failure_does_not_drop_next_turn(self) -> None:
+        """Ошибка хода учитывается, следующие сообщения все равно обрабатываются."""
+        coordinator = ChatTurnCoordinator(debounce_seconds=0)
+        processed: list[str] = []
+
+        async def process(text: str) -> None:
+            processed.append(text)
+            if text == "первое":
+                await coordinator.submit(1, 2, "второе", process)
+                raise RuntimeError("LLM error")
+
+        await coordinator.submit(1, 2, "первое", process)
+
+        assert processed == ["первое", "второе"]
+        assert coordinator.stats()["failures"] == 1
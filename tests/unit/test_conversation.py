@@ -190,3 +190,16 @@ class TestConversation:
         assert "content" in message
         assert message["role"] == "user"
         assert message["content"] == "Test message"
+
+    @pytest.mark.asyncio
+    async def test_add_turn(self) -> None:
+        """Тест добавления реплики пользователя и ответа ассистента."""
+        conversation = Conversation(max_history_messages=10)
+
+        await conversation.add_turn(1, 2, "Hello", "Hi!")
+
+        history = await conversation.get_history(1, 2)
+        assert [(msg["role"], msg["content"]) for msg in history] == [
+            ("user", "Hello"),
+            ("assistant", "Hi!"),
+        ]
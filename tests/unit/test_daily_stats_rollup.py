@@ -0,0 +1,117 @@
+"""Unit-тесты для модуля daily_stats_rollup."""
+
+from datetime import date, datetime
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.daily_stats_rollup import ROLLUP_LOCK_KEY, ROLLUP_NAME, DailyStatsRollup
+from src.hyperloglog import HyperLogLog
+
+
+class TestDailyStatsRollup:
+    """Тесты для класса DailyStatsRollup."""
+
+    @pytest.fixture
+    def mock_connection(self) -> MagicMock:
+        """Мок соединения с БД внутри транзакции."""
+        connection = MagicMock()
+        connection.fetch = AsyncMock(return_value=[])
+        connection.execute = AsyncMock()
+        connection.transaction = MagicMock(
+            return_value=AsyncMock(
+                __aenter__=AsyncMock(return_value=None),
+                __aexit__=AsyncMock(return_value=False),
+            )
+        )
+        return connection
+
+    @pytest.fixture
+    def mock_pool(self, mock_connection: MagicMock) -> MagicMock:
+        """Мок connection pool."""
+        pool = MagicMock()
+        pool.acquire = MagicMock(
+            return_value=AsyncMock(
+                __aenter__=AsyncMock(return_value=mock_connection),
+                __aexit__=AsyncMock(return_value=False),
+            )
+        )
+        return pool
+
+    async def test_first_refresh_rebuilds_everything(
+        self, mock_pool: MagicMock, mock_connection: MagicMock
+    ) -> None:
+        """Без предыдущего пересчета агрегаты строятся по всей истории."""
+        refreshed_at = datetime(2025, 10, 18, 12, 0)
+        mock_connection.fetchval = AsyncMock(side_effect=[True, refreshed_at, None])
+        rollup = DailyStatsRollup(mock_pool)
+
+        await rollup.refresh()
+
+        delete_stats = mock_connection.execute.await_args_list[0]
+        assert delete_stats.args[1:] == (date.min, [])
+        state = mock_connection.execute.await_args_list[-1]
+        assert state.args[1:] == (ROLLUP_NAME, refreshed_at)
+        assert rollup.stats()["refreshes"] == 1
+
+    async def test_incremental_refresh_recomputes_dirty_days(
+        self, mock_pool: MagicMock, mock_connection: MagicMock
+    ) -> None:
+        """Повторный пересчет захватывает lag-окно и дни с удалениями."""
+        mock_connection.fetchval = AsyncMock(
+            side_effect=[True, datetime(2025, 10, 18, 12, 0), datetime(2025, 10, 18, 11, 55)]
+        )
+        mock_connection.fetch.side_effect = [[{"day": date(2025, 9, 1)}], []]
+        rollup = DailyStatsRollup(mock_pool, lag_days=1)
+
+        await rollup.refresh()
+
+        insert_stats = mock_connection.execute.await_args_list[1]
+        assert "INSERT INTO message_daily_stats" in insert_stats.args[0]
+        assert insert_stats.args[1:] == (datetime(2025, 10, 17), [date(2025, 9, 1)])
+
+    async def test_refresh_writes_daily_sketches(
+        self, mock_pool: MagicMock, mock_connection: MagicMock
+    ) -> None:
+        """Для каждого дня с диалогами записывается HyperLogLog sketch."""
+        mock_connection.fetchval = AsyncMock(side_effect=[True, datetime(2025, 10, 18), None])
+        mock_connection.fetch.return_value = [
+            {"day": date(2025, 10, 17), "user_id": 1, "chat_id": 1},
+            {"day": date(2025, 10, 17), "user_id": 2, "chat_id": 2},
+            {"day": date(2025, 10, 18), "user_id": 1, "chat_id": 1},
+        ]
+        mock_connection.copy_records_to_table = AsyncMock()
+        rollup = DailyStatsRollup(mock_pool, hll_precision=4)
+
+        await rollup.refresh()
+
+        call = mock_connection.copy_records_to_table.await_args
+        assert call.args[0] == "message_daily_hll"
+        sketches = dict(call.kwargs["records"])
+        assert HyperLogLog.from_bytes(sketches[date(2025, 10, 17)]).count() == 2
+        assert HyperLogLog.from_bytes(sketches[date(2025, 10, 18)]).count() == 1
+
+    async def test_skips_when_lock_is_taken(
+        self, mock_pool: MagicMock, mock_connection: MagicMock
+    ) -> None:
+        """Без advisory lock пересчет не выполняется."""
+        mock_connection.fetchval = AsyncMock(return_value=False)
+        rollup = DailyStatsRollup(mock_pool)
+
+        await rollup.refresh()
+
+        mock_connection.execute.assert_not_awaited()
+        assert rollup.stats()["refreshes"] == 0
+
+    async def test_mark_dirty_moves_window_back(
+        self, mock_pool: MagicMock, mock_connection: MagicMock
+    ) -> None:
+        """Отметка сдвигает момент пересчета так, что окно начинается с since."""
+        rollup = DailyStatsRollup(mock_pool, lag_days=1)
+
+        await rollup.mark_dirty(date(2024, 12, 1))
+
+        lock, update = mock_connection.execute.await_args_list
+        assert lock.args == ("SELECT pg_advisory_xact_lock($1)", ROLLUP_LOCK_KEY)
+        assert "LEAST" in update.args[0]
+        assert update.args[1:] == (ROLLUP_NAME, datetime(2024, 12, 2))
@@ -1,11 +1,16 @@
 """Unit-тесты для модуля database_conversation."""
 
-from datetime import datetime
-from unittest.mock import AsyncMock, MagicMock, patch
+from datetime import date, datetime
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 
-from src.database_conversation import DatabaseConversation
+from src.config import Config
+from src.database_conversation import DatabaseConversation, create_database_conversation
+from src.history_cache import HistoryCache
+from src.live_stats import LiveStats
+from src.metrics import MetricsRegistry
 
 
 class TestDatabaseConversation:
@@ -14,7 +19,7 @@ class TestDatabaseConversation:
     @pytest.fixture
     def db_conversation(self) -> DatabaseConversation:
         """Создать экземпляр DatabaseConversation для тестов."""
-        return DatabaseConversation(max_history_messages=10)
+        return DatabaseConversation(MagicMock(), max_history_messages=10)
 
     @pytest.mark.asyncio
     async def test_add_message_success(self, db_conversation: DatabaseConversation) -> None:
@@ -27,15 +32,13 @@ class TestDatabaseConversation:
             )
         )
 
-        with patch(
-            "src.database_conversation.get_pool", new_callable=AsyncMock, return_value=mock_pool
-        ):
-            await db_conversation.add_message(
-                user_id=12345,
-                chat_id=67890,
-                role="user",
-                content="Hello, world!",
-            )
+        db_conversation.pool = mock_pool
+        await db_conversation.add_message(
+            user_id=12345,
+            chat_id=67890,
+            role="user",
+            content="Hello, world!",
+        )
 
         # Проверяем, что execute был вызван с правильными параметрами
         mock_connection.execute.assert_called_once()
@@ -75,10 +78,8 @@ class TestDatabaseConversation:
         ]
         mock_connection.fetch.return_value = mock_rows
 
-        with patch(
-            "src.database_conversation.get_pool", new_callable=AsyncMock, return_value=mock_pool
-        ):
-            history = await db_conversation.get_history(user_id=123, chat_id=456)
+        db_conversation.pool = mock_pool
+        history = await db_conversation.get_history(user_id=123, chat_id=456)
 
         # Проверяем SQL запрос
         mock_connection.fetch.assert_called_once()
@@ -109,10 +110,8 @@ class TestDatabaseConversation:
         )
         mock_connection.fetch.return_value = []
 
-        with patch(
-            "src.database_conversation.get_pool", new_callable=AsyncMock, return_value=mock_pool
-        ):
-            history = await db_conversation.get_history(user_id=123, chat_id=456)
+        db_conversation.pool = mock_pool
+        history = await db_conversation.get_history(user_id=123, chat_id=456)
 
         assert history == []
 
@@ -128,10 +127,8 @@ class TestDatabaseConversation:
         )
         mock_connection.execute.return_value = "UPDATE 5"  # 5 строк обновлено
 
-        with patch(
-            "src.database_conversation.get_pool", new_callable=AsyncMock, return_value=mock_pool
-        ):
-            await db_conversation.clear_history(user_id=123, chat_id=456)
+        db_conversation.pool = mock_pool
+        await db_conversation.clear_history(user_id=123, chat_id=456)
 
         # Проверяем SQL запрос
         mock_connection.execute.assert_called_once()
@@ -155,10 +152,8 @@ class TestDatabaseConversation:
         )
         mock_connection.execute.return_value = "UPDATE 0"  # 0 строк обновлено
 
-        with patch(
-            "src.database_conversation.get_pool", new_callable=AsyncMock, return_value=mock_pool
-        ):
-            await db_conversation.clear_history(user_id=123, chat_id=456)
+        db_conversation.pool = mock_pool
+        await db_conversation.clear_history(user_id=123, chat_id=456)
 
         # Должно выполниться без ошибок
         mock_connection.execute.assert_called_once()
@@ -175,10 +170,8 @@ class TestDatabaseConversation:
         )
         mock_connection.fetch.return_value = []
 
-        with patch(
-            "src.database_conversation.get_pool", new_callable=AsyncMock, return_value=mock_pool
-        ):
-            await db_conversation.get_history(user_id=123, chat_id=456)
+        db_conversation.pool = mock_pool
+        await db_conversation.get_history(user_id=123, chat_id=456)
 
         # Проверяем что лимит передается в SQL
         call_args = mock_connection.fetch.call_args
@@ -197,15 +190,13 @@ class TestDatabaseConversation:
 
         content = "Тест с кириллицей и эмодзи 😀"
 
-        with patch(
-            "src.database_conversation.get_pool", new_callable=AsyncMock, return_value=mock_pool
-        ):
-            await db_conversation.add_message(
-                user_id=123,
-                chat_id=456,
-                role="user",
-                content=content,
-            )
+        db_conversation.pool = mock_pool
+        await db_conversation.add_message(
+            user_id=123,
+            chat_id=456,
+            role="user",
+            content=content,
+        )
 
         call_args = mock_connection.execute.call_args
         assert call_args[0][5] == len(content)  # message_length должна быть длина строки
@@ -213,7 +204,7 @@ class TestDatabaseConversation:
     @pytest.mark.asyncio
     async def test_database_conversation_initialization(self) -> None:
         """Тест инициализации DatabaseConversation."""
-        conv = DatabaseConversation(max_history_messages=20)
+        conv = DatabaseConversation(MagicMock(), max_history_messages=20)
         assert conv.max_history_messages == 20
 
     @pytest.mark.asyncio
@@ -239,10 +230,8 @@ class TestDatabaseConversation:
         ]
         mock_connection.fetch.return_value = mock_rows
 
-        with patch(
-            "src.database_conversation.get_pool", new_callable=AsyncMock, return_value=mock_pool
-        ):
-            history = await db_conversation.get_history(user_id=123, chat_id=456)
+        db_conversation.pool = mock_pool
+        history = await db_conversation.get_history(user_id=123, chat_id=456)
 
         assert len(history) == 1
         message = history[0]
@@ -251,3 +240,275 @@ class TestDatabaseConversation:
         assert "content" in message
         assert "created_at" in message
         assert "message_length" in message
+
+
+class TestDatabaseConversationWithCache:
+    """Тесты DatabaseConversation с write-through кэшем истории."""
+
+    @pytest.fixture
+    def mock_connection(self) -> AsyncMock:
+        """Мок соединения с БД."""
+        connection = AsyncMock()
+        connection.fetch.return_value = [
+            {
+                "role": "user",
+                "content": "Hello",
+                "created_at": datetime(2025, 10, 16, 12, 0, 0),
+                "message_length": 5,
+            }
+        ]
+        connection.execute.return_value = "UPDATE 1"
+        return connection
+
+    @pytest.fixture
+    def mock_pool(self, mock_connection: AsyncMock) -> MagicMock:
+        """Мок connection pool."""
+        pool = MagicMock()
+        pool.acquire = MagicMock(
+            return_value=AsyncMock(
+                __aenter__=AsyncMock(return_value=mock_connection), __aexit__=AsyncMock()
+            )
+        )
+        return pool
+
+    @pytest.fixture
+    def db_conversation(self, mock_pool: MagicMock) -> DatabaseConversation:
+        """DatabaseConversation с кэшем истории."""
+        return DatabaseConversation(
+            mock_pool,
+            max_history_messages=2,
+            history_cache=HistoryCache(max_size=10, ttl_seconds=60),
+        )
+
+    async def test_second_get_history_served_from_cache(
+        self,
+        db_conversation: DatabaseConversation,
+        mock_pool: MagicMock,
+        mock_connection: AsyncMock,
+    ) -> None:
+        """Повторное чтение истории не обращается к БД."""
+        first = await db_conversation.get_history(user_id=1, chat_id=2)
+        second = await db_conversation.get_history(user_id=1, chat_id=2)
+
+        assert first == second
+        mock_connection.fetch.assert_called_once()
+
+    async def test_add_message_updates_cached_window(
+        self,
+        db_conversation: DatabaseConversation,
+        mock_pool: MagicMock,
+        mock_connection: AsyncMock,
+    ) -> None:
+        """add_message дописывает сообщение в окно кэша с учетом лимита."""
+        await db_conversation.get_history(user_id=1, chat_id=2)
+        await db_conversation.add_message(1, 2, "assistant", "Hi")
+        await db_conversation.add_message(1, 2, "user", "Question")
+        history = await db_conversation.get_history(user_id=1, chat_id=2)
+
+        assert [msg["content"] for msg in history] == ["Hi", "Question"]
+        assert history[1]["message_length"] == 8
+        mock_connection.fetch.assert_called_once()
+
+    async def test_clear_history_invalidates_cache(
+        self,
+        db_conversation: DatabaseConversation,
+        mock_pool: MagicMock,
+        mock_connection: AsyncMock,
+    ) -> None:
+        """clear_history инвалидирует окно, следующее чтение идет в БД."""
+        await db_conversation.get_history(user_id=1, chat_id=2)
+        await db_conversation.clear_history(user_id=1, chat_id=2)
+        await db_conversation.get_history(user_id=1, chat_id=2)
+
+        assert mock_connection.fetch.call_count == 2
+
+
+class TestDatabaseConversationAddTurn:
+    """Тесты пакетной записи реплики пользователя и ответа ассистента."""
+
+    async def test_add_turn_single_insert(self) -> None:
+        """add_turn записывает обе строки одним запросом на одном соединении."""
+        mock_connection = AsyncMock()
+        mock_pool = MagicMock()
+        mock_pool.acquire = MagicMock(
+            return_value=AsyncMock(
+                __aenter__=AsyncMock(return_value=mock_connection), __aexit__=AsyncMock()
+            )
+        )
+
+        await DatabaseConversation(mock_pool, max_history_messages=10).add_turn(
+            user_id=1, chat_id=2, user_content="Hello", assistant_content="Hi!", source="web"
+        )
+
+        mock_pool.acquire.assert_called_once()
+        mock_connection.execute.assert_called_once()
+        call_args = mock_connection.execute.call_args[0]
+        assert "INSERT INTO messages" in call_args[0]
+        assert "unnest" in call_args[0]
+        assert call_args[1:7] == (1, 2, ["user", "assistant"], ["Hello", "Hi!"], [5, 3], "web")
+        assert isinstance(call_args[7], datetime)
+
+    async def test_add_turn_updates_cache(self) -> None:
+        """add_turn дописывает обе реплики в закэшированное окно по порядку."""
+        mock_pool = MagicMock()
+        mock_pool.acquire = MagicMock(
+            return_value=AsyncMock(__aenter__=AsyncMock(), __aexit__=AsyncMock())
+        )
+        cache = HistoryCache(max_size=10, ttl_seconds=60)
+        cache.set(1, 2, [])
+        conversation = DatabaseConversation(mock_pool, max_history_messages=10, history_cache=cache)
+
+        await conversation.add_turn(1, 2, "Hello", "Hi!")
+        history = await conversation.get_history(1, 2)
+
+        assert [(msg["role"], msg["content"]) for msg in history] == [
+            ("user", "Hello"),
+            ("assistant", "Hi!"),
+        ]
+
+
+class TestDatabaseConversationWriteBehind:
+    """Тесты DatabaseConversation в режиме write-behind."""
+
+    async def test_add_turn_enqueues_without_db_roundtrip(self) -> None:
+        """add_turn ставит обе реплики в очередь и не обращается к БД."""
+        write_queue = MagicMock()
+        write_queue.put = AsyncMock()
+        pool = MagicMock()
+        conversation = DatabaseConversation(pool, max_history_messages=10, write_queue=write_queue)
+
+        await conversation.add_turn(1, 2, "Hello", "Hi!", source="web")
+
+        pool.acquire.assert_not_called()
+        records = write_queue.put.call_args[0][0]
+        assert [record[:6] for record in records] == [
+            (1, 2, "user", "Hello", 5, "web"),
+            (1, 2, "assistant", "Hi!", 3, "web"),
+        ]
+
+    async def test_get_history_flushes_queue_before_read(self) -> None:
+        """get_history сбрасывает очередь перед чтением из БД."""
+        mock_connection = AsyncMock()
+        mock_connection.fetch.return_value = []
+        mock_pool = MagicMock()
+        mock_pool.acquire = MagicMock(
+            return_value=AsyncMock(
+                __aenter__=AsyncMock(return_value=mock_connection), __aexit__=AsyncMock()
+            )
+        )
+        write_queue = MagicMock()
+        write_queue.flush = AsyncMock()
+        conversation = DatabaseConversation(
+            mock_pool, max_history_messages=10, write_queue=write_queue
+        )
+
+        await conversation.get_history(1, 2)
+
+        write_queue.flush.assert_called_once()
+        mock_connection.fetch.assert_called_once()
+
+
+class TestDatabaseConversationLiveStats:
+    """Тесты пополнения in-process счетчиков статистики."""
+
+    async def test_writes_and_clear_update_live_stats(self) -> None:
+        """add_message/add_turn пополняют счетчики, clear_history снимает диалог."""
+        mock_connection = AsyncMock()
+        mock_connection.execute.return_value = "UPDATE 3"
+        mock_pool = MagicMock()
+        mock_pool.acquire = MagicMock(
+            return_value=AsyncMock(
+                __aenter__=AsyncMock(return_value=mock_connection), __aexit__=AsyncMock()
+            )
+        )
+        live_stats = LiveStats(MagicMock())
+        conversation = DatabaseConversation(
+            mock_pool, max_history_messages=10, live_stats=live_stats
+        )
+        today = date.today()
+
+        await conversation.add_message(1, 2, "user", "Hello", source="web")
+        await conversation.add_turn(1, 2, "Hello", "Hi!", source="web")
+        await conversation.add_turn(3, 4, "Hello", "Hi!")
+        assert live_stats.daily_counts(today) == {today: 5}
+
+        await conversation.clear_history(1, 2)
+
+        assert live_stats.daily_counts(today) == {today: 2}
+
+
+class TestCreateDatabaseConversation:
+    """Тесты сборки хранилища диалогов по конфигурации."""
+
+    @pytest.fixture
+    def config(self, monkeypatch: pytest.MonkeyPatch) -> Config:
+        """Конфигурация с кэшем истории и write-behind очередью."""
+        monkeypatch.setenv("TELEGRAM_BOT_TOKEN", "token")
+        monkeypatch.setenv("OPENROUTER_API_KEY", "key")
+        monkeypatch.setenv("DATABASE_URL", "postgresql://localhost:5432/db")
+        monkeypatch.setenv("HISTORY_CACHE_SIZE", "100")
+        monkeypatch.setenv("MESSAGE_WRITE_BEHIND", "true")
+        return Config()
+
+    @pytest.fixture
+    def shared_pool(self) -> MagicMock:
+        """Мок pool поверх общей таблицы messages в памяти."""
+        rows: list[dict[str, Any]] = []
+
+        async def execute(query: str, *args: Any) -> str:
+            role, content, message_length = args[2:5]
+            rows.append(
+                {
+                    "role": role,
+                    "content": content,
+                    "created_at": datetime.now(),
+                    "message_length": message_length,
+                }
+            )
+            return "INSERT 0 1"
+
+        async def fetch(query: str, user_id: int, chat_id: int, limit: int) -> list[Any]:
+            return list(reversed(rows))[:limit]
+
+        connection = AsyncMock()
+        connection.execute = AsyncMock(side_effect=execute)
+        connection.fetch = AsyncMock(side_effect=fetch)
+        pool = MagicMock()
+        pool.acquire = MagicMock(
+            return_value=AsyncMock(
+                __aenter__=AsyncMock(return_value=connection), __aexit__=AsyncMock()
+            )
+        )
+        return pool
+
+    async def test_single_worker_keeps_cache_and_queue(
+        self, config: Config, shared_pool: MagicMock
+    ) -> None:
+        """В одном процессе кэш истории и очередь включаются по конфигурации."""
+        metrics = MetricsRegistry()
+
+        conversation = await create_database_conversation(config, shared_pool, metrics)
+
+        assert conversation.history_cache is not None
+        assert conversation.write_queue is not None
+        assert {"history_cache", "message_write_queue"} <= metrics.collect().keys()
+        await conversation.write_queue.stop()
+
+    async def test_two_workers_see_each_other_writes(
+        self, config: Config, shared_pool: MagicMock
+    ) -> None:
+        """При двух workers кэш и очередь отключены: запись одного сразу видна другому."""
+        first = await create_database_conversation(
+            config, shared_pool, MetricsRegistry(), workers=2
+        )
+        second = await create_database_conversation(
+            config, shared_pool, MetricsRegistry(), workers=2
+        )
+
+        assert first.history_cache is None
+        assert first.write_queue is None
+        assert await first.get_history(1, 2) == []
+
+        await second.add_message(1, 2, "user", "Hello", source="web")
+
+        assert [msg["content"] for msg in await first.get_history(1, 2)] == ["Hello"]
@@ -0,0 +1,113 @@
+"""Unit-тесты для модуля history_cache."""
+
+from unittest.mock import patch
+
+from src.history_cache import HistoryCache
+from src.types import ChatMessage
+
+
+class TestHistoryCache:
+    """Тесты для класса HistoryCache."""
+
+    def test_get_miss_returns_none(self) -> None:
+        """Промах кэша возвращает None и увеличивает счетчик misses."""
+        cache = HistoryCache(max_size=10, ttl_seconds=60)
+
+        assert cache.get(1, 2) is None
+        assert cache.misses == 1
+        assert cache.hits == 0
+
+    def test_set_and_get_hit(self) -> None:
+        """Сохраненное окно возвращается из кэша."""
+        cache = HistoryCache(max_size=10, ttl_seconds=60)
+        messages = [ChatMessage(role="user", content="Hello")]
+
+        cache.set(1, 2, messages)
+        result = cache.get(1, 2)
+
+        assert result == messages
+        assert cache.hits == 1
+
+    def test_get_returns_copy(self) -> None:
+        """Изменение результата не затрагивает закэшированное окно."""
+        cache = HistoryCache(max_size=10, ttl_seconds=60)
+        cache.set(1, 2, [ChatMessage(role="user", content="Hello")])
+
+        result = cache.get(1, 2)
+        assert result is not None
+        result.append(ChatMessage(role="assistant", content="Hi"))
+
+        assert len(cache.get(1, 2) or []) == 1
+
+    def test_append_trims_window(self) -> None:
+        """append дописывает сообщение и обрезает окно до max_messages."""
+        cache = HistoryCache(max_size=10, ttl_seconds=60)
+        cache.set(
+            1, 2, [ChatMessage(role="user", content="1"), ChatMessage(role="user", content="2")]
+        )
+
+        cache.append(1, 2, ChatMessage(role="assistant", content="3"), max_messages=2)
+
+        result = cache.get(1, 2)
+        assert result is not None
+        assert [msg["content"] for msg in result] == ["2", "3"]
+
+    def test_append_without_cached_window_is_noop(self) -> None:
+        """append не создает окно, если его нет в кэше."""
+        cache = HistoryCache(max_size=10, ttl_seconds=60)
+
+        cache.append(1, 2, ChatMessage(role="user", content="Hello"), max_messages=10)
+
+        assert cache.get(1, 2) is None
+
+    def test_invalidate(self) -> None:
+        """invalidate удаляет окно из кэша."""
+        cache = HistoryCache(max_size=10, ttl_seconds=60)
+        cache.set(1, 2, [ChatMessage(role="user", content="Hello")])
+
+        cache.invalidate(1, 2)
+
+        assert cache.get(1, 2) is None
+
+    def test_lru_eviction(self) -> None:
+        """При переполнении вытесняется самый давно использованный диалог."""
+        cache = HistoryCache(max_size=2, ttl_seconds=60)
+        cache.set(1, 1, [])
+        cache.set(2, 2, [])
+        cache.get(1, 1)  # (1, 1) становится самым свежим
+        cache.set(3, 3, [])
+
+        assert cache.get(2, 2) is None
+        assert cache.get(1, 1) == []
+        assert cache.get(3, 3) == []
+
+    def test_ttl_expiration(self) -> None:
+        """Окно истории истекает по TTL."""
+        cache = HistoryCache(max_size=10, ttl_seconds=60)
+
+        with patch("src.history_cache.time.monotonic", return_value=1000.0):
+            cache.set(1, 2, [])
+        with patch("src.history_cache.time.monotonic", return_value=1061.0):
+            assert cache.get(1, 2) is None
+
+    def test_zero_size_disables_cache(self) -> None:
+        """max_size=0 отключает кэширование."""
+        cache = HistoryCache(max_size=0, ttl_seconds=60)
+
+        cache.set(1, 2, [])
+
+        assert cache.get(1, 2) is None
+
+    def test_stats(self) -> None:
+        """stats возвращает счетчики попаданий и промахов."""
+        cache = HistoryCache(max_size=10, ttl_seconds=60)
+        cache.set(1, 2, [])
+        cache.get(1, 2)
+        cache.get(3, 4)
+
+        stats = cache.stats()
+
+        assert stats["hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_ratio"] == 0.5
+        assert stats["size"] == 1
@@ -0,0 +1,63 @@
+"""Unit-тесты для модуля hyperloglog."""
+
+import pytest
+
+from src.hyperloglog import HyperLogLog
+
+
+def _sketch(values: range, precision: int = 12) -> HyperLogLog:
+    """Создать sketch из диапазона чисел."""
+    sketch = HyperLogLog(precision)
+    for value in values:
+        sketch.add(value.to_bytes(8, "big"))
+    return sketch
+
+
+class TestHyperLogLog:
+    """Тесты для класса HyperLogLog."""
+
+    def test_empty_sketch(self) -> None:
+        """Пустой sketch оценивается нулем."""
+        assert HyperLogLog().count() == 0
+
+    def test_small_set_is_nearly_exact(self) -> None:
+        """Малые множества считаются почти точно (linear counting)."""
+        assert _sketch(range(100)).count() == pytest.approx(100, abs=2)
+
+    def test_duplicates_are_ignored(self) -> None:
+        """Повторные значения не увеличивают оценку."""
+        sketch = _sketch(range(50))
+        for value in range(50):
+            sketch.add(value.to_bytes(8, "big"))
+
+        assert sketch.count() == pytest.approx(50, abs=1)
+
+    def test_large_set_within_error(self) -> None:
+        """Оценка большого множества укладывается в несколько стандартных ошибок."""
+        assert _sketch(range(50_000)).count() == pytest.approx(50_000, rel=0.05)
+
+    def test_merge_is_union(self) -> None:
+        """Объединение sketches оценивает объединение множеств."""
+        merged = _sketch(range(0, 3000))
+        merged.merge(_sketch(range(2000, 5000)))
+
+        assert merged.count() == pytest.approx(5000, rel=0.05)
+
+    def test_bytes_roundtrip(self) -> None:
+        """Сериализация сохраняет precision и регистры."""
+        sketch = _sketch(range(1000), precision=10)
+
+        restored = HyperLogLog.from_bytes(sketch.to_bytes())
+
+        assert restored.precision == 10
+        assert restored.count() == sketch.count()
+
+    def test_merge_different_precision_fails(self) -> None:
+        """Sketches с разной precision не объединяются."""
+        with pytest.raises(ValueError, match="Cannot merge"):
+            HyperLogLog(10).merge(HyperLogLog(12))
+
+    def test_invalid_precision(self) -> None:
+        """precision вне 4-16 запрещена."""
+        with pytest.raises(ValueError, match="Invalid precision"):
+            HyperLogLog(precision=20)
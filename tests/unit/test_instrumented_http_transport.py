@@ -0,0 +1,120 @@
+"""Unit-тесты для модулей instrumented_http_transport и llm_http_client."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import httpx
+import pytest
+
+from src.instrumented_http_transport import InstrumentedHTTPTransport
+from src.llm_http_client import create_llm_http_client
+from src.metrics import MetricsRegistry
+
+
+def make_connection(idle: bool, info: str = "HTTP/1.1, IDLE") -> MagicMock:
+    """Мок соединения httpcore."""
+    connection = MagicMock()
+    connection.is_idle.return_value = idle
+    connection.info.return_value = info
+    return connection
+
+
+class TestInstrumentedHTTPTransport:
+    """Тесты для класса InstrumentedHTTPTransport."""
+
+    @pytest.fixture
+    def transport(self) -> InstrumentedHTTPTransport:
+        """Транспорт с моком пула httpcore."""
+        transport = InstrumentedHTTPTransport(limits=httpx.Limits(max_connections=50))
+        transport._pool = MagicMock(connections=[])  # type: ignore[assignment]
+        return transport
+
+    async def test_counts_new_and_reused_connections(
+        self, transport: InstrumentedHTTPTransport
+    ) -> None:
+        """Новое соединение считается по trace событию, остальные запросы - переиспользование."""
+        events = iter([["connection.connect_tcp.complete"], [], []])
+        caller_trace = AsyncMock()
+
+        async def handle(request: httpx.Request) -> httpx.Response:
+            # httpcore сообщает об установке соединения через trace extension
+            for event in next(events):
+                await request.extensions["trace"](event, {})
+            return httpx.Response(200, extensions={"http_version": b"HTTP/2"})
+
+        with patch.object(httpx.AsyncHTTPTransport, "handle_async_request", side_effect=handle):
+            for _ in range(3):
+                request = httpx.Request("POST", "https://openrouter.ai/api/v1/chat/completions")
+                request.extensions["trace"] = caller_trace
+                await transport.handle_async_request(request)
+
+        snapshot = transport.snapshot()
+        assert snapshot["requests"] == 3
+        assert snapshot["connections_opened"] == 1
+        assert snapshot["http2_requests"] == 3
+        assert snapshot["reuse_ratio"] == 0.667
+        caller_trace.assert_awaited_once_with("connection.connect_tcp.complete", {})
+
+    async def test_counts_errors(self, transport: InstrumentedHTTPTransport) -> None:
+        """Ошибка транспорта учитывается и пробрасывается дальше."""
+        request = httpx.Request("POST", "https://openrouter.ai/api/v1/chat/completions")
+
+        with (
+            patch.object(
+                httpx.AsyncHTTPTransport,
+                "handle_async_request",
+                new_callable=AsyncMock,
+                side_effect=httpx.ConnectTimeout("timeout"),
+            ),
+            pytest.raises(httpx.ConnectTimeout),
+        ):
+            await transport.handle_async_request(request)
+
+        assert transport.snapshot()["errors"] == 1
+
+    def test_snapshot_connections(self, transport: InstrumentedHTTPTransport) -> None:
+        """Снимок показывает активные, простаивающие и HTTP/2 соединения."""
+        transport._pool.connections.extend(
+            [
+                make_connection(idle=True),
+                make_connection(idle=False, info="HTTP/2, ACTIVE, Request Count: 3"),
+            ]
+        )
+
+        snapshot = transport.snapshot()
+
+        assert snapshot["connections"] == 2
+        assert snapshot["idle"] == 1
+        assert snapshot["active"] == 1
+        assert snapshot["http2_connections"] == 1
+        assert snapshot["max_connections"] == 50
+        assert snapshot["reuse_ratio"] == 0.0
+
+    def test_snapshot_without_pool(self, transport: InstrumentedHTTPTransport) -> None:
+        """Если пул httpcore недоступен, снимок показывает нули вместо ошибки."""
+        del transport._pool
+
+        snapshot = transport.snapshot()
+
+        assert snapshot["connections"] == 0
+        assert snapshot["max_connections"] == 50
+
+
+class TestCreateLLMHttpClient:
+    """Тесты для create_llm_http_client."""
+
+    async def test_client_settings(self) -> None:
+        """Клиент получает раздельные таймауты и регистрирует метрики пула."""
+        metrics = MetricsRegistry()
+        client = create_llm_http_client(
+            metrics,
+            max_connections=200,
+            keepalive_expiry=60.0,
+            connect_timeout=2.0,
+            read_timeout=45.0,
+        )
+        try:
+            assert client.timeout.connect == 2.0
+            assert client.timeout.read == 45.0
+            assert metrics.collect()["llm_http"]["max_connections"] == 200
+        finally:
+            await client.aclose()
@@ -0,0 +1,160 @@
+"""Unit-тесты для модуля instrumented_pool."""
+
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.instrumented_pool import InstrumentedPool
+from src.statements import STATEMENTS, WARM_UP_ARGS
+
+
+class TestInstrumentedPool:
+    """Тесты для класса InstrumentedPool."""
+
+    @pytest.fixture
+    def raw_pool(self) -> MagicMock:
+        """Мок исходного asyncpg pool."""
+        pool = MagicMock()
+        pool.acquire = AsyncMock(return_value="connection")
+        pool.release = AsyncMock()
+        pool.close = AsyncMock()
+        pool.get_size.return_value = 2
+        pool.get_idle_size.return_value = 1
+        pool.get_max_size.return_value = 10
+        return pool
+
+    @pytest.fixture
+    async def pool(self, raw_pool: MagicMock) -> InstrumentedPool:
+        """InstrumentedPool поверх мока asyncpg pool."""
+        instrumented = InstrumentedPool(acquire_timeout=5.0)
+        with patch(
+            "src.instrumented_pool.asyncpg.create_pool",
+            new_callable=AsyncMock,
+            return_value=raw_pool,
+        ):
+            await instrumented.open("postgresql://localhost/db", min_size=1, max_size=10)
+        return instrumented
+
+    async def test_open_passes_init_hook(self) -> None:
+        """open создает pool с init hook для query logger."""
+        instrumented = InstrumentedPool(acquire_timeout=5.0)
+        with patch(
+            "src.instrumented_pool.asyncpg.create_pool", new_callable=AsyncMock
+        ) as create_pool:
+            await instrumented.open("postgresql://localhost/db", max_size=20)
+
+        kwargs = create_pool.call_args.kwargs
+        assert kwargs["max_size"] == 20
+        assert kwargs["init"] == instrumented._init_connection
+
+    async def test_acquire_tracks_checked_out(
+        self, pool: InstrumentedPool, raw_pool: MagicMock
+    ) -> None:
+        """acquire учитывает выданные соединения и возвращает их в pool."""
+        async with pool.acquire() as connection:
+            assert connection == "connection"
+            assert pool.checked_out == 1
+
+        assert pool.checked_out == 0
+        assert pool.max_checked_out == 1
+        assert pool.acquires == 1
+        raw_pool.acquire.assert_called_once_with(timeout=5.0)
+        raw_pool.release.assert_called_once_with("connection")
+
+    async def test_acquire_releases_on_error(
+        self, pool: InstrumentedPool, raw_pool: MagicMock
+    ) -> None:
+        """Соединение возвращается в pool при исключении в теле блока."""
+        with pytest.raises(ValueError):
+            async with pool.acquire():
+                raise ValueError("boom")
+
+        assert pool.checked_out == 0
+        raw_pool.release.assert_called_once()
+
+    async def test_acquire_timeout_counted(
+        self, pool: InstrumentedPool, raw_pool: MagicMock
+    ) -> None:
+        """Таймаут ожидания соединения учитывается в метриках."""
+        raw_pool.acquire.side_effect = TimeoutError()
+
+        with pytest.raises(TimeoutError):
+            async with pool.acquire():
+                pass
+
+        assert pool.acquire_timeouts == 1
+        assert pool.checked_out == 0
+
+    async def test_record_query(self, pool: InstrumentedPool) -> None:
+        """record_query учитывает длительность и ошибки запросов."""
+        pool.record_query(SimpleNamespace(elapsed=0.002, exception=None))
+        pool.record_query(SimpleNamespace(elapsed=0.010, exception=Exception("fail")))
+
+        snapshot = pool.snapshot()
+        assert snapshot["queries"] == 2
+        assert snapshot["query_errors"] == 1
+        assert snapshot["query_max_ms"] == 10.0
+
+    async def test_init_connection_adds_query_logger(self, pool: InstrumentedPool) -> None:
+        """Init hook подключает query logger и готовит statements через кэш соединения."""
+        connection = MagicMock(prepare=AsyncMock(), fetch=AsyncMock(return_value=[]))
+
+        await pool._init_connection(connection)
+
+        connection.add_query_logger.assert_called_once_with(pool.record_query)
+        queries = [call.args[0] for call in connection.fetch.await_args_list]
+        assert queries == [STATEMENTS[name] for name in WARM_UP_ARGS]
+        # PreparedStatement не создаются: они недействительны после release
+        connection.prepare.assert_not_awaited()
+
+    async def test_init_connection_without_statement_cache(self, raw_pool: MagicMock) -> None:
+        """При statement_cache_size=0 init hook не готовит statements."""
+        instrumented = InstrumentedPool(acquire_timeout=5.0)
+        with patch(
+            "src.instrumented_pool.asyncpg.create_pool",
+            new_callable=AsyncMock,
+            return_value=raw_pool,
+        ):
+            await instrumented.open("postgresql://localhost/db", statement_cache_size=0)
+        connection = MagicMock(fetch=AsyncMock())
+
+        await instrumented._init_connection(connection)
+
+        connection.fetch.assert_not_awaited()
+
+    async def test_snapshot_pool_size(self, pool: InstrumentedPool) -> None:
+        """snapshot содержит размер pool."""
+        snapshot = pool.snapshot()
+
+        assert snapshot["size"] == 2
+        assert snapshot["idle"] == 1
+        assert snapshot["max_size"] == 10
+        assert snapshot["acquire_wait_p95_ms"] == 0.0
+
+    async def test_close_runs_callbacks_first(
+        self, pool: InstrumentedPool, raw_pool: MagicMock
+    ) -> None:
+        """close выполняет before-close callbacks до закрытия pool, ошибка не мешает закрытию."""
+        calls: list[str] = []
+
+        async def failing() -> None:
+            calls.append("failing")
+            raise RuntimeError("flush failed")
+
+        async def flush() -> None:
+            calls.append("flush")
+            raw_pool.close.assert_not_awaited()
+
+        pool.add_before_close_callback(failing)
+        pool.add_before_close_callback(flush)
+
+        await pool.close()
+
+        assert calls == ["failing", "flush"]
+        raw_pool.close.assert_awaited_once()
+
+    def test_pool_not_opened(self) -> None:
+        """Обращение к pool до open вызывает RuntimeError."""
+        with pytest.raises(RuntimeError):
+            _ = InstrumentedPool(acquire_timeout=1.0).pool
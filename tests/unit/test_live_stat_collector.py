@@ -0,0 +1,36 @@
+"""Unit-тесты для модуля live_stat_collector."""
+
+from datetime import date, timedelta
+from unittest.mock import MagicMock
+
+import pytest
+
+from src.api.live_stat_collector import LiveStatCollector
+from src.live_stats import LiveStats
+
+
+class TestLiveStatCollector:
+    """Тесты для класса LiveStatCollector."""
+
+    async def test_invalid_period(self) -> None:
+        """Невалидный период вызывает ValueError."""
+        with pytest.raises(ValueError, match="Invalid period"):
+            await LiveStatCollector(LiveStats(MagicMock())).get_dashboard_stats("1y")
+
+    async def test_stats_from_counters(self) -> None:
+        """Метрики и ряд строятся по счетчикам текущего и предыдущего периодов."""
+        today = date.today()
+        live_stats = LiveStats(MagicMock())
+        live_stats.record(1, 1, "telegram", count=10)
+        live_stats.record(2, 2, "web", count=2)
+        live_stats.record(1, 1, "web", count=6, day=today - timedelta(days=10))
+
+        stats = await LiveStatCollector(live_stats).get_dashboard_stats("7d")
+
+        assert stats.metrics.total_messages.value == 12
+        assert stats.metrics.total_messages.change_percent == 100.0
+        assert stats.metrics.active_conversations.value == 2
+        assert stats.metrics.avg_conversation_length.value == 6.0
+        assert len(stats.time_series) == 8
+        assert stats.time_series[-1].date == today.isoformat()
+        assert stats.time_series[-1].value == 12
@@ -0,0 +1,114 @@
+"""Unit-тесты для модуля live_stats."""
+
+from datetime import date, timedelta
+from unittest.mock import AsyncMock, MagicMock
+
+from src.live_stats import LiveStats
+
+
+class TestLiveStats:
+    """Тесты для класса LiveStats."""
+
+    async def test_seed_loads_counts_from_db(self) -> None:
+        """seed пересобирает счетчики из сгруппированных строк messages."""
+        today = date.today()
+        connection = AsyncMock()
+        connection.fetch.return_value = [
+            {"day": today, "user_id": 1, "chat_id": 1, "source": "telegram", "message_count": 4},
+            {"day": today, "user_id": 1, "chat_id": 1, "source": "web", "message_count": 2},
+            {"day": today, "user_id": 2, "chat_id": 2, "source": "web", "message_count": 1},
+        ]
+        pool = MagicMock()
+        pool.acquire = MagicMock(
+            return_value=AsyncMock(
+                __aenter__=AsyncMock(return_value=connection),
+                __aexit__=AsyncMock(return_value=False),
+            )
+        )
+        live_stats = LiveStats(pool)
+        live_stats.record(9, 9, "web")
+
+        await live_stats.seed()
+
+        assert live_stats.totals(today, today + timedelta(days=1)) == {
+            "total_messages": 7,
+            "active_conversations": 2,
+        }
+        assert live_stats.stats()["seeds"] == 1
+
+    async def test_changes_during_seed_are_kept(self) -> None:
+        """Сообщения и очистки, пришедшие во время пересборки, применяются к новому снимку."""
+        today = date.today()
+        live_stats = LiveStats(MagicMock())
+
+        async def fetch(*args: object) -> list[dict[str, object]]:
+            # Пока запрос выполняется, процесс записывает и очищает диалоги
+            live_stats.record(3, 3, "web", count=2)
+            live_stats.forget(2, 2)
+            return [
+                {"day": today, "user_id": 1, "chat_id": 1, "source": "web", "message_count": 4},
+                {"day": today, "user_id": 2, "chat_id": 2, "source": "web", "message_count": 1},
+            ]
+
+        connection = AsyncMock()
+        connection.fetch.side_effect = fetch
+        live_stats.pool.acquire = MagicMock(
+            return_value=AsyncMock(
+                __aenter__=AsyncMock(return_value=connection),
+                __aexit__=AsyncMock(return_value=False),
+            )
+        )
+
+        await live_stats.seed()
+        live_stats.record(1, 1, "web")
+
+        assert live_stats.totals(today, today + timedelta(days=1)) == {
+            "total_messages": 7,
+            "active_conversations": 2,
+        }
+
+    def test_record_counts_messages_and_distinct_conversations(self) -> None:
+        """Повторные сообщения диалога не увеличивают число активных диалогов."""
+        today = date.today()
+        yesterday = today - timedelta(days=1)
+        live_stats = LiveStats(MagicMock())
+
+        live_stats.record(1, 1, "telegram", count=2)
+        live_stats.record(1, 1, "web")
+        live_stats.record(2, 2, "web", day=yesterday)
+        live_stats.record(1, 1, "web", day=yesterday)
+
+        assert live_stats.totals(yesterday, today + timedelta(days=1)) == {
+            "total_messages": 5,
+            "active_conversations": 2,
+        }
+        assert live_stats.totals(yesterday, today) == {
+            "total_messages": 2,
+            "active_conversations": 2,
+        }
+        assert live_stats.daily_counts(yesterday) == {yesterday: 2, today: 3}
+
+    def test_forget_removes_conversation_from_all_days(self) -> None:
+        """Очищенный диалог снимается со счетчиков за все дни."""
+        today = date.today()
+        live_stats = LiveStats(MagicMock())
+        live_stats.record(1, 1, "web", day=today - timedelta(days=3))
+        live_stats.record(1, 1, "web")
+        live_stats.record(2, 2, "web")
+
+        live_stats.forget(1, 1)
+
+        assert live_stats.totals(today - timedelta(days=7), today + timedelta(days=1)) == {
+            "total_messages": 1,
+            "active_conversations": 1,
+        }
+
+    def test_old_days_pruned(self) -> None:
+        """Дни старше retention_days удаляются при появлении нового дня."""
+        today = date.today()
+        live_stats = LiveStats(MagicMock(), retention_days=7)
+        live_stats.record(1, 1, "web", day=today - timedelta(days=30))
+
+        live_stats.record(1, 1, "web")
+
+        assert live_stats.stats()["days"] == 1
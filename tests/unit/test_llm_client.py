@@ -3,6 +3,7 @@
 from pathlib import Path
 from unittest.mock import AsyncMock, MagicMock, patch
 
+import httpx
 import pytest
 from openai import APIError, APITimeoutError, AuthenticationError, RateLimitError
 
@@ -198,6 +199,23 @@ class TestLLMClient:
         assert client.timeout == 60
         assert client.client is not None
 
+    async def test_shared_http_client_timeouts(self) -> None:
+        """Запросы идут через общий HTTP клиент с раздельными connect/read таймаутами."""
+        http_client = httpx.AsyncClient()
+        client = LLMClient(
+            api_key="my_key",
+            model="gpt-4",
+            temperature=0.5,
+            max_tokens=2000,
+            timeout=30,
+            connect_timeout=2.0,
+            http_client=http_client,
+        )
+
+        assert client.request_timeout.connect == 2.0  # type: ignore[union-attr]
+        assert client.request_timeout.read == 30  # type: ignore[union-attr]
+        await http_client.aclose()
+
     def test_load_system_prompt_success(self, tmp_path: Path) -> None:
         """Тест успешной загрузки системного промпта из файла."""
         # Создаем временный файл с промптом
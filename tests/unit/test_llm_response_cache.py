@@ -0,0 +1,141 @@
+"""Unit-тесты для модуля llm_response_cache."""
+
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.llm_response_cache import LLMResponseCache, make_cache_key
+from src.statements import STATEMENTS
+from src.types import ChatMessage
+
+
+def question(text: str) -> list[ChatMessage]:
+    """Первый вопрос диалога."""
+    return [{"role": "user", "content": text}]
+
+
+class TestMakeCacheKey:
+    """Тесты для функции make_cache_key."""
+
+    def test_normalizes_text(self) -> None:
+        """Регистр и пробелы в тексте не меняют ключ."""
+        key = make_cache_key("model", 0.7, 1000, "prompt", question("Что съесть на завтрак?"))
+
+        assert key == make_cache_key(
+            "model", 0.7, 1000, "prompt", question("  что  съесть\nна завтрак? ")
+        )
+
+    def test_parameters_change_key(self) -> None:
+        """Модель, параметры, промпт и сообщения входят в ключ."""
+        messages = question("Что съесть на завтрак?")
+        key = make_cache_key("model", 0.7, 1000, "prompt", messages)
+
+        assert key != make_cache_key("other", 0.7, 1000, "prompt", messages)
+        assert key != make_cache_key("model", 0.2, 1000, "prompt", messages)
+        assert key != make_cache_key("model", 0.7, 500, "prompt", messages)
+        assert key != make_cache_key("model", 0.7, 1000, "new prompt", messages)
+        assert key != make_cache_key("model", 0.7, 1000, "prompt", question("А на ужин?"))
+
+
+class TestLLMResponseCache:
+    """Тесты для класса LLMResponseCache."""
+
+    @pytest.fixture
+    def mock_connection(self) -> AsyncMock:
+        """Мок соединения с БД."""
+        return AsyncMock()
+
+    @pytest.fixture
+    def mock_pool(self, mock_connection: AsyncMock) -> MagicMock:
+        """Мок connection pool."""
+        pool = MagicMock()
+        pool.acquire = MagicMock(
+            return_value=AsyncMock(
+                __aenter__=AsyncMock(return_value=mock_connection),
+                __aexit__=AsyncMock(return_value=False),
+            )
+        )
+        return pool
+
+    async def test_memory_hit_and_miss(self) -> None:
+        """Сохраненный ответ отдается из памяти, неизвестный ключ - промах."""
+        cache = LLMResponseCache(max_size=10, ttl_seconds=60)
+
+        await cache.set("a", "Овсянка")
+
+        assert await cache.get("a") == "Овсянка"
+        assert await cache.get("b") is None
+        stats = cache.stats()
+        assert stats["memory_hits"] == 1
+        assert stats["misses"] == 1
+        assert stats["hit_ratio"] == 0.5
+
+    async def test_lru_eviction(self) -> None:
+        """При переполнении вытесняется самый давно использованный ответ."""
+        cache = LLMResponseCache(max_size=2, ttl_seconds=60)
+        await cache.set("a", "1")
+        await cache.set("b", "2")
+        await cache.get("a")
+        await cache.set("c", "3")
+
+        assert await cache.get("b") is None
+        assert await cache.get("a") == "1"
+        assert cache.stats()["size"] == 2
+
+    async def test_ttl_expired(self) -> None:
+        """Ответ старше TTL не отдается."""
+        cache = LLMResponseCache(max_size=10, ttl_seconds=60)
+
+        with patch("src.llm_response_cache.time.monotonic", return_value=1000.0):
+            await cache.set("a", "Овсянка")
+        with patch("src.llm_response_cache.time.monotonic", return_value=1061.0):
+            assert await cache.get("a") is None
+
+        assert cache.stats()["size"] == 0
+
+    async def test_persistent_hit_promoted_to_memory(
+        self, mock_pool: MagicMock, mock_connection: AsyncMock
+    ) -> None:
+        """Промах памяти проверяется в БД, найденный ответ поднимается в память."""
+        mock_connection.fetchrow.return_value = {"response": "Овсянка"}
+        cache = LLMResponseCache(max_size=10, ttl_seconds=60, pool=mock_pool)
+
+        assert await cache.get("a") == "Овсянка"
+        assert await cache.get("a") == "Овсянка"
+
+        mock_connection.fetchrow.assert_awaited_once_with(
+            STATEMENTS["select_llm_response"], "a", 60.0
+        )
+        assert cache.stats()["persistent_hits"] == 1
+        assert cache.stats()["memory_hits"] == 1
+
+    async def test_persistent_store(self, mock_pool: MagicMock, mock_connection: AsyncMock) -> None:
+        """Ответ сохраняется и в память, и в БД."""
+        cache = LLMResponseCache(max_size=10, ttl_seconds=60, pool=mock_pool)
+
+        await cache.set("a", "Овсянка")
+
+        mock_connection.execute.assert_awaited_once_with(
+            STATEMENTS["upsert_llm_response"], "a", "Овсянка"
+        )
+
+    async def test_persistent_error_is_miss(
+        self, mock_pool: MagicMock, mock_connection: AsyncMock
+    ) -> None:
+        """Ошибка БД не ломает запрос: кэш считается промахнувшимся."""
+        mock_connection.fetchrow.side_effect = OSError("connection lost")
+        cache = LLMResponseCache(max_size=10, ttl_seconds=60, pool=mock_pool)
+
+        assert await cache.get("a") is None
+        assert cache.stats()["persistent_errors"] == 1
+        assert cache.stats()["misses"] == 1
+
+    async def test_prune(self, mock_pool: MagicMock, mock_connection: AsyncMock) -> None:
+        """prune удаляет устаревшие ответы из БД и возвращает их количество."""
+        mock_connection.execute.return_value = "DELETE 7"
+        cache = LLMResponseCache(max_size=10, ttl_seconds=60, pool=mock_pool)
+
+        assert await cache.prune() == 7
+        mock_connection.execute.assert_awaited_once_with(
+            STATEMENTS["delete_expired_llm_responses"], 60.0
+        )
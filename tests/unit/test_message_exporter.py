@@ -0,0 +1,87 @@
+"""Unit-тесты для модуля message_exporter."""
+
+from datetime import date
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.api.message_exporter import MessageExporter
+
+
+class TestMessageExporter:
+    """Тесты для класса MessageExporter."""
+
+    @pytest.fixture
+    def mock_connection(self) -> MagicMock:
+        """Мок соединения, отдающего результат COPY двумя кусками."""
+
+        async def copy_from_query(query: str, *args: Any, output: Any, **options: Any) -> str:
+            await output(b"id,user_id\n")
+            await output(b"1,42\n")
+            return "COPY 1"
+
+        connection = MagicMock()
+        connection.copy_from_query = AsyncMock(side_effect=copy_from_query)
+        return connection
+
+    @pytest.fixture
+    def mock_pool(self, mock_connection: MagicMock) -> MagicMock:
+        """Мок connection pool."""
+        pool = MagicMock()
+        pool.acquire = MagicMock(
+            return_value=AsyncMock(
+                __aenter__=AsyncMock(return_value=mock_connection),
+                __aexit__=AsyncMock(return_value=False),
+            )
+        )
+        return pool
+
+    def test_build_query_without_filters(self) -> None:
+        """Без фильтров выгружаются все не удаленные сообщения."""
+        query, args = MessageExporter(MagicMock()).build_query("csv")
+
+        assert "WHERE deleted_at IS NULL ORDER BY created_at, id" in query
+        assert args == []
+
+    def test_build_query_with_filters(self) -> None:
+        """Фильтры превращаются в параметры, date_to включает весь день."""
+        query, args = MessageExporter(MagicMock()).build_query(
+            "ndjson", date(2025, 10, 1), date(2025, 10, 31), "web", 42
+        )
+
+        assert "json_build_object('id', id" in query
+        assert "created_at >= $1 AND created_at < $2 AND source = $3 AND user_id = $4" in query
+        assert args == [date(2025, 10, 1), date(2025, 11, 1), "web", 42]
+
+    async def test_stream_yields_copy_chunks(
+        self, mock_pool: MagicMock, mock_connection: MagicMock
+    ) -> None:
+        """Куски COPY передаются клиенту по мере получения."""
+        chunks = [chunk async for chunk in MessageExporter(mock_pool).stream("csv", source="web")]
+
+        assert chunks == [b"id,user_id\n", b"1,42\n"]
+        call = mock_connection.copy_from_query.await_args
+        assert call.args[1:] == ("web",)
+        assert call.kwargs["format"] == "csv"
+        assert call.kwargs["header"] is True
+
+    async def test_stream_ndjson_uses_unquoted_csv(
+        self, mock_pool: MagicMock, mock_connection: MagicMock
+    ) -> None:
+        """NDJSON выгружается как CSV без кавычек и разделителей."""
+        [chunk async for chunk in MessageExporter(mock_pool).stream("ndjson")]
+
+        options = mock_connection.copy_from_query.await_args.kwargs
+        assert options["quote"] == "\x01"
+        assert options["delimiter"] == "\x02"
+        assert "header" not in options
+
+    async def test_stream_propagates_copy_error(
+        self, mock_pool: MagicMock, mock_connection: MagicMock
+    ) -> None:
+        """Ошибка COPY прерывает поток."""
+        mock_connection.copy_from_query = AsyncMock(side_effect=RuntimeError("boom"))
+
+        with pytest.raises(RuntimeError, match="boom"):
+            [chunk async for chunk in MessageExporter(mock_pool).stream("csv")]
@@ -1,5 +1,6 @@
 """Unit-тесты для модуля message_handler."""
 
+from collections.abc import AsyncIterator
 from unittest.mock import AsyncMock, MagicMock
 
 import pytest
@@ -24,6 +25,7 @@ class TestMessageHandler:
         mock = MagicMock()
         mock.get_history = AsyncMock(return_value=[])
         mock.add_message = AsyncMock()
+        mock.add_turn = AsyncMock()
         mock.clear_history = AsyncMock()
         return mock
 
@@ -58,14 +60,11 @@ class TestMessageHandler:
         assert call_args[-1]["role"] == "user"
         assert call_args[-1]["content"] == user_text
 
-        # Проверяем что добавили сообщения в историю
-        assert mock_conversation.add_message.call_count == 2
-        # Первый вызов - сообщение пользователя
-        mock_conversation.add_message.assert_any_call(user_id, chat_id, "user", user_text)
-        # Второй вызов - ответ ассистента
-        mock_conversation.add_message.assert_any_call(
-            user_id, chat_id, "assistant", expected_response
+        # Проверяем что сообщение пользователя и ответ сохранены одним вызовом
+        mock_conversation.add_turn.assert_called_once_with(
+            user_id, chat_id, user_text, expected_response
         )
+        mock_conversation.add_message.assert_not_called()
 
         # Проверяем возвращаемое значение
         assert response == expected_response
@@ -147,6 +146,7 @@ class TestMessageHandler:
 
         # Проверяем что сообщения НЕ были добавлены в историю при ошибке
         mock_conversation.add_message.assert_not_called()
+        mock_conversation.add_turn.assert_not_called()
 
     async def test_handle_message_different_users(
         self,
@@ -172,12 +172,12 @@ class TestMessageHandler:
         mock_conversation.get_history.assert_any_call(user2_id, chat2_id)
 
         # Проверяем что сообщения добавлялись для каждого пользователя
-        assert mock_conversation.add_message.call_count == 4  # 2 пользователя * 2 сообщения
-        mock_conversation.add_message.assert_any_call(
-            user1_id, chat1_id, "user", "Message from user 1"
+        assert mock_conversation.add_turn.call_count == 2  # 2 пользователя * 1 реплика
+        mock_conversation.add_turn.assert_any_call(
+            user1_id, chat1_id, "Message from user 1", "Response"
         )
-        mock_conversation.add_message.assert_any_call(
-            user2_id, chat2_id, "user", "Message from user 2"
+        mock_conversation.add_turn.assert_any_call(
+            user2_id, chat2_id, "Message from user 2", "Response"
         )
 
     def test_message_handler_initialization(self) -> None:
@@ -189,3 +189,42 @@ class TestMessageHandler:
 
         assert handler.llm_client == mock_llm
         assert handler.conversation == mock_conv
+
+    async def test_handle_message_stream(
+        self,
+        message_handler: MessageHandler,
+        mock_llm_client: MagicMock,
+        mock_conversation: MagicMock,
+    ) -> None:
+        """Ответ отдается по частям, диалог сохраняется после полного ответа."""
+
+        async def chunks(messages: list[ChatMessage]) -> AsyncIterator[str]:
+            yield "Привет"
+            yield ", как дела?"
+
+        mock_llm_client.get_response_stream = MagicMock(side_effect=chunks)
+
+        result = [chunk async for chunk in message_handler.handle_message_stream(1, 2, "Hi")]
+
+        assert result == ["Привет", ", как дела?"]
+        mock_conversation.add_turn.assert_called_once_with(1, 2, "Hi", "Привет, как дела?")
+
+    async def test_handle_message_stream_empty_response(
+        self,
+        message_handler: MessageHandler,
+        mock_llm_client: MagicMock,
+        mock_conversation: MagicMock,
+    ) -> None:
+        """Пустой ответ LLM не сохраняется и приводит к ошибке."""
+
+        async def empty(messages: list[ChatMessage]) -> AsyncIterator[str]:
+            return
+            yield
+
+        mock_llm_client.get_response_stream = MagicMock(side_effect=empty)
+
+        with pytest.raises(Exception, match="empty response"):
+            async for _ in message_handler.handle_message_stream(1, 2, "Hi"):
+                pass
+
+        mock_conversation.add_turn.assert_not_called()
@@ -0,0 +1,151 @@
+"""Unit-тесты для модуля message_importer."""
+
+import json
+from datetime import date, datetime
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.message_importer import MessageImporter, detect_format
+
+
+class TestMessageImporter:
+    """Тесты для класса MessageImporter."""
+
+    @pytest.fixture
+    def mock_connection(self) -> AsyncMock:
+        """Мок соединения с БД."""
+        return AsyncMock()
+
+    @pytest.fixture
+    def mock_pool(self, mock_connection: AsyncMock) -> MagicMock:
+        """Мок connection pool."""
+        pool = MagicMock()
+        pool.acquire = MagicMock(
+            return_value=AsyncMock(
+                __aenter__=AsyncMock(return_value=mock_connection),
+                __aexit__=AsyncMock(return_value=False),
+            )
+        )
+        return pool
+
+    def test_detect_format(self) -> None:
+        """Формат определяется по расширению файла."""
+        assert detect_format(Path("archive.csv")) == "csv"
+        assert detect_format(Path("archive.jsonl")) == "ndjson"
+        with pytest.raises(ValueError, match="Cannot detect format"):
+            detect_format(Path("archive.txt"))
+
+    def test_parse_computes_length_and_defaults_source(self) -> None:
+        """message_length считается по content, source берется по умолчанию."""
+        importer = MessageImporter(MagicMock(), default_source="web")
+
+        record = importer.parse(
+            {
+                "id": "7",
+                "user_id": "1",
+                "chat_id": "2",
+                "role": "user",
+                "content": "Привет",
+                "message_length": "999",
+                "created_at": "2025-10-18 12:00:00.5",
+            }
+        )
+
+        assert record == (
+            1,
+            2,
+            "user",
+            "Привет",
+            6,
+            "web",
+            datetime(2025, 10, 18, 12, 0, 0, 500000),
+        )
+
+    def test_parse_rejects_invalid_source(self) -> None:
+        """Неизвестный источник отклоняется."""
+        with pytest.raises(ValueError, match="Invalid source"):
+            MessageImporter(MagicMock()).parse(
+                {"user_id": 1, "chat_id": 2, "role": "user", "content": "x", "source": "sms"}
+            )
+
+    @pytest.mark.parametrize("field", ["user_id", "content"])
+    def test_parse_rejects_null_fields(self, field: str) -> None:
+        """null в обязательном поле отклоняется, а не превращается в 'None'."""
+        row = {"user_id": 1, "chat_id": 2, "role": "user", "content": "x", field: None}
+
+        with pytest.raises(ValueError, match=f"Invalid {field}"):
+            MessageImporter(MagicMock()).parse(row)
+
+    async def test_import_ndjson_in_batches(
+        self, tmp_path: Path, mock_pool: MagicMock, mock_connection: AsyncMock
+    ) -> None:
+        """NDJSON загружается пачками по batch_size, невалидные строки пропускаются."""
+        lines = [
+            json.dumps(
+                {
+                    "user_id": 1,
+                    "chat_id": 1,
+                    "role": "user",
+                    "content": f"message {i}",
+                    "created_at": "2025-10-18T12:00:00",
+                }
+            )
+            for i in range(5)
+        ]
+        lines.insert(2, "{broken")
+        lines.insert(3, json.dumps({"user_id": None, "chat_id": 1, "role": "user", "content": "x"}))
+        lines.insert(4, json.dumps({"user_id": 1, "chat_id": 1, "role": "user", "content": None}))
+        path = tmp_path / "archive.ndjson"
+        path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+        result = await MessageImporter(mock_pool, batch_size=2).import_file(path, "ndjson")
+
+        assert result["imported"] == 5
+        assert result["skipped"] == 3
+        assert result["batches"] == 3
+        batches = mock_connection.copy_records_to_table.await_args_list
+        assert [len(call.kwargs["records"]) for call in batches] == [2, 2, 1]
+        assert batches[0].kwargs["records"][0][:6] == (1, 1, "user", "message 0", 9, "telegram")
+
+    async def test_import_csv_creates_partitions_once_per_month(
+        self, tmp_path: Path, mock_pool: MagicMock, mock_connection: AsyncMock
+    ) -> None:
+        """Перед пачкой создаются партиции только для новых месяцев."""
+        path = tmp_path / "archive.csv"
+        path.write_text(
+            "user_id,chat_id,role,content,source,created_at\n"
+            "1,1,user,a,web,2024-12-01 10:00:00\n"
+            "1,1,assistant,b,web,2024-12-01 10:00:01\n"
+            "1,1,user,c,web,2025-01-01 10:00:00\n",
+            encoding="utf-8",
+        )
+        partition_manager = MagicMock(ensure_partitions=AsyncMock(return_value=[]))
+        importer = MessageImporter(mock_pool, batch_size=2, partition_manager=partition_manager)
+
+        await importer.import_file(path, "csv")
+
+        months = [
+            list(call.args[0]) for call in partition_manager.ensure_partitions.await_args_list
+        ]
+        assert months == [[date(2024, 12, 1)], [date(2025, 1, 1)]]
+
+    async def test_import_marks_days_dirty(
+        self, tmp_path: Path, mock_pool: MagicMock, mock_connection: AsyncMock
+    ) -> None:
+        """После загрузки дни начиная с самого раннего отмечаются для пересчета агрегатов."""
+        path = tmp_path / "archive.csv"
+        path.write_text(
+            "user_id,chat_id,role,content,created_at\n"
+            "1,1,user,a,2025-01-01 10:00:00\n"
+            "1,1,user,b,2024-12-01 10:00:00\n"
+            "1,1,user,c,2025-02-01 10:00:00\n",
+            encoding="utf-8",
+        )
+        stats_rollup = MagicMock(mark_dirty=AsyncMock())
+        importer = MessageImporter(mock_pool, batch_size=2, stats_rollup=stats_rollup)
+
+        await importer.import_file(path, "csv")
+
+        stats_rollup.mark_dirty.assert_awaited_once_with(date(2024, 12, 1))
@@ -0,0 +1,181 @@
+"""Unit-тесты для модуля message_partition_manager."""
+
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock
+
+import asyncpg  # type: ignore[import-untyped]
+import pytest
+
+from src.message_partition_manager import (
+    MessagePartitionManager,
+    add_months,
+    parse_partition_month,
+    partition_name,
+)
+
+
+class TestPartitionHelpers:
+    """Тесты вспомогательных функций партиций."""
+
+    def test_add_months_crosses_year(self) -> None:
+        """Сдвиг месяца корректно переходит через границу года."""
+        assert add_months(date(2025, 11, 15), 3) == date(2026, 2, 1)
+        assert add_months(date(2025, 1, 31), -1) == date(2024, 12, 1)
+
+    def test_partition_name_roundtrip(self) -> None:
+        """Имя партиции разбирается обратно в месяц."""
+        assert partition_name(date(2025, 3, 1)) == "messages_y2025m03"
+        assert parse_partition_month("messages_y2025m03") == date(2025, 3, 1)
+
+    def test_parse_ignores_other_tables(self) -> None:
+        """Default-партиция и посторонние таблицы не считаются месячными."""
+        assert parse_partition_month("messages_default") is None
+
+
+class TestMessagePartitionManager:
+    """Тесты для класса MessagePartitionManager."""
+
+    @pytest.fixture
+    def mock_connection(self) -> MagicMock:
+        """Мок соединения с БД с существующими партициями и пустой default-партицией."""
+        connection = MagicMock()
+        # advisory lock взят, строк нужного месяца в messages_default нет
+        connection.fetchval = AsyncMock(side_effect=lambda sql, *args: "advisory" in sql)
+        connection.fetch = AsyncMock(
+            return_value=[
+                {"name": "messages_default"},
+                {"name": "messages_y2025m01"},
+                {"name": "messages_y2025m09"},
+                {"name": "messages_y2025m10"},
+            ]
+        )
+        connection.execute = AsyncMock()
+        connection.transaction = MagicMock(
+            return_value=AsyncMock(
+                __aenter__=AsyncMock(return_value=None),
+                __aexit__=AsyncMock(return_value=False),
+            )
+        )
+        return connection
+
+    @pytest.fixture
+    def mock_pool(self, mock_connection: MagicMock) -> MagicMock:
+        """Мок connection pool."""
+        pool = MagicMock()
+        pool.acquire = MagicMock(
+            return_value=AsyncMock(
+                __aenter__=AsyncMock(return_value=mock_connection),
+                __aexit__=AsyncMock(return_value=False),
+            )
+        )
+        return pool
+
+    def _executed(self, connection: MagicMock) -> list[str]:
+        """SQL, выполненные через connection.execute (без блокировок messages_default)."""
+        return [
+            call.args[0]
+            for call in connection.execute.await_args_list
+            if not call.args[0].startswith("LOCK TABLE")
+        ]
+
+    async def test_creates_missing_future_partitions(
+        self, mock_pool: MagicMock, mock_connection: MagicMock
+    ) -> None:
+        """Создаются только отсутствующие партиции до months_ahead вперед."""
+        manager = MessagePartitionManager(mock_pool, months_ahead=2, retention_months=0)
+
+        await manager.run(today=date(2025, 10, 18))
+
+        executed = self._executed(mock_connection)
+        assert executed == [
+            "CREATE TABLE messages_y2025m11 PARTITION OF messages "
+            "FOR VALUES FROM ('2025-11-01') TO ('2025-12-01')",
+            "CREATE TABLE messages_y2025m12 PARTITION OF messages "
+            "FOR VALUES FROM ('2025-12-01') TO ('2026-01-01')",
+        ]
+
+    async def test_detaches_expired_partitions(
+        self, mock_pool: MagicMock, mock_connection: MagicMock
+    ) -> None:
+        """Партиции старше retention_months отсоединяются, default не трогается."""
+        manager = MessagePartitionManager(mock_pool, months_ahead=1, retention_months=3)
+
+        await manager.run(today=date(2025, 10, 18))
+
+        executed = self._executed(mock_connection)
+        assert "ALTER TABLE messages DETACH PARTITION messages_y2025m01" in executed
+        assert not any("messages_y2025m09" in sql and "DETACH" in sql for sql in executed)
+        assert not any("messages_default" in sql for sql in executed)
+
+    async def test_skips_when_lock_is_taken(
+        self, mock_pool: MagicMock, mock_connection: MagicMock
+    ) -> None:
+        """Без advisory lock обслуживание не выполняется."""
+        mock_connection.fetchval = AsyncMock(return_value=False)
+        manager = MessagePartitionManager(mock_pool, months_ahead=3, retention_months=1)
+
+        await manager.run(today=date(2025, 10, 18))
+
+        mock_connection.fetch.assert_not_awaited()
+        mock_connection.execute.assert_not_awaited()
+
+    async def test_create_failure_does_not_stop_others(
+        self, mock_pool: MagicMock, mock_connection: MagicMock
+    ) -> None:
+        """Ошибка создания одной партиции не мешает создать следующие."""
+        failed = False
+
+        async def execute(sql: str, *args: object) -> None:
+            nonlocal failed
+            if sql.startswith("CREATE TABLE") and not failed:
+                failed = True
+                raise asyncpg.PostgresError("permission denied")
+
+        mock_connection.execute.side_effect = execute
+        manager = MessagePartitionManager(mock_pool, months_ahead=2, retention_months=0)
+
+        await manager.run(today=date(2025, 10, 18))
+
+        assert self._executed(mock_connection)[-1].startswith("CREATE TABLE messages_y2025m12")
+
+    async def test_ensure_partitions_for_past_months(
+        self, mock_pool: MagicMock, mock_connection: MagicMock
+    ) -> None:
+        """Для загрузки истории создаются партиции прошлых месяцев под блокирующим lock."""
+        manager = MessagePartitionManager(mock_pool, months_ahead=0, retention_months=0)
+
+        created = await manager.ensure_partitions(
+            [date(2024, 12, 5), date(2024, 12, 20), date(2025, 1, 7)]
+        )
+
+        assert created == ["messages_y2024m12"]
+        executed = self._executed(mock_connection)
+        assert executed[0] == "SELECT pg_advisory_xact_lock($1)"
+        assert executed[1:] == [
+            "CREATE TABLE messages_y2024m12 PARTITION OF messages "
+            "FOR VALUES FROM ('2024-12-01') TO ('2025-01-01')",
+        ]
+
+    async def test_moves_default_rows_into_new_partition(
+        self, mock_pool: MagicMock, mock_connection: MagicMock
+    ) -> None:
+        """Строки месяца из messages_default переносятся, затем партиция присоединяется."""
+        mock_connection.fetchval = AsyncMock(return_value=True)
+        manager = MessagePartitionManager(mock_pool, months_ahead=0, retention_months=0)
+
+        created = await manager.ensure_partitions([date(2024, 12, 5)])
+
+        assert created == ["messages_y2024m12"]
+        executed = [call.args[0] for call in mock_connection.execute.await_args_list]
+        assert executed[1] == "LOCK TABLE messages_default IN ACCESS EXCLUSIVE MODE"
+        assert executed[2] == "CREATE TABLE messages_y2024m12 (LIKE messages INCLUDING DEFAULTS)"
+        assert "DELETE FROM messages_default" in executed[3]
+        assert "INSERT INTO messages_y2024m12" in executed[3]
+        assert mock_connection.execute.await_args_list[3].args[1:] == (
+            date(2024, 12, 1),
+            date(2025, 1, 1),
+        )
+        assert executed[4] == (
+            "ALTER TABLE messages ATTACH PARTITION messages_y2024m12 "
+            "FOR VALUES FROM ('2024-12-01') TO ('2025-01-01')"
+        )
@@ -0,0 +1,208 @@
+"""Unit-тесты для модуля message_write_queue."""
+
+import asyncio
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import asyncpg  # type: ignore[import-untyped]
+import pytest
+
+from src.database_conversation import DatabaseConversation
+from src.instrumented_pool import InstrumentedPool
+from src.message_write_queue import MESSAGE_COLUMNS, MessageRecord, MessageWriteQueue
+
+
+def _record(content: str) -> MessageRecord:
+    """Создать тестовую запись сообщения."""
+    return (1, 2, "user", content, len(content), "telegram", datetime(2025, 10, 16, 12, 0, 0))
+
+
+class TestMessageWriteQueue:
+    """Тесты для класса MessageWriteQueue."""
+
+    @pytest.fixture
+    def mock_connection(self) -> AsyncMock:
+        """Мок соединения с БД."""
+        return AsyncMock()
+
+    @pytest.fixture
+    def mock_pool(self, mock_connection: AsyncMock) -> MagicMock:
+        """Мок connection pool."""
+        pool = MagicMock()
+        pool.acquire = MagicMock(
+            return_value=AsyncMock(
+                __aenter__=AsyncMock(return_value=mock_connection),
+                __aexit__=AsyncMock(return_value=False),
+            )
+        )
+        return pool
+
+    async def test_flush_writes_with_copy(
+        self, mock_pool: MagicMock, mock_connection: AsyncMock
+    ) -> None:
+        """flush записывает буфер через copy_records_to_table."""
+        queue = MessageWriteQueue(mock_pool, max_size=10, batch_size=10, flush_interval=60)
+        await queue.put([_record("a"), _record("b")])
+
+        await queue.flush()
+
+        mock_connection.copy_records_to_table.assert_called_once_with(
+            "messages", records=[_record("a"), _record("b")], columns=MESSAGE_COLUMNS
+        )
+        stats = queue.stats()
+        assert stats["depth"] == 0
+        assert stats["written"] == 2
+        assert stats["flushes"] == 1
+
+    async def test_flush_splits_into_batches(
+        self, mock_pool: MagicMock, mock_connection: AsyncMock
+    ) -> None:
+        """flush разбивает буфер на пачки по batch_size."""
+        queue = MessageWriteQueue(mock_pool, max_size=10, batch_size=2, flush_interval=60)
+        await queue.put([_record("a"), _record("b"), _record("c")])
+
+        await queue.flush()
+
+        assert mock_connection.copy_records_to_table.call_count == 2
+
+    async def test_background_flush_on_batch_size(
+        self, mock_pool: MagicMock, mock_connection: AsyncMock
+    ) -> None:
+        """Фоновый flusher срабатывает при достижении batch_size."""
+        queue = MessageWriteQueue(mock_pool, max_size=10, batch_size=2, flush_interval=60)
+        await queue.start()
+
+        await queue.put([_record("a"), _record("b")])
+        for _ in range(10):
+            await asyncio.sleep(0)
+
+        mock_connection.copy_records_to_table.assert_called_once()
+        await queue.stop()
+
+    async def test_background_flush_on_interval(
+        self, mock_pool: MagicMock, mock_connection: AsyncMock
+    ) -> None:
+        """Фоновый flusher срабатывает по таймеру."""
+        queue = MessageWriteQueue(mock_pool, max_size=10, batch_size=100, flush_interval=0.01)
+        await queue.start()
+
+        await queue.put([_record("a")])
+        await asyncio.sleep(0.05)
+
+        mock_connection.copy_records_to_table.assert_called_once()
+        await queue.stop()
+
+    async def test_pool_close_flushes_queue(
+        self, mock_pool: MagicMock, mock_connection: AsyncMock
+    ) -> None:
+        """Закрытие pool сбрасывает оставшиеся сообщения перед закрытием."""
+        pool = InstrumentedPool(acquire_timeout=5.0)
+        with patch(
+            "src.instrumented_pool.asyncpg.create_pool",
+            new_callable=AsyncMock,
+            return_value=MagicMock(close=AsyncMock()),
+        ):
+            await pool.open("postgresql://localhost/db")
+        queue = MessageWriteQueue(pool, max_size=10, batch_size=100, flush_interval=60)
+        await queue.start()
+        await queue.put([_record("a")])
+
+        with patch.object(pool, "acquire", mock_pool.acquire):
+            await pool.close()
+
+        mock_connection.copy_records_to_table.assert_called_once()
+        assert queue.stats()["depth"] == 0
+
+    async def test_failed_flush_keeps_records(
+        self, mock_pool: MagicMock, mock_connection: AsyncMock
+    ) -> None:
+        """При ошибке записи сообщения остаются в буфере."""
+        mock_connection.copy_records_to_table.side_effect = Exception("DB down")
+        queue = MessageWriteQueue(mock_pool, max_size=10, batch_size=10, flush_interval=60)
+        await queue.put([_record("a")])
+
+        await queue.flush()
+
+        stats = queue.stats()
+        assert stats["depth"] == 1
+        assert stats["failures"] == 1
+        assert stats["written"] == 0
+
+    async def test_rejected_batch_dropped_after_max_attempts(
+        self, mock_pool: MagicMock, mock_connection: AsyncMock
+    ) -> None:
+        """Пачка, которую БД отклоняет max_attempts раз подряд, отбрасывается."""
+        rejected = asyncpg.exceptions.CheckViolationError("no partition of relation found")
+        mock_connection.copy_records_to_table.side_effect = [rejected, rejected, None]
+        queue = MessageWriteQueue(
+            mock_pool, max_size=10, batch_size=1, flush_interval=60, max_attempts=2
+        )
+        await queue.put([_record("bad"), _record("good")])
+
+        await queue.flush()
+        assert queue.stats()["depth"] == 2
+
+        await queue.flush()
+
+        stats = queue.stats()
+        assert stats["depth"] == 0
+        assert stats["dropped"] == 1
+        assert stats["written"] == 1
+        written = mock_connection.copy_records_to_table.await_args.kwargs["records"]
+        assert written == [_record("good")]
+
+    async def test_connection_errors_not_counted_as_rejections(
+        self, mock_pool: MagicMock, mock_connection: AsyncMock
+    ) -> None:
+        """Обрыв соединения не приближает отбрасывание пачки."""
+        mock_connection.copy_records_to_table.side_effect = OSError("connection refused")
+        queue = MessageWriteQueue(
+            mock_pool, max_size=10, batch_size=1, flush_interval=60, max_attempts=1
+        )
+        await queue.put([_record("a")])
+
+        await queue.flush()
+        await queue.flush()
+
+        stats = queue.stats()
+        assert stats["depth"] == 1
+        assert stats["dropped"] == 0
+        assert stats["failures"] == 2
+
+    async def test_put_blocks_when_full(
+        self, mock_pool: MagicMock, mock_connection: AsyncMock
+    ) -> None:
+        """put ждет освобождения места при заполненном буфере (backpressure)."""
+        queue = MessageWriteQueue(mock_pool, max_size=1, batch_size=10, flush_interval=60)
+        await queue.put([_record("a")])
+
+        blocked = asyncio.create_task(queue.put([_record("b")]))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+
+        await queue.flush()
+        await asyncio.wait_for(blocked, timeout=1)
+        assert queue.stats()["depth"] == 1
+
+    async def test_full_queue_blocks_turn(self, mock_pool: MagicMock) -> None:
+        """Пара сообщений add_turn ждет места для обеих записей: буфер не превышает max_size."""
+        queue = MessageWriteQueue(mock_pool, max_size=3, batch_size=10, flush_interval=60)
+        conversation = DatabaseConversation(mock_pool, max_history_messages=10, write_queue=queue)
+        await conversation.add_turn(1, 2, "Привет", "Здравствуйте")
+
+        blocked = asyncio.create_task(conversation.add_turn(1, 2, "Что съесть?", "Овсянку"))
+        await asyncio.sleep(0.01)
+        assert not blocked.done()
+        assert queue.stats()["depth"] == 2
+
+        await queue.flush()
+        await asyncio.wait_for(blocked, timeout=1)
+        assert queue.stats()["max_depth"] == 2
+
+    async def test_oversized_put_into_empty_buffer(self, mock_pool: MagicMock) -> None:
+        """Записи больше max_size не блокируются навсегда, если буфер пуст."""
+        queue = MessageWriteQueue(mock_pool, max_size=1, batch_size=10, flush_interval=60)
+
+        await asyncio.wait_for(queue.put([_record("a"), _record("b")]), timeout=1)
+
+        assert queue.stats()["depth"] == 2
@@ -0,0 +1,41 @@
+"""Unit-тесты для модуля metrics."""
+
+from src.metrics import MetricsRegistry
+
+
+class TestMetricsRegistry:
+    """Тесты для реестра источников метрик."""
+
+    def test_collect_registered_source(self) -> None:
+        """Снимок содержит метрики зарегистрированного источника."""
+        metrics = MetricsRegistry()
+        metrics.register("test_source", lambda: {"value": 1})
+
+        assert metrics.collect()["test_source"] == {"value": 1}
+
+        metrics.unregister("test_source")
+        assert "test_source" not in metrics.collect()
+
+    def test_failing_source_is_skipped(self) -> None:
+        """Ошибка одного источника не ломает сбор остальных."""
+
+        def failing() -> dict[str, float]:
+            raise RuntimeError("broken")
+
+        metrics = MetricsRegistry()
+        metrics.register("failing_source", failing)
+        metrics.register("ok_source", lambda: {"value": 2})
+
+        collected = metrics.collect()
+
+        assert "failing_source" not in collected
+        assert collected["ok_source"] == {"value": 2}
+
+    def test_registries_are_independent(self) -> None:
+        """Источники одного реестра не видны в другом."""
+        first = MetricsRegistry()
+        second = MetricsRegistry()
+
+        first.register("database_pool", lambda: {"size": 1})
+
+        assert second.collect() == {}
@@ -0,0 +1,20 @@
+"""Unit-тесты для модуля percentiles."""
+
+from collections import deque
+
+from src.percentiles import percentile_ms
+
+
+class TestPercentileMs:
+    """Тесты для функции percentile_ms."""
+
+    def test_empty_window(self) -> None:
+        """Пустое окно замеров дает 0."""
+        assert percentile_ms(deque(), 0.95) == 0.0
+
+    def test_percentiles_in_milliseconds(self) -> None:
+        """Перцентили берутся по отсортированному окну и переводятся в миллисекунды."""
+        samples = deque([0.004, 0.001, 0.003, 0.002], maxlen=10)
+
+        assert percentile_ms(samples, 0.5) == 3.0
+        assert percentile_ms(samples, 1.0) == 4.0
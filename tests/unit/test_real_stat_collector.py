@@ -0,0 +1,119 @@
+"""Unit-тесты для модуля real_stat_collector."""
+
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.api.real_stat_collector import RealStatCollector
+from src.daily_stats_rollup import conversation_key
+from src.hyperloglog import HyperLogLog
+from src.statements import STATEMENTS
+
+
+class TestRealStatCollector:
+    """Тесты для класса RealStatCollector."""
+
+    @pytest.fixture
+    def mock_connection(self) -> AsyncMock:
+        """Мок соединения с БД."""
+        connection = AsyncMock()
+        connection.fetchrow.return_value = {"total_messages": 40, "active_conversations": 4}
+        connection.fetch.return_value = []
+        return connection
+
+    @pytest.fixture
+    def mock_pool(self, mock_connection: AsyncMock) -> MagicMock:
+        """Мок connection pool."""
+        pool = MagicMock()
+        pool.acquire = MagicMock(
+            return_value=AsyncMock(
+                __aenter__=AsyncMock(return_value=mock_connection),
+                __aexit__=AsyncMock(return_value=False),
+            )
+        )
+        return pool
+
+    async def test_invalid_period(self) -> None:
+        """Невалидный период вызывает ValueError."""
+        with pytest.raises(ValueError, match="Invalid period"):
+            await RealStatCollector(MagicMock()).get_dashboard_stats("1y")
+
+    async def test_raw_mode_single_scan(
+        self, mock_pool: MagicMock, mock_connection: AsyncMock
+    ) -> None:
+        """По умолчанию метрики и ряд считаются одним запросом к messages."""
+        today = date.today()
+        mock_connection.fetch.return_value = [
+            {
+                "is_total": False,
+                "date": today,
+                "current_messages": 15,
+                "previous_messages": 0,
+                "current_conversations": 2,
+                "previous_conversations": 0,
+            },
+            {
+                "is_total": True,
+                "date": None,
+                "current_messages": 40,
+                "previous_messages": 20,
+                "current_conversations": 4,
+                "previous_conversations": 4,
+            },
+        ]
+
+        stats = await RealStatCollector(mock_pool).get_dashboard_stats("7d")
+
+        mock_connection.fetch.assert_awaited_once()
+        assert mock_connection.fetch.await_args.args[0] == STATEMENTS["stats_dashboard_scan"]
+        mock_connection.fetchrow.assert_not_awaited()
+        assert stats.metrics.total_messages.value == 40
+        assert stats.metrics.total_messages.change_percent == 100.0
+        assert stats.metrics.avg_conversation_length.value == 10.0
+        assert len(stats.time_series) == 8
+        assert stats.time_series[-1].value == 15
+
+    async def test_rollup_mode_queries_daily_tables(
+        self, mock_pool: MagicMock, mock_connection: AsyncMock
+    ) -> None:
+        """В режиме use_rollup запросы идут к дневным агрегатам с датами."""
+        today = date.today()
+        mock_connection.fetch.return_value = [{"date": today, "message_count": 5}]
+
+        stats = await RealStatCollector(mock_pool, use_rollup=True).get_dashboard_stats("7d")
+
+        current_query = mock_connection.fetchrow.await_args_list[0]
+        assert current_query.args[0] == STATEMENTS["rollup_totals_since"]
+        assert isinstance(current_query.args[1], date)
+        assert mock_connection.fetch.await_args.args[0] == STATEMENTS["rollup_daily_counts"]
+        assert stats.time_series[-1].value == 5
+
+    async def test_approximate_mode_merges_sketches(
+        self, mock_pool: MagicMock, mock_connection: AsyncMock
+    ) -> None:
+        """approximate_distinct оценивает диалоги по объединению дневных sketches."""
+        day1, day2 = HyperLogLog(precision=10), HyperLogLog(precision=10)
+        for i in range(30):
+            day1.add(conversation_key(i, i))
+            day2.add(conversation_key(i + 20, i + 20))
+        mock_connection.fetchrow.return_value = {
+            "total_messages": 100,
+            "sketches": [day1.to_bytes(), day2.to_bytes()],
+        }
+        collector = RealStatCollector(
+            mock_pool, use_rollup=True, approximate_distinct=True, hll_precision=10
+        )
+
+        stats = await collector.get_dashboard_stats("7d")
+
+        assert (
+            mock_connection.fetchrow.await_args_list[0].args[0]
+            == (STATEMENTS["rollup_sketch_totals_since"])
+        )
+        assert stats.metrics.active_conversations.value == pytest.approx(50, abs=2)
+
+    def test_approximate_requires_rollup(self) -> None:
+        """approximate_distinct без use_rollup запрещен."""
+        with pytest.raises(ValueError, match="requires use_rollup"):
+            RealStatCollector(MagicMock(), approximate_distinct=True)
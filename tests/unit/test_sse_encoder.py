@@ -0,0 +1,95 @@
+"""Unit-тесты для модуля sse_encoder."""
+
+import asyncio
+import json
+from collections.abc import AsyncIterator
+
+from src.api.models import StreamEvent
+from src.api.sse_encoder import SSEEncoder
+
+
+async def tokens(*items: str, delay: float = 0.0) -> AsyncIterator[str]:
+    """Тестовый поток токенов с задержкой перед каждым."""
+    for item in items:
+        if delay:
+            await asyncio.sleep(delay)
+        yield item
+
+
+def parse(frames: list[bytes]) -> list[dict[str, str]]:
+    """Разобрать кадры SSE в события."""
+    events = []
+    for frame in frames:
+        assert frame.startswith(b"data: ") and frame.endswith(b"\n\n")
+        events.append(json.loads(frame[6:-2]))
+    return events
+
+
+class TestSSEEncoder:
+    """Тесты для класса SSEEncoder."""
+
+    def test_encode_escapes_content(self) -> None:
+        """Кавычки, обратные слеши и управляющие символы экранируются как в JSON."""
+        content = 'он сказал "да"\\n\n\t\x00'
+        frame = SSEEncoder().encode(StreamEvent(type="token", content=content))
+
+        assert b"\n" not in frame[:-2]
+        assert parse([frame]) == [{"type": "token", "content": content}]
+
+    async def test_stream_coalesces_tokens(self) -> None:
+        """Быстрые токены объединяются в один кадр, поток завершается done."""
+        encoder = SSEEncoder(flush_bytes=256, flush_interval=1.0)
+
+        frames = [frame async for frame in encoder.stream(tokens("При", "вет", "!"))]
+
+        assert parse(frames) == [
+            {"type": "token", "content": "Привет!"},
+            {"type": "done", "content": ""},
+        ]
+        assert encoder.stats()["tokens"] == 3
+        assert encoder.stats()["frames"] == 2
+
+    async def test_flush_by_size(self) -> None:
+        """Кадр отправляется, как только набралось flush_bytes байт."""
+        encoder = SSEEncoder(flush_bytes=4, flush_interval=1.0)
+
+        chunks = [chunk async for chunk in encoder.coalesce(tokens("ab", "cd", "ef"))]
+
+        assert chunks == ["abcd", "ef"]
+
+    async def test_flush_by_interval(self) -> None:
+        """Накопленный текст отправляется, если следующий токен задерживается."""
+        encoder = SSEEncoder(flush_bytes=256, flush_interval=0.01)
+
+        async def slow() -> AsyncIterator[str]:
+            yield "a"
+            yield "b"
+            await asyncio.sleep(0.1)
+            yield "c"
+
+        chunks = [chunk async for chunk in encoder.coalesce(slow())]
+
+        assert chunks == ["ab", "c"]
+
+    async def test_zero_interval_disables_coalescing(self) -> None:
+        """При flush_interval=0 каждый токен уходит отдельным кадром."""
+        encoder = SSEEncoder(flush_interval=0)
+
+        chunks = [chunk async for chunk in encoder.coalesce(tokens("a", "b"))]
+
+        assert chunks == ["a", "b"]
+
+    async def test_stream_error_after_tokens(self) -> None:
+        """Полученный до ошибки текст отправляется, затем событие error."""
+        encoder = SSEEncoder(flush_bytes=256, flush_interval=1.0)
+
+        async def failing() -> AsyncIterator[str]:
+            yield "часть"
+            raise RuntimeError("LLM недоступна")
+
+        frames = [frame async for frame in encoder.stream(failing())]
+
+        assert parse(frames) == [
+            {"type": "token", "content": "часть"},
+            {"type": "error", "content": "LLM недоступна"},
+        ]
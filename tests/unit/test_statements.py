@@ -0,0 +1,95 @@
+"""Unit-тесты для модуля statements."""
+
+import logging
+from unittest.mock import AsyncMock, MagicMock
+
+import asyncpg  # type: ignore[import-untyped]
+import pytest
+
+from src import statements
+from src.statements import STATEMENTS, WARM_UP_ARGS, check_statement_cache_size
+
+
+def _connection() -> MagicMock:
+    """Мок соединения asyncpg."""
+    connection = MagicMock()
+    connection.prepare = AsyncMock()
+    connection.fetch = AsyncMock(return_value=["row"])
+    connection.fetchrow = AsyncMock(return_value=None)
+    connection.execute = AsyncMock(return_value="UPDATE 3")
+    return connection
+
+
+class TestStatements:
+    """Тесты для реестра SQL-запросов."""
+
+    async def test_fetch_runs_registry_text(self) -> None:
+        """fetch выполняет текст statement через соединение (кэш statements asyncpg)."""
+        connection = _connection()
+
+        rows = await statements.fetch(connection, "select_history", 1, 2, 10)
+
+        assert rows == ["row"]
+        connection.fetch.assert_awaited_once_with(STATEMENTS["select_history"], 1, 2, 10)
+        connection.prepare.assert_not_awaited()
+
+    async def test_fetchrow_runs_registry_text(self) -> None:
+        """fetchrow выполняет текст statement через соединение."""
+        connection = _connection()
+
+        await statements.fetchrow(connection, "rollup_totals_since", "2025-01-01")
+
+        connection.fetchrow.assert_awaited_once_with(
+            STATEMENTS["rollup_totals_since"], "2025-01-01"
+        )
+
+    async def test_execute_returns_status(self) -> None:
+        """execute возвращает статус команды."""
+        connection = _connection()
+
+        status = await statements.execute(connection, "soft_delete_history", None, 1, 2)
+
+        assert status == "UPDATE 3"
+        connection.execute.assert_awaited_once_with(STATEMENTS["soft_delete_history"], None, 1, 2)
+
+    def test_small_statement_cache_warns(self, caplog: pytest.LogCaptureFixture) -> None:
+        """Кэш statements меньше реестра вызывает предупреждение."""
+        with caplog.at_level(logging.WARNING, logger="src.statements"):
+            check_statement_cache_size(len(STATEMENTS))
+            assert not caplog.records
+
+            check_statement_cache_size(0)
+
+        assert "smaller than the statement registry" in caplog.text
+
+    async def test_warm_up_runs_read_statements(self) -> None:
+        """Прогрев выполняет каждый читающий statement текстом реестра (попадает в кэш)."""
+        connection = _connection()
+
+        prepared = await statements.warm_up_statements(connection)
+
+        assert prepared == len(WARM_UP_ARGS)
+        queries = [call.args[0] for call in connection.fetch.await_args_list]
+        assert queries == [STATEMENTS[name] for name in WARM_UP_ARGS]
+        connection.execute.assert_not_awaited()
+
+    def test_warm_up_covers_read_statements(self) -> None:
+        """Прогреваются все читающие statements реестра."""
+        readers = {
+            name for name, sql in STATEMENTS.items() if sql.lstrip().upper().startswith("SELECT")
+        }
+
+        assert set(WARM_UP_ARGS) == readers
+
+    async def test_warm_up_error_skips_statement(self, caplog: pytest.LogCaptureFixture) -> None:
+        """Ошибка одного statement (нет таблицы) не мешает прогреву остальных."""
+        connection = _connection()
+        connection.fetch = AsyncMock(
+            side_effect=[asyncpg.UndefinedTableError("no table"), *[[]] * len(WARM_UP_ARGS)]
+        )
+
+        with caplog.at_level(logging.WARNING, logger="src.statements"):
+            prepared = await statements.warm_up_statements(connection)
+
+        assert prepared == len(WARM_UP_ARGS) - 1
+        assert "Failed to warm up statement select_history" in caplog.text
@@ -0,0 +1,186 @@
+"""Unit-тесты для модуля stats_precomputer."""
+
+from datetime import datetime, timedelta
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+
+from src.api.mock_stat_collector import MockStatCollector
+from src.api.models import DashboardStats
+from src.api.stats_precomputer import PERIODS, StatsPrecomputer
+
+
+class TestStatsPrecomputer:
+    """Тесты для класса StatsPrecomputer."""
+
+    @pytest.fixture
+    def mock_connection(self) -> MagicMock:
+        """Мок соединения с БД внутри транзакции."""
+        connection = MagicMock()
+        connection.fetch = AsyncMock(return_value=[])
+        connection.executemany = AsyncMock()
+        connection.transaction = MagicMock(
+            return_value=AsyncMock(
+                __aenter__=AsyncMock(return_value=None),
+                __aexit__=AsyncMock(return_value=False),
+            )
+        )
+        return connection
+
+    @pytest.fixture
+    def mock_pool(self, mock_connection: MagicMock) -> MagicMock:
+        """Мок connection pool."""
+        pool = MagicMock()
+        pool.acquire = MagicMock(
+            return_value=AsyncMock(
+                __aenter__=AsyncMock(return_value=mock_connection),
+                __aexit__=AsyncMock(return_value=False),
+            )
+        )
+        return pool
+
+    @pytest.fixture
+    def collector(self) -> MockStatCollector:
+        """Исходный сборщик статистики."""
+        return MockStatCollector()
+
+    async def _snapshot_rows(
+        self, collector: MockStatCollector, computed_at: datetime
+    ) -> list[dict[str, Any]]:
+        """Строки dashboard_snapshots по всем периодам."""
+        return [
+            {
+                "period": period,
+                "stats": (await collector.get_dashboard_stats(period)).model_dump_json(),
+                "computed_at": computed_at,
+                "duration_ms": 12.5,
+            }
+            for period in PERIODS
+        ]
+
+    async def test_refresh_computes_and_stores_all_periods(
+        self, mock_pool: MagicMock, mock_connection: MagicMock, collector: MockStatCollector
+    ) -> None:
+        """Под advisory lock все периоды сохраняются в БД одной транзакцией."""
+        mock_connection.fetchval = AsyncMock(return_value=True)
+        precomputer = StatsPrecomputer(mock_pool, collector)
+
+        await precomputer.refresh()
+
+        rows = mock_connection.executemany.await_args.args[1]
+        assert [row[0] for row in rows] == list(PERIODS)
+        metrics = precomputer.stats()
+        assert metrics["computes"] == len(PERIODS)
+        assert "7d_age_seconds" in metrics
+        assert "3m_duration_ms" in metrics
+
+    async def test_compute_does_not_hold_connection(
+        self, mock_pool: MagicMock, mock_connection: MagicMock, collector: MockStatCollector
+    ) -> None:
+        """Статистика считается без удержанного соединения: сборщику хватает pool."""
+        mock_connection.fetchval = AsyncMock(return_value=True)
+        held = 0
+
+        async def enter(*_: Any) -> MagicMock:
+            nonlocal held
+            held += 1
+            return mock_connection
+
+        async def exit_(*_: Any) -> bool:
+            nonlocal held
+            held -= 1
+            return False
+
+        mock_pool.acquire = MagicMock(
+            return_value=AsyncMock(__aenter__=AsyncMock(side_effect=enter), __aexit__=exit_)
+        )
+        held_during_compute = []
+        compute = collector.get_dashboard_stats
+
+        async def tracked(period: str) -> DashboardStats:
+            held_during_compute.append(held)
+            return await compute(period)
+
+        with patch.object(collector, "get_dashboard_stats", side_effect=tracked):
+            await StatsPrecomputer(mock_pool, collector).refresh(60)
+
+        assert held_during_compute == [0] * len(PERIODS)
+        mock_connection.executemany.assert_awaited_once()
+
+    async def test_get_dashboard_stats_reads_snapshot(
+        self, mock_pool: MagicMock, mock_connection: MagicMock, collector: MockStatCollector
+    ) -> None:
+        """После предрасчета запросы не обращаются к исходному сборщику."""
+        mock_connection.fetchval = AsyncMock(return_value=True)
+        precomputer = StatsPrecomputer(mock_pool, collector)
+        await precomputer.refresh()
+
+        with patch.object(collector, "get_dashboard_stats", new_callable=AsyncMock) as compute:
+            stats = await precomputer.get_dashboard_stats("30d")
+
+        compute.assert_not_awaited()
+        assert len(stats.time_series) > 0
+
+    async def test_fresh_snapshots_loaded_without_compute(
+        self, mock_pool: MagicMock, mock_connection: MagicMock, collector: MockStatCollector
+    ) -> None:
+        """Снимки моложе интервала, рассчитанные другой репликой, загружаются из БД."""
+        rows = await self._snapshot_rows(collector, datetime.now() - timedelta(seconds=42))
+        mock_connection.fetch = AsyncMock(return_value=rows)
+        precomputer = StatsPrecomputer(mock_pool, collector)
+
+        with patch.object(collector, "get_dashboard_stats", new_callable=AsyncMock) as compute:
+            await precomputer.refresh(60)
+
+        compute.assert_not_awaited()
+        mock_connection.executemany.assert_not_awaited()
+        stats = await precomputer.get_dashboard_stats("7d")
+        assert stats.model_dump_json() == rows[0]["stats"]
+        metrics = precomputer.stats()
+        assert metrics["loads"] == 1
+        assert metrics["7d_age_seconds"] >= 42
+        assert metrics["7d_duration_ms"] == 12.5
+
+    async def test_stale_snapshots_recomputed(
+        self, mock_pool: MagicMock, mock_connection: MagicMock, collector: MockStatCollector
+    ) -> None:
+        """Снимки старше интервала пересчитываются и перезаписываются."""
+        rows = await self._snapshot_rows(collector, datetime.now() - timedelta(seconds=90))
+        mock_connection.fetch = AsyncMock(return_value=rows)
+        mock_connection.fetchval = AsyncMock(return_value=True)
+        precomputer = StatsPrecomputer(mock_pool, collector)
+
+        await precomputer.refresh(60)
+
+        assert precomputer.stats()["computes"] == len(PERIODS)
+        assert precomputer.stats()["loads"] == 0
+        mock_connection.executemany.assert_awaited_once()
+
+    async def test_refresh_without_lock_keeps_snapshots_in_memory(
+        self, mock_pool: MagicMock, mock_connection: MagicMock, collector: MockStatCollector
+    ) -> None:
+        """Если lock держит другая реплика, рассчитанные снимки не пишутся в БД."""
+        mock_connection.fetchval = AsyncMock(return_value=False)
+        precomputer = StatsPrecomputer(mock_pool, collector)
+
+        await precomputer.refresh(60)
+
+        mock_connection.executemany.assert_not_awaited()
+        assert precomputer.stats()["computes"] == len(PERIODS)
+        assert "30d_age_seconds" in precomputer.stats()
+
+    async def test_missing_snapshot_computes_inline(self, collector: MockStatCollector) -> None:
+        """До первого предрасчета статистика считается при запросе."""
+        precomputer = StatsPrecomputer(MagicMock(), collector)
+
+        stats = await precomputer.get_dashboard_stats("3m")
+
+        assert stats.metrics is not None
+
+    async def test_invalid_period(self, collector: MockStatCollector) -> None:
+        """Невалидный период отклоняется с ValueError."""
+        precomputer = StatsPrecomputer(MagicMock(), collector)
+
+        with pytest.raises(ValueError, match="Invalid period"):
+            await precomputer.get_dashboard_stats("1y")
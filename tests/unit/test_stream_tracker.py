@@ -0,0 +1,91 @@
+"""Unit-тесты для модуля stream_tracker."""
+
+import asyncio
+from collections.abc import AsyncIterator
+
+import pytest
+
+from src.api.stream_tracker import StreamTracker
+
+
+async def numbers(count: int) -> AsyncIterator[int]:
+    """Тестовый поток из count чисел."""
+    for number in range(count):
+        yield number
+
+
+class TestStreamTracker:
+    """Тесты для класса StreamTracker."""
+
+    async def test_track_passes_items_through(self) -> None:
+        """Элементы потока отдаются без изменений и поток учитывается завершенным."""
+        tracker = StreamTracker()
+
+        items = [item async for item in tracker.track(numbers(3))]
+
+        assert items == [0, 1, 2]
+        assert tracker.stats() == {"active": 0, "started": 1, "completed": 1}
+
+    async def test_track_counts_active_stream(self) -> None:
+        """Начатый, но не дочитанный поток считается активным."""
+        tracker = StreamTracker()
+        stream = tracker.track(numbers(3))
+
+        await anext(stream)
+        assert tracker.active == 1
+
+        await stream.aclose()
+        assert tracker.active == 0
+
+    async def test_track_finishes_on_error(self) -> None:
+        """Ошибка в потоке не оставляет его активным."""
+        tracker = StreamTracker()
+
+        async def failing() -> AsyncIterator[int]:
+            yield 1
+            raise RuntimeError("boom")
+
+        with pytest.raises(RuntimeError):
+            async for _ in tracker.track(failing()):
+                pass
+
+        assert tracker.active == 0
+        assert tracker.completed == 1
+
+    async def test_drain_without_streams(self) -> None:
+        """Без активных потоков drain завершается сразу."""
+        assert await StreamTracker().drain(timeout=0.01) is True
+
+    async def test_drain_waits_for_stream(self) -> None:
+        """drain дожидается, пока клиент дочитает поток."""
+        tracker = StreamTracker()
+        release = asyncio.Event()
+
+        async def slow() -> AsyncIterator[int]:
+            yield 1
+            await release.wait()
+            yield 2
+
+        async def consume() -> list[int]:
+            return [item async for item in tracker.track(slow())]
+
+        consumer = asyncio.create_task(consume())
+        await asyncio.sleep(0)
+        drain = asyncio.create_task(tracker.drain(timeout=1.0))
+        await asyncio.sleep(0)
+        assert not drain.done()
+
+        release.set()
+
+        assert await drain is True
+        assert await consumer == [1, 2]
+
+    async def test_drain_timeout(self) -> None:
+        """Если поток не завершился за timeout, drain возвращает False."""
+        tracker = StreamTracker()
+        stream = tracker.track(numbers(3))
+        await anext(stream)
+
+        assert await tracker.drain(timeout=0.01) is False
+
+        await stream.aclose()
@@ -0,0 +1,133 @@
+"""Unit-тесты для модуля telegram_stream_writer."""
+
+from collections.abc import AsyncIterator
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from aiogram.exceptions import TelegramRetryAfter
+
+from src.telegram_stream_writer import TelegramStreamWriter
+
+
+async def tokens(*items: str) -> AsyncIterator[str]:
+    """Тестовый поток токенов."""
+    for item in items:
+        yield item
+
+
+def edited_texts(bot: MagicMock) -> list[str]:
+    """Тексты всех редактирований сообщений."""
+    return [call.kwargs["text"] for call in bot.edit_message_text.call_args_list]
+
+
+class TestTelegramStreamWriter:
+    """Тесты для класса TelegramStreamWriter."""
+
+    @pytest.fixture
+    def bot(self) -> MagicMock:
+        """Мок aiogram Bot."""
+        bot = MagicMock()
+        message = MagicMock(message_id=10, chat=MagicMock(id=5))
+        bot.send_message = AsyncMock(return_value=message)
+        bot.edit_message_text = AsyncMock()
+        bot.delete_message = AsyncMock()
+        return bot
+
+    async def test_first_token_and_final_flush(self, bot: MagicMock) -> None:
+        """Первый токен показывается сразу, остальные - финальным редактированием."""
+        writer = TelegramStreamWriter(edit_interval=1.0)
+
+        with patch("src.telegram_stream_writer.time.monotonic", return_value=100.0):
+            text = await writer.write(bot, 5, tokens("При", "вет", "!"))
+
+        assert text == "Привет!"
+        bot.send_message.assert_called_once_with(chat_id=5, text="…")
+        assert edited_texts(bot) == ["При", "Привет!"]
+
+    async def test_edits_coalesced_by_interval(self, bot: MagicMock) -> None:
+        """Сообщение редактируется не чаще edit_interval."""
+        writer = TelegramStreamWriter(edit_interval=1.0)
+        times = iter([100.0, 100.4, 101.1, 101.5])
+
+        with patch("src.telegram_stream_writer.time.monotonic", side_effect=lambda: next(times)):
+            await writer.write(bot, 5, tokens("a", "b", "c", "d"))
+
+        assert edited_texts(bot) == ["a", "abc", "abcd"]
+        assert writer.stats()["edits"] == 3
+
+    async def test_long_response_continues_in_new_message(self, bot: MagicMock) -> None:
+        """Ответ длиннее лимита разбивается на несколько сообщений."""
+        writer = TelegramStreamWriter(edit_interval=1.0, max_length=5)
+
+        with patch("src.telegram_stream_writer.time.monotonic", return_value=100.0):
+            await writer.write(bot, 5, tokens("abc", "defgh", "ij"))
+
+        assert bot.send_message.call_count == 2
+        assert edited_texts(bot)[-2:] == ["abcde", "fghij"]
+
+    async def test_rate_limited_edit_postponed(self, bot: MagicMock) -> None:
+        """При RetryAfter промежуточное редактирование пропускается, финальное повторяется."""
+        writer = TelegramStreamWriter(edit_interval=1.0)
+        retry = TelegramRetryAfter(method=MagicMock(), message="Too Many Requests", retry_after=3)
+        bot.edit_message_text = AsyncMock(side_effect=[retry, retry, None])
+
+        with (
+            patch("src.telegram_stream_writer.time.monotonic", return_value=100.0),
+            patch("src.telegram_stream_writer.asyncio.sleep", new_callable=AsyncMock) as sleep,
+        ):
+            await writer.write(bot, 5, tokens("a", "b"))
+
+        sleep.assert_called_once_with(3)
+        assert edited_texts(bot) == ["a", "ab", "ab"]
+        assert writer.stats()["rate_limited"] == 2
+
+    async def test_error_before_tokens_removes_placeholder(self, bot: MagicMock) -> None:
+        """Если ответ не начался, заглушка удаляется, ошибка пробрасывается."""
+        writer = TelegramStreamWriter()
+
+        async def failing() -> AsyncIterator[str]:
+            raise RuntimeError("LLM error")
+            yield
+
+        with pytest.raises(RuntimeError):
+            await writer.write(bot, 5, failing())
+
+        bot.delete_message.assert_called_once_with(chat_id=5, message_id=10)
+
+    async def test_whitespace_text_not_sent(self, bot: MagicMock) -> None:
+        """Пробельный текст не отправляется: Telegram отклоняет пустые сообщения."""
+        writer = TelegramStreamWriter(edit_interval=1.0)
+
+        with patch("src.telegram_stream_writer.time.monotonic", return_value=100.0):
+            await writer.write(bot, 5, tokens("\n", " ", "abc"))
+
+        assert edited_texts(bot) == ["\n abc"]
+
+    async def test_whitespace_continuation_not_sent(self, bot: MagicMock) -> None:
+        """Следующее сообщение отправляется только с видимым текстом продолжения."""
+        writer = TelegramStreamWriter(edit_interval=1.0, max_length=5)
+
+        with patch("src.telegram_stream_writer.time.monotonic", return_value=100.0):
+            await writer.write(bot, 5, tokens("abcde", "\n ", "f"))
+
+        assert edited_texts(bot) == ["abcde", "\n f"]
+        assert bot.send_message.call_count == 2
+
+    async def test_whitespace_response_removes_placeholder(self, bot: MagicMock) -> None:
+        """Ответ из одних пробелов не показывается, заглушка удаляется."""
+        writer = TelegramStreamWriter()
+
+        with patch("src.telegram_stream_writer.time.monotonic", return_value=100.0):
+            await writer.write(bot, 5, tokens("\n", " "))
+
+        bot.edit_message_text.assert_not_called()
+        bot.delete_message.assert_called_once_with(chat_id=5, message_id=10)
+
+    async def test_limit_counted_in_utf16_units(self, bot: MagicMock) -> None:
+        """Эмодзи занимает две единицы лимита Telegram."""
+        writer = TelegramStreamWriter(edit_interval=1.0, max_length=4)
+
+        with patch("src.telegram_stream_writer.time.monotonic", return_value=100.0):
+            await writer.write(bot, 5, tokens("😀😀😀"))
+
+        assert edited_texts(bot) == ["😀😀", "😀"]
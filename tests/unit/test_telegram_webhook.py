@@ -0,0 +1,158 @@
+"""Unit-тесты для модуля telegram_webhook и endpoint /telegram/webhook."""
+
+from typing import Any
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.app import create_app, create_webhook_app
+from src.telegram_webhook import TelegramWebhook
+
+SECRET = "test_secret"
+
+
+def make_update(update_id: int, text: str = "Привет") -> dict[str, Any]:
+    """JSON текстового обновления, как его присылает Telegram."""
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": 1760000000,
+            "chat": {"id": 5, "type": "private"},
+            "from": {"id": 5, "is_bot": False, "first_name": "Анна"},
+            "text": text,
+        },
+    }
+
+
+class TestTelegramWebhook:
+    """Тесты для класса TelegramWebhook."""
+
+    @pytest.fixture
+    def dispatcher(self) -> MagicMock:
+        """Мок aiogram Dispatcher."""
+        dispatcher = MagicMock()
+        dispatcher.feed_update = AsyncMock()
+        return dispatcher
+
+    @pytest.fixture
+    def webhook(self, dispatcher: MagicMock) -> TelegramWebhook:
+        """Прием обновлений с маленькой очередью."""
+        return TelegramWebhook(MagicMock(), dispatcher, SECRET, queue_size=2, workers=2)
+
+    def test_verify_secret(self, webhook: TelegramWebhook) -> None:
+        """Принимается только совпадающий секрет."""
+        assert webhook.verify(SECRET) is True
+        assert webhook.verify("wrong") is False
+        assert webhook.verify(None) is False
+        assert webhook.stats()["rejected"] == 2
+
+    def test_enqueue_until_full(self, webhook: TelegramWebhook) -> None:
+        """При заполненной очереди обновление отклоняется."""
+        assert webhook.enqueue(make_update(1)) is True
+        assert webhook.enqueue(make_update(2)) is True
+        assert webhook.enqueue(make_update(3)) is False
+
+        stats = webhook.stats()
+        assert stats["queue_size"] == 2
+        assert stats["dropped"] == 1
+
+    def test_enqueue_invalid_update(self, webhook: TelegramWebhook) -> None:
+        """Невалидное обновление вызывает ValueError."""
+        with pytest.raises(ValueError):
+            webhook.enqueue({"message": "not an update"})
+
+        assert webhook.stats()["invalid"] == 1
+
+    async def test_workers_feed_dispatcher(
+        self, webhook: TelegramWebhook, dispatcher: MagicMock
+    ) -> None:
+        """Workers передают обновления из очереди в Dispatcher."""
+        dispatcher.feed_update = AsyncMock(side_effect=[None, RuntimeError("handler error")])
+        webhook.enqueue(make_update(1))
+        webhook.enqueue(make_update(2))
+
+        await webhook.start()
+        await webhook.stop(timeout=1.0)
+
+        updates = [call.args[1].update_id for call in dispatcher.feed_update.call_args_list]
+        assert sorted(updates) == [1, 2]
+        assert webhook.stats()["processed"] == 1
+        assert webhook.stats()["failures"] == 1
+
+
+class TestWebhookEndpoint:
+    """Тесты endpoint /telegram/webhook с фейковым Telegram, присылающим обновления."""
+
+    @pytest.fixture
+    def webhook(self) -> TelegramWebhook:
+        """Прием обновлений без запущенных workers."""
+        return TelegramWebhook(MagicMock(), MagicMock(), SECRET, queue_size=1, workers=1)
+
+    @pytest.fixture
+    def client(self, webhook: TelegramWebhook) -> TestClient:
+        """Клиент отдельного приложения webhook (процесс бота)."""
+        return TestClient(create_webhook_app(webhook))
+
+    def test_update_acknowledged(self, client: TestClient, webhook: TelegramWebhook) -> None:
+        """Обновление с верным секретом ставится в очередь, ответ 200 сразу."""
+        response = client.post(
+            "/telegram/webhook",
+            json=make_update(1),
+            headers={"X-Telegram-Bot-Api-Secret-Token": SECRET},
+        )
+
+        assert response.status_code == 200
+        assert response.json() == {"ok": True}
+        assert webhook.stats()["received"] == 1
+
+    def test_wrong_secret(self, client: TestClient, webhook: TelegramWebhook) -> None:
+        """Запрос без верного секрета отклоняется с 401."""
+        response = client.post(
+            "/telegram/webhook",
+            json=make_update(1),
+            headers={"X-Telegram-Bot-Api-Secret-Token": "wrong"},
+        )
+
+        assert response.status_code == 401
+        assert webhook.stats()["received"] == 0
+
+    def test_invalid_update(self, client: TestClient) -> None:
+        """Невалидное обновление отклоняется с 400."""
+        response = client.post(
+            "/telegram/webhook",
+            json=[1, 2, 3],
+            headers={"X-Telegram-Bot-Api-Secret-Token": SECRET},
+        )
+
+        assert response.status_code == 400
+
+    def test_queue_full(self, client: TestClient) -> None:
+        """При заполненной очереди ответ 503, Telegram повторит доставку."""
+        headers = {"X-Telegram-Bot-Api-Secret-Token": SECRET}
+
+        assert client.post("/telegram/webhook", json=make_update(1), headers=headers).is_success
+        response = client.post("/telegram/webhook", json=make_update(2), headers=headers)
+
+        assert response.status_code == 503
+
+    def test_disabled_in_api_app(self) -> None:
+        """Если webhook не принимает API сервер, endpoint отвечает 404."""
+        client = TestClient(create_app(stat_collector=MagicMock()))
+
+        response = client.post("/telegram/webhook", json=make_update(1))
+
+        assert response.status_code == 404
+
+    def test_api_app_shares_webhook(self, webhook: TelegramWebhook) -> None:
+        """API приложение принимает обновления, если webhook передан в зависимости."""
+        client = TestClient(create_app(stat_collector=MagicMock(), telegram_webhook=webhook))
+
+        response = client.post(
+            "/telegram/webhook",
+            json=make_update(1),
+            headers={"X-Telegram-Bot-Api-Secret-Token": SECRET},
+        )
+
+        assert response.status_code == 200
@@ -0,0 +1,100 @@
+"""Unit-тесты для модуля turn_limiter."""
+
+import asyncio
+
+import pytest
+
+from src.turn_limiter import PRIORITY_GROUP, PRIORITY_PRIVATE, OverloadedError, TurnLimiter
+
+
+class TestTurnLimiter:
+    """Тесты для класса TurnLimiter."""
+
+    async def test_limits_concurrency(self) -> None:
+        """Одновременно выполняется не больше max_concurrent ходов."""
+        limiter = TurnLimiter(max_concurrent=2, max_queue=10, max_wait=1.0)
+        running = 0
+        max_running = 0
+
+        async def turn() -> None:
+            nonlocal running, max_running
+            async with limiter.slot():
+                running += 1
+                max_running = max(max_running, running)
+                await asyncio.sleep(0.01)
+                running -= 1
+
+        await asyncio.gather(*(turn() for _ in range(6)))
+
+        stats = limiter.stats()
+        assert max_running == 2
+        assert stats["admitted"] == 6
+        assert stats["queued"] == 4
+        assert stats["active"] == 0
+        assert stats["queue_depth"] == 0
+
+    async def test_priority_order(self) -> None:
+        """Личные чаты получают слот раньше групп, пришедших раньше них."""
+        limiter = TurnLimiter(max_concurrent=1, max_queue=10, max_wait=1.0)
+        release = asyncio.Event()
+        order: list[str] = []
+
+        async def turn(name: str, priority: int) -> None:
+            async with limiter.slot(priority):
+                order.append(name)
+                if name == "first":
+                    await release.wait()
+
+        first = asyncio.create_task(turn("first", PRIORITY_PRIVATE))
+        await asyncio.sleep(0)
+        waiters = [
+            asyncio.create_task(turn("group", PRIORITY_GROUP)),
+            asyncio.create_task(turn("private", PRIORITY_PRIVATE)),
+        ]
+        await asyncio.sleep(0)
+        assert limiter.stats()["queue_depth"] == 2
+
+        release.set()
+        await asyncio.gather(first, *waiters)
+
+        assert order == ["first", "private", "group"]
+
+    async def test_shed_when_queue_full(self) -> None:
+        """При заполненной очереди ход сразу отклоняется."""
+        limiter = TurnLimiter(max_concurrent=1, max_queue=0, max_wait=1.0)
+
+        async with limiter.slot():
+            with pytest.raises(OverloadedError):
+                async with limiter.slot():
+                    pass
+
+        assert limiter.stats()["shed_queue_full"] == 1
+        assert limiter.stats()["active"] == 0
+
+    async def test_shed_after_max_wait(self) -> None:
+        """Если слот не освободился за max_wait, ход отклоняется и уходит из очереди."""
+        limiter = TurnLimiter(max_concurrent=1, max_queue=10, max_wait=0.01)
+
+        async with limiter.slot():
+            with pytest.raises(OverloadedError):
+                async with limiter.slot():
+                    pass
+            assert limiter.stats()["queue_depth"] == 0
+
+        assert limiter.stats()["shed_timeout"] == 1
+        async with limiter.slot():
+            assert limiter.stats()["active"] == 1
+
+    async def test_cancelled_waiter_does_not_leak_slot(self) -> None:
+        """Отмененное ожидание не занимает слот."""
+        limiter = TurnLimiter(max_concurrent=1, max_queue=10, max_wait=1.0)
+
+        async with limiter.slot():
+            waiter = asyncio.create_task(limiter.slot().__aenter__())
+            await asyncio.sleep(0)
+            waiter.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await waiter
+
+        assert limiter.stats()["active"] == 0
+        assert limiter.stats()["queue_depth"] == 0
@@ -0,0 +1,82 @@
+"""Unit-тесты для модуля web_session_store."""
+
+from unittest.mock import AsyncMock, MagicMock
+
+import pytest
+
+from src.statements import STATEMENTS
+from src.web_session_store import WebSessionStore
+
+
+class TestWebSessionStore:
+    """Тесты для класса WebSessionStore."""
+
+    @pytest.fixture
+    def mock_connection(self) -> AsyncMock:
+        """Мок соединения с БД."""
+        return AsyncMock()
+
+    @pytest.fixture
+    def mock_pool(self, mock_connection: AsyncMock) -> MagicMock:
+        """Мок connection pool."""
+        pool = MagicMock()
+        pool.acquire = MagicMock(
+            return_value=AsyncMock(
+                __aenter__=AsyncMock(return_value=mock_connection),
+                __aexit__=AsyncMock(return_value=False),
+            )
+        )
+        return pool
+
+    async def test_existing_session_loaded_and_cached(
+        self, mock_pool: MagicMock, mock_connection: AsyncMock
+    ) -> None:
+        """Существующая сессия читается из БД один раз, дальше из кэша."""
+        mock_connection.fetchrow.return_value = {"user_id": -5}
+        store = WebSessionStore(mock_pool, cache_size=10)
+
+        assert await store.get_or_create_user_id("session-a") == -5
+        assert await store.get_or_create_user_id("session-a") == -5
+
+        mock_connection.fetchrow.assert_awaited_once_with(
+            STATEMENTS["select_web_session"], "session-a"
+        )
+        assert store.stats()["hits"] == 1
+        assert store.stats()["created"] == 0
+
+    async def test_new_session_gets_id_from_sequence(
+        self, mock_pool: MagicMock, mock_connection: AsyncMock
+    ) -> None:
+        """Для новой сессии user_id выдает вставка в web_sessions."""
+        mock_connection.fetchrow.side_effect = [None, {"user_id": -42}]
+        store = WebSessionStore(mock_pool, cache_size=10)
+
+        assert await store.get_or_create_user_id("session-b") == -42
+
+        assert mock_connection.fetchrow.await_args_list[1].args == (
+            STATEMENTS["insert_web_session"],
+            "session-b",
+        )
+        assert store.stats()["created"] == 1
+
+    async def test_concurrent_insert_falls_back_to_select(
+        self, mock_pool: MagicMock, mock_connection: AsyncMock
+    ) -> None:
+        """Если сессию вставил параллельный запрос, user_id перечитывается."""
+        mock_connection.fetchrow.side_effect = [None, None, {"user_id": -7}]
+        store = WebSessionStore(mock_pool, cache_size=10)
+
+        assert await store.get_or_create_user_id("session-c") == -7
+        assert store.stats()["created"] == 0
+
+    async def test_cache_is_bounded(self, mock_pool: MagicMock, mock_connection: AsyncMock) -> None:
+        """Кэш вытесняет давно не использованные сессии."""
+        mock_connection.fetchrow.side_effect = [{"user_id": -1}, {"user_id": -2}, {"user_id": -1}]
+        store = WebSessionStore(mock_pool, cache_size=1)
+
+        await store.get_or_create_user_id("session-1")
+        await store.get_or_create_user_id("session-2")
+        await store.get_or_create_user_id("session-1")
+
+        assert store.stats()["size"] == 1
+        assert store.stats()["misses"] == 3